@@ -15,15 +15,15 @@ try:
         file_size = os.path.getsize(pdf_path)
         print(f"✓ File verified: {file_size} bytes")
     
-    # Try to count pages using PyPDF2 if available
+    # Try to count pages using pypdf if available
     try:
-        from PyPDF2 import PdfReader
+        from pypdf import PdfReader
         with open(pdf_path, 'rb') as f:
             reader = PdfReader(f)
             page_count = len(reader.pages)
             print(f"✓ Page count: {page_count}")
     except ImportError:
-        print("⚠ PyPDF2 not installed (can't auto-detect page count)")
+        print("⚠ pypdf not installed (can't auto-detect page count)")
     except Exception as e:
         print(f"⚠ Error reading PDF: {e}")
     
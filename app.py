@@ -1,3 +1,4 @@
+import hmac
 import os
 try:
     from dotenv import load_dotenv
@@ -6,6 +7,7 @@ except Exception:
     pass
 from nicegui import ui
 from fastapi import Request, Response
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 import subprocess
 import threading
 from pathlib import Path
@@ -39,6 +41,118 @@ def login():
     login_page.page()
 
 from nicegui import app as nicegui_app
+from core.db import close_pools
+from core.telemetry_ingest import stop_writer
+from core.telemetry_maintenance import start_maintenance, stop_maintenance
+from core.live_hub import start_live_hub, stop_live_hub
+from core.pdf_render import stop_pdf_service
+from core.email_outbox import start_email_sender, stop_email_sender
+from core.settings_cache import reset_settings_cache
+from core.ticket_batch import (
+    iter_ticket_batch_zip, resume_ticket_batches, stop_ticket_batches, ticket_batch_pdf, ticket_batch_status,
+)
+
+def _ensure_telemetry_tables():
+    """Idempotent startup migrations for the telemetry read path."""
+    try:
+        from core.readings_repo import ensure_latest_reading_table, ensure_readings_text_view
+        from core.telemetry_store import ensure_rollup_tables
+        from core.alert_rules import ensure_alert_rules_table
+        from core.unit_alerts import ensure_unit_alerts_table
+        from core.settings_repo import ensure_retention_tables
+        ensure_latest_reading_table()
+        ensure_readings_text_view()
+        ensure_rollup_tables()
+        ensure_alert_rules_table()
+        ensure_unit_alerts_table()
+        ensure_retention_tables()
+    except Exception as e:
+        log_error(f"Telemetry table migration failed: {e}", "app")
+
+
+def _ensure_stat_counters():
+    """Trigger-maintained counters for the dashboard tiles and ticket stats."""
+    try:
+        from core.stat_counters import ensure_stat_counters
+        ensure_stat_counters()
+    except Exception as e:
+        log_error(f"Stat counters migration failed: {e}", "app")
+
+
+def _ensure_search_index():
+    """FTS5 search tables + triggers (first run indexes existing rows)."""
+    try:
+        from core.search_index import ensure_search_index
+        ensure_search_index()
+    except Exception as e:
+        log_error(f"Search index migration failed: {e}", "app")
+
+
+def _ensure_ticket_grid():
+    """Ticket grid view + keyset indexes."""
+    try:
+        from core.tickets_repo import ensure_ticket_grid
+        ensure_ticket_grid()
+    except Exception as e:
+        log_error(f"Ticket grid migration failed: {e}", "app")
+
+
+def _ensure_table_indexes():
+    """Sort indexes for the server-side CRUD tables, range indexes for the reports."""
+    try:
+        from core.customers_repo import ensure_customer_sort_indexes
+        from core.reports_repo import ensure_report_indexes
+        ensure_customer_sort_indexes()
+        ensure_report_indexes()
+    except Exception as e:
+        log_error(f"Table index migration failed: {e}", "app")
+
+
+def _ensure_report_cache():
+    """Table version triggers the report cache checks its entries against."""
+    try:
+        from core.report_cache import ensure_report_cache_tables
+        ensure_report_cache_tables()
+    except Exception as e:
+        log_error(f"Report cache migration failed: {e}", "app")
+
+
+def _ensure_settings_version():
+    """SettingsVersion + triggers, so the settings cache notices edits made by other processes."""
+    try:
+        from core.email_settings import ensure_email_settings_table
+        from core.settings_cache import ensure_settings_version
+        ensure_email_settings_table()
+        ensure_settings_version()
+    except Exception as e:
+        log_error(f"Settings version migration failed: {e}", "app")
+
+
+nicegui_app.on_startup(_ensure_telemetry_tables)
+nicegui_app.on_startup(_ensure_stat_counters)
+nicegui_app.on_startup(_ensure_search_index)
+nicegui_app.on_startup(_ensure_ticket_grid)
+nicegui_app.on_startup(_ensure_table_indexes)
+nicegui_app.on_startup(_ensure_settings_version)
+nicegui_app.on_startup(_ensure_report_cache)
+# Background roll-ups (after the tables above exist)
+nicegui_app.on_startup(start_maintenance)
+# Server-push refresh loop for live dashboards
+nicegui_app.on_startup(start_live_hub)
+# Outbound email queue (creates EmailOutbox, resends mail cut off by the last shutdown)
+nicegui_app.on_startup(start_email_sender)
+# Batch PDF exports interrupted by the last shutdown
+nicegui_app.on_startup(resume_ticket_batches)
+
+# Flush queued telemetry, then release pooled SQLite connections when the server stops
+nicegui_app.on_shutdown(stop_writer)
+nicegui_app.on_shutdown(stop_maintenance)
+nicegui_app.on_shutdown(stop_live_hub)
+nicegui_app.on_shutdown(stop_email_sender)
+nicegui_app.on_shutdown(stop_ticket_batches)
+nicegui_app.on_shutdown(stop_pdf_service)
+nicegui_app.on_shutdown(reset_settings_cache)
+nicegui_app.on_shutdown(close_pools)
 
 @nicegui_app.post("/api/logout-on-close")
 async def logout_on_close():
@@ -46,6 +160,35 @@ async def logout_on_close():
     logout()
     return {"status": "logged_out"}
 
+def _own_ticket_batch(batch_id: str):
+    """Status of a batch export the signed-in user may download, else None."""
+    user = current_user()
+    batch = ticket_batch_status(batch_id) if user else None
+    if batch is None or (batch["owner"] != user.get("email") and not is_admin()):
+        return None
+    return batch
+
+@nicegui_app.get("/api/tickets/batch/{batch_id}.zip")
+async def ticket_batch_zip(batch_id: str):
+    """ZIP of a batch export, streamed as its service orders finish rendering"""
+    if _own_ticket_batch(batch_id) is None:
+        return JSONResponse({"status": "error", "message": "Export not found"}, status_code=404)
+    return StreamingResponse(
+        iter_ticket_batch_zip(batch_id),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="ServiceOrders_{batch_id[:8]}.zip"'},
+    )
+
+@nicegui_app.get("/api/tickets/batch/{batch_id}.pdf")
+async def ticket_batch_merged_pdf(batch_id: str):
+    """Merged PDF of a finished batch export"""
+    if _own_ticket_batch(batch_id) is None:
+        return JSONResponse({"status": "error", "message": "Export not found"}, status_code=404)
+    path = ticket_batch_pdf(batch_id)
+    if path is None:
+        return JSONResponse({"status": "error", "message": "Export is not finished"}, status_code=409)
+    return FileResponse(path, media_type="application/pdf", filename=f"ServiceOrders_{batch_id[:8]}.pdf")
+
 @nicegui_app.post("/api/set-unit")
 async def set_unit(request: Request):
     """Trigger thermostat dialog for a unit"""
@@ -73,6 +216,53 @@ async def set_unit(request: Request):
         log_error(f"Error in /api/set-unit: {str(e)}", "app")
         return {"status": "error", "message": str(e)}
 
+@nicegui_app.post("/api/readings")
+async def ingest_readings(request: Request):
+    """
+    Telemetry ingestion for gateways.
+    Body: one JSON reading, a JSON array, {"readings": [...]}, or NDJSON.
+    Readings are queued and written in batches by core.telemetry_ingest.
+    """
+    from core.telemetry_ingest import MAX_BODY_BYTES, parse_payload, submit_readings, IngestQueueFull
+
+    api_key = os.getenv("INGEST_API_KEY")
+    if not api_key:
+        return JSONResponse({"status": "error", "message": "Ingestion is disabled (INGEST_API_KEY not set)"},
+                            status_code=403)
+    if not hmac.compare_digest(request.headers.get("x-api-key", "").encode(), api_key.encode()):
+        return JSONResponse({"status": "error", "message": "Invalid API key"}, status_code=401)
+
+    too_large = JSONResponse({"status": "error", "message": f"Body exceeds {MAX_BODY_BYTES} bytes"}, status_code=413)
+    try:
+        if int(request.headers.get("content-length") or 0) > MAX_BODY_BYTES:
+            return too_large
+    except ValueError:
+        return JSONResponse({"status": "error", "message": "Invalid Content-Length"}, status_code=400)
+    body = bytearray()
+    async for chunk in request.stream():   # Content-Length can be absent (chunked) or wrong
+        body += chunk
+        if len(body) > MAX_BODY_BYTES:
+            return too_large
+
+    try:
+        readings = parse_payload(bytes(body), request.headers.get("content-type", ""))
+    except ValueError as e:
+        return JSONResponse({"status": "error", "message": str(e)}, status_code=400)
+
+    try:
+        accepted, rejected = submit_readings(readings)
+    except IngestQueueFull as e:
+        return JSONResponse(
+            {"status": "busy", "message": str(e)},
+            status_code=503,
+            headers={"Retry-After": "1"},
+        )
+
+    return JSONResponse(
+        {"status": "ok", "accepted": accepted, "rejected": rejected},
+        status_code=202,
+    )
+
 # Store dialog callbacks per session
 _dialog_callbacks = {}
 
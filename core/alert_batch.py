@@ -0,0 +1,206 @@
+"""
+Batch Alert Evaluation
+Vectorized (NumPy) version of core.alert_system.evaluate_all_alerts for
+many readings at once - e.g. the latest reading of every unit, or a
+batch of new readings in core.unit_alerts (which uses the masks to skip
+readings that match no rule).
+
+Input is a columnar block: a dict of column name -> sequence/ndarray, all
+the same length (see readings_to_columns). Metrics are derived for whole
+columns exactly like core.alert_rules.derive_metrics, and every rule of the
+'alerts' ruleset becomes one boolean mask. Codes and counts match the
+scalar path exactly; messages are not built here - call
+evaluate_all_alerts() for the few readings that need them.
+"""
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.alert_rules import READING_METRICS, _split, _to_float, get_rule_engine, parse_modes
+
+# Columns the rules read
+ALERT_COLUMNS = (*READING_METRICS, 'mode', 'fault_code')
+
+_COMPARE = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '==': np.equal,
+    '!=': np.not_equal,
+}
+
+
+def readings_to_columns(rows: Iterable[Any], columns: Sequence[str] = ALERT_COLUMNS) -> Dict[str, Any]:
+    """
+    Transpose readings (dicts or sqlite3.Row) into a columnar block.
+    Columns a row does not have come out as None, like reading.get().
+    """
+    rows = list(rows)
+    if not rows:
+        return {name: [] for name in columns}
+
+    block: Dict[str, Any] = {}
+    if isinstance(rows[0], dict):
+        for name in (*columns, 'unit_id'):
+            block[name] = [r.get(name) for r in rows]
+    else:
+        keys = set(rows[0].keys())   # sqlite3.Row - same columns in every row
+        for name in (*columns, 'unit_id'):
+            block[name] = [r[name] for r in rows] if name in keys else [None] * len(rows)
+    if all(u is None for u in block['unit_id']):
+        del block['unit_id']
+    return block
+
+
+def _numeric(values: Any, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Column -> (float64 values, present mask). 'present' mirrors
+    `_to_float(v) is not None`; in float arrays NaN means missing (SQLite
+    stores NaN as NULL, so stored readings cannot tell the two apart).
+    """
+    if values is None:
+        return np.full(n, np.nan), np.zeros(n, dtype=bool)
+    if isinstance(values, np.ndarray) and values.dtype.kind in 'fiub':
+        vals = values.astype(np.float64, copy=False)
+        return vals, ~np.isnan(vals)
+
+    try:
+        vals = np.asarray(values, dtype=object).astype(np.float64)
+    except (ValueError, TypeError):
+        # Some entries are not numbers - convert one by one like the scalar path
+        converted = [_to_float(v) for v in values]
+        present = np.fromiter((v is not None for v in converted), dtype=bool, count=n)
+        vals = np.fromiter((np.nan if v is None else v for v in converted), dtype=np.float64, count=n)
+        return vals, present
+
+    nan = np.isnan(vals)
+    if not nan.any():
+        return vals, np.ones(n, dtype=bool)
+    # NaN is either a missing value or a literal 'nan' string (which the scalar path keeps)
+    present = ~nan
+    for i in np.flatnonzero(nan):
+        present[i] = _to_float(values[i]) is not None
+    return vals, present
+
+
+def _derive(block: Mapping[str, Any], n: int) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Columnar derive_metrics(): name -> (values, present)."""
+    m = {name: _numeric(block.get(name), n) for name in READING_METRICS}
+    with np.errstate(all='ignore'):
+        (s, s_ok), (r, r_ok) = m['supply_temp'], m['return_temp']
+        delta = s - r
+        m['delta_t'] = delta, s_ok & r_ok
+        m['abs_delta_t'] = np.abs(delta), s_ok & r_ok
+
+        (d, d_ok), (su, su_ok) = m['discharge_psi'], m['suction_psi']
+        m['pressure_ratio'] = d / su, d_ok & su_ok & (su > 0)
+
+        # Sums in the same order as the scalar path so rounding matches
+        (p1, p1_ok), (p2, p2_ok), (p3, p3_ok) = m['v_1'], m['v_2'], m['v_3']
+        n_phases = p1_ok.astype(np.int8) + p2_ok + p3_ok
+        phase_sum = np.where(p1_ok, p1, 0.0) + np.where(p2_ok, p2, 0.0) + np.where(p3_ok, p3, 0.0)
+        avg = phase_sum / n_phases
+        m['phase_avg'] = avg, n_phases > 0
+
+        spread = np.maximum(np.maximum(p1, p2), p3) - np.minimum(np.minimum(p1, p2), p3)
+        m['phase_imbalance'] = (spread / avg) * 100, (n_phases == 3) & (avg > 0)
+
+        c, c_ok = m['compressor_amps']
+        m['compressor_overload'] = ((c - avg) / avg) * 100, c_ok & (c != 0) & (n_phases > 0) & (avg > 0)
+
+    faults = block.get('fault_code')
+    if faults is None:
+        m['fault_code'] = np.zeros(n), np.zeros(n, dtype=bool)
+    else:
+        truthy = np.fromiter((bool(f) for f in faults), dtype=bool, count=n)
+        m['fault_code'] = truthy.astype(np.float64), np.fromiter((f is not None for f in faults), dtype=bool, count=n)
+    return m
+
+
+def _rule_mask(rule: Dict[str, Any], metrics: Dict[str, Tuple[np.ndarray, np.ndarray]],
+               modes: Optional[np.ndarray], n: int) -> np.ndarray:
+    mask = np.ones(n, dtype=bool)
+    negate, names = parse_modes(rule['modes'])
+    if names:
+        if modes is None:
+            in_modes = np.zeros(n, dtype=bool)
+        else:
+            in_modes = np.zeros(n, dtype=bool)
+            for name in names:
+                in_modes |= modes == name
+        mask &= ~in_modes if negate else in_modes
+    for name in _split(rule['requires']):
+        mask &= metrics[name][1]
+
+    op = rule['op']
+    if op == 'always':
+        return mask
+    vals, present = metrics[rule['metric']]
+    mask &= present
+    if op == 'set':
+        return mask & (vals != 0)
+    if op == 'between':
+        return mask & (vals >= rule['value']) & (vals <= rule['value2'])
+    if op == 'outside':
+        return mask & ((vals < rule['value']) | (vals > rule['value2']))
+    return mask & _COMPARE[op](vals, rule['value'])
+
+
+def evaluate_alerts_batch(block: Mapping[str, Any], with_codes: bool = True,
+                          ruleset: str = 'alerts',
+                          rules: Optional[List[Dict[str, Any]]] = None,
+                          record: bool = True) -> Dict[str, Any]:
+    """
+    Evaluate a ruleset (default 'alerts') for every reading in a columnar block.
+    `rules` pins the rule list (e.g. compiled['rules'] of the caller's
+    compiled ruleset) instead of the engine's current one; record=False
+    leaves the engine's hit / timing statistics alone (internal prefilters).
+
+    Returns:
+        dict: 'masks' (code -> bool array, rule order), 'count' / 'critical' /
+        'warning' / 'info' (int arrays per reading), 'codes' (list of code
+        lists in evaluate_all_alerts order, if with_codes), and 'unit_id'
+        when given.
+    """
+    started = time.perf_counter()
+    engine = get_rule_engine()
+    if rules is None:
+        rules = engine.rules(ruleset)
+    n = len(next(iter(block.values()), ()))
+
+    modes = block.get('mode')
+    modes = None if modes is None else np.asarray(modes, dtype=object)
+    with np.errstate(all='ignore'):
+        metrics = _derive(block, n)
+        masks: Dict[str, np.ndarray] = {}
+        result: Dict[str, Any] = {sev: np.zeros(n, dtype=np.int32) for sev in ('critical', 'warning', 'info')}
+        for rule in rules:
+            mask = _rule_mask(rule, metrics, modes, n)
+            code = rule['code']
+            masks[code] = masks[code] | mask if code in masks else mask
+            result[rule['severity']] += mask
+
+    result['masks'] = masks
+    result['count'] = result['critical'] + result['warning'] + result['info']
+    if with_codes:
+        result['codes'] = alert_codes(masks, n)
+    if 'unit_id' in block:
+        result['unit_id'] = np.asarray(block['unit_id'])
+
+    if record:
+        engine.record_batch(ruleset, {code: int(mask.sum()) for code, mask in masks.items()},
+                            n, time.perf_counter() - started)
+    return result
+
+
+def alert_codes(masks: Mapping[str, np.ndarray], n: Optional[int] = None) -> List[List[str]]:
+    """Per-reading alert code lists (rule order) from batch masks."""
+    if n is None:
+        n = len(next(iter(masks.values()), ()))
+    codes: List[List[str]] = [[] for _ in range(n)]
+    for code, mask in masks.items():
+        for i in np.flatnonzero(mask):
+            codes[i].append(code)
+    return codes
@@ -0,0 +1,746 @@
+"""
+Alert Rules
+One declarative rule table for every threshold check in the app:
+
+  ruleset 'alerts'  core.alert_system / core.alert_batch / ui.alert_system
+  ruleset 'health'  core.equipment_analysis (health score warnings)
+  ruleset 'status'  core.unit_status (status colour / message, first match)
+
+A rule is `metric op value` plus optional mode and "requires" guards, e.g.
+  {code: LOW_DELTA_T, metric: delta_t, op: '<', value: 10, modes: 'Cooling,Heating'}
+'alerts' rules may also set hysteresis / open_after / clear_after for the
+alert lifecycle tracker (core/unit_alerts.py).
+
+Rules come from ALERT_RULES_FILE (YAML) if set, else the AlertRules table,
+else DEFAULT_RULES (a ruleset missing from a source falls back to the
+defaults). Each ruleset is compiled into one generated Python function and
+cached; the source is re-checked every RELOAD_INTERVAL seconds and
+recompiled when it changed. Per-rule hit counters and evaluation timings
+are kept in the engine (get_rule_stats()).
+"""
+import os
+import sqlite3
+import string
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.db import get_conn
+
+RULES_SQL = Path(__file__).resolve().parent.parent / "schema" / "alert_rules.sql"
+RELOAD_INTERVAL = float(os.getenv("ALERT_RULES_RELOAD_SECONDS", "5"))   # seconds between source checks
+
+RULESETS = ("alerts", "health", "status")
+SEVERITIES = ("critical", "warning", "info")
+OPS = ("<", "<=", ">", ">=", "==", "!=", "between", "outside", "set", "always")
+
+# Numeric reading columns rules may use, and metrics derived from them
+READING_METRICS = (
+    "supply_temp", "return_temp", "discharge_psi", "suction_psi",
+    "v_1", "v_2", "v_3", "compressor_amps", "fan_speed_percent",
+)
+DERIVED_METRICS = (
+    "delta_t", "abs_delta_t", "pressure_ratio", "phase_avg", "phase_imbalance", "compressor_overload",
+)
+METRICS = READING_METRICS + DERIVED_METRICS + ("fault_code",)
+
+_RULE_FIELDS = (
+    "ruleset", "code", "category", "severity", "metric", "op", "value", "value2",
+    "modes", "requires", "message", "parameter", "priority", "enabled",
+    "hysteresis", "open_after", "clear_after",
+)
+
+# Lifecycle columns added after AlertRules first shipped (see ensure_alert_rules_table)
+_LIFECYCLE_COLUMNS = (("hysteresis", "REAL"), ("open_after", "INTEGER"), ("clear_after", "INTEGER"))
+
+
+def _to_float(value):
+    """Convert value to float, returns None if conversion fails"""
+    if value is None:
+        return None
+    if type(value) is float:  # typed REAL column - nothing to parse
+        return value
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+# =========================================================
+# DEFAULT RULES
+# =========================================================
+
+def _rules(ruleset: str, *rows: Tuple) -> List[Dict[str, Any]]:
+    """(code, category, severity, metric, op, value, message, extras) -> rule dicts, priority in order."""
+    out = []
+    for i, (code, category, severity, metric, op, value, message, *extra) in enumerate(rows, 1):
+        rule = {
+            "ruleset": ruleset, "code": code, "category": category, "severity": severity,
+            "metric": metric, "op": op, "value": value, "value2": None, "modes": None,
+            "requires": None, "message": message, "parameter": metric, "priority": i * 10,
+            "enabled": 1, "hysteresis": None, "open_after": None, "clear_after": None,
+        }
+        rule.update(extra[0] if extra else {})
+        out.append(rule)
+    return out
+
+
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    # Alerts (dashboard counts, alert lists, batch evaluation)
+    *_rules(
+        "alerts",
+        ("UNIT_FAULT", "fault", "critical", "fault_code", "set", None, "Unit fault: {fault_code}"),
+        ("TEMP_FREEZE_RISK", "temperature", "critical", "supply_temp", "<", 32,
+         "Supply temp {supply_temp}°F - Freezing risk", {"hysteresis": 2}),
+        ("TEMP_TOO_HIGH", "temperature", "warning", "supply_temp", ">", 140,
+         "Supply temp {supply_temp}°F - Excessive temperature", {"hysteresis": 5}),
+        ("LOW_DELTA_T", "temperature", "warning", "delta_t", "<", 10,
+         "Low Delta-T ({delta_t:.1f}°F) - Poor efficiency", {"modes": "Cooling,Heating", "hysteresis": 1}),
+        ("HIGH_DELTA_T", "temperature", "info", "delta_t", ">", 25,
+         "High Delta-T ({delta_t:.1f}°F) - Possible restriction", {"modes": "Cooling,Heating", "hysteresis": 1}),
+        ("LOW_DISCHARGE_PSI", "pressure", "warning", "discharge_psi", "<", 100,
+         "Low discharge pressure {discharge_psi} PSI - Possible leak",
+         {"requires": "suction_psi", "hysteresis": 10}),
+        ("HIGH_DISCHARGE_PSI", "pressure", "critical", "discharge_psi", ">", 400,
+         "High discharge pressure {discharge_psi} PSI - System overload",
+         {"requires": "suction_psi", "hysteresis": 10}),
+        ("LOW_SUCTION_PSI", "pressure", "warning", "suction_psi", "<", 20,
+         "Low suction pressure {suction_psi} PSI - Possible blockage",
+         {"requires": "discharge_psi", "hysteresis": 5}),
+        ("HIGH_SUCTION_PSI", "pressure", "info", "suction_psi", ">", 150,
+         "High suction pressure {suction_psi} PSI", {"requires": "discharge_psi", "hysteresis": 5}),
+        ("UNUSUAL_PRESSURE_RATIO", "pressure", "warning", "pressure_ratio", "outside", 3,
+         "Pressure ratio {pressure_ratio:.1f} - Outside normal range", {"value2": 7, "hysteresis": 0.3}),
+        ("PHASE_1_OVERLOAD", "electrical", "warning", "v_1", ">", 50, "Phase 1 overload: {v_1}A",
+         {"hysteresis": 2}),
+        ("PHASE_2_OVERLOAD", "electrical", "warning", "v_2", ">", 50, "Phase 2 overload: {v_2}A",
+         {"hysteresis": 2}),
+        ("PHASE_3_OVERLOAD", "electrical", "warning", "v_3", ">", 50, "Phase 3 overload: {v_3}A",
+         {"hysteresis": 2}),
+        ("PHASE_IMBALANCE", "electrical", "warning", "phase_imbalance", ">", 10,
+         "Phase imbalance: {phase_imbalance:.1f}% (max {threshold:g}%)", {"hysteresis": 2}),
+        ("COMPRESSOR_OVERLOAD", "electrical", "warning", "compressor_overload", ">", 20,
+         "Compressor overload: {compressor_overload:.0f}% above average",
+         {"parameter": "compressor_amps", "hysteresis": 5}),
+    ),
+    # Health score (first match per category counts as that category's warning)
+    *_rules(
+        "health",
+        ("LOW_DELTA_T", "temperature", "warning", "delta_t", "<", 10,
+         "Low Delta-T (poor temperature differential)"),
+        ("HIGH_DELTA_T", "temperature", "warning", "delta_t", ">", 25, "High Delta-T (possible restriction)"),
+        ("LOW_RATIO_COOLING", "pressure", "warning", "pressure_ratio", "<", 4,
+         "Low pressure ratio: {pressure_ratio:.1f} (expected 4-6)", {"modes": "Cooling"}),
+        ("HIGH_RATIO_COOLING", "pressure", "warning", "pressure_ratio", ">", 6,
+         "High pressure ratio: {pressure_ratio:.1f} (expected 4-6)", {"modes": "Cooling"}),
+        ("LOW_RATIO_HEATING", "pressure", "warning", "pressure_ratio", "<", 3,
+         "Low pressure ratio: {pressure_ratio:.1f} (expected 3-5)", {"modes": "Heating"}),
+        ("HIGH_RATIO_HEATING", "pressure", "warning", "pressure_ratio", ">", 5,
+         "High pressure ratio: {pressure_ratio:.1f} (expected 3-5)", {"modes": "Heating"}),
+        ("COMPRESSOR_OVERLOAD", "electrical", "warning", "compressor_overload", ">", 20,
+         "Compressor overload: {compressor_amps}A at {compressor_overload:.0f}% above average"),
+        ("PHASE_IMBALANCE", "electrical", "warning", "phase_imbalance", ">", 10,
+         "Phase imbalance: {phase_imbalance:.1f}% (should be <{threshold:g}%)"),
+    ),
+    # Equipment page status colour (first match wins)
+    *_rules(
+        "status",
+        ("FAULT_MODE", "operation", "critical", None, "always", None, "Unit in fault mode", {"modes": "Fault"}),
+        ("LOW_DELTA_T", "temperature", "critical", "abs_delta_t", "<", 14,
+         "Low Delta T (cooling fault?) - check refrigerant/airflow/coil", {"modes": "Cooling"}),
+        ("MARGINAL_DELTA_T", "temperature", "warning", "abs_delta_t", "<", 16,
+         "Marginal Delta T - possible low charge or dirty filter", {"modes": "Cooling"}),
+        ("HIGH_SUPPLY_TEMP", "temperature", "warning", "supply_temp", ">", 62,
+         "High supply temp - cooling underperforming", {"modes": "Cooling"}),
+        ("LOW_HEAT_RISE", "temperature", "critical", "abs_delta_t", "<", 30,
+         "Low heat rise - check heat exchanger/fan", {"modes": "Heating"}),
+        ("FAN_STOPPED", "operation", "critical", "fan_speed_percent", "==", 0,
+         "Fan stopped during operation", {"modes": "!Off,Idle"}),
+    ),
+]
+
+
+# =========================================================
+# METRICS
+# =========================================================
+
+def derive_metrics(reading: Any) -> Dict[str, Any]:
+    """
+    Reading (dict or sqlite3.Row) -> values rules can test. Missing or
+    non-numeric values are None; derived metrics are None unless every
+    input is present (and the divisor is positive).
+    """
+    if not isinstance(reading, dict):
+        reading = dict(reading)
+    get = reading.get
+    m: Dict[str, Any] = {}
+    for name in READING_METRICS:
+        value = get(name)
+        m[name] = value if type(value) is float else _to_float(value)
+    m["mode"] = get("mode")
+    m["fault_code"] = get("fault_code")
+
+    supply, ret = m["supply_temp"], m["return_temp"]
+    delta = supply - ret if supply is not None and ret is not None else None
+    m["delta_t"] = delta
+    m["abs_delta_t"] = abs(delta) if delta is not None else None
+
+    discharge, suction = m["discharge_psi"], m["suction_psi"]
+    m["pressure_ratio"] = (
+        discharge / suction if discharge is not None and suction is not None and suction > 0 else None
+    )
+
+    phases = [p for p in (m["v_1"], m["v_2"], m["v_3"]) if p is not None]
+    avg = sum(phases) / len(phases) if phases else None
+    m["phase_avg"] = avg
+    imbalance = None
+    if len(phases) == 3 and avg > 0:
+        imbalance = ((max(phases) - min(phases)) / avg) * 100
+    m["phase_imbalance"] = imbalance
+    comp = m["compressor_amps"]
+    m["compressor_overload"] = ((comp - avg) / avg) * 100 if comp and avg is not None and avg > 0 else None
+    return m
+
+
+# =========================================================
+# VALIDATION / COMPILATION
+# =========================================================
+
+def _split(value: Any) -> List[str]:
+    return [p.strip() for p in str(value or "").split(",") if p.strip()]
+
+
+def parse_modes(spec: Any) -> Tuple[bool, Tuple[str, ...]]:
+    """'Cooling,Heating' -> (False, modes); '!Off,Idle' -> (True, modes) meaning 'not in'."""
+    text = str(spec or "").strip()
+    negate = text.startswith("!")
+    return negate, tuple(_split(text[1:] if negate else text))
+
+
+def normalize_rule(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate one rule (from YAML, the DB or DEFAULT_RULES). Raises ValueError."""
+    rule = {k: raw.get(k) for k in _RULE_FIELDS}
+    code = str(rule["code"] or "").strip()
+    if not code:
+        raise ValueError("rule without code")
+    rule["code"] = code
+    if rule["ruleset"] not in RULESETS:
+        raise ValueError(f"{code}: unknown ruleset {rule['ruleset']!r}")
+    if rule["severity"] not in SEVERITIES:
+        raise ValueError(f"{code}: unknown severity {rule['severity']!r}")
+    if rule["op"] not in OPS:
+        raise ValueError(f"{code}: unknown op {rule['op']!r}")
+    if rule["op"] != "always" and rule["metric"] not in METRICS:
+        raise ValueError(f"{code}: unknown metric {rule['metric']!r}")
+    if rule["metric"] == "fault_code" and rule["op"] != "set":
+        raise ValueError(f"{code}: fault_code only supports op 'set'")
+    for name in _split(rule["requires"]):
+        if name not in METRICS:
+            raise ValueError(f"{code}: unknown required metric {name!r}")
+    if rule["op"] in ("between", "outside"):
+        if rule["value"] is None or rule["value2"] is None:
+            raise ValueError(f"{code}: {rule['op']} needs value and value2")
+    elif rule["op"] not in ("set", "always") and rule["value"] is None:
+        raise ValueError(f"{code}: {rule['op']} needs a value")
+    for key in ("value", "value2"):
+        if rule[key] is not None:
+            rule[key] = float(rule[key])
+
+    rule["message"] = str(rule["message"] or code)
+    allowed = set(METRICS) | {"mode", "threshold", "threshold2"}
+    try:
+        fields = {field for _, field, _, _ in string.Formatter().parse(rule["message"]) if field is not None}
+    except ValueError as e:
+        raise ValueError(f"{code}: bad message template ({e})")
+    for field in fields - allowed:
+        raise ValueError(f"{code}: unknown message field {{{field}}}")
+
+    rule["category"] = str(rule["category"] or "general")
+    rule["parameter"] = rule["parameter"] or rule["metric"]
+    rule["priority"] = int(rule["priority"] if rule["priority"] is not None else 100)
+    rule["enabled"] = 0 if rule["enabled"] in (0, "0", False) else 1
+
+    # Lifecycle tuning (core.unit_alerts); None = tracker defaults
+    if rule["hysteresis"] is not None:
+        rule["hysteresis"] = float(rule["hysteresis"])
+        if rule["hysteresis"] < 0:
+            raise ValueError(f"{code}: hysteresis must be >= 0")
+    for key in ("open_after", "clear_after"):
+        if rule[key] is not None:
+            rule[key] = int(rule[key])
+            if rule[key] < 1:
+                raise ValueError(f"{code}: {key} must be >= 1")
+    return rule
+
+
+def _condition(rule: Dict[str, Any]) -> str:
+    """Python expression for one rule over the metrics dict `m`."""
+    parts = []
+    negate, modes = parse_modes(rule["modes"])
+    if modes:
+        parts.append(f"m['mode'] {'not in' if negate else 'in'} {modes!r}")
+    for name in _split(rule["requires"]):
+        parts.append(f"m[{name!r}] is not None")
+
+    op, metric = rule["op"], rule["metric"]
+    v, v2 = rule["value"], rule["value2"]
+    if op == "always":
+        pass
+    elif op == "set":
+        parts.append(f"m[{metric!r}]")
+    else:
+        parts.append(f"m[{metric!r}] is not None")
+        x = f"m[{metric!r}]"
+        if op == "between":
+            parts.append(f"{v!r} <= {x} <= {v2!r}")
+        elif op == "outside":
+            parts.append(f"({x} < {v!r} or {x} > {v2!r})")
+        else:
+            parts.append(f"{x} {op} {v!r}")
+    return " and ".join(parts) or "True"
+
+
+def _clear_condition(rule: Dict[str, Any]) -> str:
+    """
+    Python expression that is true once a matching reading is clearly back
+    to normal: outside the rule's modes, or past the threshold by the
+    rule's hysteresis band. Missing values are neither a match nor a clear.
+    """
+    negate, modes = parse_modes(rule["modes"])
+    left_mode = f"m['mode'] {'in' if negate else 'not in'} {modes!r}" if modes else None
+
+    op, metric = rule["op"], rule["metric"]
+    v, v2, h = rule["value"], rule["value2"], rule["hysteresis"] or 0.0
+    x = f"m[{metric!r}]"
+    parts = [f"m[{name!r}] is not None" for name in _split(rule["requires"])]
+    if op == "always":
+        parts = ["False"]
+    elif op == "set":
+        parts.append(f"not {x}")
+    else:
+        parts.append(f"{x} is not None")
+        if op == "<":
+            parts.append(f"{x} >= {v + h!r}")
+        elif op == "<=":
+            parts.append(f"{x} > {v + h!r}")
+        elif op == ">":
+            parts.append(f"{x} <= {v - h!r}")
+        elif op == ">=":
+            parts.append(f"{x} < {v - h!r}")
+        elif op == "==":
+            parts.append(f"abs({x} - {v!r}) > {h!r}" if h else f"{x} != {v!r}")
+        elif op == "!=":
+            parts.append(f"{x} == {v!r}")
+        elif op == "between":
+            parts.append(f"({x} < {v - h!r} or {x} > {v2 + h!r})")
+        else:   # outside
+            parts.append(f"{v + h!r} <= {x} <= {v2 - h!r}")
+    back = " and ".join(parts)
+    return f"({left_mode} or ({back}))" if left_mode else f"({back})"
+
+
+def _generate(rules: List[Dict[str, Any]], name: str, first: bool) -> Callable[[Dict[str, Any]], Any]:
+    """One function testing every rule in order; returns hit indexes (or the first one / -1)."""
+    lines = [f"def {name}(m):"]
+    if not first:
+        lines.append("    hits = []")
+    for i, rule in enumerate(rules):
+        lines.append(f"    if {_condition(rule)}:")
+        lines.append(f"        return {i}" if first else f"        hits.append({i})")
+    lines.append("    return -1" if first else "    return hits")
+    namespace: Dict[str, Any] = {}
+    exec(compile("\n".join(lines), f"<alert_rules:{name}>", "exec"), namespace)
+    return namespace[name]
+
+
+def _generate_states(rules: List[Dict[str, Any]]) -> Callable[[Dict[str, Any]], Tuple[int, ...]]:
+    """One function returning per rule 1 (matches), 0 (clear past the hysteresis band) or 2 (neither)."""
+    lines = ["def _states(m):", "    return ("]
+    for rule in rules:
+        lines.append(f"        1 if {_condition(rule)} else 0 if {_clear_condition(rule)} else 2,")
+    lines.append("    )")
+    namespace: Dict[str, Any] = {}
+    exec(compile("\n".join(lines), "<alert_rules:_states>", "exec"), namespace)
+    return namespace["_states"]
+
+
+def _renderer(rule: Dict[str, Any]) -> Callable[[Dict[str, Any]], str]:
+    """Message template -> function building the text from the metrics dict."""
+    parts = []
+    for literal, field, spec, conversion in string.Formatter().parse(rule["message"]):
+        if literal:
+            parts.append(repr(literal))
+        if field is None:
+            continue
+        if field in ("threshold", "threshold2"):
+            value = repr(rule["value" if field == "threshold" else "value2"])
+        else:
+            value = f"m[{field!r}]"
+        if conversion:
+            value = f"{'repr' if conversion == 'r' else 'ascii' if conversion == 'a' else 'str'}({value})"
+        parts.append(f"format({value}, {spec or ''!r})")
+    return eval(f"lambda m: {' + '.join(parts) or repr('')}", {})
+
+
+def compile_ruleset(rules: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Enabled rules (priority order) + generated evaluators for the set and
+    each category, and the per-rule match / clear states used by the
+    alert lifecycle tracker.
+    """
+    active = sorted((r for r in rules if r["enabled"]), key=lambda r: r["priority"])
+    for rule in active:
+        rule["_render"] = _renderer(rule)
+    compiled: Dict[str, Any] = {
+        "rules": active,
+        "hits": [0] * len(active),
+        "all": _generate(active, "_all", first=False),
+        "first": _generate(active, "_first", first=True),
+        "states": _generate_states(active),
+        "categories": {},
+    }
+    for category in dict.fromkeys(r["category"] for r in active):
+        subset = [i for i, r in enumerate(active) if r["category"] == category]
+        sub_rules = [active[i] for i in subset]
+        compiled["categories"][category] = {
+            "index": subset,
+            "all": _generate(sub_rules, "_all", first=False),
+            "first": _generate(sub_rules, "_first", first=True),
+        }
+    return compiled
+
+
+def format_alert(rule: Dict[str, Any], metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """Alert dict for a matched rule (same shape the alert functions always returned)."""
+    try:
+        message = rule["_render"](metrics)
+    except (ValueError, TypeError, KeyError):
+        message = rule["message"]   # value missing or not numeric - show the template
+    return {
+        "severity": rule["severity"],
+        "code": rule["code"],
+        "message": message,
+        "parameter": rule["parameter"],
+    }
+
+
+# =========================================================
+# SOURCES
+# =========================================================
+
+def ensure_alert_rules_table(seed: bool = True) -> None:
+    """Create AlertRules (+ version triggers) and seed DEFAULT_RULES (idempotent)."""
+    with get_conn() as conn:
+        conn.executescript(RULES_SQL.read_text(encoding="utf-8"))
+
+        # Tables created before the lifecycle columns: add them, with the default hysteresis bands
+        existing = {r[1] for r in conn.execute("PRAGMA table_info(AlertRules)")}
+        added = [name for name, _ in _LIFECYCLE_COLUMNS if name not in existing]
+        for name, sql_type in _LIFECYCLE_COLUMNS:
+            if name in added:
+                conn.execute(f"ALTER TABLE AlertRules ADD COLUMN {name} {sql_type}")
+        if "hysteresis" in added:
+            conn.executemany(
+                "UPDATE AlertRules SET hysteresis = ? WHERE ruleset = ? AND code = ? AND hysteresis IS NULL",
+                [(r["hysteresis"], r["ruleset"], r["code"]) for r in DEFAULT_RULES if r["hysteresis"]],
+            )
+
+        if seed:
+            cols = ", ".join(_RULE_FIELDS)
+            conn.executemany(
+                f"INSERT OR IGNORE INTO AlertRules ({cols}) VALUES ({', '.join('?' for _ in _RULE_FIELDS)})",
+                [tuple(r[k] for k in _RULE_FIELDS) for r in DEFAULT_RULES],
+            )
+
+
+def _rules_file() -> Optional[Path]:
+    path = os.getenv("ALERT_RULES_FILE", "").strip()
+    return Path(path) if path else None
+
+
+def _load_yaml(path: Path) -> List[Dict[str, Any]]:
+    import yaml
+
+    data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    if isinstance(data, list):
+        return data
+    rules = []
+    for ruleset, items in data.items():   # {alerts: [...], health: [...]} layout
+        for item in items or []:
+            rules.append({"ruleset": ruleset, **item})
+    return rules
+
+
+def _db_version() -> Optional[int]:
+    conn = get_conn()
+    try:
+        row = conn.execute("SELECT version FROM AlertRulesVersion WHERE id = 1").fetchone()
+    except sqlite3.OperationalError:
+        return None   # table not created yet
+    finally:
+        conn.close()
+    return int(row[0]) if row else None
+
+
+def _fingerprint() -> Tuple[Any, ...]:
+    path = _rules_file()
+    if path is not None:
+        try:
+            st = path.stat()
+            return ("yaml", str(path), st.st_mtime_ns, st.st_size)
+        except OSError:
+            return ("yaml", str(path), None, None)
+    from core import db
+    return ("db", str(db.DB_PATH), _db_version())
+
+
+def _load_source(fingerprint: Tuple[Any, ...]) -> List[Dict[str, Any]]:
+    if fingerprint[0] == "yaml":
+        if fingerprint[2] is None:
+            raise FileNotFoundError(f"Alert rules file not found: {fingerprint[1]}")
+        return _load_yaml(Path(fingerprint[1]))
+    if fingerprint[2] is None:
+        return []
+    with get_conn() as conn:
+        return [dict(r) for r in conn.execute("SELECT * FROM AlertRules ORDER BY ruleset, priority, id")]
+
+
+# =========================================================
+# ENGINE
+# =========================================================
+
+class RuleEngine:
+    """Compiled rulesets with hot reload, hit counters and timing."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._compiled: Dict[str, Dict[str, Any]] = {}
+        self._fingerprint: Optional[Tuple[Any, ...]] = None
+        self._next_check = 0.0
+        self._loaded_at: Optional[str] = None
+        self._source = "defaults"
+        self._load_errors: List[str] = []
+        self._reloads = 0
+        self._hits: Dict[Tuple[str, str], int] = {}
+        self._evals: Dict[str, Dict[str, float]] = {}
+
+    # -------------------------
+    # Loading
+    # -------------------------
+
+    def reload(self, force: bool = True) -> Dict[str, Any]:
+        """Re-read the rule source and recompile if it changed (or force)."""
+        fingerprint = _fingerprint()
+        with self._lock:
+            self._next_check = time.monotonic() + RELOAD_INTERVAL
+            unchanged = not force and fingerprint == self._fingerprint and bool(self._compiled)
+        if unchanged:
+            return self.source_info()
+
+        errors: List[str] = []
+        try:
+            raw = _load_source(fingerprint)
+        except Exception as e:
+            errors.append(f"Could not load alert rules: {e}")
+            raw = None
+
+        if raw is None and self._compiled:
+            # Keep serving the last good rules
+            with self._lock:
+                self._load_errors = errors
+                self._fingerprint = fingerprint
+            _log_error(errors[0])
+            return self.source_info()
+
+        by_set: Dict[str, List[Dict[str, Any]]] = {name: [] for name in RULESETS}
+        for item in raw or []:
+            try:
+                rule = normalize_rule(item)
+            except (ValueError, TypeError) as e:
+                errors.append(str(e))
+                continue
+            by_set[rule["ruleset"]].append(rule)
+
+        source = "defaults" if not raw else fingerprint[0]
+        compiled = {}
+        for name in RULESETS:
+            rules = by_set[name] or [normalize_rule(r) for r in DEFAULT_RULES if r["ruleset"] == name]
+            compiled[name] = compile_ruleset(rules)
+
+        with self._lock:
+            self._hits = self._hit_counts()   # keep counts from the rules being replaced
+            self._compiled = compiled
+            self._fingerprint = fingerprint
+            self._source = source
+            self._load_errors = errors
+            self._loaded_at = time.strftime("%Y-%m-%d %H:%M:%S")
+            self._reloads += 1
+        for message in errors:
+            _log_error(f"Invalid alert rule skipped: {message}")
+        return self.source_info()
+
+    def _ruleset(self, ruleset: str) -> Dict[str, Any]:
+        if not self._compiled or time.monotonic() >= self._next_check:
+            try:
+                self.reload(force=False)
+            except Exception as e:   # never let a bad source break evaluation
+                _log_error(f"Alert rule reload failed: {e}")
+                if not self._compiled:
+                    self._compiled = {
+                        name: compile_ruleset(normalize_rule(r) for r in DEFAULT_RULES if r["ruleset"] == name)
+                        for name in RULESETS
+                    }
+        return self._compiled[ruleset]
+
+    def rules(self, ruleset: str = "alerts") -> List[Dict[str, Any]]:
+        """Enabled rules of a set in evaluation order."""
+        return list(self._ruleset(ruleset)["rules"])
+
+    def compiled(self, ruleset: str = "alerts") -> Dict[str, Any]:
+        """The current compiled set (rules + generated functions); a reload swaps in a new one."""
+        return self._ruleset(ruleset)
+
+    # -------------------------
+    # Evaluation
+    # -------------------------
+
+    def evaluate(self, reading: Any, ruleset: str = "alerts", category: Optional[str] = None,
+                 first: bool = False) -> List[Dict[str, Any]]:
+        """
+        Matched rules as alert dicts, in rule order. `category` limits the
+        check to one category; `first` stops at the first match.
+        """
+        return self.evaluate_metrics(derive_metrics(reading), ruleset, category, first)
+
+    def evaluate_metrics(self, metrics: Dict[str, Any], ruleset: str = "alerts", category: Optional[str] = None,
+                         first: bool = False) -> List[Dict[str, Any]]:
+        """evaluate() for values already passed through derive_metrics()."""
+        started = time.perf_counter()
+        compiled = self._ruleset(ruleset)
+
+        rules = compiled["rules"]
+        if category is not None:
+            group = compiled["categories"].get(category)
+            if group is None:
+                hits: List[int] = []
+            elif first:
+                i = group["first"](metrics)
+                hits = [group["index"][i]] if i >= 0 else []
+            else:
+                hits = [group["index"][i] for i in group["all"](metrics)]
+        elif first:
+            i = compiled["first"](metrics)
+            hits = [i] if i >= 0 else []
+        else:
+            hits = compiled["all"](metrics)
+
+        alerts = [format_alert(rules[i], metrics) for i in hits]
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        with self._lock:
+            counts = compiled["hits"]
+            for i in hits:
+                counts[i] += 1
+            self._timing(ruleset, 1, elapsed_ms)
+        return alerts
+
+    def first_match(self, reading: Any, ruleset: str, category: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        found = self.evaluate(reading, ruleset, category, first=True)
+        return found[0] if found else None
+
+    def record_batch(self, ruleset: str, hits: Dict[str, int], rows: int, seconds: float) -> None:
+        """Counters for a vectorized evaluation (core.alert_batch)."""
+        with self._lock:
+            for code, n in hits.items():
+                key = (ruleset, code)
+                self._hits[key] = self._hits.get(key, 0) + int(n)
+            self._timing(ruleset, rows, seconds * 1000.0)
+
+    def _timing(self, ruleset: str, rows: int, ms: float) -> None:
+        # Caller holds self._lock
+        ev = self._evals.get(ruleset)
+        if ev is None:
+            ev = self._evals[ruleset] = {"evaluations": 0, "total_ms": 0.0, "max_ms": 0.0}
+        ev["evaluations"] += rows
+        ev["total_ms"] += ms
+        if ms > ev["max_ms"]:
+            ev["max_ms"] = ms
+
+    def _hit_counts(self) -> Dict[Tuple[str, str], int]:
+        # Caller holds self._lock: batch / retired counts + live counters of the compiled rules
+        totals = dict(self._hits)
+        for ruleset, compiled in self._compiled.items():
+            for rule, n in zip(compiled["rules"], compiled["hits"]):
+                if n:
+                    key = (ruleset, rule["code"])
+                    totals[key] = totals.get(key, 0) + n
+        return totals
+
+    # -------------------------
+    # Introspection
+    # -------------------------
+
+    def source_info(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "source": self._source,
+                "fingerprint": self._fingerprint,
+                "loaded_at": self._loaded_at,
+                "reloads": self._reloads,
+                "errors": list(self._load_errors),
+                "rules": {name: len(c["rules"]) for name, c in self._compiled.items()},
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        info = self.source_info()
+        with self._lock:
+            info["rulesets"] = {
+                name: {
+                    **ev,
+                    "avg_us": round(ev["total_ms"] * 1000.0 / ev["evaluations"], 3) if ev["evaluations"] else None,
+                    "total_ms": round(ev["total_ms"], 3),
+                    "max_ms": round(ev["max_ms"], 3),
+                }
+                for name, ev in self._evals.items()
+            }
+            info["hits"] = {f"{rs}.{code}": n for (rs, code), n in sorted(self._hit_counts().items())}
+        return info
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._hits.clear()
+            self._evals.clear()
+            for compiled in self._compiled.values():
+                compiled["hits"] = [0] * len(compiled["rules"])
+
+
+def _log_error(message: str) -> None:
+    try:
+        from core.logger import log_error
+        log_error(message, "alert_rules")
+    except Exception:
+        pass
+
+
+_engine: Optional[RuleEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_rule_engine() -> RuleEngine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RuleEngine()
+    return _engine
+
+
+def reset_rule_engine() -> None:
+    """Drop the compiled rules and counters (tests, after switching databases)."""
+    global _engine
+    with _engine_lock:
+        _engine = None
+
+
+def get_rule_stats() -> Dict[str, Any]:
+    return get_rule_engine().stats()
@@ -1,6 +1,8 @@
 # core/customers_repo.py
 from typing import Any, Dict, List
 from .db import get_conn
+from .paged_query import PagedQuery, search_filter
+from .search_index import ranked_hits
 
 
 def _dicts(rows) -> List[Dict[str, Any]]:
@@ -11,7 +13,13 @@ def list_customers(search: str = "") -> List[Dict[str, Any]]:
     search = (search or "").strip()
     like = f"%{search}%"
 
-    sql = """
+    hits = ranked_hits("customers", search) if search else None
+    source = "Customers"
+    if hits:
+        # Ranked FTS5 prefix search (core/search_index.py), best match first
+        source = f"({hits[0]}) h JOIN Customers ON Customers.ID = h.hit_id"
+
+    sql = f"""
     SELECT
         ID,
         company,
@@ -38,11 +46,15 @@ def list_customers(search: str = "") -> List[Dict[str, Any]]:
         credit_status,
         flag_and_lock,
         created
-    FROM Customers
+    FROM {source}
     """
 
     params = ()
-    if search:
+    if hits:
+        sql += " ORDER BY h.hit_rank;"
+        params = tuple(hits[1])
+    elif search:
+        # No FTS5 index (or no words to match): substring scan
         sql += """
         WHERE
             company         LIKE ?
@@ -76,7 +88,8 @@ def list_customers(search: str = "") -> List[Dict[str, Any]]:
             like, like
         )
 
-    sql += " ORDER BY ID DESC;"
+    if not hits:
+        sql += " ORDER BY ID DESC;"
 
     conn = get_conn()
     try:
@@ -86,6 +99,34 @@ def list_customers(search: str = "") -> List[Dict[str, Any]]:
         conn.close()
 
 
+_CUSTOMER_NAME = "TRIM(IFNULL(first_name, '') || ' ' || IFNULL(last_name, ''))"
+
+
+def customers_query() -> PagedQuery:
+    """Server-side Clients table (core/paged_query.py); filter: search."""
+    return PagedQuery(
+        source="Customers",
+        key="ID",
+        select=f"*, {_CUSTOMER_NAME} AS name",
+        sort_columns={
+            "ID": "ID", "company": "company", "name": _CUSTOMER_NAME, "email": "email",
+            "phone1": "phone1", "city": "city", "state": "state",
+        },
+        filters={"search": search_filter("customers", "ID", [
+            "company", "first_name", "last_name", "email", "phone1", "phone2", "mobile",
+            "address1", "city", "state", "zip", "notes",
+        ])},
+    )
+
+
+def ensure_customer_sort_indexes() -> None:
+    """Indexes for the Clients table's common sorts (50k+ rows: sorting them per page is too slow)."""
+    query = customers_query()
+    with get_conn() as conn:
+        for order in ("company", "name"):
+            conn.execute(query.sort_index_sql("Customers", order))
+
+
 def get_customer(customer_id: int):
     conn = get_conn()
     try:
@@ -1,21 +1,272 @@
 # core/db.py
 import os
+import queue
 import sqlite3
+import threading
+import time
 from pathlib import Path
+from typing import Any, Dict, Optional
 
 # Always use the DB inside /data
 BASE_DIR = Path(__file__).resolve().parents[1]           # .../gcc_monitoring
 DATA_DIR = BASE_DIR / "data"
 DB_PATH = DATA_DIR / "app.db"
 
+# Pool tuning (override with env vars on the server if needed)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))      # seconds to wait for a free connection
+CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "16384"))  # page cache per connection
+MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+BUSY_TIMEOUT_MS = 5000
 
-def get_conn() -> sqlite3.Connection:
-    """Open a connection to the app database."""
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH))
+
+class _PoolConnection(sqlite3.Connection):
+    """sqlite3.Connection that can carry pool bookkeeping flags."""
+    overflow = False
+
+
+def _configure(conn: sqlite3.Connection) -> None:
+    """Per-connection PRAGMAs. Runs once when the connection is opened, not per query."""
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.execute("PRAGMA synchronous = NORMAL;")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB};")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE};")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS};")
     conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections for one database file.
+    Connections are opened lazily up to `size`; callers beyond that wait
+    up to `timeout` seconds, then get a one-off overflow connection.
+    """
+
+    def __init__(self, path: Path, size: int = POOL_SIZE, timeout: float = POOL_TIMEOUT):
+        self.path = Path(path)
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._open_count = 0
+        self._closed = False
+        self._stats = {
+            "opens": 0,
+            "reuses": 0,
+            "waits": 0,
+            "wait_time_ms": 0.0,
+            "overflow": 0,
+        }
+
+    # -------------------------
+    # Internals
+    # -------------------------
+
+    def _open(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), check_same_thread=False, factory=_PoolConnection)
+        _configure(conn)
+        with self._lock:
+            self._stats["opens"] += 1
+        return conn
+
+    def _reserve_slot(self) -> bool:
+        with self._lock:
+            if self._open_count < self.size:
+                self._open_count += 1
+                return True
+            return False
+
+    # -------------------------
+    # Public API
+    # -------------------------
+
+    def acquire(self) -> sqlite3.Connection:
+        """Take a connection out of the pool (caller must release it)."""
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self._stats["reuses"] += 1
+            return conn
+        except queue.Empty:
+            pass
+
+        if self._reserve_slot():
+            try:
+                return self._open()
+            except Exception:
+                with self._lock:
+                    self._open_count -= 1
+                raise
+
+        # Pool is at capacity: wait for someone to release
+        started = time.perf_counter()
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+            reused = True
+        except queue.Empty:
+            conn = None
+            reused = False
+        waited_ms = (time.perf_counter() - started) * 1000.0
+
+        with self._lock:
+            self._stats["waits"] += 1
+            self._stats["wait_time_ms"] += waited_ms
+            if reused:
+                self._stats["reuses"] += 1
+            else:
+                self._stats["overflow"] += 1
+
+        if conn is not None:
+            return conn
+        # Nobody released in time (e.g. deeply nested callers) - don't deadlock the UI
+        overflow = self._open()
+        overflow.overflow = True
+        return overflow
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Return a connection to the pool, discarding any uncommitted work."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = sqlite3.Row
+        except sqlite3.Error:
+            # Broken connection - drop it and free the slot
+            self._discard(conn)
+            return
+
+        if getattr(conn, "overflow", False) or self._closed:
+            self._discard(conn)
+            return
+        self._idle.put(conn)
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        if not getattr(conn, "overflow", False):
+            with self._lock:
+                self._open_count = max(0, self._open_count - 1)
+
+    def close_all(self) -> None:
+        """Close idle connections; in-use ones are closed when released."""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["open"] = self._open_count
+        out["idle"] = self._idle.qsize()
+        out["in_use"] = max(0, out["open"] - out["idle"])
+        out["wait_time_ms"] = round(out["wait_time_ms"], 3)
+        return out
+
+
+class PooledConnection:
+    """
+    Thin proxy around a pooled sqlite3.Connection.
+
+    Behaves like the connection returned by sqlite3.connect():
+    - `conn.execute(...)`, `conn.commit()`, `conn.cursor()` etc. pass through
+    - `conn.close()` hands the connection back to the pool
+    - `with get_conn() as conn:` commits on success, rolls back on error,
+      then hands the connection back to the pool
+    """
+
+    __slots__ = ("_pool", "_conn")
+
+    def __init__(self, pool: ConnectionPool, conn: sqlite3.Connection):
+        self._pool = pool
+        self._conn = conn
+
+    @property
+    def raw(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return self._conn
+
+    def __getattr__(self, name: str) -> Any:
+        if name in PooledConnection.__slots__:
+            raise AttributeError(name)
+        return getattr(self.raw, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in PooledConnection.__slots__:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.raw, name, value)
+
+    def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.release(conn)
+
+    def __enter__(self) -> "PooledConnection":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        try:
+            if self._conn is not None:
+                if exc_type is None:
+                    self._conn.commit()
+                else:
+                    self._conn.rollback()
+        finally:
+            self.close()
+        return False
+
+    def __del__(self):
+        # Safety net for callers that never close (e.g. get_conn().execute(...))
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path: Optional[Path] = None) -> ConnectionPool:
+    """Pool for `path` (defaults to DB_PATH). One pool per database file."""
+    key = str(Path(path or DB_PATH).resolve())
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(Path(key))
+                _pools[key] = pool
+    return pool
+
+
+def get_conn() -> PooledConnection:
+    """Borrow a connection to the app database from the pool."""
+    pool = get_pool()
+    return PooledConnection(pool, pool.acquire())
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Counters for the app database pool: opens, reuses, waits, wait time, overflow."""
+    return get_pool().stats()
+
+
+def close_pools() -> None:
+    """Close every pooled connection (shutdown / tests)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
 
 
 def init_db() -> None:
@@ -0,0 +1,538 @@
+"""
+Email Outbox
+Persistent queue of outbound mail and the background sender that delivers it.
+
+send_email() read the settings, opened and logged in to a new SMTP
+connection (10s timeout) and sent one message - inside the UI handler, so
+emailing a ticket to five people froze the page for five handshakes, and a
+slow or unreachable server failed the click outright. Pages now queue:
+
+    outbox_id = enqueue_email(to, subject, body, ticket_id=42, queued_by=email)
+    get_email_status([outbox_id]) -> {outbox_id: {"status": "queued" | "sending" | "sent" | "failed", ...}}
+
+One sender thread claims due messages in batches of BATCH_SIZE and sends
+them over a kept-alive connection: an SMTP session is reused until it has
+been idle IDLE_TIMEOUT seconds, has carried MAX_PER_CONNECTION messages
+or the settings change (SendGrid: one keep-alive HTTPS connection). A
+message whose ticket_id is set gets that service order attached, rendered
+by the PDF service once per batch however many recipients it has.
+
+Temporary failures (connection errors, 4xx replies, incomplete settings)
+are retried with exponential backoff - RETRY_BASE, doubling, at most
+RETRY_MAX seconds apart - up to MAX_ATTEMPTS; permanent ones (5xx,
+invalid address) fail at once. Delivery is at-least-once: a message that
+was being sent when the process died is sent again on the next start.
+Sent messages lose their attachment and are deleted after KEEP_DAYS.
+"""
+import http.client
+import json
+import os
+import random
+import smtplib
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from core.db import get_conn
+from core.email_settings import (
+    SENDGRID_URL, build_mime_message, build_sendgrid_payload, get_email_settings, open_smtp, smtp_settings_error,
+)
+
+OUTBOX_SQL = Path(__file__).resolve().parents[1] / "schema" / "email_outbox.sql"
+BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "20"))                    # messages claimed per round
+MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "6"))
+RETRY_BASE = float(os.getenv("EMAIL_RETRY_BASE", "30"))                  # seconds before the first retry
+RETRY_MAX = float(os.getenv("EMAIL_RETRY_MAX", "1800"))                  # longest wait between retries
+IDLE_TIMEOUT = float(os.getenv("EMAIL_IDLE_TIMEOUT", "30"))              # seconds an idle connection is kept
+MAX_PER_CONNECTION = int(os.getenv("EMAIL_MAX_PER_CONNECTION", "100"))   # messages before reconnecting
+KEEP_DAYS = float(os.getenv("EMAIL_KEEP_DAYS", "30"))                    # days sent mail stays in the outbox
+
+STATUSES = ("queued", "sending", "sent", "failed")
+POLL_INTERVAL = 30.0   # seconds between due checks when nothing woke the sender
+SEND_TIMEOUT = 10.0    # socket timeout per SMTP / HTTP operation
+RENDER_TIMEOUT = 120.0
+
+
+def ensure_outbox_table() -> None:
+    """Create EmailOutbox (idempotent)."""
+    with get_conn() as conn:
+        conn.executescript(OUTBOX_SQL.read_text(encoding="utf-8"))
+
+
+# =========================================================
+# QUEUE
+# =========================================================
+
+def enqueue_email(to_email: str, subject: str, body: str, *, html_body: Optional[str] = None,
+                  attachment: Optional[bytes] = None, attachment_name: Optional[str] = None,
+                  from_email: Optional[str] = None, ticket_id: Optional[int] = None,
+                  queued_by: Optional[str] = None) -> int:
+    """Queue one message for the background sender; returns its outbox id."""
+    with get_conn() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO EmailOutbox (to_email, subject, body, html_body, from_email, attachment, attachment_name,
+                                     ticket_id, queued_by, next_attempt_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            ((to_email or "").strip(), subject, body, html_body, from_email, attachment, attachment_name,
+             ticket_id, queued_by, time.time()),
+        )
+        outbox_id = cur.lastrowid
+    if _sender is not None:
+        _sender.wake()
+    return outbox_id
+
+
+def get_email_status(outbox_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Delivery status by outbox id (ids no longer in the outbox are missing)."""
+    ids = [int(i) for i in outbox_ids]
+    if not ids:
+        return {}
+    marks = ",".join("?" * len(ids))
+    with get_conn() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT id, to_email, subject, ticket_id, status, attempts, next_attempt_at, last_error, created_at, sent_at
+            FROM EmailOutbox WHERE id IN ({marks})
+            """,
+            ids,
+        ).fetchall()
+    return {row["id"]: dict(row) for row in rows}
+
+
+def retry_email(outbox_id: int) -> bool:
+    """Queue a failed message again, with a fresh set of attempts."""
+    with get_conn() as conn:
+        cur = conn.execute(
+            "UPDATE EmailOutbox SET status = 'queued', attempts = 0, next_attempt_at = ? WHERE id = ? AND status = 'failed'",
+            (time.time(), outbox_id),
+        )
+        retried = cur.rowcount > 0
+    if retried and _sender is not None:
+        _sender.wake()
+    return retried
+
+
+def get_outbox_counts() -> Dict[str, int]:
+    with get_conn() as conn:
+        rows = conn.execute("SELECT status, COUNT(*) AS n FROM EmailOutbox GROUP BY status").fetchall()
+    counts = {status: 0 for status in STATUSES}
+    counts.update({row["status"]: row["n"] for row in rows})
+    return counts
+
+
+# =========================================================
+# TRANSPORTS
+# =========================================================
+
+class _Retry(Exception):
+    """Temporary failure: try the message again later."""
+
+
+class _Reject(Exception):
+    """Permanent failure: the message will never go through as it is."""
+
+
+def _smtp_failure(exc: Exception) -> Exception:
+    """Map an smtplib error to _Retry / _Reject by its reply code (5xx is permanent)."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in exc.recipients.values()]
+        detail = "; ".join(f"{addr}: {code} {msg.decode(errors='replace') if isinstance(msg, bytes) else msg}"
+                           for addr, (code, msg) in exc.recipients.items())
+        return (_Reject if codes and min(codes) >= 500 else _Retry)(f"Recipient refused - {detail}")
+    if isinstance(exc, smtplib.SMTPAuthenticationError):
+        return _Retry("SMTP authentication failed - check username/password")
+    if isinstance(exc, smtplib.SMTPResponseException):
+        error = exc.smtp_error.decode(errors="replace") if isinstance(exc.smtp_error, bytes) else str(exc.smtp_error)
+        return (_Reject if exc.smtp_code >= 500 else _Retry)(f"SMTP error {exc.smtp_code}: {error}")
+    return _Retry(f"SMTP error: {exc}" if isinstance(exc, smtplib.SMTPException) else f"Email error: {exc}")
+
+
+class _SmtpTransport:
+    """One SMTP session kept open across messages and batches."""
+
+    def __init__(self, connect: Callable[..., Any], idle_timeout: float, max_per_connection: int):
+        self._connect = connect
+        self.idle_timeout = idle_timeout
+        self.max_per_connection = max(1, int(max_per_connection))
+        self._smtp = None
+        self._key: Optional[Tuple[Any, ...]] = None
+        self._last_used = 0.0
+        self._carried = 0
+        self.connections = 0
+
+    def send(self, settings: Dict[str, Any], msg: Any, sender: str, to_email: str) -> None:
+        key = tuple(settings.get(k) for k in ("smtp_host", "smtp_port", "use_tls", "smtp_user", "smtp_pass"))
+        if self._smtp is not None and (key != self._key or self._carried >= self.max_per_connection
+                                       or time.monotonic() - self._last_used > self.idle_timeout):
+            self.close()
+        while True:
+            reused = self._smtp is not None
+            if not reused:
+                try:
+                    self._smtp = self._connect(settings, timeout=SEND_TIMEOUT)
+                except Exception as e:
+                    raise _smtp_failure(e) from e
+                self._key, self._carried = key, 0
+                self.connections += 1
+            try:
+                self._smtp.send_message(msg, from_addr=sender, to_addrs=[to_email])
+            except smtplib.SMTPResponseException as e:
+                self._reset()
+                raise _smtp_failure(e) from e
+            except smtplib.SMTPRecipientsRefused as e:
+                self._reset()
+                raise _smtp_failure(e) from e
+            except OSError as e:   # SMTPServerDisconnected, timeouts, resets
+                # A kept-alive session the server has dropped: reconnect once
+                self.close()
+                if reused:
+                    continue
+                raise _smtp_failure(e) from e
+            self._carried += 1
+            self._last_used = time.monotonic()
+            return
+
+    @property
+    def is_open(self) -> bool:
+        return self._smtp is not None
+
+    def _reset(self) -> None:
+        """Abort the refused transaction so the session can carry the next message."""
+        try:
+            self._smtp.rset()
+        except Exception:
+            self.close()
+
+    def close_if_idle(self) -> None:
+        if self._smtp is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self.close()
+
+    def close(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except Exception:
+            try:
+                smtp.close()
+            except Exception:
+                pass
+
+
+class _SendGridTransport:
+    """Keep-alive HTTPS connection to the SendGrid mail/send API."""
+
+    def __init__(self, idle_timeout: float):
+        self.idle_timeout = idle_timeout
+        url = urlsplit(SENDGRID_URL)
+        self._host, self._path = url.netloc, url.path
+        self._conn: Optional[http.client.HTTPSConnection] = None
+        self._last_used = 0.0
+        self.connections = 0
+
+    def send(self, api_key: str, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+        while True:
+            reused = self._conn is not None
+            if not reused:
+                self._conn = http.client.HTTPSConnection(self._host, timeout=SEND_TIMEOUT)
+                self.connections += 1
+            try:
+                self._conn.request("POST", self._path, body=body, headers=headers)
+                response = self._conn.getresponse()
+                detail = response.read().decode("utf-8", errors="ignore")
+            except (http.client.HTTPException, OSError) as e:
+                self.close()
+                if reused:
+                    continue
+                raise _Retry(f"SendGrid error: {e}") from e
+            self._last_used = time.monotonic()
+            if response.will_close:
+                self.close()
+            if response.status == 202:
+                return
+            error = f"SendGrid API error ({response.status}): {detail[:500]}"
+            raise (_Retry if response.status == 429 or response.status >= 500 else _Reject)(error)
+
+    @property
+    def is_open(self) -> bool:
+        return self._conn is not None
+
+    def close_if_idle(self) -> None:
+        if self._conn is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self.close()
+
+    def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            conn.close()
+
+
+# =========================================================
+# SENDER
+# =========================================================
+
+class EmailSender:
+    """Background thread delivering EmailOutbox over reused connections."""
+
+    def __init__(self, batch_size: int = BATCH_SIZE, max_attempts: int = MAX_ATTEMPTS,
+                 retry_base: float = RETRY_BASE, retry_max: float = RETRY_MAX,
+                 idle_timeout: float = IDLE_TIMEOUT, max_per_connection: int = MAX_PER_CONNECTION,
+                 connect: Callable[..., Any] = open_smtp):
+        self.batch_size = max(1, int(batch_size))
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._smtp = _SmtpTransport(connect, idle_timeout, max_per_connection)
+        self._sendgrid = _SendGridTransport(idle_timeout)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._next_purge = 0.0
+        self._stats = {"batches": 0, "sent": 0, "retried": 0, "failed": 0, "errors": 0, "last_error": None}
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+
+    def start(self) -> None:
+        ensure_outbox_table()
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+        with get_conn() as conn:
+            # Claimed by a process that stopped mid-batch: send again
+            conn.execute("UPDATE EmailOutbox SET status = 'queued' WHERE status = 'sending'")
+        self._thread = threading.Thread(target=self._run, name="email-sender", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 15.0) -> None:
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.close()
+
+    def wake(self) -> None:
+        """New mail was queued: look for due messages now."""
+        self._wake.set()
+
+    def close(self) -> None:
+        self._smtp.close()
+        self._sendgrid.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["running"] = self._running
+        out["smtp_connections"] = self._smtp.connections
+        out["sendgrid_connections"] = self._sendgrid.connections
+        return out
+
+    # -------------------------
+    # Delivery
+    # -------------------------
+
+    def run_once(self) -> int:
+        """Claim and deliver one batch of due messages; returns how many were processed."""
+        rows = self._claim()
+        if not rows:
+            return 0
+        settings = get_email_settings()
+        tickets: Dict[int, Tuple[str, bytes]] = {}
+        outcomes: List[Tuple[Dict[str, Any], str, Optional[str]]] = []
+        for row in rows:
+            try:
+                self._deliver(row, settings, tickets)
+            except _Reject as e:
+                outcomes.append((row, "failed", str(e)))
+            except _Retry as e:
+                outcomes.append((row, "retry", str(e)))
+            except Exception as e:
+                outcomes.append((row, "retry", f"Email error: {e}"))
+            else:
+                outcomes.append((row, "sent", None))
+        self._record(outcomes)
+        return len(rows)
+
+    def _claim(self) -> List[Dict[str, Any]]:
+        with get_conn() as conn:
+            rows = conn.execute(
+                """
+                UPDATE EmailOutbox SET status = 'sending'
+                WHERE id IN (
+                    SELECT id FROM EmailOutbox
+                    WHERE status = 'queued' AND next_attempt_at <= ?
+                    ORDER BY next_attempt_at, id
+                    LIMIT ?
+                )
+                RETURNING *
+                """,
+                (time.time(), self.batch_size),
+            ).fetchall()
+        return sorted((dict(r) for r in rows), key=lambda r: r["id"])
+
+    def _deliver(self, row: Dict[str, Any], settings: Dict[str, Any], tickets: Dict[int, Tuple[str, bytes]]) -> None:
+        sender = row["from_email"] or settings.get("smtp_from")
+        to_email = row["to_email"]
+        if not to_email or "@" not in to_email:
+            raise _Reject("Invalid recipient email address")
+        if not sender:
+            raise _Retry("From email address not provided and not configured in settings")
+
+        attachment, attachment_name = row["attachment"], row["attachment_name"]
+        if attachment is None and row["ticket_id"] is not None:
+            attachment_name, attachment = self._ticket_pdf(row["ticket_id"], tickets)
+
+        if settings.get("use_sendgrid"):
+            if not settings.get("sendgrid_api_key"):
+                raise _Retry("SendGrid API key not configured")
+            payload = build_sendgrid_payload(to_email, row["subject"], row["body"], row["html_body"],
+                                             attachment, attachment_name, sender)
+            self._sendgrid.send(settings["sendgrid_api_key"], payload)
+        else:
+            settings_error = smtp_settings_error(settings)
+            if settings_error:
+                raise _Retry(settings_error)
+            msg = build_mime_message(to_email, row["subject"], row["body"], row["html_body"],
+                                     attachment, attachment_name, sender)
+            self._smtp.send(settings, msg, sender, to_email)
+
+    def _ticket_pdf(self, ticket_id: int, tickets: Dict[int, Tuple[str, bytes]]) -> Tuple[str, bytes]:
+        """The service order PDF, rendered once per batch by the PDF service."""
+        if ticket_id not in tickets:
+            from core.pdf_render import PdfQueueFull, get_pdf_service
+            try:
+                rendered = get_pdf_service().render("ticket", ticket_id, timeout=RENDER_TIMEOUT)
+            except (PdfQueueFull, RuntimeError) as e:
+                raise _Retry(f"PDF generation failed: {e}") from e
+            if rendered is None:
+                raise _Reject(f"Ticket {ticket_id} has no service order")
+            tickets[ticket_id] = rendered
+        return tickets[ticket_id]
+
+    def _record(self, outcomes: List[Tuple[Dict[str, Any], str, Optional[str]]]) -> None:
+        """Write a batch's results in one transaction."""
+        now = time.time()
+        sent, retried, failed = [], [], []
+        for row, outcome, error in outcomes:
+            attempts = row["attempts"] + 1
+            if outcome == "sent":
+                sent.append((attempts, row["id"]))
+            elif outcome == "retry" and attempts < self.max_attempts:
+                delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+                retried.append((attempts, now + delay, error, row["id"]))
+            else:
+                failed.append((attempts, error, row["id"]))
+        with get_conn() as conn:
+            conn.executemany(
+                "UPDATE EmailOutbox SET status = 'sent', attempts = ?, sent_at = datetime('now'), "
+                "last_error = NULL, attachment = NULL WHERE id = ?",
+                sent,
+            )
+            conn.executemany(
+                "UPDATE EmailOutbox SET status = 'queued', attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                retried,
+            )
+            conn.executemany(
+                "UPDATE EmailOutbox SET status = 'failed', attempts = ?, last_error = ? WHERE id = ?",
+                failed,
+            )
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["sent"] += len(sent)
+            self._stats["retried"] += len(retried)
+            self._stats["failed"] += len(failed)
+        for _, error, outbox_id in failed:
+            _log_error(f"Email {outbox_id} failed: {error}")
+
+    def _purge(self) -> None:
+        """Delete sent mail older than KEEP_DAYS (hourly)."""
+        if time.monotonic() < self._next_purge:
+            return
+        self._next_purge = time.monotonic() + 3600
+        with get_conn() as conn:
+            conn.execute(
+                "DELETE FROM EmailOutbox WHERE status = 'sent' AND sent_at < datetime('now', ?)",
+                (f"-{KEEP_DAYS} days",),
+            )
+
+    def _next_wait(self) -> float:
+        with get_conn() as conn:
+            due = conn.execute("SELECT MIN(next_attempt_at) FROM EmailOutbox WHERE status = 'queued'").fetchone()[0]
+        wait = POLL_INTERVAL if due is None else max(0.0, min(POLL_INTERVAL, due - time.time()))
+        if self._smtp.is_open or self._sendgrid.is_open:
+            wait = min(wait, self._smtp.idle_timeout)   # wake up to hang up idle connections
+        return wait
+
+    def _run(self) -> None:
+        while self._running:
+            self._wake.clear()
+            try:
+                if self.run_once():
+                    continue
+                self._smtp.close_if_idle()
+                self._sendgrid.close_if_idle()
+                self._purge()
+                wait = self._next_wait()
+            except Exception as e:
+                with self._lock:
+                    self._stats["errors"] += 1
+                    self._stats["last_error"] = str(e)
+                _log_error(f"Email sender round failed: {e}")
+                wait = min(POLL_INTERVAL, self.retry_base)
+            self._wake.wait(wait)
+
+
+def _log_error(message: str) -> None:
+    try:
+        from core.logger import log_error
+        log_error(message, "email_outbox")
+    except Exception:
+        pass
+
+
+_sender: Optional[EmailSender] = None
+_sender_lock = threading.Lock()
+
+
+def get_email_sender() -> EmailSender:
+    global _sender
+    if _sender is None:
+        with _sender_lock:
+            if _sender is None:
+                _sender = EmailSender()
+    return _sender
+
+
+def start_email_sender() -> None:
+    """Start delivering the outbox (app startup)."""
+    try:
+        get_email_sender().start()
+    except Exception as e:
+        _log_error(f"Email sender failed to start: {e}")
+
+
+def stop_email_sender() -> None:
+    """Stop the sender and hang up its connections (app shutdown / tests)."""
+    global _sender
+    with _sender_lock:
+        sender, _sender = _sender, None
+    if sender is not None:
+        sender.stop()
+
+
+def get_email_sender_stats() -> Dict[str, Any]:
+    return get_email_sender().stats()
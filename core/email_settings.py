@@ -4,9 +4,23 @@
 
 from __future__ import annotations
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional, TypedDict
 
 from core.db import get_conn
+from core.settings_cache import cached_setting, invalidate_settings
+
+
+class EmailSettings(TypedDict, total=False):
+    """The EmailSettings row (id=1); columns added by older schemas may be None."""
+    id: int
+    smtp_host: Optional[str]
+    smtp_port: Optional[int]
+    use_tls: Optional[int]
+    smtp_user: Optional[str]
+    smtp_pass: Optional[str]
+    smtp_from: Optional[str]
+    use_sendgrid: Optional[int]
+    sendgrid_api_key: Optional[str]
 
 
 def _table_columns(conn, table_name: str) -> set[str]:
@@ -62,8 +76,12 @@ def ensure_email_settings_table() -> None:
         conn.close()
 
 
-def get_email_settings() -> Dict[str, Any]:
-    """Returns the single EmailSettings row (id=1)."""
+def get_email_settings() -> EmailSettings:
+    """Returns the single EmailSettings row (id=1), from the settings cache."""
+    return cached_setting("email_settings", _load_email_settings)
+
+
+def _load_email_settings() -> EmailSettings:
     ensure_email_settings_table()
     conn = get_conn()
     try:
@@ -98,12 +116,16 @@ def update_email_settings(payload: Dict[str, Any]) -> None:
         conn.commit()
     finally:
         conn.close()
+    invalidate_settings("email_settings")
 
 
 def send_email(to_email: str, subject: str, body: str, html_body: str = None, pdf_attachment: bytes = None, pdf_filename: str = None, from_email: str = None) -> tuple[bool, str]:
     """
-    Send email via configured SMTP settings or SendGrid API.
-    Returns (success: bool, message: str)
+    Send email via configured SMTP settings or SendGrid API, right now, on
+    a fresh connection. Returns (success: bool, message: str)
+
+    Blocks for the whole SMTP/HTTP exchange - pages queue mail with
+    core.email_outbox.enqueue_email() instead.
     
     Args:
         from_email: Optional override for sender address (defaults to smtp_from from settings)
@@ -117,9 +139,98 @@ def send_email(to_email: str, subject: str, body: str, html_body: str = None, pd
         return _send_via_smtp(to_email, subject, body, html_body, pdf_attachment, pdf_filename, from_email, settings)
 
 
+# ---------------------------------------------------------
+# Shared by send_email() and the outbox sender (core/email_outbox.py)
+# ---------------------------------------------------------
+
+SENDGRID_URL = "https://api.sendgrid.com/v3/mail/send"
+
+
+def build_sendgrid_payload(to_email: str, subject: str, body: str, html_body: str, pdf_attachment: bytes, pdf_filename: str, sender: str) -> dict:
+    """SendGrid v3 mail/send request body."""
+    import base64
+
+    payload = {
+        "personalizations": [{
+            "to": [{"email": to_email}],
+            "subject": subject
+        }],
+        "from": {"email": sender},
+        "content": [
+            {"type": "text/plain", "value": body}
+        ]
+    }
+
+    # Add HTML if provided
+    if html_body:
+        payload["content"].append({"type": "text/html", "value": html_body})
+
+    # Add PDF attachment if provided
+    if pdf_attachment and pdf_filename:
+        payload["attachments"] = [{
+            "content": base64.b64encode(pdf_attachment).decode(),
+            "filename": pdf_filename,
+            "type": "application/pdf",
+            "disposition": "attachment"
+        }]
+    return payload
+
+
+def build_mime_message(to_email: str, subject: str, body: str, html_body: str, pdf_attachment: bytes, pdf_filename: str, sender: str):
+    """multipart/mixed message: text (+ html alternative) and an optional PDF."""
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.application import MIMEApplication
+
+    msg = MIMEMultipart("mixed")
+    msg["Subject"] = subject
+    msg["From"] = sender
+    msg["To"] = to_email
+
+    # Add text/html body
+    if html_body:
+        body_part = MIMEMultipart("alternative")
+        body_part.attach(MIMEText(body, "plain"))
+        body_part.attach(MIMEText(html_body, "html"))
+        msg.attach(body_part)
+    else:
+        msg.attach(MIMEText(body, "plain"))
+
+    # Add PDF attachment if provided
+    if pdf_attachment and pdf_filename:
+        pdf_part = MIMEApplication(pdf_attachment, _subtype="pdf")
+        pdf_part.add_header("Content-Disposition", f"attachment; filename={pdf_filename}")
+        msg.attach(pdf_part)
+    return msg
+
+
+def smtp_settings_error(settings: dict) -> str | None:
+    """Why `settings` cannot be used for SMTP, or None."""
+    if not all([settings.get("smtp_host"), settings.get("smtp_user"), settings.get("smtp_pass")]):
+        return "SMTP settings incomplete (missing host, user, or password)"
+    return None
+
+
+def open_smtp(settings: dict, timeout: float = 10):
+    """Connected and logged-in SMTP session (STARTTLS when use_tls, implicit TLS otherwise)."""
+    import smtplib
+
+    port = int(settings.get("smtp_port", 587))
+    if settings.get("use_tls", 1):
+        smtp = smtplib.SMTP(settings.get("smtp_host"), port, timeout=timeout)
+        smtp.starttls()
+    else:
+        smtp = smtplib.SMTP_SSL(settings.get("smtp_host"), port, timeout=timeout)
+    try:
+        smtp.login(settings.get("smtp_user"), settings.get("smtp_pass"))
+    except Exception:
+        smtp.close()
+        raise
+    return smtp
+
+
 def _send_via_sendgrid(to_email: str, subject: str, body: str, html_body: str, pdf_attachment: bytes, pdf_filename: str, from_email: str, settings: dict) -> tuple[bool, str]:
     """Send email via SendGrid API"""
-    import base64
     import json
     try:
         import urllib.request
@@ -138,33 +249,11 @@ def _send_via_sendgrid(to_email: str, subject: str, body: str, html_body: str, p
     
     try:
         # Build SendGrid API payload
-        payload = {
-            "personalizations": [{
-                "to": [{"email": to_email}],
-                "subject": subject
-            }],
-            "from": {"email": sender},
-            "content": [
-                {"type": "text/plain", "value": body}
-            ]
-        }
-        
-        # Add HTML if provided
-        if html_body:
-            payload["content"].append({"type": "text/html", "value": html_body})
-        
-        # Add PDF attachment if provided
-        if pdf_attachment and pdf_filename:
-            payload["attachments"] = [{
-                "content": base64.b64encode(pdf_attachment).decode(),
-                "filename": pdf_filename,
-                "type": "application/pdf",
-                "disposition": "attachment"
-            }]
+        payload = build_sendgrid_payload(to_email, subject, body, html_body, pdf_attachment, pdf_filename, sender)
         
         # Send request
         req = urllib.request.Request(
-            "https://api.sendgrid.com/v3/mail/send",
+            SENDGRID_URL,
             data=json.dumps(payload).encode('utf-8'),
             headers={
                 "Authorization": f"Bearer {api_key}",
@@ -189,16 +278,14 @@ def _send_via_sendgrid(to_email: str, subject: str, body: str, html_body: str, p
 def _send_via_smtp(to_email: str, subject: str, body: str, html_body: str, pdf_attachment: bytes, pdf_filename: str, from_email: str, settings: dict) -> tuple[bool, str]:
     """Send email via SMTP"""
     import smtplib
-    from email.mime.text import MIMEText
-    from email.mime.multipart import MIMEMultipart
-    from email.mime.application import MIMEApplication
     
     # Use provided from_email or fall back to settings
     sender = from_email if from_email else settings.get("smtp_from")
     
     # Validate settings
-    if not all([settings.get("smtp_host"), settings.get("smtp_user"), settings.get("smtp_pass")]):
-        return False, "SMTP settings incomplete (missing host, user, or password)"
+    settings_error = smtp_settings_error(settings)
+    if settings_error:
+        return False, settings_error
     
     if not sender:
         return False, "From email address not provided and not configured in settings"
@@ -208,37 +295,10 @@ def _send_via_smtp(to_email: str, subject: str, body: str, html_body: str, pdf_a
     
     try:
         # Create message
-        msg = MIMEMultipart("mixed")
-        msg["Subject"] = subject
-        msg["From"] = sender
-        msg["To"] = to_email
-        
-        # Add text/html body
-        if html_body:
-            body_part = MIMEMultipart("alternative")
-            body_part.attach(MIMEText(body, "plain"))
-            body_part.attach(MIMEText(html_body, "html"))
-            msg.attach(body_part)
-        else:
-            msg.attach(MIMEText(body, "plain"))
-        
-        # Add PDF attachment if provided
-        if pdf_attachment and pdf_filename:
-            pdf_part = MIMEApplication(pdf_attachment, _subtype="pdf")
-            pdf_part.add_header("Content-Disposition", f"attachment; filename={pdf_filename}")
-            msg.attach(pdf_part)
+        msg = build_mime_message(to_email, subject, body, html_body, pdf_attachment, pdf_filename, sender)
         
         # Connect and send
-        port = int(settings.get("smtp_port", 587))
-        use_tls = settings.get("use_tls", 1)
-        
-        if use_tls:
-            smtp = smtplib.SMTP(settings.get("smtp_host"), port, timeout=10)
-            smtp.starttls()
-        else:
-            smtp = smtplib.SMTP_SSL(settings.get("smtp_host"), port, timeout=10)
-        
-        smtp.login(settings.get("smtp_user"), settings.get("smtp_pass"))
+        smtp = open_smtp(settings)
         smtp.send_message(msg)
         smtp.quit()
         
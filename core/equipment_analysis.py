@@ -1,7 +1,10 @@
 """
 Equipment Analysis Module
-Simple, readable functions for analyzing HVAC equipment readings
+Simple, readable functions for analyzing HVAC equipment readings.
+Warning thresholds live in the 'health' ruleset of core.alert_rules.
 """
+from core.alert_rules import get_rule_engine
+
 
 def _ensure_dict(reading):
     """Convert sqlite3.Row to dict if needed"""
@@ -14,12 +17,22 @@ def _to_float(value):
     """Convert value to float, returns None if conversion fails"""
     if value is None:
         return None
+    if type(value) is float:  # typed REAL column - nothing to parse
+        return value
     try:
         return float(value)
     except (ValueError, TypeError):
         return None
 
 
+def _apply_rule(analysis, category, values):
+    """Mark the analysis as a warning if a 'health' rule of the category matches."""
+    hit = get_rule_engine().first_match(values, 'health', category)
+    if hit:
+        analysis['status'] = 'warning'
+        analysis['warning'] = hit['message']
+
+
 def get_temperature_analysis(supply_temp, return_temp):
     """
     Analyze temperature readings.
@@ -55,13 +68,8 @@ def get_temperature_analysis(supply_temp, return_temp):
         'warning': None
     }
     
-    # Check for warnings
-    if delta_t < 10:
-        analysis['status'] = 'warning'
-        analysis['warning'] = 'Low Delta-T (poor temperature differential)'
-    elif delta_t > 25:
-        analysis['status'] = 'warning'
-        analysis['warning'] = 'High Delta-T (possible restriction)'
+    # Check for warnings (first matching health rule)
+    _apply_rule(analysis, 'temperature', {'supply_temp': supply_temp, 'return_temp': return_temp})
     
     return analysis
 
@@ -88,12 +96,6 @@ def get_pressure_analysis(discharge_psi, suction_psi, mode):
             'warning': 'Missing pressure readings'
         }
     
-    # Typical pressure ratios by mode
-    normal_ratios = {
-        'Cooling': {'min': 4, 'max': 6},
-        'Heating': {'min': 3, 'max': 5},
-    }
-    
     # Calculate pressure ratio
     if suction_psi > 0:
         ratio = discharge_psi / suction_psi
@@ -108,17 +110,8 @@ def get_pressure_analysis(discharge_psi, suction_psi, mode):
         'warning': None
     }
     
-    # Check if ratio is out of normal range
-    if ratio is not None and mode in normal_ratios:
-        min_ratio = normal_ratios[mode]['min']
-        max_ratio = normal_ratios[mode]['max']
-        
-        if ratio < min_ratio:
-            analysis['status'] = 'warning'
-            analysis['warning'] = f'Low pressure ratio: {ratio:.1f} (expected {min_ratio}-{max_ratio})'
-        elif ratio > max_ratio:
-            analysis['status'] = 'warning'
-            analysis['warning'] = f'High pressure ratio: {ratio:.1f} (expected {min_ratio}-{max_ratio})'
+    # Check if ratio is out of the normal range for the mode
+    _apply_rule(analysis, 'pressure', {'discharge_psi': discharge_psi, 'suction_psi': suction_psi, 'mode': mode})
     
     return analysis
 
@@ -167,23 +160,17 @@ def get_electrical_analysis(phase_1, phase_2, phase_3, compressor_amps):
     avg = sum(phase_values) / len(phase_values)
     analysis['avg_amps'] = round(avg, 2)
     
-    # Check phase imbalance (ideal: within 5%)
+    # Phase imbalance (ideal: within 5%)
     if len(phase_values) == 3:
         max_phase = max(phase_values)
         min_phase = min(phase_values)
         imbalance_percent = ((max_phase - min_phase) / avg * 100) if avg > 0 else 0
         analysis['imbalance'] = round(imbalance_percent, 1)
-        
-        if imbalance_percent > 10:
-            analysis['status'] = 'warning'
-            analysis['warning'] = f'Phase imbalance: {imbalance_percent:.1f}% (should be <10%)'
-    
-    # Check compressor overload (typical max 120% of rated)
-    if compressor_amps and avg > 0:
-        overload_percent = (compressor_amps / avg * 100) - 100
-        if overload_percent > 20:
-            analysis['status'] = 'warning'
-            analysis['warning'] = f'Compressor overload: {compressor_amps}A at {overload_percent:.0f}% above average'
+    
+    # Compressor overload outranks imbalance
+    _apply_rule(analysis, 'electrical', {
+        'v_1': phase_1, 'v_2': phase_2, 'v_3': phase_3, 'compressor_amps': compressor_amps,
+    })
     
     return analysis
 
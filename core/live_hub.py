@@ -0,0 +1,313 @@
+"""
+Live Hub
+Publish / subscribe for server-push page updates.
+
+A feed is a named loader (e.g. the dashboard unit stats for one customer)
+plus the topics that invalidate it ('readings', 'alerts', 'tickets').
+Writers call publish(topic) from any thread; the hub marks the affected
+feeds stale, and its refresh loop (one asyncio task) re-runs each
+subscribed feed ONCE and pushes only the rows and counters that changed to
+every subscriber of that feed.
+
+snapshot() is the read side for page renders: results are cached per
+(feed, params) and loads are single-flight, so N sessions opening the same
+page cost one query, not N. Cached data also expires after MAX_AGE seconds
+to pick up writes that were not published (other processes, manual SQL).
+"""
+import asyncio
+import itertools
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+MIN_INTERVAL = float(os.getenv("LIVE_MIN_INTERVAL", "1.0"))   # seconds; bursts of publishes coalesce into one refresh
+MAX_AGE = float(os.getenv("LIVE_MAX_AGE", "30"))              # seconds before cached feed data is re-queried anyway
+
+Key = Tuple[str, Tuple[Any, ...]]
+
+
+def feed_data(rows: Iterable[Dict[str, Any]], row_key: str, counters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Loader result: rows keyed by `row_key` (in order) + scalar counters."""
+    return {"rows": {r[row_key]: r for r in rows}, "counters": dict(counters or {})}
+
+
+def diff_feed(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Rows added/changed, row keys removed and counters changed between two loads."""
+    old_rows = old["rows"] if old else {}
+    old_counters = old["counters"] if old else {}
+    return {
+        "changed": [row for key, row in new["rows"].items() if old_rows.get(key) != row],
+        "removed": [key for key in old_rows if key not in new["rows"]],
+        "counters": {k: v for k, v in new["counters"].items() if k not in old_counters or old_counters[k] != v},
+    }
+
+
+class LiveHub:
+    """Cached, coalesced feeds with change push to subscribers."""
+
+    def __init__(self, min_interval: float = MIN_INTERVAL, max_age: float = MAX_AGE):
+        self.min_interval = min_interval
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._feeds: Dict[str, Dict[str, Any]] = {}
+        self._entries: Dict[Key, Dict[str, Any]] = {}
+        self._subs: Dict[Key, Dict[int, Callable[[Dict[str, Any]], Any]]] = {}
+        self._tokens: Dict[int, Key] = {}
+        self._ids = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "queries": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "published": 0,
+            "refreshes": 0,
+            "pushes": 0,
+            "push_errors": 0,
+        }
+
+    # -------------------------
+    # Feeds
+    # -------------------------
+
+    def register(self, name: str, loader: Callable[..., Dict[str, Any]], topics: Iterable[str]) -> None:
+        """Add (or replace) a feed. `loader(*params)` returns feed_data(...)."""
+        with self._lock:
+            self._feeds[name] = {"loader": loader, "topics": frozenset(topics)}
+            for key in [k for k in self._entries if k[0] == name]:
+                del self._entries[key]
+
+    def _entry(self, key: Key) -> Dict[str, Any]:
+        # Caller holds self._lock
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = {
+                "data": None,
+                "loaded": 0.0,
+                "stale": True,
+                "pushed": None,   # data subscribers were last brought up to
+                "lock": threading.Lock(),
+            }
+        return entry
+
+    def _fresh(self, entry: Dict[str, Any]) -> bool:
+        return entry["data"] is not None and not entry["stale"] and time.monotonic() - entry["loaded"] < self.max_age
+
+    def _load(self, key: Key) -> Dict[str, Any]:
+        """Fresh data for a key; one loader call per key at a time."""
+        with self._lock:
+            feed = self._feeds[key[0]]
+            entry = self._entry(key)
+        with entry["lock"]:
+            with self._lock:
+                if self._fresh(entry):
+                    # Another caller loaded it while we waited
+                    self._stats["coalesced"] += 1
+                    return entry["data"]
+                entry["stale"] = False   # publishes from here on make it stale again
+                self._stats["queries"] += 1
+            try:
+                data = feed["loader"](*key[1])
+            except Exception:
+                with self._lock:
+                    entry["stale"] = True
+                raise
+            with self._lock:
+                entry["data"] = data
+                entry["loaded"] = time.monotonic()
+        return data
+
+    def snapshot(self, name: str, *params: Any) -> Dict[str, Any]:
+        """Current data of a feed, from cache when fresh."""
+        key = (name, params)
+        with self._lock:
+            if name not in self._feeds:
+                raise KeyError(f"Unknown live feed: {name}")
+            entry = self._entries.get(key)
+            if entry is not None and self._fresh(entry):
+                self._stats["cache_hits"] += 1
+                return entry["data"]
+        return self._load(key)
+
+    # -------------------------
+    # Publish / subscribe
+    # -------------------------
+
+    def publish(self, topic: str) -> None:
+        """Data behind `topic` changed (safe to call from any thread)."""
+        with self._lock:
+            self._stats["published"] += 1
+            for key in list(self._entries):
+                if topic in self._feeds[key[0]]["topics"]:
+                    if key in self._subs:
+                        self._entries[key]["stale"] = True
+                    else:
+                        del self._entries[key]   # nobody watching: reload on next snapshot()
+            loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                pass   # loop closed (shutdown)
+
+    def subscribe(self, name: str, params: Tuple[Any, ...], callback: Callable[[Dict[str, Any]], Any]) -> int:
+        """
+        Call `callback(diff)` on the event loop whenever the feed changes.
+        diff = {"changed": rows, "removed": row keys, "counters": changed counters}.
+        Returns a token for unsubscribe().
+        """
+        key = (name, tuple(params))
+        with self._lock:
+            if name not in self._feeds:
+                raise KeyError(f"Unknown live feed: {name}")
+            token = next(self._ids)
+            self._subs.setdefault(key, {})[token] = callback
+            self._tokens[token] = key
+            entry = self._entry(key)
+            if entry["pushed"] is None:
+                entry["pushed"] = entry["data"]   # the page was rendered from this snapshot
+        return token
+
+    def unsubscribe(self, token: int) -> None:
+        with self._lock:
+            key = self._tokens.pop(token, None)
+            subs = self._subs.get(key) if key else None
+            if subs is not None:
+                subs.pop(token, None)
+                if not subs:
+                    del self._subs[key]
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        entry["pushed"] = None
+
+    # -------------------------
+    # Refresh loop
+    # -------------------------
+
+    async def refresh(self) -> int:
+        """
+        Reload stale / expired subscribed feeds and push what changed since
+        the last push (also covers data a page render already reloaded).
+        Returns the number of feeds pushed.
+        """
+        with self._lock:
+            due = [
+                key for key in self._subs
+                if not self._fresh(self._entry(key)) or self._entries[key]["data"] is not self._entries[key]["pushed"]
+            ]
+        pushed = 0
+        loop = asyncio.get_running_loop()
+        for key in due:
+            try:
+                data = await loop.run_in_executor(None, self._load, key)
+            except Exception as e:
+                _log_error(f"Live feed {key[0]} failed to load: {e}")
+                continue
+            with self._lock:
+                entry = self._entry(key)
+                previous, entry["pushed"] = entry["pushed"], data
+            diff = diff_feed(previous, data)
+            if not (diff["changed"] or diff["removed"] or diff["counters"]):
+                continue
+            with self._lock:
+                subscribers = list(self._subs.get(key, {}).items())
+                self._stats["refreshes"] += 1
+            pushed += 1
+            for token, callback in subscribers:
+                try:
+                    result = callback(diff)
+                    if asyncio.iscoroutine(result):
+                        await result
+                    with self._lock:
+                        self._stats["pushes"] += 1
+                except Exception as e:
+                    # Page gone or broken handler: stop pushing to it
+                    with self._lock:
+                        self._stats["push_errors"] += 1
+                    self.unsubscribe(token)
+                    _log_error(f"Live feed {key[0]} subscriber dropped: {e}")
+        return pushed
+
+    async def run(self) -> None:
+        """Refresh loop: wakes on publish (or every max_age), waits min_interval for the burst to settle."""
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+        wake = self._wake
+        while True:
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=self.max_age)
+                await asyncio.sleep(self.min_interval)
+            except asyncio.TimeoutError:
+                pass
+            wake.clear()
+            try:
+                await self.refresh()
+            except Exception as e:
+                _log_error(f"Live refresh failed: {e}")
+
+    def start(self) -> None:
+        """Start the refresh loop on the running event loop (app startup)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        with self._lock:
+            self._loop = self._wake = None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["feeds"] = sorted(self._feeds)
+            out["cached"] = len(self._entries)
+            out["subscribers"] = sum(len(s) for s in self._subs.values())
+            out["running"] = self._task is not None and not self._task.done()
+        return out
+
+
+def _log_error(message: str) -> None:
+    try:
+        from core.logger import log_error
+        log_error(message, "live_hub")
+    except Exception:
+        pass
+
+
+_hub: Optional[LiveHub] = None
+_hub_lock = threading.Lock()
+
+
+def get_live_hub() -> LiveHub:
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = LiveHub()
+    return _hub
+
+
+def publish(topic: str) -> None:
+    """Shortcut for writers: get_live_hub().publish(topic)."""
+    get_live_hub().publish(topic)
+
+
+async def start_live_hub() -> None:
+    get_live_hub().start()
+
+
+async def stop_live_hub() -> None:
+    if _hub is not None:
+        await _hub.stop()
+
+
+def get_live_stats() -> Dict[str, Any]:
+    return get_live_hub().stats()
@@ -1,6 +1,8 @@
 # core/locations_repo.py
 from typing import Any, Dict, List, Optional
 from core.db import get_conn
+from core.paged_query import PagedQuery, search_filter
+from core.search_index import ranked_hits
 
 
 def _dicts(rows):
@@ -11,7 +13,15 @@ def list_locations(search: str = "", customer_id: Optional[int] = None) -> List[
     search = (search or "").strip()
     like = f"%{search}%"
 
-    sql = """
+    # Ranked FTS5 prefix search (core/search_index.py), best match first
+    hits = ranked_hits(
+        "locations", search,
+        where="t.customer_id = ?" if customer_id is not None else None,
+        where_params=[customer_id] if customer_id is not None else [],
+    ) if search else None
+    source = f"({hits[0]}) h JOIN PropertyLocations ON PropertyLocations.ID = h.hit_id" if hits else "PropertyLocations"
+
+    sql = f"""
     SELECT
         ID,
         custid,
@@ -29,16 +39,17 @@ def list_locations(search: str = "", customer_id: Optional[int] = None) -> List[
         commercial,
         business_name,
         date_created
-    FROM PropertyLocations
+    FROM {source}
     WHERE 1=1
     """
-    params = []
+    params = list(hits[1]) if hits else []
 
     if customer_id is not None:
         sql += " AND customer_id = ?"
         params.append(customer_id)
 
-    if search:
+    if search and not hits:
+        # No FTS5 index (or no words to match): substring scan
         sql += """
         AND (
             address1 LIKE ?
@@ -55,13 +66,30 @@ def list_locations(search: str = "", customer_id: Optional[int] = None) -> List[
         """
         params += [like] * 10
 
-    sql += " ORDER BY ID DESC"
+    sql += " ORDER BY h.hit_rank" if hits else " ORDER BY ID DESC"
 
     with get_conn() as conn:
         rows = conn.execute(sql, params).fetchall()
         return _dicts(rows)
 
 
+def locations_query(customer_id: int) -> PagedQuery:
+    """Server-side Locations table for one customer (core/paged_query.py); filter: search."""
+    return PagedQuery(
+        source="PropertyLocations",
+        key="ID",
+        where=["customer_id = ?"],
+        params=[customer_id],
+        sort_columns={
+            "ID": "ID", "address1": "address1", "city": "city", "state": "state", "zip": "zip",
+            "contact": "contact", "job_phone": "job_phone",
+        },
+        filters={"search": search_filter("locations", "ID", [
+            "address1", "address2", "city", "state", "zip", "contact", "job_phone", "job_phone2", "notes",
+        ])},
+    )
+
+
 def get_location(location_id: int):
     with get_conn() as conn:
         row = conn.execute("SELECT * FROM PropertyLocations WHERE ID = ?", (location_id,)).fetchone()
@@ -0,0 +1,221 @@
+"""
+Paged Query
+Server-side paging, sorting and filtering for the CRUD tables.
+
+A PagedQuery describes one listing in SQL - FROM clause, unique key,
+sortable columns and named filters - and serves it one page at a time:
+
+    query.fetch({"page": 3, "rows_per_page": 50, "sort_by": "company",
+                 "descending": False, "filters": {"search": "acme"}})
+      -> {"rows": [... 50 rows ...], "page": 3, "total": 1234, "exact": True}
+
+Sorting, filtering and paging all run in SQLite, so a session only ever
+holds the page on screen (ui/table_page.ServerTable sends nothing else to
+the browser). Pages are read with keyset cursors: the last (sort value,
+key) of every page served is remembered, so the next page - or any page
+after one already seen - is a range seek from that cursor instead of an
+OFFSET over every row before it.
+
+Totals: an exact COUNT(*) for the unfiltered listing (base `where` only);
+a filtered count stops after COUNT_CAP rows and is then reported as an
+estimate ("exact": False) that grows as the user pages past it.
+"""
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from core.db import get_conn
+from core.search_index import ranked_hits
+
+COUNT_CAP = int(os.getenv("TABLE_COUNT_CAP", "10000"))   # filtered counts stop here
+ROWS_PER_PAGE = 50
+MAX_ROWS_PER_PAGE = 500
+
+# filter value -> (SQL condition, params), or None to skip the filter
+Filter = Callable[[Any], Optional[Tuple[str, Sequence[Any]]]]
+
+
+class PagedQuery:
+    """
+    One server-side table listing.
+
+    source:        FROM clause, e.g. "Customers c"
+    key:           unique, NOT NULL key expression, e.g. "c.ID"; the tie-breaker
+                   of every sort and the default order
+    sort_columns:  column name -> SQL expression; only these can be sorted on
+    select:        SELECT list (default "*")
+    where, params: fixed conditions (e.g. the selected customer)
+    filters:       filter name -> Filter, applied when the request carries a value
+    """
+
+    def __init__(self, *, source: str, key: str, sort_columns: Optional[Dict[str, str]] = None,
+                 select: str = "*", where: Sequence[str] = (), params: Sequence[Any] = (),
+                 filters: Optional[Dict[str, Filter]] = None, count_cap: int = COUNT_CAP):
+        self.source = source
+        self.key = key
+        self.sort_columns = dict(sort_columns or {})
+        self.select = select
+        self.where = [f"({w})" for w in where] or ["1=1"]
+        self.params = list(params)
+        self.filters = dict(filters or {})
+        self.count_cap = count_cap
+
+        self._state: Optional[Tuple[Any, ...]] = None
+        self._cursors: Dict[int, Tuple[Any, ...]] = {}   # page -> (sort value, key) of its last row
+        self._total: Optional[Tuple[int, bool]] = None
+
+    # ---------------------------------------------------------
+    # Public
+    # ---------------------------------------------------------
+
+    def fetch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Rows of one page plus the (possibly estimated) total row count."""
+        size = max(1, min(int(request.get("rows_per_page") or ROWS_PER_PAGE), MAX_ROWS_PER_PAGE))
+        page = max(1, int(request.get("page") or 1))
+        order, descending = self._order(request)
+        where, params = self._where(request.get("filters") or {})
+
+        state = (order, descending, size, tuple(where), tuple(params))
+        if state != self._state:
+            self.invalidate()
+            self._state = state
+        if self._total is None:
+            self._total = self._count(where, params)
+        total, exact = self._total
+        if exact:
+            page = min(page, max(1, -(-total // size)))
+
+        rows = self._page(order, descending, where, params, page, size)
+
+        if len(rows) < size and (rows or page == 1):
+            # Short page: the listing ends here, so the count is now known
+            total, exact = (page - 1) * size + len(rows), True
+        elif not exact:
+            # Estimate: always leave room for one more page
+            total = max(total, (page + 1) * size)
+        self._total = (total, exact)
+        return {"rows": rows, "page": page, "total": total, "exact": exact}
+
+    def locate(self, key_value: Any, request: Dict[str, Any]) -> Optional[int]:
+        """Page (for `request`'s sort, filters and page size) holding the row with this key, or None."""
+        size = max(1, min(int(request.get("rows_per_page") or ROWS_PER_PAGE), MAX_ROWS_PER_PAGE))
+        order, descending = self._order(request)
+        where, params = self._where(request.get("filters") or {})
+        columns = self._columns(order)
+
+        with get_conn() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(columns)} FROM {self.source} "
+                f"WHERE {' AND '.join(where + [f'{self.key} = ?'])}",
+                params + [key_value],
+            ).fetchone()
+            if row is None:
+                return None
+            before = conn.execute(
+                f"SELECT COUNT(*) FROM {self.source} WHERE {' AND '.join(where + [self._seek(columns, not descending)])}",
+                params + list(row),
+            ).fetchone()[0]
+        return before // size + 1
+
+    def sort_index_sql(self, table: str, order: str) -> str:
+        """
+        CREATE INDEX matching this query's ORDER BY for `order`: sorted pages
+        and cursor seeks become index range scans instead of sorting the table.
+        """
+        return (
+            f"CREATE INDEX IF NOT EXISTS idx_{table.lower()}_sort_{order.lower()} "
+            f"ON {table}({', '.join(self._columns(order))})"
+        )
+
+    def invalidate(self) -> None:
+        """Forget cursors and the count (after a write, or when sort / filters change)."""
+        self._state = None
+        self._cursors = {}
+        self._total = None
+
+    # ---------------------------------------------------------
+    # SQL
+    # ---------------------------------------------------------
+
+    def _order(self, request: Dict[str, Any]) -> Tuple[Optional[str], bool]:
+        sort_by = request.get("sort_by")
+        return (sort_by if sort_by in self.sort_columns else None), bool(request.get("descending"))
+
+    def _columns(self, order: Optional[str]) -> List[str]:
+        """ORDER BY expressions: the sort column (NULLs as '', case-insensitive), then the key."""
+        if order is None or self.sort_columns[order] == self.key:
+            return [self.key]
+        return [f"IFNULL({self.sort_columns[order]}, '') COLLATE NOCASE", self.key]
+
+    @staticmethod
+    def _seek(columns: List[str], descending: bool) -> str:
+        """Rows strictly after a cursor in this order (before it when the order is flipped)."""
+        return f"({', '.join(columns)}) {'<' if descending else '>'} ({', '.join('?' * len(columns))})"
+
+    def _where(self, values: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+        where, params = list(self.where), list(self.params)
+        for name, value in values.items():
+            if value is None or value == "" or value == []:
+                continue
+            clause = self.filters[name](value)
+            if clause:
+                where.append(f"({clause[0]})")
+                params.extend(clause[1])
+        return where, params
+
+    def _count(self, where: List[str], params: List[Any]) -> Tuple[int, bool]:
+        with get_conn() as conn:
+            if len(where) == len(self.where):
+                # No user filter: the base listing is meant to be index-backed
+                n = conn.execute(f"SELECT COUNT(*) FROM {self.source} WHERE {' AND '.join(where)}", params).fetchone()[0]
+                return n, True
+            n = conn.execute(
+                f"SELECT COUNT(*) FROM (SELECT 1 FROM {self.source} WHERE {' AND '.join(where)} LIMIT ?)",
+                params + [self.count_cap + 1],
+            ).fetchone()[0]
+        return min(n, self.count_cap), n <= self.count_cap
+
+    def _page(self, order: Optional[str], descending: bool, where: List[str], params: List[Any],
+              page: int, size: int) -> List[Dict[str, Any]]:
+        columns = self._columns(order)
+        direction = "DESC" if descending else "ASC"
+
+        # Nearest page before this one whose last row we know
+        start = max((p for p in self._cursors if p < page), default=0)
+        where, params = list(where), list(params)
+        if start:
+            where.append(self._seek(columns, descending))
+            params.extend(self._cursors[start])
+
+        cursor_select = ", ".join(f"{c} AS _cursor{i}" for i, c in enumerate(columns))
+        sql = (
+            f"SELECT {self.select}, {cursor_select} FROM {self.source} "
+            f"WHERE {' AND '.join(where)} "
+            f"ORDER BY {', '.join(f'{c} {direction}' for c in columns)} LIMIT ? OFFSET ?"
+        )
+        with get_conn() as conn:
+            rows = [dict(r) for r in conn.execute(sql, params + [size, (page - 1 - start) * size]).fetchall()]
+
+        cursor = None
+        for row in rows:
+            cursor = tuple(row.pop(f"_cursor{i}") for i in range(len(columns)))
+        if cursor is not None and len(rows) == size:
+            self._cursors[page] = cursor
+        return rows
+
+
+def search_filter(entity: str, key: str, like_columns: Sequence[str]) -> Filter:
+    """
+    Filter on the FTS5 search index (core/search_index.py): rows whose key is
+    among the ranked hits for the typed words. Without an index it falls back
+    to LIKE over `like_columns`.
+    """
+    def build(value: Any) -> Optional[Tuple[str, Sequence[Any]]]:
+        search = str(value).strip()
+        if not search:
+            return None
+        hits = ranked_hits(entity, search)
+        if hits:
+            return f"{key} IN (SELECT hit_id FROM ({hits[0]}))", hits[1]
+        like = f"%{search}%"
+        return " OR ".join(f"{c} LIKE ?" for c in like_columns), [like] * len(like_columns)
+    return build
@@ -0,0 +1,204 @@
+"""
+PDF Cache
+Content-addressed cache of rendered PDFs, so reprinting or emailing an
+unchanged ticket returns the stored bytes instead of running reportlab.
+
+A key is "<tag>-<fingerprint>": the tag names what the PDF is about
+("ticket-42") and the fingerprint is a hash of every input the document
+is drawn from - the rows, the company branding and the template version:
+
+    key = pdf_key(f"ticket-{ticket_id}", TEMPLATE_VERSION, ticket, units, company, branding)
+    pdf = get_pdf_cache().get(key)
+
+Any change to those inputs changes the key, so a stale PDF is never
+served. Writes that change a ticket, its TicketUnits or the company
+profile also call forget_pdfs() to drop the superseded entries at once
+rather than waiting for them to age out.
+
+Two tiers, both LRU and bounded in bytes: memory (per process, so each
+PDF worker has its own) and disk (PDF_CACHE_DIR, shared by the app and
+its workers; file mtime is the recency).
+"""
+import hashlib
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from core.db import BASE_DIR
+
+CACHE_DIR = Path(os.getenv("PDF_CACHE_DIR", str(BASE_DIR / "data" / "pdf_cache")))
+MEMORY_MB = float(os.getenv("PDF_CACHE_MEMORY_MB", "32"))    # 0 disables the memory tier
+DISK_MB = float(os.getenv("PDF_CACHE_DISK_MB", "512"))       # 0 disables the disk tier
+
+
+def pdf_key(tag: str, *inputs: Any) -> str:
+    """Cache key for a document tagged `tag` drawn from `inputs` (JSON-able values)."""
+    payload = json.dumps(inputs, sort_keys=True, default=str, separators=(",", ":"))
+    return f"{tag}-{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+class PdfCache:
+    """Memory + disk LRU of PDF bytes by key."""
+
+    def __init__(self, directory: Path = CACHE_DIR, memory_bytes: int = int(MEMORY_MB * 1024 * 1024),
+                 disk_bytes: int = int(DISK_MB * 1024 * 1024)):
+        self.directory = Path(directory)
+        self.memory_bytes = max(0, int(memory_bytes))
+        self.disk_bytes = max(0, int(disk_bytes))
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stored": 0, "evicted": 0, "forgotten": 0}
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            pdf = self._memory.get(key)
+            if pdf is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return pdf
+
+        pdf = self._read(key)
+        with self._lock:
+            if pdf is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._remember(key, pdf)
+        return pdf
+
+    def put(self, key: str, pdf: bytes) -> None:
+        with self._lock:
+            self._remember(key, pdf)
+            self._stats["stored"] += 1
+        self._write(key, pdf)
+
+    def forget(self, tag: Optional[str] = None) -> int:
+        """Drop entries tagged `tag` ("ticket-42"; a tag prefix like "ticket" drops them all); None drops everything."""
+        prefix = "" if tag is None else f"{tag}-"
+        dropped = 0
+        with self._lock:
+            for key in [k for k in self._memory if k.startswith(prefix)]:
+                self._memory_size -= len(self._memory.pop(key))
+                dropped += 1
+        if self.directory.is_dir():
+            for path in self.directory.glob(f"{prefix}*.pdf"):
+                try:
+                    path.unlink()
+                    dropped += 1
+                except OSError:
+                    pass
+        with self._lock:
+            self._stats["forgotten"] += dropped
+        return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["memory_entries"] = len(self._memory)
+            out["memory_bytes"] = self._memory_size
+        out["memory_limit"] = self.memory_bytes
+        out["disk_limit"] = self.disk_bytes
+        return out
+
+    # ---------------------------------------------------------
+    # Internals
+    # ---------------------------------------------------------
+
+    def _remember(self, key: str, pdf: bytes) -> None:
+        """Add to the memory tier, evicting least recently used (caller holds the lock)."""
+        if len(pdf) > self.memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_size -= len(old)
+        self._memory[key] = pdf
+        self._memory_size += len(pdf)
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+            self._stats["evicted"] += 1
+
+    def _read(self, key: str) -> Optional[bytes]:
+        if not self.disk_bytes:
+            return None
+        path = self.directory / f"{key}.pdf"
+        try:
+            pdf = path.read_bytes()
+            os.utime(path)   # mtime = last use
+        except OSError:
+            return None
+        return pdf
+
+    def _write(self, key: str, pdf: bytes) -> None:
+        if not self.disk_bytes or len(pdf) > self.disk_bytes:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self.directory / f".{key}.{uuid.uuid4().hex}.tmp"
+            tmp.write_bytes(pdf)
+            os.replace(tmp, self.directory / f"{key}.pdf")
+            self._trim_disk()
+        except OSError as e:
+            print(f"PDF cache write failed: {e}")
+
+    def _trim_disk(self) -> None:
+        """Delete least recently used files until the directory fits disk_bytes."""
+        entries = []
+        for path in self.directory.glob("*.pdf"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        if total <= self.disk_bytes:
+            return
+        evicted = 0
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.disk_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._stats["evicted"] += evicted
+
+
+_cache: Optional[PdfCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_pdf_cache() -> PdfCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PdfCache()
+    return _cache
+
+
+def reset_pdf_cache() -> None:
+    """Forget the shared cache object (tests); files on disk are kept."""
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def forget_pdfs(tag: Optional[str] = None) -> None:
+    """Drop cached PDFs for `tag` after the data behind them changed (see module docstring)."""
+    try:
+        get_pdf_cache().forget(tag)
+    except Exception as e:
+        print(f"PDF cache invalidation failed: {e}")
+
+
+def get_pdf_cache_stats() -> Dict[str, Any]:
+    return get_pdf_cache().stats()
@@ -1,14 +1,19 @@
 """Shared PDF layout helpers for GCC Monitoring reports."""
 
+import zlib
 from datetime import datetime
-from typing import Iterable, List, Optional
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
 
 from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import Table, TableStyle, Paragraph
 from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.pdfdoc import PDFDictionary, PDFName, PDFStream
 from reportlab.pdfbase.ttfonts import TTFont
 
 from core.settings_repo import get_company_profile
@@ -38,14 +43,15 @@ def fit_text_to_width(text: str, width_inches: float, font_size: int = 8) -> str
 
 
 PDF_BRANDING: dict = {}
-_BRANDING_LOADED = False
+_BRANDING_OVERRIDE = False
+_BRANDING_PROFILE: Optional[dict] = None   # the company profile PDF_BRANDING was built from
 
 
 def set_pdf_branding(data: dict) -> None:
     """Override PDF branding globally (used by header/footer)."""
-    global PDF_BRANDING, _BRANDING_LOADED
+    global PDF_BRANDING, _BRANDING_OVERRIDE
     PDF_BRANDING = dict(data or {})
-    _BRANDING_LOADED = True
+    _BRANDING_OVERRIDE = True
 
 
 def _build_branding(profile: dict) -> dict:
@@ -81,14 +87,19 @@ def _build_branding(profile: dict) -> dict:
 
 
 def load_pdf_branding(force: bool = False) -> dict:
-    """Load branding from CompanyInfo (settings) into a global cache."""
-    global PDF_BRANDING, _BRANDING_LOADED
-    if _BRANDING_LOADED and not force:
+    """
+    Branding for headers/footers: the set_pdf_branding() override, else the
+    company profile from the settings cache - so an edited profile shows up
+    on the next page drawn. Rebuilt only when the profile changed; `force`
+    rebuilds anyway.
+    """
+    global PDF_BRANDING, _BRANDING_PROFILE
+    if _BRANDING_OVERRIDE:
         return PDF_BRANDING
-
-    profile = get_company_profile() or {}
-    PDF_BRANDING = _build_branding(profile)
-    _BRANDING_LOADED = True
+    profile = get_company_profile()   # {} without a CompanyInfo table: default branding
+    if force or profile != _BRANDING_PROFILE:
+        PDF_BRANDING = _build_branding(profile)
+        _BRANDING_PROFILE = profile
     return PDF_BRANDING
 
 
@@ -156,6 +167,29 @@ def create_pdf_footer(c, page_num: int) -> None:
     c.drawCentredString(center_x, 0.28 * inch, f"Page {page_num}")
 
 
+BODY_TEXT = colors.HexColor("#111827")
+
+
+@lru_cache(maxsize=None)
+def _normal_style() -> ParagraphStyle:
+    return getSampleStyleSheet()["Normal"]
+
+
+@lru_cache(maxsize=64)
+def paragraph_style(font_size: float, text_color=BODY_TEXT, font_name: str = "Helvetica",
+                    alignment: int = TA_LEFT) -> ParagraphStyle:
+    """Shared ParagraphStyle per (size, colour, font, alignment); styles are never mutated."""
+    return ParagraphStyle(
+        f"pdf_{font_name}_{font_size}_{alignment}",
+        parent=_normal_style(),
+        fontName=font_name,
+        fontSize=font_size,
+        leading=font_size + 1,
+        textColor=text_color,
+        alignment=alignment,
+    )
+
+
 def build_report_table(
     headers: List[str],
     rows: Iterable[Iterable[str]],
@@ -176,21 +210,8 @@ def build_report_table(
     valign: str = "TOP",
 ):
     """Build a reusable, wrapped table with consistent styling."""
-    styles = getSampleStyleSheet()
-    header_style = ParagraphStyle(
-        "pdf_header",
-        parent=styles["Normal"],
-        fontSize=header_font_size,
-        leading=header_font_size + 1,
-        textColor=header_text,
-    )
-    body_style = ParagraphStyle(
-        "pdf_body",
-        parent=styles["Normal"],
-        fontSize=body_font_size,
-        leading=body_font_size + 1,
-        textColor=colors.HexColor("#111827"),
-    )
+    header_style = paragraph_style(header_font_size, header_text)
+    body_style = paragraph_style(body_font_size, BODY_TEXT)
 
     def normalize(value, col_idx: int = 0, is_header: bool = False) -> str:
         if value is None:
@@ -317,3 +338,184 @@ def draw_table_paged(
         y_cursor = y_cursor - part_h
 
     return page_num, y_cursor
+
+
+_ALIGNMENTS = {"LEFT": TA_LEFT, "CENTER": TA_CENTER, "RIGHT": TA_RIGHT}
+
+
+def compress_finished_pages(c) -> None:
+    """Flate-compress the content of pages already closed with showPage().
+
+    reportlab keeps every page's drawing operators as text until save(), so
+    a long document's memory grows with its page count; compressing each
+    page as soon as it is finished keeps that to a few hundred bytes a page.
+    """
+    pages = c._doc.Pages.pages
+    for page in pages[getattr(c, "_compressed_pages", 0):]:
+        stream = getattr(page, "stream", None)
+        if stream and not page.Contents:
+            data = stream.encode("utf8") if isinstance(stream, str) else stream   # as PDFZCompress does
+            page.Contents = PDFStream(PDFDictionary({"Filter": PDFName("FlateDecode")}), zlib.compress(data), filters=[])
+            page.stream = None
+    c._compressed_pages = len(pages)
+
+
+class StreamingTable:
+    """Table writer that draws rows straight from an iterator, one page at a time.
+
+    Unlike build_report_table + draw_table_paged, no row outlives the page it
+    is drawn on: a 200k-row export from a SQLite cursor keeps only the current
+    row in memory. Cells that fit on one line (nearly all of them, after
+    fit_text_to_width) are drawn with drawString; longer ones wrap in a
+    Paragraph with a shared cached style. Styling matches build_report_table.
+
+        table = StreamingTable(headers, col_widths, grid_width=0.75)
+        y, drawn = table.draw(c, rows, x=0.25 * inch, y=y, bottom_margin=0.6 * inch,
+                              new_page=start_next_page)
+
+    `new_page()` is called when the next row does not fit: it finishes the
+    current page (c.showPage(), page number, header...) and returns the y
+    where the table continues; the header row is repeated there.
+    """
+
+    def __init__(
+        self,
+        headers: Sequence[str],
+        col_widths: Sequence[float],
+        *,
+        header_font_size: int = 9,
+        body_font_size: int = 8,
+        header_bg=colors.HexColor("#111827"),
+        header_text=colors.white,
+        grid_width: float = 0.35,
+        grid_color=colors.HexColor("#D1D5DB"),
+        row_backgrounds=(colors.white, colors.HexColor("#F9FAFB")),
+        align_right_from: Optional[int] = None,
+        align_center_cols: Optional[List[int]] = None,
+        padding: int = 4,
+    ):
+        self.headers = list(headers)
+        self.col_widths = list(col_widths)
+        self.header_font_size = header_font_size
+        self.body_font_size = body_font_size
+        self.header_bg = header_bg
+        self.header_text = header_text
+        self.grid_width = grid_width
+        self.grid_color = grid_color
+        self.row_backgrounds = list(row_backgrounds)
+        self.padding = padding
+        self.aligns = ["LEFT"] * len(self.col_widths)
+        if align_right_from is not None:
+            for col in range(align_right_from, len(self.aligns)):
+                self.aligns[col] = "RIGHT"
+        for col in align_center_cols or []:
+            self.aligns[col] = "CENTER"
+        self.width = sum(self.col_widths)
+        self.stats = {"rows": 0, "fast_cells": 0, "wrapped_cells": 0}
+
+    def draw(self, c, rows: Iterable[Sequence[Any]], *, x: float, y: float, bottom_margin: float,
+             new_page: Callable[[], float]) -> Tuple[float, int]:
+        """Draw every row; returns (y below the table, rows drawn)."""
+        top = y
+        y = self._row(c, self._layout(self.headers, header=True), x, y, header=True, shade=0)
+        drawn = 0
+        for row in rows:
+            cells = self._layout(row, header=False)
+            if y - self._height(cells, header=False) < bottom_margin:
+                self._grid(c, x, top, y)
+                top = y = new_page()
+                compress_finished_pages(c)
+                y = self._row(c, self._layout(self.headers, header=True), x, y, header=True, shade=0)
+            y = self._row(c, cells, x, y, header=False, shade=drawn % len(self.row_backgrounds))
+            drawn += 1
+        self._grid(c, x, top, y)
+        self.stats["rows"] += drawn
+        return y, drawn
+
+    # ---------------------------------------------------------
+    # Internals
+    # ---------------------------------------------------------
+
+    def _layout(self, row: Sequence[Any], *, header: bool) -> List[Tuple[str, Any]]:
+        """Per cell: ("text", (str, width)) for the drawString fast path, or ("para", (Paragraph, height))."""
+        font = "Helvetica-Bold" if header else "Helvetica"
+        size = self.header_font_size if header else self.body_font_size
+        cells = []
+        for col, width in enumerate(self.col_widths):
+            value = row[col] if col < len(row) else None
+            text = "—" if value is None or not str(value).strip() else fit_text_to_width(str(value), width / inch, size)
+            inner = width - 2 * self.padding
+            text_w = pdfmetrics.stringWidth(text, font, size)
+            if text_w <= inner:
+                cells.append(("text", (text, text_w)))
+                self.stats["fast_cells"] += 1
+            else:
+                style = paragraph_style(size, self.header_text if header else BODY_TEXT, font,
+                                        _ALIGNMENTS[self.aligns[col]])
+                para = Paragraph(escape(text), style)
+                _, para_h = para.wrap(inner, 10_000)
+                cells.append(("para", (para, para_h)))
+                self.stats["wrapped_cells"] += 1
+        return cells
+
+    def _height(self, cells: List[Tuple[str, Any]], *, header: bool) -> float:
+        size = self.header_font_size if header else self.body_font_size
+        pad = 4 if header else 3
+        content = max([size + 1] + [cell[1][1] for cell in cells if cell[0] == "para"])
+        return content + 2 * pad
+
+    def _row(self, c, cells: List[Tuple[str, Any]], x: float, top: float, *, header: bool, shade: int) -> float:
+        """Paint one row below `top`; returns its bottom."""
+        size = self.header_font_size if header else self.body_font_size
+        pad = 4 if header else 3
+        height = self._height(cells, header=header)
+        bottom = top - height
+        color = self.header_text if header else BODY_TEXT
+
+        background = self.header_bg if header else self.row_backgrounds[shade]
+        if background != colors.white:   # the page is already white
+            c.setFillColor(background)
+            c.rect(x, bottom, self.width, height, stroke=0, fill=1)
+
+        # All one-line cells in a single text object
+        text = c.beginText()
+        text.setFont("Helvetica-Bold" if header else "Helvetica", size)
+        text.setFillColor(color)
+        baseline = top - pad - size
+        paragraphs = []
+        cell_x = x
+        for (kind, content), width, align in zip(cells, self.col_widths, self.aligns):
+            if kind == "text":
+                value, value_w = content
+                if align == "RIGHT":
+                    text.setTextOrigin(cell_x + width - self.padding - value_w, baseline)
+                elif align == "CENTER":
+                    text.setTextOrigin(cell_x + (width - value_w) / 2, baseline)
+                else:
+                    text.setTextOrigin(cell_x + self.padding, baseline)
+                text.textOut(value)
+            else:
+                paragraphs.append((content, cell_x))
+            cell_x += width
+        c.drawText(text)
+        for (para, para_h), para_x in paragraphs:
+            para.drawOn(c, para_x + self.padding, top - pad - para_h)
+
+        if header:
+            c.setLineWidth(0.75)
+            c.setStrokeColor(BODY_TEXT)
+        else:
+            c.setLineWidth(self.grid_width)
+            c.setStrokeColor(self.grid_color)
+        c.line(x, bottom, x + self.width, bottom)
+        return bottom
+
+    def _grid(self, c, x: float, top: float, bottom: float) -> None:
+        """Outer border and column lines of the part of the table on this page."""
+        c.setLineWidth(self.grid_width)
+        c.setStrokeColor(self.grid_color)
+        c.rect(x, bottom, self.width, top - bottom, stroke=1, fill=0)
+        cell_x = x
+        for width in self.col_widths[:-1]:
+            cell_x += width
+            c.line(cell_x, top, cell_x, bottom)
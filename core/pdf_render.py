@@ -0,0 +1,362 @@
+"""
+PDF Render Service
+Background rendering of service orders and report PDFs.
+
+reportlab is CPU-bound and holds the GIL, so rendering inside a NiceGUI
+handler froze the event loop - and every connected user's UI - for as long
+as the document took. Pages now submit a job instead:
+
+    job_id = submit_pdf("hierarchical_company", customer_id, owner="alice")
+    status_pdf(job_id)  -> {"status": "queued" | "running" | "done" | "failed", ...}
+    result_pdf(job_id)  -> (filename, pdf_bytes), or None when there was no data
+
+Jobs run in a pool of PDF_WORKERS spawned processes (0: a single background
+thread, for tests and small installs). A job looks up its renderer by name
+in RENDERERS, loads its data and renders into memory (BytesIO), so only the
+finished bytes cross back to the app process. ui/pdf_jobs.py polls a job
+from the page and hands the bytes to the browser.
+
+Limits: at most MAX_QUEUED unfinished jobs overall and MAX_PER_OWNER per
+user; submit() raises PdfQueueFull beyond that. Finished jobs are kept for
+JOB_TTL seconds for the page to collect.
+"""
+import itertools
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+WORKERS = int(os.getenv("PDF_WORKERS", "2"))              # render processes; 0 = one in-process thread
+MAX_QUEUED = int(os.getenv("PDF_MAX_QUEUED", "20"))       # unfinished jobs across all users
+MAX_PER_OWNER = int(os.getenv("PDF_MAX_PER_USER", "3"))   # unfinished jobs per user
+JOB_TTL = float(os.getenv("PDF_JOB_TTL", "300"))          # seconds a finished job is kept
+
+
+class PdfQueueFull(Exception):
+    """Raised when too many PDFs are already waiting to be rendered."""
+
+
+# ---------------------------------------------------------
+# Renderers (run inside the worker)
+# ---------------------------------------------------------
+# Each loads its own data and returns (path, pdf_bytes), or None when there
+# is nothing to render.
+
+def _ticket(ticket_id: int):
+    from core.ticket_document import generate_ticket_pdf
+    return generate_ticket_pdf(ticket_id)
+
+
+def _hierarchical_company(customer_id: Optional[int]):
+    # Streamed a customer at a time: the whole tree is never in memory
+    from core.report_document import generate_hierarchical_company_pdf
+    from core.reports_repo import iter_hierarchical_company_report
+    customers = iter_hierarchical_company_report(customer_id)
+    first = next(customers, None)
+    if first is None:
+        return None
+    return generate_hierarchical_company_pdf({"customers": itertools.chain([first], customers)})
+
+
+def _equipment_inventory(customer_id: Optional[int], location_id: Optional[int]):
+    # Streamed from the cursor: memory stays flat however many units there are
+    from core.report_document import generate_equipment_inventory_pdf
+    from core.reports_repo import count_equipment_inventory, iter_equipment_inventory
+    total = count_equipment_inventory(customer_id, location_id)
+    if not total:
+        return None
+    rows = iter_equipment_inventory(customer_id, location_id)
+    return generate_equipment_inventory_pdf(rows, customer_id, total=total)
+
+
+def _equipment_age():
+    from core.report_document import generate_equipment_age_pdf
+    from core.reports_repo import get_equipment_by_age_report
+    data = get_equipment_by_age_report()
+    return generate_equipment_age_pdf(data) if data else None
+
+
+def _tickets_report(status: Optional[str], start_date: Optional[str], end_date: Optional[str]):
+    from core.report_document import generate_tickets_report_pdf
+    from core.reports_repo import get_tickets_by_status_report
+    data = get_tickets_by_status_report(status=status, start_date=start_date, end_date=end_date)
+    return generate_tickets_report_pdf(data, status) if data else None
+
+
+def _open_tickets():
+    from core.report_document import generate_open_tickets_pdf
+    from core.reports_repo import get_open_tickets_summary
+    data = get_open_tickets_summary()
+    return generate_open_tickets_pdf(data) if data else None
+
+
+def _customer_summary():
+    from core.report_document import generate_customer_summary_pdf
+    from core.reports_repo import get_customer_summary_report
+    data = get_customer_summary_report()
+    return generate_customer_summary_pdf(data) if data else None
+
+
+def _location_inventory():
+    from core.report_document import generate_location_inventory_pdf
+    from core.reports_repo import get_location_inventory_report
+    data = get_location_inventory_report()
+    return generate_location_inventory_pdf(data) if data else None
+
+
+def _current_alerts():
+    from core.report_document import generate_current_alerts_pdf
+    from core.reports_repo import get_current_alerts_report
+    data = get_current_alerts_report()
+    return generate_current_alerts_pdf(data) if data else None
+
+
+RENDERERS: Dict[str, Callable[..., Optional[Tuple[str, bytes]]]] = {
+    "ticket": _ticket,
+    "hierarchical_company": _hierarchical_company,
+    "equipment_inventory": _equipment_inventory,
+    "equipment_age": _equipment_age,
+    "tickets_report": _tickets_report,
+    "open_tickets": _open_tickets,
+    "customer_summary": _customer_summary,
+    "location_inventory": _location_inventory,
+    "current_alerts": _current_alerts,
+}
+
+
+def _run(kind: str, args: Tuple[Any, ...], db_path: Optional[str]) -> Optional[Tuple[str, bytes]]:
+    """Worker entry point: render one job. Returns (filename, pdf_bytes) or None."""
+    if db_path is not None:
+        # Spawned worker: use the app's database, not the import-time default
+        from core import db
+        if str(db.DB_PATH) != db_path:
+            db.close_pools()
+            db.DB_PATH = Path(db_path)
+    rendered = RENDERERS[kind](*args)
+    if rendered is None:
+        return None
+    path, pdf_bytes = rendered
+    return os.path.basename(path), pdf_bytes
+
+
+# ---------------------------------------------------------
+# Service
+# ---------------------------------------------------------
+
+class PdfRenderService:
+    """Job queue in front of a pool of PDF render workers."""
+
+    def __init__(self, workers: int = WORKERS, max_queued: int = MAX_QUEUED,
+                 max_per_owner: int = MAX_PER_OWNER, job_ttl: float = JOB_TTL):
+        self.workers = max(0, int(workers))
+        self.max_queued = max(1, int(max_queued))
+        self.max_per_owner = max(1, int(max_per_owner))
+        self.job_ttl = job_ttl
+        self._lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._futures: Dict[str, Future] = {}
+        self._results: Dict[str, Optional[Tuple[str, bytes]]] = {}
+        self._finished: Dict[str, threading.Event] = {}
+        self._stats = {"submitted": 0, "done": 0, "failed": 0, "rejected": 0, "render_ms": 0.0}
+
+    def submit(self, kind: str, *args: Any, owner: Optional[str] = None) -> str:
+        """Queue a render; returns the job id. Raises PdfQueueFull / KeyError (unknown kind)."""
+        if kind not in RENDERERS:
+            raise KeyError(f"Unknown PDF kind: {kind}")
+        with self._lock:
+            self._purge()
+            pending = [j for j in self._jobs.values() if j["status"] in ("queued", "running")]
+            if len(pending) >= self.max_queued:
+                self._stats["rejected"] += 1
+                raise PdfQueueFull("Too many PDFs are being generated - try again in a moment")
+            if owner is not None and sum(j["owner"] == owner for j in pending) >= self.max_per_owner:
+                self._stats["rejected"] += 1
+                raise PdfQueueFull("You already have PDFs being generated - wait for them to finish")
+
+            job_id = uuid.uuid4().hex
+            job = {
+                "id": job_id,
+                "kind": kind,
+                "owner": owner,
+                "status": "queued",
+                "submitted": time.time(),
+                "finished": None,
+                "error": None,
+                "filename": None,
+                "size": None,
+            }
+            self._jobs[job_id] = job
+            self._finished[job_id] = threading.Event()
+            self._stats["submitted"] += 1
+            future = self._submit_locked(kind, args)
+            self._futures[job_id] = future
+        future.add_done_callback(lambda f, job_id=job_id: self._finish(job_id, f))
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Copy of the job record, or None for an unknown / expired job."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            future = self._futures.get(job_id)
+            if job["status"] == "queued" and future is not None and future.running():
+                job["status"] = "running"
+            return dict(job)
+
+    def result(self, job_id: str) -> Optional[Tuple[str, bytes]]:
+        """(filename, pdf_bytes) of a finished job; None when it rendered nothing."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] != "done":
+                raise KeyError(f"PDF job {job_id} is not finished")
+            return self._results.get(job_id)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Block until the job has finished (or timeout); returns its status."""
+        with self._lock:
+            finished = self._finished.get(job_id)
+        if finished is not None:
+            finished.wait(timeout)
+        return self.status(job_id)
+
+    def render(self, kind: str, *args: Any, timeout: Optional[float] = None) -> Optional[Tuple[str, bytes]]:
+        """Submit and wait (scripts / tests). Raises RuntimeError when the job failed."""
+        job = self.wait(self.submit(kind, *args), timeout)
+        if job is None or job["status"] == "failed":
+            raise RuntimeError(f"PDF job {kind} failed: {job['error'] if job else 'expired'}")
+        return self.result(job["id"])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["queued"] = sum(j["status"] in ("queued", "running") for j in self._jobs.values())
+            out["kept"] = len(self._jobs)
+        out["workers"] = self.workers
+        out["max_queued"] = self.max_queued
+        return out
+
+    def shutdown(self) -> None:
+        """Stop the workers; queued jobs are cancelled (app shutdown)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    # ---------------------------------------------------------
+    # Internals
+    # ---------------------------------------------------------
+
+    def _submit_locked(self, kind: str, args: Tuple[Any, ...]) -> Future:
+        if self.workers == 0:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-render")
+            return self._executor.submit(_run, kind, args, None)
+
+        from core import db
+        db_path = str(db.DB_PATH)
+        if self._executor is None:
+            self._executor = self._process_pool()
+        try:
+            return self._executor.submit(_run, kind, args, db_path)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory): start a fresh pool
+            self._executor = self._process_pool()
+            return self._executor.submit(_run, kind, args, db_path)
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        # spawn, not fork: the app process runs threads (writer, pools, event loop)
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn"))
+
+    def _finish(self, job_id: str, future: Future) -> None:
+        error = None
+        result = None
+        if future.cancelled():
+            error = "Cancelled"
+        else:
+            exc = future.exception()
+            if exc is not None:
+                error = str(exc) or exc.__class__.__name__
+                if isinstance(exc, BrokenProcessPool):
+                    with self._lock:
+                        self._executor = None
+            else:
+                result = future.result()
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            self._futures.pop(job_id, None)
+            if job is None:
+                return
+            job["finished"] = time.time()
+            if error is not None:
+                job["status"] = "failed"
+                job["error"] = error
+                self._stats["failed"] += 1
+            else:
+                job["status"] = "done"
+                if result is not None:
+                    job["filename"], job["size"] = result[0], len(result[1])
+                self._results[job_id] = result
+                self._stats["done"] += 1
+            self._stats["render_ms"] += (job["finished"] - job["submitted"]) * 1000
+            self._finished[job_id].set()
+
+        if error is not None:
+            try:
+                from core.logger import log_error
+                log_error(f"PDF job {job['kind']} failed: {error}", "pdf_render")
+            except Exception:
+                pass
+
+    def _purge(self) -> None:
+        """Drop finished jobs older than job_ttl (caller holds the lock)."""
+        cutoff = time.time() - self.job_ttl
+        for job_id in [j["id"] for j in self._jobs.values() if j["finished"] and j["finished"] < cutoff]:
+            self._jobs.pop(job_id, None)
+            self._results.pop(job_id, None)
+            self._finished.pop(job_id, None)
+
+
+_service: Optional[PdfRenderService] = None
+_service_lock = threading.Lock()
+
+
+def get_pdf_service() -> PdfRenderService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = PdfRenderService()
+    return _service
+
+
+def stop_pdf_service() -> None:
+    """Stop the workers and forget the shared service (app shutdown / tests)."""
+    global _service
+    with _service_lock:
+        service, _service = _service, None
+    if service is not None:
+        service.shutdown()
+
+
+def submit_pdf(kind: str, *args: Any, owner: Optional[str] = None) -> str:
+    return get_pdf_service().submit(kind, *args, owner=owner)
+
+
+def status_pdf(job_id: str) -> Optional[Dict[str, Any]]:
+    return get_pdf_service().status(job_id)
+
+
+def result_pdf(job_id: str) -> Optional[Tuple[str, bytes]]:
+    return get_pdf_service().result(job_id)
+
+
+def get_pdf_stats() -> Dict[str, Any]:
+    return get_pdf_service().stats()
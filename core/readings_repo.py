@@ -0,0 +1,425 @@
+"""
+Repository for UnitReadings (telemetry)
+Bulk insert path used by the ingestion writer, typed-storage migration
+and numeric range queries
+"""
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.db import get_conn
+
+LATEST_READING_SQL = Path(__file__).resolve().parents[1] / "schema" / "unit_latest_reading.sql"
+
+
+# Every writable UnitReadings column (reading_id is assigned by SQLite)
+READING_COLUMNS: Tuple[str, ...] = (
+    "unit_id", "ts",
+    "i_temp", "o_temp", "supply_temp", "return_temp", "delta_t",
+    "v_1", "v_2", "v_3", "a_1", "a_2", "a_3", "id_l1", "id_l2",
+    "h_1", "h_2", "rh",
+    "l_v", "discharge_psi", "suction_psi",
+    "c_1", "c_2", "c_3",
+    "time_1", "time_2", "date_1", "runtime_hours", "compressor_runtime_hours",
+    "sp_1", "sp_2", "sp_deadband",
+    "rpm_1", "rpm_2", "fan_speed_percent",
+    "ev_1", "ev_2", "superheat", "subcooling",
+    "cn_1", "cn_2", "compressor_amps",
+    "mode", "unit_status", "fault_code",
+    "accumulator_level", "oil_pressure",
+    "demand_percent", "load_percent",
+    "alarm_status", "alert_message",
+)
+
+# Numeric metric columns and their storage type. Anything not listed here
+# (ts, status strings, fault codes, c_1..c_3, cn_1/cn_2, id_l1/id_l2, date_1)
+# stays TEXT.
+NUMERIC_COLUMNS: Dict[str, str] = {
+    "i_temp": "REAL", "o_temp": "REAL", "supply_temp": "REAL",
+    "return_temp": "REAL", "delta_t": "REAL",
+    "v_1": "REAL", "v_2": "REAL", "v_3": "REAL",
+    "a_1": "REAL", "a_2": "REAL", "a_3": "REAL",
+    "h_1": "REAL", "h_2": "REAL", "rh": "REAL",
+    "l_v": "REAL", "discharge_psi": "REAL", "suction_psi": "REAL",
+    "time_1": "REAL", "time_2": "REAL",
+    "runtime_hours": "REAL", "compressor_runtime_hours": "REAL",
+    "sp_1": "REAL", "sp_2": "REAL", "sp_deadband": "REAL",
+    "rpm_1": "INTEGER", "rpm_2": "INTEGER", "fan_speed_percent": "INTEGER",
+    "ev_1": "REAL", "ev_2": "REAL", "superheat": "REAL", "subcooling": "REAL",
+    "compressor_amps": "REAL",
+    "accumulator_level": "REAL", "oil_pressure": "REAL",
+    "demand_percent": "INTEGER", "load_percent": "INTEGER",
+}
+
+READINGS_TEXT_VIEW_SQL = Path(__file__).resolve().parents[1] / "schema" / "readings_numeric.sql"
+
+_INSERT_SQL = (
+    f"INSERT INTO UnitReadings ({', '.join(READING_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in READING_COLUMNS)})"
+)
+
+
+TS_FORMAT = "%Y-%m-%d %H:%M:%S"   # UTC; roll-ups, retention and range queries compare ts as this text
+
+
+def _utc_now_str() -> str:
+    # Same format as the column default datetime('now')
+    return datetime.now(timezone.utc).strftime(TS_FORMAT)
+
+
+def normalize_ts(value: Any) -> Optional[str]:
+    """
+    Canonical UTC "YYYY-MM-DD HH:MM:SS" for a gateway timestamp: ISO 8601
+    (space or T separator, fractional seconds, Z or +hh:mm offset; no offset
+    means UTC) or epoch seconds (number or digit string). None if unparseable.
+    """
+    if isinstance(value, bool):
+        return None
+    try:
+        if isinstance(value, (int, float)) or (isinstance(value, str) and value.strip().isdigit()):
+            dt = datetime.fromtimestamp(float(value), tz=timezone.utc)
+        elif isinstance(value, str):
+            text = value.strip()
+            if text[-1:] in ("Z", "z"):
+                text = text[:-1] + "+00:00"
+            dt = datetime.fromisoformat(text)
+        else:
+            return None
+    except (ValueError, OverflowError, OSError):
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.strftime(TS_FORMAT)
+
+
+def normalize_reading(data: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+    """
+    Turn one incoming reading dict into an insert tuple.
+    Returns None if it has no usable unit_id or an unparseable ts (see
+    normalize_ts; a missing ts means now). Unknown keys are ignored.
+    """
+    if not isinstance(data, dict):
+        return None
+    try:
+        unit_id = int(data.get("unit_id"))
+    except (TypeError, ValueError):
+        return None
+
+    raw_ts = data.get("ts")
+    ts = _utc_now_str() if raw_ts is None or raw_ts == "" else normalize_ts(raw_ts)
+    if ts is None:
+        return None
+
+    values: List[Any] = [unit_id, ts]
+    for col in READING_COLUMNS[2:]:
+        value = data.get(col)
+        if value == "" and col in NUMERIC_COLUMNS:
+            value = None   # empty string would be stored as TEXT in a REAL column
+        values.append(value)
+    return tuple(values)
+
+
+def insert_readings(rows: Iterable[Tuple[Any, ...]]) -> Tuple[int, int]:
+    """
+    Insert normalized reading tuples in a single transaction with executemany.
+    If the batch violates a constraint (e.g. unknown unit_id), falls back to
+    row-by-row inserts so one bad reading doesn't drop the whole batch.
+    Returns (written, rejected).
+    """
+    rows = list(rows)
+    if not rows:
+        return 0, 0
+
+    conn = get_conn()
+    try:
+        try:
+            conn.executemany(_INSERT_SQL, rows)
+            conn.commit()
+            return len(rows), 0
+        except sqlite3.IntegrityError:
+            conn.rollback()
+
+        written = 0
+        for row in rows:
+            try:
+                conn.execute(_INSERT_SQL, row)
+                written += 1
+            except sqlite3.IntegrityError:
+                pass
+        conn.commit()
+        return written, len(rows) - written
+    finally:
+        conn.close()
+
+
+# ---------------------------------------------------------
+# LATEST READING PER UNIT (UnitLatestReading)
+# ---------------------------------------------------------
+
+def _table_exists(conn, table_name: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+        (table_name,),
+    ).fetchone()
+    return row is not None
+
+
+def ensure_latest_reading_table() -> bool:
+    """
+    Create UnitLatestReading + its triggers if missing (idempotent).
+    Backfills from UnitReadings the first time. Returns True if it was created.
+    """
+    conn = get_conn()
+    try:
+        if not _table_exists(conn, "UnitReadings"):
+            return False
+        created = not _table_exists(conn, "UnitLatestReading")
+        conn.executescript(LATEST_READING_SQL.read_text(encoding="utf-8"))
+    finally:
+        conn.close()
+
+    if created:
+        rebuild_latest_readings()
+    return created
+
+
+def rebuild_latest_readings() -> int:
+    """
+    Recompute UnitLatestReading from scratch (after bulk imports / backfills
+    that bypassed the triggers). Returns the number of units tracked.
+    """
+    with get_conn() as conn:
+        conn.execute("DELETE FROM UnitLatestReading")
+        conn.execute(
+            """
+            INSERT INTO UnitLatestReading (unit_id, reading_id, ts)
+            SELECT ur.unit_id, ur.reading_id, ur.ts
+            FROM UnitReadings ur
+            JOIN (
+                SELECT unit_id, MAX(reading_id) AS reading_id
+                FROM UnitReadings
+                GROUP BY unit_id
+            ) latest ON latest.reading_id = ur.reading_id
+            WHERE ur.unit_id IN (SELECT unit_id FROM Units)
+            """
+        )
+        row = conn.execute("SELECT COUNT(*) FROM UnitLatestReading").fetchone()
+        return int(row[0]) if row else 0
+
+
+def get_latest_reading(unit_id: int) -> Optional[Dict[str, Any]]:
+    """Newest UnitReadings row for one unit (primary-key lookups only)."""
+    conn = get_conn()
+    try:
+        row = conn.execute(
+            """
+            SELECT ur.*
+            FROM UnitLatestReading lr
+            JOIN UnitReadings ur ON ur.reading_id = lr.reading_id
+            WHERE lr.unit_id = ?
+            """,
+            (unit_id,),
+        ).fetchone()
+        return dict(row) if row else None
+    finally:
+        conn.close()
+
+
+# ---------------------------------------------------------
+# TYPED STORAGE (REAL / INTEGER metric columns)
+# ---------------------------------------------------------
+
+_RANGE_OPS = ("<", "<=", ">", ">=", "=", "!=")
+
+
+def get_reading_column_types(conn=None) -> Dict[str, str]:
+    """Declared type of every UnitReadings column, e.g. {'supply_temp': 'REAL'}."""
+    own = conn is None
+    conn = conn or get_conn()
+    try:
+        return {r["name"]: (r["type"] or "").upper() for r in conn.execute("PRAGMA table_info(UnitReadings)")}
+    finally:
+        if own:
+            conn.close()
+
+
+def readings_are_numeric(conn=None) -> bool:
+    """True once every metric column has its numeric storage type."""
+    types = get_reading_column_types(conn)
+    return bool(types) and all(types.get(col) == typ for col, typ in NUMERIC_COLUMNS.items())
+
+
+def ensure_readings_text_view() -> None:
+    """Create the UnitReadingsText compatibility view (idempotent)."""
+    with get_conn() as conn:
+        if _table_exists(conn, "UnitReadings"):
+            conn.executescript(READINGS_TEXT_VIEW_SQL.read_text(encoding="utf-8"))
+
+
+def _used_bytes(conn) -> int:
+    """Database size excluding free pages (what VACUUM would leave)."""
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    pages = conn.execute("PRAGMA page_count").fetchone()[0]
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return (pages - free) * page_size
+
+
+def _typed_readings_ddl(table_name: str, foreign_key: bool = True) -> str:
+    cols = [
+        "reading_id INTEGER PRIMARY KEY AUTOINCREMENT",
+        "unit_id INTEGER NOT NULL",
+        "ts TEXT DEFAULT (datetime('now'))",
+    ]
+    for col in READING_COLUMNS[2:]:
+        cols.append(f"{col} {NUMERIC_COLUMNS.get(col, 'TEXT')}")
+    if foreign_key:
+        cols.append("FOREIGN KEY(unit_id) REFERENCES Units(unit_id) ON DELETE CASCADE")
+    return f"CREATE TABLE {table_name} (\n  " + ",\n  ".join(cols) + "\n)"
+
+
+def migrate_readings_to_numeric() -> Dict[str, Any]:
+    """
+    Rebuild UnitReadings with REAL/INTEGER metric columns.
+
+    SQLite can't change a column type in place, so this follows the
+    create-copy-drop-rename procedure inside one transaction. Indexes,
+    triggers (UnitLatestReading) and views on UnitReadings are re-created
+    afterwards; reading_id values are preserved.
+
+    Numeric-looking text is converted by column affinity, blanks become
+    NULL, and anything non-numeric is kept as-is (counted in 'non_numeric').
+    Returns a summary dict; 'migrated' is False if nothing had to be done.
+    """
+    started = time.perf_counter()
+    conn = get_conn()
+    try:
+        if not _table_exists(conn, "UnitReadings"):
+            return {"migrated": False, "reason": "UnitReadings does not exist"}
+        if readings_are_numeric(conn):
+            return {"migrated": False, "reason": "already numeric"}
+
+        bytes_before = _used_bytes(conn)
+
+        # Everything that depends on UnitReadings and must be re-created
+        dependents = conn.execute(
+            """
+            SELECT type, name, sql FROM sqlite_master
+            WHERE sql IS NOT NULL
+              AND (tbl_name = 'UnitReadings' AND type IN ('index', 'trigger')
+                   OR type = 'view' AND sql LIKE '%UnitReadings%')
+            """
+        ).fetchall()
+
+        old_cols = set(get_reading_column_types(conn))
+        select_exprs = ["reading_id", "unit_id", "ts"]
+        for col in READING_COLUMNS[2:]:
+            if col not in old_cols:
+                select_exprs.append("NULL")
+            elif col in NUMERIC_COLUMNS:
+                select_exprs.append(f"NULLIF(TRIM({col}), '')")
+            else:
+                select_exprs.append(col)
+        target_cols = ["reading_id", "unit_id", "ts", *READING_COLUMNS[2:]]
+
+        # foreign_keys can only be toggled outside a transaction
+        conn.execute("PRAGMA foreign_keys = OFF")
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for row in dependents:
+                if row["type"] == "view":
+                    conn.execute(f'DROP VIEW IF EXISTS "{row["name"]}"')
+            conn.execute("DROP TABLE IF EXISTS UnitReadings_typed")
+            conn.execute(_typed_readings_ddl("UnitReadings_typed"))
+            copied = conn.execute(
+                f"INSERT INTO UnitReadings_typed ({', '.join(target_cols)}) "
+                f"SELECT {', '.join(select_exprs)} FROM UnitReadings"
+            ).rowcount
+            conn.execute("DROP TABLE UnitReadings")
+            conn.execute("ALTER TABLE UnitReadings_typed RENAME TO UnitReadings")
+            for row in dependents:
+                conn.execute(row["sql"])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute("PRAGMA foreign_keys = ON")
+
+        non_numeric = {}
+        for col in NUMERIC_COLUMNS:
+            n = conn.execute(
+                f"SELECT COUNT(*) FROM UnitReadings WHERE typeof({col}) = 'text'"
+            ).fetchone()[0]
+            if n:
+                non_numeric[col] = n
+        bytes_after = _used_bytes(conn)
+    finally:
+        conn.close()
+
+    ensure_latest_reading_table()
+    ensure_readings_text_view()
+    return {
+        "migrated": True,
+        "rows": copied,
+        "non_numeric": non_numeric,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def query_readings(
+    filters: Optional[List[Tuple[str, str, float]]] = None,
+    unit_id: Optional[int] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    limit: int = 1000,
+) -> List[Dict[str, Any]]:
+    """
+    Readings matching numeric range filters, evaluated in SQL.
+
+        query_readings([("supply_temp", "<", 32)], since="2026-01-01 00:00:00")
+
+    Filter columns must be numeric metric columns and operators one of
+    < <= > >= = != (both are whitelisted, values are bound parameters).
+    """
+    where: List[str] = []
+    params: List[Any] = []
+    for col, op, value in filters or []:
+        if col not in NUMERIC_COLUMNS:
+            raise ValueError(f"Not a numeric reading column: {col}")
+        if op not in _RANGE_OPS:
+            raise ValueError(f"Unsupported operator: {op}")
+        where.append(f"{col} {op} ?")
+        params.append(value)
+    if unit_id is not None:
+        where.append("unit_id = ?")
+        params.append(unit_id)
+    if since:
+        where.append("ts >= ?")
+        params.append(since)
+    if until:
+        where.append("ts < ?")
+        params.append(until)
+
+    if columns:
+        unknown = [c for c in columns if c not in READING_COLUMNS and c != "reading_id"]
+        if unknown:
+            raise ValueError(f"Unknown reading column(s): {', '.join(unknown)}")
+        select = ", ".join(columns)
+    else:
+        select = "*"
+    where_clause = f"WHERE {' AND '.join(where)}" if where else ""
+
+    conn = get_conn()
+    try:
+        rows = conn.execute(
+            f"SELECT {select} FROM UnitReadings {where_clause} ORDER BY ts DESC LIMIT ?",
+            (*params, int(limit)),
+        ).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
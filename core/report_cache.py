@@ -0,0 +1,300 @@
+"""
+Report Cache
+Memoized results of the heavy reports in core/reports_repo, so opening a
+report panel and then exporting it to PDF runs the aggregation once.
+
+    @cached_report("customer_summary", tables=("Customers", "PropertyLocations", "Units", "ServiceCalls"))
+    def get_customer_summary_report(customer_id=None): ...
+
+An entry is keyed by report name + arguments and lives until the first of:
+
+  - its TTL runs out (REPORT_TTLS, else REPORT_CACHE_TTL) - reports whose
+    numbers depend on the clock ("last 30 days") or on tables that are not
+    tracked (Logins) are never staler than that
+  - any table it depends on is written: triggers (schema/report_cache.sql)
+    bump that table's row in ReportTableVersions on every insert, update or
+    delete, from any process. The versions are read (one small query)
+    before each lookup and stored with the entry; a mismatch is a miss.
+
+Two tiers like core/pdf_cache: memory (per process) and disk
+(REPORT_CACHE_DIR, pickles shared by the app and its PDF workers - the
+export job then reuses the result the page just showed). Until
+ensure_report_cache_tables() has run there are no versions to check, and
+reports bypass the cache. Results are handed out as deep copies.
+"""
+import copy
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, TypeVar
+
+from core import db
+
+REPORT_CACHE_SQL = Path(__file__).parent.parent / "schema" / "report_cache.sql"
+
+CACHE_DIR = Path(os.getenv("REPORT_CACHE_DIR", str(db.BASE_DIR / "data" / "report_cache")))
+DEFAULT_TTL = float(os.getenv("REPORT_CACHE_TTL", "300"))               # seconds; 0 disables the cache
+MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "256"))         # memory tier, least recently used go first
+DISK_MB = float(os.getenv("REPORT_CACHE_DISK_MB", "64"))                # 0 disables the disk tier
+
+# Per-report TTL overrides (seconds)
+REPORT_TTLS: Dict[str, float] = {
+    "system_overview": 60,          # dashboard counters, "last 7 days"
+    "ticket_resolution": 120,
+    "open_tickets_summary": 60,
+}
+
+# Tables with version triggers; a report may only depend on these
+TRACKED_TABLES = ("Customers", "PropertyLocations", "Units", "ServiceCalls")
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def ensure_report_cache_tables() -> None:
+    """Create ReportTableVersions and its triggers (idempotent)."""
+    with db.get_conn() as conn:
+        conn.executescript(REPORT_CACHE_SQL.read_text(encoding="utf-8"))
+
+
+def _read_versions() -> Optional[Dict[str, int]]:
+    """Current ReportTableVersions, or None when the table does not exist."""
+    conn = db.get_conn()
+    try:
+        return {r[0]: r[1] for r in conn.execute("SELECT table_name, version FROM ReportTableVersions")}
+    except Exception:
+        return None
+    finally:
+        conn.close()
+
+
+class ReportCache:
+    """Memory + disk LRU of report results by (database, report, arguments), checked against table versions."""
+
+    def __init__(self, directory: Path = CACHE_DIR, max_entries: int = MAX_ENTRIES,
+                 disk_bytes: int = int(DISK_MB * 1024 * 1024), default_ttl: float = DEFAULT_TTL,
+                 ttls: Optional[Dict[str, float]] = None):
+        self.directory = Path(directory)
+        self.max_entries = max(0, int(max_entries))
+        self.disk_bytes = max(0, int(disk_bytes))
+        self.default_ttl = default_ttl
+        self.ttls = dict(REPORT_TTLS if ttls is None else ttls)
+        self._lock = threading.Lock()
+        # key -> (value, expires_at wall clock, table versions)
+        self._memory: "OrderedDict[str, Tuple[Any, float, Tuple[int, ...]]]" = OrderedDict()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "invalidated": 0,
+                       "bypassed": 0, "evicted": 0}
+        self._by_report: Dict[str, Dict[str, int]] = {}
+
+    def ttl(self, report: str) -> float:
+        return self.ttls.get(report, self.default_ttl)
+
+    def get_or_run(self, report: str, tables: Sequence[str], args: Tuple[Any, ...],
+                   run: Callable[[], Any]) -> Any:
+        """The cached result of `report` for `args`, or run() it and remember the result."""
+        ttl = self.ttl(report)
+        versions = _read_versions() if ttl > 0 else None
+        if versions is None:
+            with self._lock:
+                self._count(report, "bypassed")
+            return run()
+
+        key = self._key(report, args)
+        deps = tuple(versions.get(t, -1) for t in tables)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        if entry is None:
+            entry = self._read(key)
+            source = "disk_hits"
+        else:
+            source = "hits"
+
+        if entry is not None:
+            value, expires, seen = entry
+            if seen != deps or now >= expires:
+                self._drop(key)
+                with self._lock:
+                    self._count(report, "invalidated" if seen != deps else "expired")
+            else:
+                with self._lock:
+                    if source == "disk_hits":
+                        self._remember(key, entry)
+                        self._stats["disk_hits"] += 1
+                    self._count(report, "hits")
+                return copy.deepcopy(value)
+        with self._lock:
+            self._count(report, "misses")
+
+        value = run()
+        entry = (value, now + ttl, deps)
+        with self._lock:
+            self._remember(key, entry)
+        self._write(key, entry)
+        return copy.deepcopy(value)
+
+    def clear(self, report: Optional[str] = None) -> int:
+        """Drop every entry (or those of one report) from both tiers; returns how many."""
+        prefix = "" if report is None else f"{report}-"
+        with self._lock:
+            keys = [k for k in self._memory if k.startswith(prefix)]
+            for key in keys:
+                del self._memory[key]
+        dropped = len(keys)
+        if self.directory.is_dir():
+            for path in self.directory.glob(f"{prefix}*.pickle"):
+                try:
+                    path.unlink()
+                    dropped += 1
+                except OSError:
+                    pass
+        return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._stats)
+            out["memory_entries"] = len(self._memory)
+            out["reports"] = {name: dict(counts) for name, counts in self._by_report.items()}
+        lookups = out["hits"] + out["misses"]
+        out["hit_rate"] = round(out["hits"] / lookups, 3) if lookups else None
+        out["disk_limit"] = self.disk_bytes
+        return out
+
+    # ---------------------------------------------------------
+    # Internals
+    # ---------------------------------------------------------
+
+    @staticmethod
+    def _key(report: str, args: Tuple[Any, ...]) -> str:
+        payload = json.dumps([str(db.DB_PATH), args], sort_keys=True, default=str, separators=(",", ":"))
+        return f"{report}-{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    def _count(self, report: str, what: str) -> None:
+        """Caller holds the lock. "expired"/"invalidated" are followed by a miss; hits + misses is every cached lookup"""
+        self._stats[what] += 1
+        counts = self._by_report.setdefault(report, {"hits": 0, "misses": 0})
+        if what in counts:
+            counts[what] += 1
+
+    def _remember(self, key: str, entry: Tuple[Any, float, Tuple[int, ...]]) -> None:
+        """Add to the memory tier, evicting least recently used (caller holds the lock)."""
+        if not self.max_entries:
+            return
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evicted"] += 1
+
+    def _drop(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+        try:
+            (self.directory / f"{key}.pickle").unlink()
+        except OSError:
+            pass
+
+    def _read(self, key: str) -> Optional[Tuple[Any, float, Tuple[int, ...]]]:
+        if not self.disk_bytes:
+            return None
+        path = self.directory / f"{key}.pickle"
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+            os.utime(path)   # mtime = last use
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        return entry
+
+    def _write(self, key: str, entry: Tuple[Any, float, Tuple[int, ...]]) -> None:
+        if not self.disk_bytes:
+            return
+        try:
+            data = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+            if len(data) > self.disk_bytes:
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self.directory / f".{key}.{uuid.uuid4().hex}.tmp"
+            tmp.write_bytes(data)
+            os.replace(tmp, self.directory / f"{key}.pickle")
+            self._trim_disk()
+        except OSError as e:
+            print(f"Report cache write failed: {e}")
+
+    def _trim_disk(self) -> None:
+        """Delete least recently used files until the directory fits disk_bytes."""
+        entries = []
+        for path in self.directory.glob("*.pickle"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.disk_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._stats["evicted"] += evicted
+
+
+_cache: Optional[ReportCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_report_cache() -> ReportCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ReportCache()
+    return _cache
+
+
+def reset_report_cache() -> None:
+    """Forget the shared cache object (tests); files on disk are kept."""
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def cached_report(report: str, tables: Sequence[str]) -> Callable[[F], F]:
+    """Memoize a reports_repo function under `report`; `tables` are the tables its queries read."""
+    unknown = set(tables) - set(TRACKED_TABLES)
+    if unknown:
+        raise ValueError(f"{report}: no version triggers for {sorted(unknown)}")
+    tables = tuple(tables)
+
+    def decorate(func: F) -> F:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()   # f(5) and f(customer_id=5) share an entry
+            key = tuple(bound.arguments.items())
+            return get_report_cache().get_or_run(report, tables, key, lambda: func(*args, **kwargs))
+        wrapper.uncached = func
+        return wrapper
+
+    return decorate
+
+
+def get_report_cache_stats() -> Dict[str, Any]:
+    return get_report_cache().stats()
@@ -3,19 +3,23 @@ Report PDF Generator
 Generates PDF exports for various report types
 """
 
-from typing import List, Dict, Any, Tuple, Optional
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
+from io import BytesIO
 from reportlab.lib.pagesizes import letter, landscape
 from reportlab.lib.units import inch
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
 from pathlib import Path
-from core.pdf_layout import create_pdf_header, create_pdf_footer, build_report_table, draw_table_paged
+from core.pdf_layout import create_pdf_header, create_pdf_footer, build_report_table, StreamingTable
 from core.settings_repo import get_report_settings
 
+KEEP_COPY = os.getenv("REPORT_PDF_KEEP_COPY") == "1"   # also write each rendered report into the reports directory
+
 
 def get_pdf_dir() -> Path:
-    """Get or create reports PDF directory from settings"""
+    """Reports PDF directory from settings (created when a copy is kept)"""
     # Try to get settings, fall back to default if table doesn't exist yet
     try:
         settings = get_report_settings()
@@ -33,68 +37,80 @@ def get_pdf_dir() -> Path:
         path_str = "reports/pdfs"
     
     # If relative path, make it relative to project root
-    pdf_dir = Path(path_str) if Path(path_str).is_absolute() else Path(__file__).parent.parent / path_str
-    pdf_dir.mkdir(parents=True, exist_ok=True)
-    return pdf_dir
-
+    return Path(path_str) if Path(path_str).is_absolute() else Path(__file__).parent.parent / path_str
 
 
+def _finish_pdf(filepath: Path, buffer: BytesIO) -> Tuple[str, bytes]:
+    """
+    Bytes of a PDF rendered into memory. With REPORT_PDF_KEEP_COPY=1 a copy
+    is also written to the reports directory (never read back).
+    """
+    pdf_bytes = buffer.getvalue()
+    if KEEP_COPY:
+        try:
+            filepath.parent.mkdir(parents=True, exist_ok=True)
+            filepath.write_bytes(pdf_bytes)
+        except OSError as e:
+            from core.logger import log_error
+            log_error(f"Could not keep a copy of {filepath.name}: {e}", "report_document")
+    return str(filepath), pdf_bytes
 
 
 # ============================================
 # EQUIPMENT INVENTORY PDF
 # ============================================
 
-def generate_equipment_inventory_pdf(data: List[Dict[str, Any]], customer_id: Optional[int] = None) -> Tuple[str, bytes]:
-    """Generate Equipment Inventory Report PDF - Crew-Friendly Format"""
+def _inventory_cells(row: Dict[str, Any]) -> List[str]:
+    """One equipment inventory table row (crew-focused columns)."""
+    # Build full location string with proper trimming
+    location_parts = []
+    if row.get("location_address"):
+        location_parts.append(str(row["location_address"]).strip())
+    if row.get("location_city"):
+        location_parts.append(str(row["location_city"]).strip())
+    if row.get("location_state"):
+        location_parts.append(str(row["location_state"]).strip())
+    full_location = ", ".join(filter(None, location_parts))
+    
+    # Trim all fields properly
+    return [
+        (row.get("customer_name") or "N/A").strip(),
+        full_location,
+        (row.get("unit_tag") or f"Unit {row.get('unit_id', '')}").strip(),
+        (row.get("make") or "—").strip(),
+        (row.get("model") or "—").strip(),
+        (row.get("serial") or "—").strip(),
+        (row.get("inst_date") or "—").strip(),
+    ]
+
+
+def generate_equipment_inventory_pdf(data: Iterable[Dict[str, Any]], customer_id: Optional[int] = None,
+                                     total: Optional[int] = None) -> Tuple[str, bytes]:
+    """
+    Generate Equipment Inventory Report PDF - Crew-Friendly Format
     
+    `data` may be a list or a row iterator (reports_repo.iter_equipment_inventory);
+    rows are drawn as they arrive, one page at a time. Pass `total` (the row
+    count for the subtitle) when `data` is an iterator.
+    """
     filename = f"equipment_inventory_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
     filepath = get_pdf_dir() / filename
+    if total is None:
+        data = list(data)
+        total = len(data)
     
-    c = canvas.Canvas(str(filepath), pagesize=landscape(letter))
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=landscape(letter), pageCompression=1)
     width, height = landscape(letter)
     
     # Calculate usable dimensions
     usable_width = width - 0.5 * inch  # 0.25" left + 0.25" right
-    header_height = 1.8 * inch  # Header + subtitle space
     footer_space = 0.4 * inch  # Space for page number
     bottom_margin = 0.2 * inch
-    available_height_per_page = height - header_height - footer_space - bottom_margin
     
     # Table headers - crew-focused columns (Make and Model separate)
     headers = ["Customer", "Location Address", "Unit Tag", "Make", "Model", "Serial Number", "Install Date"]
     
-    # Prepare table data with full location info
-    table_data = [headers]
-    for row in data:
-        # Build full location string with proper trimming
-        location_parts = []
-        if row.get("location_address"):
-            location_parts.append(str(row["location_address"]).strip())
-        if row.get("location_city"):
-            location_parts.append(str(row["location_city"]).strip())
-        if row.get("location_state"):
-            location_parts.append(str(row["location_state"]).strip())
-        full_location = ", ".join(filter(None, location_parts))
-        
-        # Trim all fields properly
-        customer_name = (row.get("customer_name") or "N/A").strip()
-        unit_tag = (row.get("unit_tag") or f"Unit {row.get('unit_id', '')}").strip()
-        make = (row.get("make") or "—").strip()
-        model = (row.get("model") or "—").strip()
-        serial = (row.get("serial") or "—").strip()
-        inst_date = (row.get("inst_date") or "—").strip()
-        
-        table_data.append([
-            customer_name,
-            full_location,
-            unit_tag,
-            make,
-            model,
-            serial,
-            inst_date,
-        ])
-    
     # Create table with adjusted column widths (7 columns now)
     col_widths = [1.5*inch, 2.5*inch, 1.0*inch, 1.2*inch, 1.2*inch, 1.3*inch, 0.9*inch]
     
@@ -103,62 +119,49 @@ def generate_equipment_inventory_pdf(data: List[Dict[str, Any]], customer_id: Op
     if total_width > usable_width:
         raise ValueError(f"Table width {total_width/inch:.2f}\" exceeds usable width {usable_width/inch:.2f}\"")
     
-    # Split data into pages
-    rows_per_page = max(5, int(available_height_per_page / (0.2 * inch)))
-    header_row = table_data[0]
-    data_rows = table_data[1:]
-    
+    table = StreamingTable(
+        headers,
+        col_widths,
+        header_font_size=9,
+        body_font_size=8,
+        header_bg=colors.HexColor('#1a1a1a'),
+        header_text=colors.white,
+        grid_width=0.75,
+        row_backgrounds=(colors.white, colors.HexColor('#f0f0f0')),
+    )
     page_num = 1
-    row_idx = 0
     
-    while row_idx < len(data_rows):
-        # Draw header
-        y = create_pdf_header(c, "Equipment Inventory - Crew Guide", f"{len(data_rows)} Units", max_width=6.5)
-        
-        # Add subtitle
+    def page_top() -> float:
+        y = create_pdf_header(c, "Equipment Inventory - Crew Guide", f"{total} Units", max_width=6.5)
         c.setFont("Helvetica-Bold", 10)
         c.drawString(0.25 * inch, y, "Customer → Location → Equipment Details")
-        y -= 0.3 * inch
-        
-        # On first page, subtract 2 rows for footer space; on subsequent pages use full rows_per_page
-        rows_for_this_page = rows_per_page - 2 if page_num == 1 else rows_per_page
-        rows_to_draw = data_rows[row_idx:row_idx + rows_for_this_page]
-        
-        if rows_to_draw:
-            page_table = build_report_table(
-                header_row,
-                rows_to_draw,
-                col_widths,
-                header_font_size=9,
-                body_font_size=8,
-                header_bg=colors.HexColor('#1a1a1a'),
-                header_text=colors.white,
-                grid_width=0.75,
-                row_backgrounds=(colors.white, colors.HexColor('#f0f0f0')),
-                align_left_until=6,
-            )
-            
-            table_w, table_h = page_table.wrapOn(c, usable_width, available_height_per_page)
-            page_table.drawOn(c, 0.25 * inch, y - table_h)
-            
-            # Draw page number at bottom right only
-            c.setFont("Helvetica", 8)
-            c.setFillColorRGB(0.4, 0.4, 0.4)
-            c.drawRightString(width - 0.25 * inch, 0.3 * inch, f"Page {page_num}")
-        
-        row_idx += rows_for_this_page
-        
-        # If more rows to draw, create new page
-        if row_idx < len(data_rows):
-            c.showPage()
-            page_num += 1
+        return y - 0.3 * inch
+    
+    def page_number() -> None:
+        # Draw page number at bottom right only
+        c.setFont("Helvetica", 8)
+        c.setFillColorRGB(0.4, 0.4, 0.4)
+        c.drawRightString(width - 0.25 * inch, 0.3 * inch, f"Page {page_num}")
+    
+    def next_page() -> float:
+        nonlocal page_num
+        page_number()
+        c.showPage()
+        page_num += 1
+        return page_top()
+    
+    table.draw(
+        c,
+        (_inventory_cells(row) for row in data),
+        x=0.25 * inch,
+        y=page_top(),
+        bottom_margin=footer_space + bottom_margin,
+        new_page=next_page,
+    )
+    page_number()
     
     c.save()
-    
-    with open(filepath, "rb") as f:
-        pdf_bytes = f.read()
-    
-    return str(filepath), pdf_bytes
+    return _finish_pdf(filepath, buffer)
 
 
 # ============================================
@@ -171,7 +174,8 @@ def generate_equipment_age_pdf(data: List[Dict[str, Any]]) -> Tuple[str, bytes]:
     filename = f"equipment_age_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
     filepath = get_pdf_dir() / filename
     
-    c = canvas.Canvas(str(filepath), pagesize=letter)
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
     width, height = letter
     
     # Calculate usable width (page width - margins)
@@ -242,11 +246,7 @@ def generate_equipment_age_pdf(data: List[Dict[str, Any]]) -> Tuple[str, bytes]:
     
     create_pdf_footer(c, page_num)
     c.save()
-    
-    with open(filepath, "rb") as f:
-        pdf_bytes = f.read()
-    
-    return str(filepath), pdf_bytes
+    return _finish_pdf(filepath, buffer)
 
 
 # ============================================
@@ -259,7 +259,8 @@ def generate_tickets_report_pdf(data: List[Dict[str, Any]], status: Optional[str
     filename = f"tickets_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
     filepath = get_pdf_dir() / filename
     
-    c = canvas.Canvas(str(filepath), pagesize=landscape(letter))
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=landscape(letter))
     width, height = landscape(letter)
     
     # Calculate usable width (page width - margins)
@@ -323,11 +324,7 @@ def generate_tickets_report_pdf(data: List[Dict[str, Any]], status: Optional[str
     
     create_pdf_footer(c, page_num)
     c.save()
-    
-    with open(filepath, "rb") as f:
-        pdf_bytes = f.read()
-    
-    return str(filepath), pdf_bytes
+    return _finish_pdf(filepath, buffer)
 
 
 # ============================================
@@ -340,7 +337,8 @@ def generate_open_tickets_pdf(data: List[Dict[str, Any]]) -> Tuple[str, bytes]:
     filename = f"open_tickets_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
     filepath = get_pdf_dir() / filename
     
-    c = canvas.Canvas(str(filepath), pagesize=landscape(letter))
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=landscape(letter))
     width, height = landscape(letter)
     
     # Calculate usable width (page width - margins)
@@ -388,11 +386,7 @@ def generate_open_tickets_pdf(data: List[Dict[str, Any]]) -> Tuple[str, bytes]:
     
     create_pdf_footer(c, page_num)
     c.save()
-    
-    with open(filepath, "rb") as f:
-        pdf_bytes = f.read()
-    
-    return str(filepath), pdf_bytes
+    return _finish_pdf(filepath, buffer)
 
 
 # ============================================
@@ -405,7 +399,8 @@ def generate_customer_summary_pdf(data: List[Dict[str, Any]]) -> Tuple[str, byte
     filename = f"customer_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
     filepath = get_pdf_dir() / filename
     
-    c = canvas.Canvas(str(filepath), pagesize=landscape(letter))
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=landscape(letter))
     width, height = landscape(letter)
     
     # Calculate usable width (page width - margins)
@@ -454,11 +449,7 @@ def generate_customer_summary_pdf(data: List[Dict[str, Any]]) -> Tuple[str, byte
     
     create_pdf_footer(c, page_num)
     c.save()
-    
-    with open(filepath, "rb") as f:
-        pdf_bytes = f.read()
-    
-    return str(filepath), pdf_bytes
+    return _finish_pdf(filepath, buffer)
 
 
 # ============================================
@@ -471,7 +462,8 @@ def generate_location_inventory_pdf(data: List[Dict[str, Any]]) -> Tuple[str, by
     filename = f"location_inventory_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
     filepath = get_pdf_dir() / filename
     
-    c = canvas.Canvas(str(filepath), pagesize=landscape(letter))
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=landscape(letter))
     width, height = landscape(letter)
     
     # Calculate usable width (page width - margins)
@@ -521,11 +513,7 @@ def generate_location_inventory_pdf(data: List[Dict[str, Any]]) -> Tuple[str, by
     
     create_pdf_footer(c, page_num)
     c.save()
-    
-    with open(filepath, "rb") as f:
-        pdf_bytes = f.read()
-    
-    return str(filepath), pdf_bytes
+    return _finish_pdf(filepath, buffer)
 
 
 # ============================================
@@ -538,7 +526,8 @@ def generate_current_alerts_pdf(data: List[Dict[str, Any]]) -> Tuple[str, bytes]
     filename = f"current_alerts_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
     filepath = get_pdf_dir() / filename
     
-    c = canvas.Canvas(str(filepath), pagesize=landscape(letter))
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=landscape(letter))
     width, height = landscape(letter)
     
     # Calculate usable width (page width - margins)
@@ -587,40 +576,16 @@ def generate_current_alerts_pdf(data: List[Dict[str, Any]]) -> Tuple[str, bytes]
     
     create_pdf_footer(c, page_num)
     c.save()
-    
-    with open(filepath, "rb") as f:
-        pdf_bytes = f.read()
-    
-    return str(filepath), pdf_bytes
+    return _finish_pdf(filepath, buffer)
 
 
 # ============================================
 # HIERARCHICAL COMPANY REPORT PDF
 # ============================================
 
-def generate_hierarchical_company_pdf(data: Dict[str, Any]) -> Tuple[str, bytes]:
-    """
-    Generate Hierarchical Company Report PDF
-    Shows Company → Customers → Locations → Equipment structure
-    """
-    
-    filename = f"hierarchical_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-    filepath = get_pdf_dir() / filename
-    
-    c = canvas.Canvas(str(filepath), pagesize=landscape(letter))
-    width, height = landscape(letter)
-    
-    # Calculate usable dimensions
-    usable_width = width - 0.5 * inch  # 0.25" left + 0.25" right
-    header_height = 1.6 * inch  # Approximate header size from create_pdf_header
-    footer_space = 0.4 * inch  # Space for page number + footer line
-    bottom_margin = 0.2 * inch  # Margin below footer
-    available_height_per_page = height - header_height - footer_space - bottom_margin
-    
-    # Build hierarchical table data
-    table_data = [["Customer", "Location", "Unit Tag", "Make", "Model", "Serial Number"]]
-    
-    for customer in data.get("customers", []):
+def _hierarchy_rows(customers: Iterable[Dict[str, Any]]) -> Iterator[List[str]]:
+    """Flatten customers → locations → equipment into table rows, one customer at a time."""
+    for customer in customers:
         customer_name = customer.get("company") or f"{customer.get('first_name', '')} {customer.get('last_name', '')}".strip() or "Unknown"
         
         for location in customer.get("locations", []):
@@ -640,13 +605,35 @@ def generate_hierarchical_company_pdf(data: Dict[str, Any]) -> Tuple[str, bytes]
                     make = (unit.get("make") or "").strip()
                     model = (unit.get("model") or "").strip()
                     serial = (unit.get("serial") or "—").strip()
-                    table_data.append([customer_name, location_display, unit_tag, make, model, serial])
+                    yield [customer_name, location_display, unit_tag, make, model, serial]
                 if len(equipment) > 20:
-                    table_data.append(["", location_display, f"({len(equipment) - 20} more units)", "", "", ""])
+                    yield ["", location_display, f"({len(equipment) - 20} more units)", "", "", ""]
             else:
-                table_data.append([customer_name, location_display, "(No equipment)", "", "", ""])
+                yield [customer_name, location_display, "(No equipment)", "", "", ""]
+
+
+def generate_hierarchical_company_pdf(data: Dict[str, Any]) -> Tuple[str, bytes]:
+    """
+    Generate Hierarchical Company Report PDF
+    Shows Company → Customers → Locations → Equipment structure
+    
+    data["customers"] may be a list or the customer iterator from
+    reports_repo.iter_hierarchical_company_report(); rows are drawn as
+    each customer arrives.
+    """
+    
+    filename = f"hierarchical_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    filepath = get_pdf_dir() / filename
+    
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=landscape(letter), pageCompression=1)
+    width, height = landscape(letter)
+    
+    # Calculate usable dimensions
+    usable_width = width - 0.5 * inch  # 0.25" left + 0.25" right
+    footer_space = 0.4 * inch  # Space for page number + footer line
+    bottom_margin = 0.2 * inch  # Margin below footer
     
-    # Build table
     col_widths = [2*inch, 2.2*inch, 1.2*inch, 1*inch, 1*inch, 1.3*inch]
     
     # Validate table fits usable width
@@ -654,49 +641,39 @@ def generate_hierarchical_company_pdf(data: Dict[str, Any]) -> Tuple[str, bytes]
     if total_width > usable_width:
         raise ValueError(f"Table width {total_width/inch:.2f}\" exceeds usable width {usable_width/inch:.2f}\"")
     
-    # Split data into pages - calculate exactly what fits
-    rows_per_page = max(5, int(available_height_per_page / (0.2 * inch)))  # Estimate ~0.2" per row
-    header_row = table_data[0]
-    data_rows = table_data[1:]
-    
+    table = StreamingTable(
+        ["Customer", "Location", "Unit Tag", "Make", "Model", "Serial Number"],
+        col_widths,
+        header_font_size=9,
+        body_font_size=7,
+    )
     page_num = 1
-    row_idx = 0
     
-    while row_idx < len(data_rows):
-        # Draw header
-        y = create_pdf_header(c, "Hierarchical Company Report", "Customer → Location → Equipment", max_width=6.5)
-        
-        # On first page, subtract 2 rows for footer space; on subsequent pages use full rows_per_page
-        rows_for_this_page = rows_per_page - 2 if page_num == 1 else rows_per_page
-        rows_to_draw = data_rows[row_idx:row_idx + rows_for_this_page]
-        
-        if rows_to_draw:
-            page_table = build_report_table(
-                header_row,
-                rows_to_draw,
-                col_widths,
-                header_font_size=9,
-                body_font_size=7,
-            )
-            
-            table_w, table_h = page_table.wrapOn(c, usable_width, available_height_per_page)
-            page_table.drawOn(c, 0.25 * inch, y - table_h)
-            
-            # Draw page number at bottom right
-            c.setFont("Helvetica", 8)
-            c.setFillColorRGB(0.4, 0.4, 0.4)
-            c.drawRightString(width - 0.25 * inch, 0.3 * inch, f"Page {page_num}")
-        
-        row_idx += rows_for_this_page
-        
-        # If more rows to draw, create new page
-        if row_idx < len(data_rows):
-            c.showPage()
-            page_num += 1
+    def page_top() -> float:
+        return create_pdf_header(c, "Hierarchical Company Report", "Customer → Location → Equipment", max_width=6.5)
+    
+    def page_number() -> None:
+        # Draw page number at bottom right
+        c.setFont("Helvetica", 8)
+        c.setFillColorRGB(0.4, 0.4, 0.4)
+        c.drawRightString(width - 0.25 * inch, 0.3 * inch, f"Page {page_num}")
+    
+    def next_page() -> float:
+        nonlocal page_num
+        page_number()
+        c.showPage()
+        page_num += 1
+        return page_top()
+    
+    table.draw(
+        c,
+        _hierarchy_rows(data.get("customers", [])),
+        x=0.25 * inch,
+        y=page_top(),
+        bottom_margin=footer_space + bottom_margin,
+        new_page=next_page,
+    )
+    page_number()
     
     c.save()
-    
-    with open(filepath, "rb") as f:
-        pdf_bytes = f.read()
-    
-    return str(filepath), pdf_bytes
+    return _finish_pdf(filepath, buffer)
@@ -3,9 +3,26 @@ Reports Repository - All Report Queries for GCC Monitoring System
 Generates various analytical reports based on system data
 """
 
-from typing import List, Dict, Any, Optional
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 from core.db import get_conn
+from core.report_cache import cached_report
+from core.telemetry_store import choose_tier, get_rollup_buckets
+
+REPORT_INDEXES_SQL = Path(__file__).resolve().parents[1] / "schema" / "report_indexes.sql"
+
+# Date predicates compare the stored ISO text with range bounds, never DATE(column),
+# so they are index range searches: created on day D or later is created >= 'D',
+# on day D or earlier is created < D + 1 day
+_CREATED_FROM_SQL = "sc.created >= DATE(?)"
+_CREATED_UNTIL_SQL = "sc.created < DATE(?, '+1 day')"
+
+
+def ensure_report_indexes() -> None:
+    """Create the indexes behind the report date ranges (idempotent)."""
+    with get_conn() as conn:
+        conn.executescript(REPORT_INDEXES_SQL.read_text(encoding="utf-8"))
 
 
 # ============================================
@@ -13,51 +30,126 @@ from core.db import get_conn
 # ============================================
 
 def get_company_profile() -> Dict[str, Any]:
+    """Get company profile information"""
+    from core.settings_repo import get_company_header
+    return dict(get_company_header())
+
+
+# Three queries walked in step: every level is ordered customer-first by the
+# same keys, so each customer's locations (and each location's units) come
+# off their cursors as one contiguous run right after the customer itself.
+_HIERARCHY_CUSTOMERS_SQL = """
+    SELECT
+        c.ID as customer_id,
+        c.company,
+        c.first_name,
+        c.last_name,
+        c.email,
+        c.phone1,
+        c.mobile,
+        c.address1,
+        c.city,
+        c.state,
+        c.zip,
+        c.website,
+        c.created
+    FROM Customers c
+    {where}
+    ORDER BY c.company, c.ID
+"""
+
+_HIERARCHY_LOCATIONS_SQL = """
+    SELECT
+        pl.customer_id,
+        pl.ID as location_id,
+        pl.address1,
+        pl.address2,
+        pl.city,
+        pl.state,
+        pl.zip,
+        pl.contact,
+        pl.job_phone
+    FROM PropertyLocations pl
+    JOIN Customers c ON c.ID = pl.customer_id
+    {where}
+    ORDER BY c.company, c.ID, pl.address1, pl.ID
+"""
+
+_HIERARCHY_UNITS_SQL = """
+    SELECT
+        pl.ID as location_id,
+        u.unit_id,
+        u.unit_tag,
+        u.make,
+        u.model,
+        u.serial,
+        u.inst_date
+    FROM Units u
+    JOIN PropertyLocations pl ON pl.ID = u.location_id
+    JOIN Customers c ON c.ID = pl.customer_id
+    {where}
+    ORDER BY c.company, c.ID, pl.address1, pl.ID, u.unit_tag, u.unit_id
+"""
+
+
+def _rows(cursor, batch_size: int) -> Iterator[Dict[str, Any]]:
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            return
+        for r in batch:
+            yield dict(r)
+
+
+def _take_run(rows: Iterator[Dict[str, Any]], pending: List[Optional[Dict[str, Any]]],
+              key: str, value: Any) -> List[Dict[str, Any]]:
+    """Pop the rows at the head of `rows` whose `key` equals `value`; pending[0] holds the one read ahead."""
+    run = []
+    while pending[0] is not None and pending[0][key] == value:
+        run.append(pending[0])
+        pending[0] = next(rows, None)
+    return run
+
+
+def iter_hierarchical_company_report(customer_id: Optional[int] = None,
+                                     batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
     """
-    Get company profile information
+    Customers of the hierarchical report, one at a time, each with its
+    "locations" (and their "equipment") attached and counted.
+
+    Three ordered queries instead of one per customer and per location; the
+    tree is assembled in a single pass over the cursors, so only the current
+    customer's subtree is held in memory (PDF export of every customer).
     """
-    from core.db import get_conn
-    
-    default_profile = {
-        "company": "GCC TECHNOLOGY",
-        "address1": "123 Tech Street",
-        "address2": "",
-        "city": "Tech City",
-        "state": "TC",
-        "zip": "12345",
-        "phone": "(555) 123-4567",
-        "email": "support@gcc.com",
-        "service_email": "service@gcc.com",
-        "website": "www.gcc.com"
-    }
-    
+    where = "WHERE c.ID = ?" if customer_id else ""
+    params = [customer_id] if customer_id else []
+    conn = get_conn()
     try:
-        conn = get_conn()
-        # Try CompanyProfile first
-        row = conn.execute("SELECT * FROM CompanyProfile LIMIT 1").fetchone()
-        if not row:
-            # Fallback to CompanyInfo
-            row = conn.execute("SELECT * FROM CompanyInfo LIMIT 1").fetchone()
-        
-        if row:
-            row_dict = dict(row)
-            return {
-                "company": row_dict.get("company_name") or row_dict.get("name") or row_dict.get("company") or default_profile["company"],
-                "address1": row_dict.get("address1") or "",
-                "address2": row_dict.get("address2") or "",
-                "city": row_dict.get("city") or "",
-                "state": row_dict.get("state") or "",
-                "zip": row_dict.get("zip") or "",
-                "phone": row_dict.get("phone") or row_dict.get("fax") or default_profile["phone"],
-                "email": row_dict.get("email") or default_profile["email"],
-                "service_email": row_dict.get("service_email") or row_dict.get("email") or "",
-                "website": row_dict.get("website") or default_profile["website"],
-            }
+        customers = _rows(conn.execute(_HIERARCHY_CUSTOMERS_SQL.format(where=where), params), batch_size)
+        locations = _rows(conn.execute(_HIERARCHY_LOCATIONS_SQL.format(where=where), params), batch_size)
+        units = _rows(conn.execute(_HIERARCHY_UNITS_SQL.format(where=where), params), batch_size)
+        next_location = [next(locations, None)]
+        next_unit = [next(units, None)]
+
+        for cust in customers:
+            cust_locations = _take_run(locations, next_location, "customer_id", cust["customer_id"])
+            for loc in cust_locations:
+                del loc["customer_id"]
+                loc["equipment"] = _take_run(units, next_unit, "location_id", loc["location_id"])
+                for unit in loc["equipment"]:
+                    del unit["location_id"]
+                loc["equipment_count"] = len(loc["equipment"])
+            cust["location_count"] = len(cust_locations)
+            cust["equipment_count"] = sum(loc["equipment_count"] for loc in cust_locations)
+            cust["locations"] = cust_locations
+            yield cust
+    finally:
         conn.close()
-    except Exception:
-        pass
-    
-    return default_profile
+
+
+@cached_report("hierarchical_company", tables=("Customers", "PropertyLocations", "Units"))
+def _hierarchical_customers(customer_id: Optional[int]) -> List[Dict[str, Any]]:
+    return list(iter_hierarchical_company_report(customer_id))
 
 
 def get_hierarchical_company_report(customer_id: Optional[int] = None) -> Dict[str, Any]:
@@ -65,154 +157,104 @@ def get_hierarchical_company_report(customer_id: Optional[int] = None) -> Dict[s
     Hierarchical Company Report
     Structure: Company → Customers → Locations → Equipment
     Returns nested dictionary with full hierarchy
-    """
-    conn = get_conn()
-    try:
-        # Company Profile
-        company_profile = get_company_profile()
-        
-        # Customers
-        customer_filter = ""
-        params = []
-        if customer_id:
-            customer_filter = "WHERE c.ID = ?"
-            params.append(customer_id)
-        
-        customers_data = conn.execute(f"""
-            SELECT 
-                c.ID as customer_id,
-                c.company,
-                c.first_name,
-                c.last_name,
-                c.email,
-                c.phone1,
-                c.mobile,
-                c.address1,
-                c.city,
-                c.state,
-                c.zip,
-                c.website,
-                c.created,
-                COUNT(DISTINCT pl.ID) as location_count,
-                COUNT(DISTINCT u.unit_id) as equipment_count
-            FROM Customers c
-            LEFT JOIN PropertyLocations pl ON c.ID = pl.customer_id
-            LEFT JOIN Units u ON pl.ID = u.location_id
-            {customer_filter}
-            GROUP BY c.ID
-            ORDER BY c.company
-        """, params).fetchall()
-        
-        customers = []
-        for cust_row in customers_data:
-            cust = dict(cust_row)
-            cust_id = cust["customer_id"]
-            
-            # Get locations for this customer
-            locations_data = conn.execute("""
-                SELECT 
-                    pl.ID as location_id,
-                    pl.address1,
-                    pl.address2,
-                    pl.city,
-                    pl.state,
-                    pl.zip,
-                    pl.contact,
-                    pl.job_phone,
-                    COUNT(DISTINCT u.unit_id) as equipment_count
-                FROM PropertyLocations pl
-                LEFT JOIN Units u ON pl.ID = u.location_id
-                WHERE pl.customer_id = ?
-                GROUP BY pl.ID
-                ORDER BY pl.address1
-            """, (cust_id,)).fetchall()
-            
-            locations = []
-            for loc_row in locations_data:
-                loc = dict(loc_row)
-                loc_id = loc["location_id"]
-                
-                # Get equipment for this location
-                equipment_data = conn.execute("""
-                    SELECT 
-                        u.unit_id,
-                        u.unit_tag,
-                        u.make,
-                        u.model,
-                        u.serial,
-                        u.inst_date
-                    FROM Units u
-                    WHERE u.location_id = ?
-                    ORDER BY u.unit_tag
-                """, (loc_id,)).fetchall()
-                
-                loc["equipment"] = [dict(eq) for eq in equipment_data]
-                locations.append(loc)
-            
-            cust["locations"] = locations
-            customers.append(cust)
-        
-        return {
-            "company_profile": company_profile,
-            "customers": customers,
-            "total_customers": len(customers),
-            "total_locations": sum(len(c["locations"]) for c in customers),
-            "total_equipment": sum(len(loc["equipment"]) for c in customers for loc in c["locations"])
-        }
-    finally:
-        conn.close()
+    (iter_hierarchical_company_report() streams the customers instead)
+    """
+    customers = _hierarchical_customers(customer_id)
+    return {
+        "company_profile": get_company_profile(),
+        "customers": customers,
+        "total_customers": len(customers),
+        "total_locations": sum(c["location_count"] for c in customers),
+        "total_equipment": sum(c["equipment_count"] for c in customers),
+    }
 
 
 # ============================================
 # EQUIPMENT REPORTS
 # ============================================
 
+def _equipment_inventory_query(customer_id: Optional[int], location_id: Optional[int]) -> Tuple[str, List[Any]]:
+    filters = []
+    params: List[Any] = []
+    
+    if customer_id:
+        filters.append("c.ID = ?")
+        params.append(customer_id)
+    
+    if location_id:
+        filters.append("pl.ID = ?")
+        params.append(location_id)
+    
+    where_clause = f"WHERE {' AND '.join(filters)}" if filters else ""
+    
+    return f"""
+        SELECT 
+            c.ID as customer_id,
+            c.company as customer_name,
+            pl.ID as location_id,
+            pl.address1 as location_address,
+            pl.city as location_city,
+            pl.state as location_state,
+            u.unit_id,
+            u.unit_tag,
+            u.make,
+            u.model,
+            u.serial,
+            u.inst_date
+        FROM Units u
+        JOIN PropertyLocations pl ON u.location_id = pl.ID
+        JOIN Customers c ON pl.customer_id = c.ID
+        {where_clause}
+        ORDER BY c.company, pl.address1, u.unit_tag
+    """, params
+
+
+@cached_report("equipment_inventory", tables=("Customers", "PropertyLocations", "Units"))
 def get_equipment_inventory_report(customer_id: Optional[int] = None, location_id: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Equipment Inventory Report
     Lists all equipment with full specifications, organized by customer/location
     """
+    sql, params = _equipment_inventory_query(customer_id, location_id)
     conn = get_conn()
     try:
-        filters = []
-        params = []
-        
-        if customer_id:
-            filters.append("c.ID = ?")
-            params.append(customer_id)
-        
-        if location_id:
-            filters.append("pl.ID = ?")
-            params.append(location_id)
-        
-        where_clause = f"WHERE {' AND '.join(filters)}" if filters else ""
-        
-        rows = conn.execute(f"""
-            SELECT 
-                c.ID as customer_id,
-                c.company as customer_name,
-                pl.ID as location_id,
-                pl.address1 as location_address,
-                pl.city as location_city,
-                pl.state as location_state,
-                u.unit_id,
-                u.unit_tag,
-                u.make,
-                u.model,
-                u.serial,
-                u.inst_date
-            FROM Units u
-            JOIN PropertyLocations pl ON u.location_id = pl.ID
-            JOIN Customers c ON pl.customer_id = c.ID
-            {where_clause}
-            ORDER BY c.company, pl.address1, u.unit_tag
-        """, params).fetchall()
-        
-        return [dict(r) for r in rows]
+        return [dict(r) for r in conn.execute(sql, params).fetchall()]
+    finally:
+        conn.close()
+
+
+@cached_report("equipment_inventory_count", tables=("Customers", "PropertyLocations", "Units"))
+def count_equipment_inventory(customer_id: Optional[int] = None, location_id: Optional[int] = None) -> int:
+    """Row count of the equipment inventory report."""
+    sql, params = _equipment_inventory_query(customer_id, location_id)
+    conn = get_conn()
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM ({sql})", params).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def iter_equipment_inventory(customer_id: Optional[int] = None, location_id: Optional[int] = None,
+                             batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """
+    Equipment inventory rows streamed from the cursor (for PDF export of
+    very large inventories); only `batch_size` rows are held at a time.
+    """
+    sql, params = _equipment_inventory_query(customer_id, location_id)
+    conn = get_conn()
+    try:
+        cursor = conn.execute(sql, params)
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            for r in batch:
+                yield dict(r)
     finally:
         conn.close()
 
 
+@cached_report("equipment_by_age", tables=("Customers", "PropertyLocations", "Units"))
 def get_equipment_by_age_report() -> List[Dict[str, Any]]:
     """
     Equipment Age Report
@@ -247,6 +289,7 @@ def get_equipment_by_age_report() -> List[Dict[str, Any]]:
         conn.close()
 
 
+@cached_report("equipment_maintenance_history", tables=("Customers", "PropertyLocations", "Units", "ServiceCalls"))
 def get_equipment_maintenance_history(unit_id: Optional[int] = None, customer_id: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Equipment Maintenance History Report
@@ -302,6 +345,7 @@ def get_equipment_maintenance_history(unit_id: Optional[int] = None, customer_id
 # SERVICE TICKET REPORTS
 # ============================================
 
+@cached_report("tickets_by_status", tables=("Customers", "PropertyLocations", "Units", "ServiceCalls"))
 def get_tickets_by_status_report(status: Optional[str] = None, customer_id: Optional[int] = None, 
                                   start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Dict[str, Any]]:
     """
@@ -322,11 +366,11 @@ def get_tickets_by_status_report(status: Optional[str] = None, customer_id: Opti
             params.append(customer_id)
         
         if start_date:
-            filters.append("DATE(sc.created) >= DATE(?)")
+            filters.append(_CREATED_FROM_SQL)
             params.append(start_date)
         
         if end_date:
-            filters.append("DATE(sc.created) <= DATE(?)")
+            filters.append(_CREATED_UNTIL_SQL)
             params.append(end_date)
         
         where_clause = f"WHERE {' AND '.join(filters)}" if filters else ""
@@ -369,6 +413,7 @@ def get_tickets_by_status_report(status: Optional[str] = None, customer_id: Opti
         conn.close()
 
 
+@cached_report("ticket_resolution", tables=("Customers", "ServiceCalls"))
 def get_ticket_resolution_analysis(days: int = 30) -> Dict[str, Any]:
     """
     Ticket Resolution Time Analysis
@@ -388,7 +433,7 @@ def get_ticket_resolution_analysis(days: int = 30) -> Dict[str, Any]:
                     THEN (JULIANDAY(closed) - JULIANDAY(created)) * 24 
                 END) as avg_resolution_hours
             FROM ServiceCalls
-            WHERE DATE(created) >= DATE(?)
+            WHERE created >= ?
         """, (cutoff_date,)).fetchone()
         
         # By priority
@@ -401,7 +446,7 @@ def get_ticket_resolution_analysis(days: int = 30) -> Dict[str, Any]:
                     THEN (JULIANDAY(closed) - JULIANDAY(created)) * 24 
                 END) as avg_resolution_hours
             FROM ServiceCalls
-            WHERE DATE(created) >= DATE(?)
+            WHERE created >= ?
             GROUP BY priority
             ORDER BY 
                 CASE priority
@@ -423,8 +468,8 @@ def get_ticket_resolution_analysis(days: int = 30) -> Dict[str, Any]:
                 END) as avg_resolution_hours
             FROM ServiceCalls sc
             JOIN Customers c ON sc.customer_id = c.ID
-            WHERE DATE(sc.created) >= DATE(?)
-            GROUP BY sc.customer_id, c.company
+            WHERE sc.created >= ?
+            GROUP BY +sc.customer_id, c.company   -- unary +: keep the created range, don't walk customer_id order
             ORDER BY ticket_count DESC
             LIMIT 10
         """, (cutoff_date,)).fetchall()
@@ -439,6 +484,7 @@ def get_ticket_resolution_analysis(days: int = 30) -> Dict[str, Any]:
         conn.close()
 
 
+@cached_report("open_tickets_summary", tables=("Customers", "PropertyLocations", "Units", "ServiceCalls"))
 def get_open_tickets_summary() -> List[Dict[str, Any]]:
     """
     Open Tickets Summary
@@ -476,25 +522,34 @@ def get_open_tickets_summary() -> List[Dict[str, Any]]:
         conn.close()
 
 
+# Units at one location: an idx_units_location_id range count, correlated on pl.ID
+_LOCATION_UNIT_COUNT_SQL = "(SELECT COUNT(*) FROM Units u WHERE u.location_id = pl.ID)"
+
+
 # ============================================
 # CUSTOMER REPORTS
 # ============================================
 
+@cached_report("customer_summary", tables=("Customers", "PropertyLocations", "Units", "ServiceCalls"))
 def get_customer_summary_report(customer_id: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Customer Summary Report
     Overview of all customers with location/equipment counts and activity
+
+    Locations (with their units) and tickets are each counted in their own
+    grouped subquery and joined one row per customer, instead of joining all
+    three and undoing the locations × units × tickets product with
+    COUNT(DISTINCT).
     """
     conn = get_conn()
     try:
-        filters = []
-        params = []
-        
+        where_clause = loc_filter = ticket_filter = ""
+        params: List[Any] = []
         if customer_id:
-            filters.append("c.ID = ?")
-            params.append(customer_id)
-        
-        where_clause = f"WHERE {' AND '.join(filters)}" if filters else ""
+            loc_filter = "WHERE pl.customer_id = ?"
+            ticket_filter = "WHERE customer_id = ?"
+            where_clause = "WHERE c.ID = ?"
+            params = [customer_id, customer_id, customer_id]
         
         rows = conn.execute(f"""
             SELECT 
@@ -506,18 +561,33 @@ def get_customer_summary_report(customer_id: Optional[int] = None) -> List[Dict[
                 c.city,
                 c.state,
                 c.zip,
-                COUNT(DISTINCT pl.ID) as location_count,
-                COUNT(DISTINCT u.unit_id) as equipment_count,
-                COUNT(DISTINCT CASE WHEN sc.status IN ('Open', 'Pending', 'In Progress') THEN sc.ID END) as open_tickets,
-                COUNT(DISTINCT sc.ID) as total_tickets,
-                MAX(sc.created) as last_service_date
+                COALESCE(loc.location_count, 0) as location_count,
+                COALESCE(loc.equipment_count, 0) as equipment_count,
+                COALESCE(t.open_tickets, 0) as open_tickets,
+                COALESCE(t.total_tickets, 0) as total_tickets,
+                t.last_service_date
             FROM Customers c
-            LEFT JOIN PropertyLocations pl ON c.ID = pl.customer_id
-            LEFT JOIN Units u ON pl.ID = u.location_id
-            LEFT JOIN ServiceCalls sc ON c.ID = sc.customer_id
+            LEFT JOIN (
+                SELECT 
+                    pl.customer_id,
+                    COUNT(*) as location_count,
+                    SUM({_LOCATION_UNIT_COUNT_SQL}) as equipment_count
+                FROM PropertyLocations pl
+                {loc_filter}
+                GROUP BY pl.customer_id
+            ) loc ON loc.customer_id = c.ID
+            LEFT JOIN (
+                SELECT 
+                    customer_id,
+                    SUM(status IN ('Open', 'Pending', 'In Progress')) as open_tickets,
+                    COUNT(*) as total_tickets,
+                    MAX(created) as last_service_date
+                FROM ServiceCalls
+                {ticket_filter}
+                GROUP BY customer_id
+            ) t ON t.customer_id = c.ID
             {where_clause}
-            GROUP BY c.ID
-            ORDER BY c.company
+            ORDER BY c.company, c.ID
         """, params).fetchall()
         
         return [dict(r) for r in rows]
@@ -525,6 +595,7 @@ def get_customer_summary_report(customer_id: Optional[int] = None) -> List[Dict[
         conn.close()
 
 
+@cached_report("customer_activity", tables=("Customers", "PropertyLocations", "Units", "ServiceCalls"))
 def get_customer_activity_report(customer_id: int, days: int = 90) -> Dict[str, Any]:
     """
     Customer Activity Detail Report
@@ -540,14 +611,13 @@ def get_customer_activity_report(customer_id: int, days: int = 90) -> Dict[str,
         """, (customer_id,)).fetchone()
         
         # Locations
-        locations = conn.execute("""
+        locations = conn.execute(f"""
             SELECT 
                 pl.*,
-                COUNT(DISTINCT u.unit_id) as equipment_count
+                {_LOCATION_UNIT_COUNT_SQL} as equipment_count
             FROM PropertyLocations pl
-            LEFT JOIN Units u ON pl.ID = u.location_id
             WHERE pl.customer_id = ?
-            GROUP BY pl.ID
+            ORDER BY pl.ID
         """, (customer_id,)).fetchall()
         
         # Recent tickets
@@ -560,7 +630,7 @@ def get_customer_activity_report(customer_id: int, days: int = 90) -> Dict[str,
             LEFT JOIN PropertyLocations pl ON sc.location_id = pl.ID
             LEFT JOIN Units u ON sc.unit_id = u.unit_id
             WHERE sc.customer_id = ?
-                AND DATE(sc.created) >= DATE(?)
+                AND sc.created >= ?
             ORDER BY sc.created DESC
         """, (customer_id, cutoff_date)).fetchall()
         
@@ -577,6 +647,7 @@ def get_customer_activity_report(customer_id: int, days: int = 90) -> Dict[str,
 # LOCATION REPORTS
 # ============================================
 
+@cached_report("location_inventory", tables=("Customers", "PropertyLocations", "Units"))
 def get_location_inventory_report(location_id: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Location Inventory Report
@@ -605,13 +676,11 @@ def get_location_inventory_report(location_id: Optional[int] = None) -> List[Dic
                 pl.job_phone,
                 c.company as customer_name,
                 c.phone1 as customer_phone,
-                COUNT(DISTINCT u.unit_id) as equipment_count
+                {_LOCATION_UNIT_COUNT_SQL} as equipment_count
             FROM PropertyLocations pl
             JOIN Customers c ON pl.customer_id = c.ID
-            LEFT JOIN Units u ON pl.ID = u.location_id
             {where_clause}
-            GROUP BY pl.ID
-            ORDER BY c.company, pl.address1
+            ORDER BY c.company, pl.address1, pl.ID
         """, params).fetchall()
         
         return [dict(r) for r in rows]
@@ -626,46 +695,55 @@ def get_location_inventory_report(location_id: Optional[int] = None) -> List[Dic
 def get_alert_history_report(days: int = 30, unit_id: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Alert History Report
-    Historical alerts from unit readings
+    Alerts active at any point in the last `days` days, from the alert
+    lifecycle table (UnitAlerts) kept by core.unit_alerts as readings arrive.
     """
     conn = get_conn()
     try:
-        cutoff_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
-        
-        filters = ["DATE(ur.ts) >= DATE(?)"]
-        params = [cutoff_date]
-        
+        since = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+        unit_params: List[Any] = []
+        unit_filter = ""
         if unit_id:
-            filters.append("ur.unit_id = ?")
-            params.append(unit_id)
-        
-        where_clause = f"WHERE {' AND '.join(filters)}"
-        
+            unit_filter = "AND unit_id = ?"
+            unit_params.append(unit_id)
+        params = [*unit_params, since, *unit_params]
+
+        # Active (partial index ux_unit_alerts_active) + cleared in the window
+        # (idx_unit_alerts_cleared): two index reads, not a pass over the whole
+        # history. MATERIALIZED keeps the ORDER BY from being pushed into the
+        # branches, which would walk idx_unit_alerts_opened instead.
         rows = conn.execute(f"""
+            WITH hit AS MATERIALIZED (
+                SELECT alert_id FROM UnitAlerts WHERE status != 'cleared' {unit_filter}
+                UNION ALL
+                SELECT alert_id FROM UnitAlerts WHERE status = 'cleared' AND cleared_at >= ? {unit_filter}
+            )
             SELECT 
-                ur.reading_id,
-                ur.unit_id,
-                ur.ts as timestamp,
-                ur.mode,
-                ur.fault_code,
-                ur.alarm_status,
-                ur.alert_message,
-                ur.supply_temp,
-                ur.return_temp,
+                a.alert_id,
+                a.unit_id,
+                a.opened_at as timestamp,
+                a.code,
+                a.category,
+                a.severity,
+                a.status,
+                a.message as alert_message,
+                a.readings,
+                a.last_seen_at,
+                a.acked_at,
+                a.acked_by,
+                a.cleared_at,
+                a.clear_reason,
                 u.unit_tag,
                 u.make,
                 u.model,
                 pl.address1 as location_address,
                 c.company as customer_name
-            FROM UnitReadings ur
-            JOIN Units u ON ur.unit_id = u.unit_id
+            FROM hit
+            JOIN UnitAlerts a ON a.alert_id = hit.alert_id
+            JOIN Units u ON a.unit_id = u.unit_id
             JOIN PropertyLocations pl ON u.location_id = pl.ID
             JOIN Customers c ON pl.customer_id = c.ID
-            {where_clause}
-                AND (ur.fault_code IS NOT NULL 
-                     OR ur.alarm_status = 'Active'
-                     OR ur.mode = 'Fault')
-            ORDER BY ur.ts DESC
+            ORDER BY a.opened_at DESC
         """, params).fetchall()
         
         return [dict(r) for r in rows]
@@ -700,11 +778,9 @@ def get_current_alerts_report() -> List[Dict[str, Any]]:
             FROM Units u
             JOIN PropertyLocations pl ON u.location_id = pl.ID
             JOIN Customers c ON pl.customer_id = c.ID
-            LEFT JOIN UnitReadings ur ON u.unit_id = ur.unit_id
-            WHERE ur.reading_id IN (
-                SELECT MAX(reading_id) FROM UnitReadings GROUP BY unit_id
-            )
-            AND (u.status IN ('warning', 'error')
+            JOIN UnitLatestReading lr ON lr.unit_id = u.unit_id
+            JOIN UnitReadings ur ON ur.reading_id = lr.reading_id
+            WHERE (u.status IN ('warning', 'error')
                  OR ur.fault_code IS NOT NULL
                  OR ur.alarm_status = 'Active'
                  OR ur.mode = 'Fault')
@@ -725,11 +801,18 @@ def get_current_alerts_report() -> List[Dict[str, Any]]:
 def get_temperature_trend_report(unit_id: int, hours: int = 24) -> List[Dict[str, Any]]:
     """
     Temperature Trend Report
-    Temperature readings over time for specific unit
+    Temperature readings over time for specific unit. Windows long enough
+    for a roll-up tier return bucket averages instead of every reading.
     """
+    end = datetime.now()
+    start = end - timedelta(hours=hours)
+    tier = choose_tier(start, end)
+    if tier != "raw":
+        return _temperature_trend_from_rollups(unit_id, tier, start, end)
+
     conn = get_conn()
     try:
-        cutoff_time = (datetime.now() - timedelta(hours=hours)).strftime('%Y-%m-%d %H:%M:%S')
+        cutoff_time = start.strftime('%Y-%m-%d %H:%M:%S')
         
         rows = conn.execute("""
             SELECT 
@@ -758,10 +841,47 @@ def get_temperature_trend_report(unit_id: int, hours: int = 24) -> List[Dict[str
         conn.close()
 
 
+def _temperature_trend_from_rollups(unit_id: int, tier: str, start: datetime,
+                                    end: datetime) -> List[Dict[str, Any]]:
+    conn = get_conn()
+    try:
+        unit = conn.execute(
+            "SELECT unit_tag, make, model FROM Units WHERE unit_id = ?", (unit_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+    if unit is None:
+        return []
+
+    return [
+        {
+            "reading_id": None,
+            "timestamp": b["bucket"],
+            "supply_temp": b["supply_temp"],
+            "return_temp": b["return_temp"],
+            "indoor_temp": b["i_temp"],
+            "outdoor_temp": b["o_temp"],
+            "delta_t": b["delta_t"],
+            "cooling_setpoint": b["sp_1"],
+            "heating_setpoint": b["sp_2"],
+            "mode": None,
+            "unit_tag": unit["unit_tag"],
+            "make": unit["make"],
+            "model": unit["model"],
+            "supply_temp_min": b["supply_temp_min"],
+            "supply_temp_max": b["supply_temp_max"],
+            "readings": b["readings"],
+            "tier": tier,
+        }
+        for b in get_rollup_buckets(tier, start, end, unit_id=unit_id)
+    ]
+
+
 # ============================================
 # SUMMARY/DASHBOARD REPORTS
 # ============================================
 
+@cached_report("system_overview", tables=("Customers", "PropertyLocations", "Units", "ServiceCalls"))
 def get_system_overview_report() -> Dict[str, Any]:
     """
     System Overview Report
@@ -772,9 +892,8 @@ def get_system_overview_report() -> Dict[str, Any]:
         # Customer stats
         customer_stats = conn.execute("""
             SELECT 
-                COUNT(*) as total_customers,
-                COUNT(CASE WHEN created >= DATE('now', '-30 days') THEN 1 END) as new_customers_30d
-            FROM Customers
+                (SELECT COUNT(*) FROM Customers) as total_customers,
+                (SELECT COUNT(*) FROM Customers WHERE created >= DATE('now', '-30 days')) as new_customers_30d
         """).fetchone()
         
         # Location stats
@@ -792,15 +911,14 @@ def get_system_overview_report() -> Dict[str, Any]:
             FROM Units
         """).fetchone()
         
-        # Ticket stats
+        # Ticket stats: one index search per count instead of a pass over every ticket
         ticket_stats = conn.execute("""
             SELECT 
-                COUNT(*) as total_tickets,
-                COUNT(CASE WHEN status IN ('Open', 'Pending', 'In Progress') THEN 1 END) as open_tickets,
-                COUNT(CASE WHEN status = 'Closed' THEN 1 END) as closed_tickets,
-                COUNT(CASE WHEN DATE(created) >= DATE('now', '-7 days') THEN 1 END) as tickets_7d,
-                COUNT(CASE WHEN DATE(created) >= DATE('now', '-30 days') THEN 1 END) as tickets_30d
-            FROM ServiceCalls
+                (SELECT COUNT(*) FROM ServiceCalls) as total_tickets,
+                (SELECT COUNT(*) FROM ServiceCalls WHERE status IN ('Open', 'Pending', 'In Progress')) as open_tickets,
+                (SELECT COUNT(*) FROM ServiceCalls WHERE status = 'Closed') as closed_tickets,
+                (SELECT COUNT(*) FROM ServiceCalls WHERE created >= DATE('now', '-7 days')) as tickets_7d,
+                (SELECT COUNT(*) FROM ServiceCalls WHERE created >= DATE('now', '-30 days')) as tickets_30d
         """).fetchone()
         
         # Recent activity
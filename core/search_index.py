@@ -0,0 +1,339 @@
+"""
+Search Index
+FTS5 full-text index for customers, locations, units and service calls.
+
+Each source table gets an external-content FTS5 table (<Table>Search) that
+stores only the index, kept in sync by insert / update / delete triggers, so
+search is a ranked index lookup instead of OR-ing LIKE '%x%' over every
+column (a full table scan per keystroke).
+
+Queries are prefix searches: every word the user typed must match the start
+of a word in some indexed column ("acm main" finds "Acme Corp, 1 Main St").
+Results are ranked with bm25 using per-column weights (company / tag / title
+count more than notes). An all-digit search also matches the record ID.
+
+The indexed columns are whichever of the configured ones the table actually
+has (older databases differ); ensure_search_index() rebuilds an index when
+that set changes. When FTS5 is not available the repos fall back to LIKE.
+"""
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core.db import get_conn
+
+MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "500"))   # ranked hits returned per entity search
+
+TOKENIZE = "unicode61 remove_diacritics 2"
+PREFIX = "2 3"   # extra prefix indexes: 2 / 3 character prefixes resolve without a term scan
+
+# entity -> source table, rowid column, indexed columns (name, bm25 weight),
+# filter (alias t) restricting rows to one customer for scoped searches
+SEARCH_SOURCES: Dict[str, Dict[str, Any]] = {
+    "customers": {
+        "table": "Customers",
+        "key": "ID",
+        "columns": [
+            ("company", 10.0), ("first_name", 8.0), ("last_name", 8.0), ("email", 6.0),
+            ("phone1", 5.0), ("phone2", 4.0), ("mobile", 4.0), ("fax", 2.0),
+            ("extension1", 1.0), ("extension2", 1.0),
+            ("address1", 4.0), ("address2", 2.0), ("city", 3.0), ("state", 2.0), ("zip", 3.0),
+            ("website", 2.0), ("notes", 1.0), ("extended_notes", 1.0), ("idstring", 5.0),
+            ("csr", 1.0), ("referral", 1.0), ("credit_status", 1.0),
+        ],
+        "customer_scope": "t.ID = ?",
+    },
+    "locations": {
+        "table": "PropertyLocations",
+        "key": "ID",
+        "columns": [
+            ("business_name", 10.0), ("address1", 8.0), ("address2", 4.0), ("city", 4.0),
+            ("state", 2.0), ("zip", 4.0), ("contact", 6.0), ("job_phone", 4.0), ("job_phone2", 3.0),
+            ("notes", 1.0), ("extendednotes", 1.0), ("extended_notes", 1.0),
+        ],
+        "customer_scope": "t.customer_id = ?",
+    },
+    "units": {
+        "table": "Units",
+        "key": "unit_id",
+        "columns": [("unit_tag", 10.0), ("make", 4.0), ("model", 4.0), ("serial", 6.0)],
+        "customer_scope": "t.location_id IN (SELECT ID FROM PropertyLocations WHERE customer_id = ?)",
+    },
+    "service_calls": {
+        "table": "ServiceCalls",
+        "key": "ID",
+        "columns": [("title", 10.0), ("description", 3.0)],
+        "customer_scope": "t.customer_id = ?",
+    },
+}
+
+# Display fields for search_all(): title, subtitle, owning customer
+_GLOBAL_SQL = {
+    "customers": """
+        SELECT c.ID AS id,
+               COALESCE(NULLIF(c.company, ''),
+                        NULLIF(TRIM(COALESCE(c.first_name, '') || ' ' || COALESCE(c.last_name, '')), ''),
+                        c.email) AS title,
+               TRIM(COALESCE(c.city, '') || ' ' || COALESCE(c.state, '')) AS subtitle,
+               c.ID AS customer_id,
+               h.hit_rank AS rank
+        FROM ({hits}) h JOIN Customers c ON c.ID = h.hit_id
+    """,
+    "locations": """
+        SELECT p.ID AS id,
+               COALESCE(NULLIF(p.address1, ''), p.address2) AS title,
+               TRIM(COALESCE(p.city, '') || ' ' || COALESCE(p.state, '') || ' ' || COALESCE(p.zip, '')) AS subtitle,
+               p.customer_id AS customer_id,
+               h.hit_rank AS rank
+        FROM ({hits}) h JOIN PropertyLocations p ON p.ID = h.hit_id
+    """,
+    "units": """
+        SELECT u.unit_id AS id,
+               COALESCE(NULLIF(u.unit_tag, ''), CAST(u.unit_id AS TEXT)) AS title,
+               TRIM(COALESCE(u.make, '') || ' ' || COALESCE(u.model, '')) AS subtitle,
+               p.customer_id AS customer_id,
+               h.hit_rank AS rank
+        FROM ({hits}) h
+        JOIN Units u ON u.unit_id = h.hit_id
+        LEFT JOIN PropertyLocations p ON p.ID = u.location_id
+    """,
+    "service_calls": """
+        SELECT sc.ID AS id,
+               '#' || sc.ID || ' ' || COALESCE(sc.title, '') AS title,
+               COALESCE(sc.status, '') || ' · ' || COALESCE(sc.created, '') AS subtitle,
+               sc.customer_id AS customer_id,
+               h.hit_rank AS rank
+        FROM ({hits}) h JOIN ServiceCalls sc ON sc.ID = h.hit_id
+    """,
+}
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+_indexed: Dict[str, List[str]] = {}   # "<db path>:<entity>" -> indexed columns ([] = no index)
+_indexed_lock = threading.Lock()
+
+
+def _fts_table(entity: str) -> str:
+    return f"{SEARCH_SOURCES[entity]['table']}Search"
+
+
+def _columns(conn, table: str) -> List[str]:
+    return [r[1] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def _indexed_columns(conn, entity: str) -> List[Tuple[str, float]]:
+    present = set(_columns(conn, SEARCH_SOURCES[entity]["table"]))
+    return [(name, weight) for name, weight in SEARCH_SOURCES[entity]["columns"] if name in present]
+
+
+# =========================================================
+# SCHEMA
+# =========================================================
+
+def _create_sql(entity: str, columns: List[Tuple[str, float]]) -> str:
+    src = SEARCH_SOURCES[entity]
+    table, key, fts = src["table"], src["key"], _fts_table(entity)
+    names = [c for c, _ in columns]
+    cols = ", ".join(names)
+    new_vals = ", ".join(f"NEW.{c}" for c in names)
+    old_vals = ", ".join(f"OLD.{c}" for c in names)
+    trg = f"trg_{table.lower()}_search"
+    return f"""
+    CREATE VIRTUAL TABLE {fts} USING fts5(
+        {cols},
+        content='{table}', content_rowid='{key}',
+        tokenize='{TOKENIZE}', prefix='{PREFIX}'
+    );
+
+    CREATE TRIGGER {trg}_ins AFTER INSERT ON {table}
+    BEGIN
+      INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.{key}, {new_vals});
+    END;
+
+    CREATE TRIGGER {trg}_del AFTER DELETE ON {table}
+    BEGIN
+      INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', OLD.{key}, {old_vals});
+    END;
+
+    -- Only when an indexed column (or the key) changes; status / date updates don't touch the index
+    CREATE TRIGGER {trg}_upd AFTER UPDATE OF {key}, {cols} ON {table}
+    BEGIN
+      INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', OLD.{key}, {old_vals});
+      INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.{key}, {new_vals});
+    END;
+
+    INSERT INTO {fts} ({fts}) VALUES ('rebuild');
+    """
+
+
+def _drop_sql(entity: str) -> str:
+    trg = f"trg_{SEARCH_SOURCES[entity]['table'].lower()}_search"
+    return f"""
+    DROP TRIGGER IF EXISTS {trg}_ins;
+    DROP TRIGGER IF EXISTS {trg}_del;
+    DROP TRIGGER IF EXISTS {trg}_upd;
+    DROP TABLE IF EXISTS {_fts_table(entity)};
+    """
+
+
+def ensure_search_index() -> Dict[str, str]:
+    """
+    Create the FTS5 tables + triggers and index existing rows (idempotent).
+    An index whose columns no longer match the source table is rebuilt.
+    Returns entity -> 'created' / 'rebuilt' / 'ok' / 'missing table' / 'unavailable'.
+    """
+    result: Dict[str, str] = {}
+    conn = get_conn()
+    try:
+        for entity, src in SEARCH_SOURCES.items():
+            if not _columns(conn, src["table"]):
+                result[entity] = "missing table"
+                continue
+            wanted = _indexed_columns(conn, entity)
+            existing = _columns(conn, _fts_table(entity))
+            if existing == [c for c, _ in wanted]:
+                result[entity] = "ok"
+                continue
+            try:
+                conn.executescript(
+                    "BEGIN IMMEDIATE;" + _drop_sql(entity) + _create_sql(entity, wanted) + "COMMIT;"
+                )
+            except sqlite3.OperationalError as e:
+                if conn.in_transaction:
+                    conn.rollback()
+                if "fts5" not in str(e):
+                    raise
+                result[entity] = "unavailable"   # SQLite built without FTS5: repos keep using LIKE
+                continue
+            result[entity] = "rebuilt" if existing else "created"
+    finally:
+        conn.close()
+    reset_search_cache()
+    return result
+
+
+def rebuild_search_index() -> None:
+    """Re-index every row (after bulk imports that bypassed the triggers, e.g. a restored table)."""
+    with get_conn() as conn:
+        for entity in SEARCH_SOURCES:
+            if _columns(conn, _fts_table(entity)):
+                fts = _fts_table(entity)
+                conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+
+def reset_search_cache() -> None:
+    with _indexed_lock:
+        _indexed.clear()
+
+
+def _index_columns(conn, entity: str) -> List[str]:
+    """Columns of the entity's FTS table ([] when there is none), cached per database."""
+    from core import db
+    cache_key = f"{db.DB_PATH}:{entity}"
+    with _indexed_lock:
+        known = _indexed.get(cache_key)
+    if known is None:
+        known = _columns(conn, _fts_table(entity))
+        with _indexed_lock:
+            _indexed[cache_key] = known
+    return known
+
+
+# =========================================================
+# QUERIES
+# =========================================================
+
+def match_query(search: str) -> Optional[str]:
+    """
+    User text -> FTS5 MATCH expression: every word as a quoted prefix term
+    ("acme main" -> '"acme"* "main"*'). None when there is nothing to match.
+    Quoting keeps FTS5 operators / punctuation in user input literal.
+    """
+    words = _WORD.findall(search or "")
+    if not words:
+        return None
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def ranked_hits(entity: str, search: str, limit: Optional[int] = MAX_RESULTS,
+                where: Optional[str] = None, where_params: Sequence[Any] = (),
+                conn=None) -> Optional[Tuple[str, List[Any]]]:
+    """
+    SQL (hit_id, hit_rank) for the best matches of `search` and its params.
+    Join it to the source table and ORDER BY hit_rank (lower is better).
+
+    `where` filters the source rows (alias t, e.g. "t.customer_id = ?")
+    inside the match, so the planner can start from an indexed filter and
+    probe the index per row instead of ranking every match first. An
+    all-digit search also hits that record ID, ranked first.
+
+    Returns None when the index can't answer (no FTS5 / index not built / no
+    words in `search`): the caller falls back to its LIKE query.
+    """
+    query = match_query(search)
+    if query is None:
+        return None
+    if conn is None:
+        with get_conn() as c:
+            columns = _index_columns(c, entity)
+    else:
+        columns = _index_columns(conn, entity)
+    if not columns:
+        return None
+
+    src = SEARCH_SOURCES[entity]
+    fts, table, key = _fts_table(entity), src["table"], src["key"]
+    weights = dict(src["columns"])
+    bm25 = f"bm25({fts}, {', '.join(str(weights.get(c, 1.0)) for c in columns)})"
+    scope = f" AND ({where})" if where else ""
+
+    if where:
+        # CROSS JOIN keeps the filtered source rows as the outer loop: one index probe per row
+        sql = (
+            f"SELECT t.{key} AS hit_id, {bm25} AS hit_rank "
+            f"FROM {table} t CROSS JOIN {fts} ON {fts}.rowid = t.{key} "
+            f"WHERE {fts} MATCH ?{scope}"
+        )
+    else:
+        sql = f"SELECT rowid AS hit_id, {bm25} AS hit_rank FROM {fts} WHERE {fts} MATCH ?"
+    params: List[Any] = [query, *where_params]
+    term = search.strip()
+    if term.isdigit():
+        sql = (
+            f"SELECT hit_id, MIN(hit_rank) AS hit_rank FROM ("
+            f"SELECT t.{key} AS hit_id, -1e300 AS hit_rank FROM {table} t WHERE t.{key} = ?{scope} "
+            f"UNION ALL {sql}) GROUP BY hit_id"
+        )
+        params = [int(term), *where_params, *params]
+    if limit is not None:
+        sql += " ORDER BY hit_rank LIMIT ?"
+        params.append(int(limit))
+    return sql, params
+
+
+def search_all(search: str, limit: int = 20, customer_id: Optional[int] = None,
+               entities: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Global search across customers, locations, units and service calls.
+
+    Returns up to `limit` hits, best first:
+    {"entity", "id", "title", "subtitle", "customer_id", "rank"}.
+    customer_id restricts results to one customer's records (client logins).
+    Without FTS5 (or with nothing searchable typed) it returns [].
+    """
+    results: List[Dict[str, Any]] = []
+    with get_conn() as conn:
+        for entity in entities or list(SEARCH_SOURCES):
+            scope = SEARCH_SOURCES[entity]["customer_scope"] if customer_id else None
+            hits = ranked_hits(entity, search, limit, where=scope, where_params=[customer_id] if scope else [],
+                               conn=conn)
+            if hits is None:
+                continue
+            hits_sql, params = hits
+            sql = _GLOBAL_SQL[entity].format(hits=hits_sql) + " ORDER BY rank"
+            for row in conn.execute(sql, params).fetchall():
+                results.append({"entity": entity, **dict(row)})
+    results.sort(key=lambda r: r["rank"])
+    return results[:limit]
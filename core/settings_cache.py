@@ -0,0 +1,237 @@
+"""
+Settings Cache
+Process-wide cache for configuration that is read far more often than it
+changes: the company profile and PDF header, email, service call and
+telemetry retention settings, and the VERSION file. ui/layout.layout()
+alone used to re-read VERSION three times and the repos re-query their
+settings row on every page render and every PDF.
+
+    get_company_profile() -> cached_setting("company_profile", _load_company_profile)
+    update_company_profile(...) -> ... invalidate_settings("company_profile", ...)
+
+Entries are loaded on first use and handed out as deep copies, so a caller
+mutating its dict never changes what the next caller sees. They are
+dropped when:
+
+  - the process writes them: the update_* functions call invalidate_settings()
+  - another process does (the PDF workers, a utility script, the sqlite3
+    shell): at most every CHECK_INTERVAL seconds the cache reads
+    PRAGMA data_version on its own connection. That number moves on any
+    commit by another connection, telemetry included, so on a change the
+    cache also compares SettingsVersion.version - bumped by triggers on the
+    settings tables (ensure_settings_version()) - and the schema version,
+    and only drops database entries when one of those moved. Without the
+    SettingsVersion table every foreign commit drops them.
+  - a file entry's mtime changes (checked on the same schedule).
+"""
+import copy
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from core import db
+
+CHECK_INTERVAL = float(os.getenv("SETTINGS_CHECK_INTERVAL", "1.0"))   # seconds between change checks
+
+# Settings tables whose writes bump SettingsVersion (those that exist when ensure_settings_version() runs)
+SETTINGS_TABLES = (
+    "CompanyInfo", "CompanyProfile", "EmailSettings", "ServiceCallSettings", "ReportSettings",
+    "TelemetryRetentionSettings",
+)
+
+T = TypeVar("T")
+
+
+def ensure_settings_version() -> None:
+    """Create SettingsVersion and its triggers on the settings tables that exist (idempotent)."""
+    with db.get_conn() as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS SettingsVersion (
+                id       INTEGER PRIMARY KEY CHECK (id = 1),
+                version  INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("INSERT OR IGNORE INTO SettingsVersion (id, version) VALUES (1, 0)")
+        existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table in SETTINGS_TABLES:
+            if table not in existing:
+                continue
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_settings_version_{table.lower()}_{event.lower()}
+                    AFTER {event} ON {table}
+                    BEGIN
+                        UPDATE SettingsVersion SET version = version + 1 WHERE id = 1;
+                    END
+                """)
+
+
+class SettingsCache:
+    """Named settings entries, invalidated by name or by a change in the database / file."""
+
+    def __init__(self, check_interval: float = CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Any] = {}
+        self._files: Dict[str, Tuple[Path, Optional[int]]] = {}   # name -> (path, mtime_ns when loaded)
+        self._watch: Optional[sqlite3.Connection] = None
+        self._db_path: Optional[str] = None
+        self._data_version: Optional[int] = None
+        self._settings_version: Optional[Tuple[Any, ...]] = None
+        self._checked = 0.0
+        self._stats = {"hits": 0, "loads": 0, "invalidations": 0, "external_changes": 0}
+
+    def get(self, name: str, loader: Callable[[], T]) -> T:
+        """The cached value of `name`, loading it with `loader` when missing. Loader errors are not cached."""
+        with self._lock:
+            self._check()
+            if name in self._entries:
+                self._stats["hits"] += 1
+                return copy.deepcopy(self._entries[name])
+        value = loader()
+        with self._lock:
+            self._entries[name] = value
+            self._stats["loads"] += 1
+        return copy.deepcopy(value)
+
+    def get_file(self, name: str, path: Path, loader: Callable[[Path], T]) -> T:
+        """Like get(), for a value read from `path`; reloaded when the file's mtime changes."""
+        with self._lock:
+            self._check()
+            if name in self._entries and name in self._files:
+                self._stats["hits"] += 1
+                return copy.deepcopy(self._entries[name])
+        mtime = _mtime(path)
+        value = loader(path)
+        with self._lock:
+            self._entries[name] = value
+            self._files[name] = (path, mtime)
+            self._stats["loads"] += 1
+        return copy.deepcopy(value)
+
+    def invalidate(self, *names: str) -> None:
+        """Drop the named entries; no names drops everything."""
+        with self._lock:
+            for name in (names or list(self._entries)):
+                self._entries.pop(name, None)
+                self._files.pop(name, None)
+            self._stats["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["entries"] = sorted(self._entries)
+        out["check_interval"] = self.check_interval
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            watch, self._watch = self._watch, None
+            self._db_path = None
+        if watch is not None:
+            watch.close()
+
+    # ---------------------------------------------------------
+    # Change detection (caller holds the lock)
+    # ---------------------------------------------------------
+
+    def _check(self) -> None:
+        now = time.monotonic()
+        if now - self._checked < self.check_interval and str(db.DB_PATH) == self._db_path:
+            return
+        self._checked = now
+        try:
+            self._check_database()
+        except sqlite3.Error:
+            self._drop_database_entries()   # can't tell: reload from the source
+            self.close()
+        for name, (path, mtime) in list(self._files.items()):
+            if _mtime(path) != mtime:
+                self._entries.pop(name, None)
+                self._files.pop(name, None)
+
+    def _check_database(self) -> None:
+        path = str(db.DB_PATH)
+        if path != self._db_path:
+            # First use, or the app switched databases (tests): start over
+            if self._watch is not None:
+                self._watch.close()
+            self._watch = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+            self._db_path = path
+            self._data_version = self._watch.execute("PRAGMA data_version").fetchone()[0]
+            self._settings_version = self._read_settings_version()
+            self._drop_database_entries()
+            return
+
+        data_version = self._watch.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return
+        self._data_version = data_version
+        settings_version = self._read_settings_version()
+        if settings_version is None or settings_version != self._settings_version:
+            self._settings_version = settings_version
+            self._stats["external_changes"] += 1
+            self._drop_database_entries()
+
+    def _read_settings_version(self) -> Optional[Tuple[Any, ...]]:
+        """(schema version, SettingsVersion.version), or None without the SettingsVersion table."""
+        try:
+            return self._watch.execute(
+                "SELECT (SELECT schema_version FROM pragma_schema_version), "
+                "(SELECT version FROM SettingsVersion WHERE id = 1)"
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+
+    def _drop_database_entries(self) -> None:
+        for name in [n for n in self._entries if n not in self._files]:
+            del self._entries[name]
+
+
+def _mtime(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+_cache: Optional[SettingsCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_settings_cache() -> SettingsCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SettingsCache()
+    return _cache
+
+
+def reset_settings_cache() -> None:
+    """Forget every entry and the watch connection (tests, app shutdown)."""
+    global _cache
+    with _cache_lock:
+        cache, _cache = _cache, None
+    if cache is not None:
+        cache.close()
+
+
+def cached_setting(name: str, loader: Callable[[], T]) -> T:
+    return get_settings_cache().get(name, loader)
+
+
+def cached_file(name: str, path: Path, loader: Callable[[Path], T]) -> T:
+    return get_settings_cache().get_file(name, path, loader)
+
+
+def invalidate_settings(*names: str) -> None:
+    """Call after writing the settings behind `names` (see module docstring)."""
+    get_settings_cache().invalidate(*names)
+
+
+def get_settings_cache_stats() -> Dict[str, Any]:
+    return get_settings_cache().stats()
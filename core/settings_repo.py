@@ -1,8 +1,12 @@
 # core/settings_repo.py
 # Repository for managing all system settings and configuration
 
-from typing import Any, Dict, List, Optional
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TypedDict
 from core.db import get_conn
+from core.pdf_cache import forget_pdfs
+from core.settings_cache import cached_setting, invalidate_settings
 import json
 
 def _dicts(rows):
@@ -14,11 +18,85 @@ def _dicts(rows):
 # COMPANY PROFILE
 # ============================================
 
-def get_company_profile() -> Dict[str, Any]:
-    """Get company profile settings"""
-    with get_conn() as conn:
+class CompanyHeader(TypedDict):
+    """Company block printed at the top of reports and service orders."""
+    company: str
+    address1: str
+    address2: str
+    city: str
+    state: str
+    zip: str
+    phone: str
+    email: str
+    service_email: str
+    website: str
+
+
+DEFAULT_COMPANY_HEADER: CompanyHeader = {
+    "company": "GCC TECHNOLOGY",
+    "address1": "123 Tech Street",
+    "address2": "",
+    "city": "Tech City",
+    "state": "TC",
+    "zip": "12345",
+    "phone": "(555) 123-4567",
+    "email": "support@gcc.com",
+    "service_email": "service@gcc.com",
+    "website": "www.gcc.com",
+}
+
+
+def _load_company_profile() -> Dict[str, Any]:
+    conn = get_conn()
+    try:
         row = conn.execute("SELECT * FROM CompanyInfo WHERE id=1").fetchone()
         return dict(row) if row else {}
+    except Exception:
+        return {}   # CompanyInfo not created yet
+    finally:
+        conn.close()
+
+
+def get_company_profile() -> Dict[str, Any]:
+    """Get company profile settings (cached; {} until CompanyInfo exists)"""
+    return cached_setting("company_profile", _load_company_profile)
+
+
+def _load_company_header() -> CompanyHeader:
+    conn = get_conn()
+    try:
+        row = None
+        for table in ("CompanyProfile", "CompanyInfo"):
+            try:
+                row = conn.execute(f"SELECT * FROM {table} LIMIT 1").fetchone()
+            except Exception:
+                continue   # table not created yet
+            if row:
+                break
+    finally:
+        conn.close()
+    if not row:
+        return dict(DEFAULT_COMPANY_HEADER)
+
+    row_dict = dict(row)
+    default = DEFAULT_COMPANY_HEADER
+    return {
+        "company": row_dict.get("company_name") or row_dict.get("name") or row_dict.get("company") or default["company"],
+        "address1": row_dict.get("address1") or "",
+        "address2": row_dict.get("address2") or "",
+        "city": row_dict.get("city") or "",
+        "state": row_dict.get("state") or "",
+        "zip": row_dict.get("zip") or "",
+        "phone": row_dict.get("phone") or row_dict.get("fax") or default["phone"],
+        "email": row_dict.get("email") or default["email"],
+        "service_email": row_dict.get("service_email") or row_dict.get("email") or "",
+        "website": row_dict.get("website") or default["website"],
+    }
+
+
+def get_company_header() -> CompanyHeader:
+    """Company header for reports and service orders: CompanyProfile, else CompanyInfo, else placeholders (cached)"""
+    return cached_setting("company_header", _load_company_header)
 
 
 def update_company_profile(data: Dict[str, Any]) -> bool:
@@ -53,10 +131,12 @@ def update_company_profile(data: Dict[str, Any]) -> bool:
                 safe_strip("logo_path"),
             ))
             conn.commit()
-            return True
         except Exception as e:
             print(f"Error updating company profile: {e}")
             return False
+    invalidate_settings("company_profile", "company_header")
+    forget_pdfs("ticket")   # branding is part of every service order PDF
+    return True
 
 
 # ============================================
@@ -64,10 +144,9 @@ def update_company_profile(data: Dict[str, Any]) -> bool:
 # ============================================
 
 def get_email_settings() -> Dict[str, Any]:
-    """Get email/SMTP settings"""
-    with get_conn() as conn:
-        row = conn.execute("SELECT * FROM EmailSettings WHERE id=1").fetchone()
-        return dict(row) if row else {}
+    """Get email/SMTP settings (cached, shared with core.email_settings)"""
+    from core.email_settings import get_email_settings as _get_email_settings
+    return dict(_get_email_settings())
 
 
 def update_email_settings(data: Dict[str, Any]) -> bool:
@@ -87,10 +166,29 @@ def update_email_settings(data: Dict[str, Any]) -> bool:
                 data.get("smtp_from", "").strip(),
             ))
             conn.commit()
-            return True
         except Exception as e:
             print(f"Error updating email settings: {e}")
             return False
+    invalidate_settings("email_settings")
+    return True
+
+
+# ============================================
+# REPORT SETTINGS
+# ============================================
+
+def _load_report_settings() -> Dict[str, Any]:
+    conn = get_conn()
+    try:
+        row = conn.execute("SELECT * FROM ReportSettings WHERE id=1").fetchone()
+        return dict(row) if row else {}
+    finally:
+        conn.close()
+
+
+def get_report_settings() -> Dict[str, Any]:
+    """Get report storage settings (cached; raises if the ReportSettings table doesn't exist yet)"""
+    return cached_setting("report_settings", _load_report_settings)
 
 
 # ============================================
@@ -234,7 +332,11 @@ def delete_employee(employee_id: int) -> bool:
 # ============================================
 
 def get_service_call_settings() -> Dict[str, Any]:
-    """Get service call configuration"""
+    """Get service call configuration (cached)"""
+    return cached_setting("service_call_settings", _load_service_call_settings)
+
+
+def _load_service_call_settings() -> Dict[str, Any]:
     with get_conn() as conn:
         row = conn.execute("SELECT * FROM ServiceCallSettings WHERE id=1").fetchone()
         if row:
@@ -288,10 +390,102 @@ def update_service_call_settings(data: Dict[str, Any]) -> bool:
                 int(data.get("sla_hours_emergency") or 4),
             ))
             conn.commit()
-            return True
         except Exception as e:
             print(f"Error updating service call settings: {e}")
             return False
+    invalidate_settings("service_call_settings")
+    return True
+
+
+# ============================================
+# TELEMETRY RETENTION SETTINGS
+# ============================================
+
+RETENTION_SQL = Path(__file__).resolve().parents[1] / "schema" / "telemetry_retention.sql"
+
+RETENTION_DEFAULTS: Dict[str, int] = {
+    "enabled": 1,
+    "raw_days": 30,
+    "rollup_1m_days": 30,
+    "rollup_15m_days": 365,
+    "rollup_1h_days": 730,
+    "rollup_1d_days": 0,
+    "batch_size": 5000,
+    "run_every_minutes": 60,
+}
+
+
+def ensure_retention_tables() -> None:
+    """Create TelemetryRetentionSettings / TelemetryRetentionRuns if missing (startup migration)."""
+    with get_conn() as conn:
+        conn.executescript(RETENTION_SQL.read_text(encoding="utf-8"))
+
+
+def get_retention_settings() -> Dict[str, Any]:
+    """Telemetry retention policy (days per tier, 0 = forever; cached)"""
+    return cached_setting("retention_settings", _load_retention_settings)
+
+
+def _load_retention_settings() -> Dict[str, Any]:
+    conn = get_conn()
+    try:
+        row = conn.execute("SELECT * FROM TelemetryRetentionSettings WHERE id=1").fetchone()
+    except sqlite3.OperationalError:
+        row = None   # ensure_retention_tables() has not run yet: defaults
+    finally:
+        conn.close()
+    result = dict(RETENTION_DEFAULTS)
+    if row:
+        result.update({k: v for k, v in dict(row).items() if v is not None})
+    return result
+
+
+def update_retention_settings(data: Dict[str, Any]) -> bool:
+    """Update telemetry retention policy"""
+    current = get_retention_settings()
+
+    def days(key):
+        value = data.get(key, current[key])
+        return max(0, int(value or 0))
+
+    with get_conn() as conn:
+        try:
+            conn.execute("""
+                UPDATE TelemetryRetentionSettings
+                SET enabled=?, raw_days=?, rollup_1m_days=?, rollup_15m_days=?,
+                    rollup_1h_days=?, rollup_1d_days=?, batch_size=?, run_every_minutes=?,
+                    updated=datetime('now')
+                WHERE id=1
+            """, (
+                1 if data.get("enabled", current["enabled"]) else 0,
+                days("raw_days"),
+                days("rollup_1m_days"),
+                days("rollup_15m_days"),
+                days("rollup_1h_days"),
+                days("rollup_1d_days"),
+                max(100, int(data.get("batch_size") or current["batch_size"])),
+                max(1, int(data.get("run_every_minutes") or current["run_every_minutes"])),
+            ))
+            conn.commit()
+        except Exception as e:
+            print(f"Error updating retention settings: {e}")
+            return False
+    invalidate_settings("retention_settings")
+    return True
+
+
+def list_retention_runs(limit: int = 20) -> List[Dict[str, Any]]:
+    """Most recent retention runs, newest first"""
+    conn = get_conn()
+    try:
+        rows = conn.execute(
+            "SELECT * FROM TelemetryRetentionRuns ORDER BY id DESC LIMIT ?", (limit,)
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return []
+    finally:
+        conn.close()
+    return _dicts(rows)
 
 
 # ============================================
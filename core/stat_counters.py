@@ -0,0 +1,128 @@
+"""
+Stat Counters
+Trigger-maintained row counts behind the dashboard tiles (clients,
+locations, equipment, active alerts) and the ticket stats bar (total /
+open / in progress / closed / emergency), overall and per customer.
+
+The triggers in schema/stat_counters.sql adjust StatCounters in the same
+transaction as the write, from any process, so reading a tile is a primary
+key lookup instead of a COUNT over the whole table:
+
+    get_stat_counters(customer_id)   -> {"tickets": 12, "tickets:Open": 4, ...}
+
+Writes made with the triggers missing (foreign_keys off, bulk imports into
+a copy, a restored backup) can leave the counters off. check_stat_counters()
+recounts everything in one write transaction and corrects the rows that
+differ; it runs as the "counters" maintenance job every CHECK_INTERVAL
+seconds and fills the table the first time ensure_stat_counters() creates it.
+Until then the readers fall back to counting.
+"""
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from core.db import get_conn
+
+STAT_COUNTERS_SQL = Path(__file__).resolve().parents[1] / "schema" / "stat_counters.sql"
+CHECK_INTERVAL = float(os.getenv("STAT_COUNTERS_CHECK_INTERVAL", "3600"))   # seconds between consistency checks
+
+# The true value of every counter, computed from the base tables (see schema/stat_counters.sql)
+_ACTUAL_SQL = """
+    SELECT 0, 'customers', COUNT(*) FROM Customers
+    UNION ALL SELECT 0, 'locations', COUNT(*) FROM PropertyLocations
+    UNION ALL SELECT customer_id, 'locations', COUNT(*) FROM PropertyLocations GROUP BY customer_id
+    UNION ALL SELECT 0, 'units', COUNT(*) FROM Units
+    UNION ALL SELECT pl.customer_id, 'units', COUNT(*)
+              FROM Units u JOIN PropertyLocations pl ON pl.ID = u.location_id GROUP BY pl.customer_id
+    UNION ALL SELECT 0, 'active_alerts', COUNT(*) FROM UnitAlerts WHERE status != 'cleared'
+    UNION ALL SELECT pl.customer_id, 'active_alerts', COUNT(*)
+              FROM UnitAlerts a
+              JOIN Units u ON u.unit_id = a.unit_id
+              JOIN PropertyLocations pl ON pl.ID = u.location_id
+              WHERE a.status != 'cleared' GROUP BY pl.customer_id
+    UNION ALL SELECT 0, 'tickets', COUNT(*) FROM ServiceCalls
+    UNION ALL SELECT customer_id, 'tickets', COUNT(*) FROM ServiceCalls GROUP BY customer_id
+    UNION ALL SELECT 0, 'tickets:' || COALESCE(status, ''), COUNT(*) FROM ServiceCalls GROUP BY status
+    UNION ALL SELECT customer_id, 'tickets:' || COALESCE(status, ''), COUNT(*)
+              FROM ServiceCalls GROUP BY customer_id, status
+    UNION ALL SELECT 0, 'emergency', COUNT(*) FROM ServiceCalls
+              WHERE priority = 'Emergency' AND status IS NOT 'Closed'
+    UNION ALL SELECT customer_id, 'emergency', COUNT(*) FROM ServiceCalls
+              WHERE priority = 'Emergency' AND status IS NOT 'Closed' GROUP BY customer_id
+"""
+
+
+def ensure_stat_counters() -> None:
+    """Create StatCounters and its triggers (idempotent); counts existing rows when the table is new."""
+    from core.unit_alerts import ensure_unit_alerts_table
+    ensure_unit_alerts_table()   # the alert triggers need the table
+
+    with get_conn() as conn:
+        created = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'StatCounters'"
+        ).fetchone() is None
+        conn.executescript(STAT_COUNTERS_SQL.read_text(encoding="utf-8"))
+    if created:
+        check_stat_counters()
+
+
+def get_stat_counters(customer_id: Optional[int] = None) -> Optional[Dict[str, int]]:
+    """Counters of one customer (or the totals), or None before ensure_stat_counters() has run."""
+    conn = get_conn()
+    try:
+        rows = conn.execute(
+            "SELECT name, n FROM StatCounters WHERE customer_id = ?", (int(customer_id or 0),)
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return None   # table not created yet
+    finally:
+        conn.close()
+    return {r[0]: int(r[1]) for r in rows}
+
+
+def check_stat_counters(repair: bool = True) -> List[Dict[str, object]]:
+    """
+    Recount every counter and compare with StatCounters. Returns the drifted
+    counters as {"customer_id", "name", "stored", "actual"}; with repair the
+    stored values are corrected in the same transaction, so no write can
+    slip in between the count and the fix.
+    """
+    conn = get_conn()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        actual: Dict[Tuple[int, str], int] = {(r[0], r[1]): int(r[2]) for r in conn.execute(_ACTUAL_SQL)}
+        stored: Dict[Tuple[int, str], int] = {
+            (r[0], r[1]): int(r[2]) for r in conn.execute("SELECT customer_id, name, n FROM StatCounters")
+        }
+        drift = [
+            {"customer_id": key[0], "name": key[1], "stored": stored.get(key, 0), "actual": actual.get(key, 0)}
+            for key in sorted(set(actual) | set(stored))
+            if stored.get(key, 0) != actual.get(key, 0)
+        ]
+        if repair and drift:
+            conn.executemany(
+                "INSERT INTO StatCounters (customer_id, name, n) VALUES (?, ?, ?) "
+                "ON CONFLICT(customer_id, name) DO UPDATE SET n = excluded.n",
+                [(d["customer_id"], d["name"], d["actual"]) for d in drift],
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return drift
+
+
+def stat_counters_job() -> Dict[str, int]:
+    """Scheduler entry point: repair drift and log it (it means a write bypassed the triggers)."""
+    drift = check_stat_counters(repair=True)
+    if drift:
+        try:
+            from core.logger import log_warning
+            sample = ", ".join(f"{d['customer_id']}/{d['name']}: {d['stored']} -> {d['actual']}" for d in drift[:5])
+            log_warning(f"Repaired {len(drift)} drifted stat counters ({sample})", "stat_counters")
+        except Exception:
+            pass
+    return {"drifted": len(drift)}
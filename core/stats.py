@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import Dict
 from .db import get_conn
+from .stat_counters import get_stat_counters
 
 
 def _table_exists(conn, table_name: str) -> bool:
@@ -23,7 +24,16 @@ def get_summary_counts() -> Dict[str, int]:
     Returns counts for dashboard tiles.
     Supports either your HVAC schema (Customers, PropertyLocations, equipments)
     or future tables (clients, locations, equipment).
+    Read from the trigger-maintained StatCounters when they exist.
     """
+    counters = get_stat_counters()
+    if counters is not None:
+        return {
+            "clients": counters.get("customers", 0),
+            "locations": counters.get("locations", 0),
+            "equipment": counters.get("units", 0),
+        }
+
     with get_conn() as conn:
         # Pick the best matching table names for the current DB
         clients_table = "Customers" if _table_exists(conn, "Customers") else (
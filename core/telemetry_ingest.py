@@ -0,0 +1,297 @@
+"""
+Telemetry Ingestion
+In-process queue + background batch writer for UnitReadings.
+
+Gateways POST readings to /api/readings (see app.py). The request handler
+only parses and enqueues; a single writer thread drains the queue and
+writes each batch with executemany inside one transaction, so the UI
+event loop never waits on SQLite.
+
+Flush policy: a batch is written when BATCH_SIZE readings are pending or
+FLUSH_INTERVAL seconds after the first pending reading, whichever is first.
+Readings older than the roll-up watermarks are recorded for the next
+roll-up run (core/telemetry_store.record_late_readings).
+After each written batch the 'alerts' maintenance job is triggered, so
+alert lifecycles (core/unit_alerts.py) follow the incoming readings, and
+live pages subscribed to 'readings' are refreshed (core/live_hub.py).
+Back-pressure: once MAX_PENDING readings are queued, submit() raises
+IngestQueueFull and the route answers 503 + Retry-After. The route refuses
+every request while INGEST_API_KEY is unset and bodies over MAX_BODY_BYTES.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from core.readings_repo import insert_readings, normalize_reading
+
+BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "1000"))
+FLUSH_INTERVAL = float(os.getenv("INGEST_FLUSH_INTERVAL", "0.5"))   # seconds
+MAX_PENDING = int(os.getenv("INGEST_MAX_PENDING", "50000"))
+MAX_BODY_BYTES = int(os.getenv("INGEST_MAX_BODY_BYTES", str(4 * 1024 * 1024)))   # larger requests get 413
+RETRY_DELAY = 1.0                                                  # seconds after a failed write
+
+
+class IngestQueueFull(Exception):
+    """Raised when the writer is too far behind to accept more readings."""
+
+
+def parse_payload(body: bytes, content_type: str = "") -> List[Dict[str, Any]]:
+    """
+    Accepts:
+      - a single JSON object                {"unit_id": 1, ...}
+      - a JSON array                        [{...}, {...}]
+      - a JSON envelope                     {"readings": [{...}, ...]}
+      - NDJSON (one object per line)        application/x-ndjson
+    Raises ValueError on malformed input.
+    """
+    text = (body or b"").decode("utf-8", errors="replace").strip()
+    if not text:
+        return []
+
+    is_ndjson = "ndjson" in (content_type or "").lower() or "jsonl" in (content_type or "").lower()
+    if not is_ndjson:
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            # Not a single JSON document - try NDJSON before giving up
+            is_ndjson = "\n" in text
+            if not is_ndjson:
+                raise ValueError("Body is not valid JSON")
+        else:
+            if isinstance(data, dict) and isinstance(data.get("readings"), list):
+                return data["readings"]
+            if isinstance(data, dict):
+                return [data]
+            if isinstance(data, list):
+                return data
+            raise ValueError("Expected a JSON object or array")
+
+    readings = []
+    for line_no, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            readings.append(json.loads(line))
+        except json.JSONDecodeError:
+            raise ValueError(f"Invalid NDJSON on line {line_no}")
+    return readings
+
+
+class TelemetryWriter:
+    """Single background thread that batches readings into UnitReadings."""
+
+    def __init__(self, batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL,
+                 max_pending: int = MAX_PENDING):
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        self.max_pending = max(self.batch_size, int(max_pending))
+
+        self._pending: deque = deque()
+        self._first_pending_at: Optional[float] = None
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        self._stats = {
+            "accepted": 0,
+            "rejected": 0,
+            "written": 0,
+            "write_rejected": 0,
+            "batches": 0,
+            "throttled": 0,
+            "errors": 0,
+            "last_batch_size": 0,
+            "last_flush_ms": 0.0,
+        }
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+
+    def start(self) -> None:
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Flush what is queued and stop the thread."""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    # -------------------------
+    # Producer side (event loop)
+    # -------------------------
+
+    def submit(self, readings: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Validate and enqueue readings. Never touches the DB.
+        Returns (accepted, rejected). Raises IngestQueueFull when saturated.
+        """
+        rows = []
+        rejected = 0
+        for r in readings:
+            row = normalize_reading(r)
+            if row is None:
+                rejected += 1
+            else:
+                rows.append(row)
+
+        with self._cond:
+            if len(self._pending) + len(rows) > self.max_pending:
+                self._stats["throttled"] += 1
+                raise IngestQueueFull(
+                    f"Ingest queue full ({len(self._pending)} pending readings)"
+                )
+            if rows:
+                if not self._pending:
+                    self._first_pending_at = time.monotonic()
+                self._pending.extend(rows)
+                if len(self._pending) >= self.batch_size:
+                    self._cond.notify()
+            self._stats["accepted"] += len(rows)
+            self._stats["rejected"] += rejected
+
+        if rows and not self._running:
+            self.start()
+        return len(rows), rejected
+
+    # -------------------------
+    # Consumer side (writer thread)
+    # -------------------------
+
+    def _take_batch(self) -> List[Tuple[Any, ...]]:
+        """Block until a batch is due (size or time), then pop it."""
+        with self._cond:
+            while self._running:
+                if len(self._pending) >= self.batch_size:
+                    break
+                if self._pending:
+                    due_in = self.flush_interval - (time.monotonic() - (self._first_pending_at or 0))
+                    if due_in <= 0:
+                        break
+                    self._cond.wait(due_in)
+                else:
+                    self._cond.wait()
+
+            n = min(self.batch_size, len(self._pending))
+            batch = [self._pending.popleft() for _ in range(n)]
+            self._first_pending_at = time.monotonic() if self._pending else None
+            return batch
+
+    def _requeue(self, batch: List[Tuple[Any, ...]]) -> None:
+        with self._cond:
+            self._pending.extendleft(reversed(batch))
+            if self._first_pending_at is None:
+                self._first_pending_at = time.monotonic()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                if not self._running:
+                    return
+                continue
+
+            started = time.perf_counter()
+            try:
+                written, bad = insert_readings(batch)
+            except Exception as e:
+                # DB locked / disk issue: keep the readings and try again shortly
+                self._stats["errors"] += 1
+                _log_error(f"Telemetry batch write failed ({len(batch)} readings): {e}")
+                self._requeue(batch)
+                if not self._running:
+                    return
+                time.sleep(RETRY_DELAY)
+                continue
+
+            with self._cond:
+                self._stats["written"] += written
+                self._stats["write_rejected"] += bad
+                self._stats["batches"] += 1
+                self._stats["last_batch_size"] = len(batch)
+                self._stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000.0, 3)
+            if written:
+                _record_late(batch)
+                _after_write({row[0] for row in batch})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            out = dict(self._stats)
+            out["pending"] = len(self._pending)
+        out["running"] = self._running
+        return out
+
+
+def _log_error(message: str) -> None:
+    try:
+        from core.logger import log_error
+        log_error(message, "telemetry")
+    except Exception:
+        pass
+
+
+def _record_late(batch: List[Tuple[Any, ...]]) -> None:
+    # Readings behind the roll-up watermarks (buffer flushed after an outage):
+    # the next roll-up run rebuilds their buckets (core.telemetry_store)
+    try:
+        from core.telemetry_store import record_late_readings
+        record_late_readings(row[1] for row in batch)
+    except Exception as e:
+        _log_error(f"Recording late readings failed: {e}")
+
+
+def _after_write(unit_ids: Set[int]) -> None:
+    # Drop the units' cached status (core.unit_status), evaluate the new
+    # readings on the maintenance thread (core.unit_alerts) and push them to
+    # open dashboards (core.live_hub)
+    try:
+        from core.live_hub import publish
+        from core.telemetry_maintenance import get_scheduler
+        from core.unit_status import invalidate_unit_status
+        invalidate_unit_status(unit_ids)
+        get_scheduler().trigger("alerts")
+        publish("readings")
+    except Exception:
+        pass
+
+
+_writer: Optional[TelemetryWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> TelemetryWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = TelemetryWriter()
+    return _writer
+
+
+def submit_readings(readings: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """Enqueue readings on the shared writer. Returns (accepted, rejected)."""
+    return get_writer().submit(readings)
+
+
+def stop_writer() -> None:
+    """Flush pending readings and stop the writer (app shutdown)."""
+    if _writer is not None:
+        _writer.stop()
+
+
+def get_ingest_stats() -> Dict[str, Any]:
+    return get_writer().stats()
@@ -0,0 +1,180 @@
+"""
+Telemetry Maintenance
+Background scheduler for periodic telemetry jobs (roll-ups, retention,
+alert evaluation, stat counter checks).
+
+One daemon thread runs each registered job at its interval. Jobs are
+plain functions that do their own bounded, short transactions; a failing
+job is logged and retried at its next interval without affecting others.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+ROLLUP_INTERVAL = float(os.getenv("TELEMETRY_ROLLUP_INTERVAL", "60"))   # seconds
+
+
+class MaintenanceScheduler:
+    """Runs registered jobs on a single background thread."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def add_job(self, name: str, interval: float, func: Callable[[], Any]) -> None:
+        """Register (or replace) a job. It first runs right after start()."""
+        with self._lock:
+            self._jobs[name] = {
+                "func": func,
+                "interval": float(interval),
+                "next_run": 0.0,
+                "runs": 0,
+                "errors": 0,
+                "last_run": None,
+                "last_duration_ms": None,
+                "last_result": None,
+                "last_error": None,
+                "triggered": False,
+            }
+        self._wake.set()
+
+    def trigger(self, name: str) -> None:
+        """Run a job as soon as the thread is free (e.g. alerts after new readings). Unknown jobs are ignored."""
+        with self._lock:
+            job = self._jobs.get(name)
+            if job is None:
+                return
+            job["triggered"] = True
+            job["next_run"] = 0.0
+        self._wake.set()
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+
+    def start(self) -> None:
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="telemetry-maintenance", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    # -------------------------
+    # Running jobs
+    # -------------------------
+
+    def run_now(self, name: str) -> Any:
+        """Run one job synchronously (admin actions, tests)."""
+        with self._lock:
+            job = self._jobs[name]
+        return self._execute(name, job)
+
+    def _execute(self, name: str, job: Dict[str, Any]) -> Any:
+        started = time.perf_counter()
+        with self._lock:
+            job["triggered"] = False
+        try:
+            result = job["func"]()
+        except Exception as e:
+            with self._lock:
+                job["errors"] += 1
+                job["last_error"] = str(e)
+            _log_error(f"Maintenance job '{name}' failed: {e}")
+            result = None
+        else:
+            with self._lock:
+                job["last_result"] = result
+                job["last_error"] = None
+        with self._lock:
+            job["runs"] += 1
+            job["last_run"] = time.strftime("%Y-%m-%d %H:%M:%S")
+            job["last_duration_ms"] = round((time.perf_counter() - started) * 1000.0, 3)
+            # A trigger that arrived while running means new work: run again right away
+            job["next_run"] = 0.0 if job["triggered"] else time.monotonic() + job["interval"]
+        return result
+
+    def _run(self) -> None:
+        while self._running:
+            self._wake.clear()
+            now = time.monotonic()
+            with self._lock:
+                due = [(n, j) for n, j in self._jobs.items() if j["next_run"] <= now]
+                upcoming = [j["next_run"] for j in self._jobs.values() if j["next_run"] > now]
+
+            for name, job in due:
+                if not self._running:
+                    return
+                self._execute(name, job)
+
+            if not due:
+                wait = (min(upcoming) - now) if upcoming else None
+                self._wake.wait(wait)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            jobs = {
+                name: {k: v for k, v in job.items() if k not in ("func", "next_run", "triggered")}
+                for name, job in self._jobs.items()
+            }
+        return {"running": self._running, "jobs": jobs}
+
+
+def _log_error(message: str) -> None:
+    try:
+        from core.logger import log_error
+        log_error(message, "maintenance")
+    except Exception:
+        pass
+
+
+_scheduler: Optional[MaintenanceScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> MaintenanceScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = MaintenanceScheduler()
+    return _scheduler
+
+
+def start_maintenance() -> None:
+    """Register the default telemetry jobs and start the thread (app startup)."""
+    from core.stat_counters import CHECK_INTERVAL as COUNTERS_INTERVAL, stat_counters_job
+    from core.telemetry_retention import CHECK_INTERVAL, retention_job
+    from core.telemetry_store import run_rollups
+    from core.unit_alerts import EVAL_INTERVAL, process_new_readings
+
+    scheduler = get_scheduler()
+    scheduler.add_job("rollups", ROLLUP_INTERVAL, run_rollups)
+    scheduler.add_job("retention", CHECK_INTERVAL, retention_job)
+    scheduler.add_job("alerts", EVAL_INTERVAL, process_new_readings)
+    scheduler.add_job("counters", COUNTERS_INTERVAL, stat_counters_job)
+    scheduler.start()
+
+
+def stop_maintenance() -> None:
+    """Stop the scheduler thread (app shutdown)."""
+    if _scheduler is not None:
+        _scheduler.stop()
+
+
+def get_maintenance_stats() -> Dict[str, Any]:
+    return get_scheduler().stats()
@@ -0,0 +1,206 @@
+"""
+Telemetry Retention
+Prunes raw readings and roll-up tiers according to TelemetryRetentionSettings
+(Settings > Service, or core.settings_repo.update_retention_settings).
+
+Deletes run in batches of `batch_size` rows, each in its own short
+transaction with a small pause in between, so ingestion and the UI never
+wait long on the write lock. A run stops after MAX_BATCHES_PER_RUN batches
+and the next run continues where it left off.
+
+Raw readings are only pruned once every roll-up tier has aggregated them,
+and each unit's latest reading is always kept (dashboard status).
+"""
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from core import db
+from core.db import get_conn
+from core.readings_repo import _used_bytes
+from core.settings_repo import get_retention_settings
+from core.telemetry_store import TIERS, _fmt, _parse_ts, _utc_now, ensure_rollup_tables, get_watermarks
+
+MAX_BATCHES_PER_RUN = int(os.getenv("RETENTION_MAX_BATCHES", "500"))
+BATCH_PAUSE = 0.02        # seconds between delete batches
+CHECK_INTERVAL = 300      # seconds between "is a run due?" checks (scheduler)
+
+_RAW_DELETE_SQL = """
+    DELETE FROM UnitReadings WHERE reading_id IN (
+        SELECT reading_id FROM UnitReadings
+        WHERE ts < ?
+          AND reading_id NOT IN (SELECT reading_id FROM UnitLatestReading)
+        LIMIT ?
+    )
+"""
+
+_ROLLUP_DELETE_SQL = """
+    DELETE FROM ReadingRollups WHERE (tier, unit_id, bucket) IN (
+        SELECT tier, unit_id, bucket FROM ReadingRollups
+        WHERE tier = ? AND bucket < ?
+        LIMIT ?
+    )
+"""
+
+
+def retention_cutoffs(now: Optional[datetime] = None,
+                      settings: Optional[Dict[str, Any]] = None) -> Dict[str, Optional[datetime]]:
+    """
+    Oldest timestamp kept for 'raw' and each roll-up tier (None = forever).
+    Policy only; run_retention() additionally holds raw back until rolled up.
+    """
+    now = now or _utc_now()
+    settings = settings or get_retention_settings()
+    cutoffs: Dict[str, Optional[datetime]] = {}
+    for tier, key in (("raw", "raw_days"), *((t, f"rollup_{t}_days") for t in TIERS)):
+        days = int(settings.get(key) or 0)
+        cutoffs[tier] = now - timedelta(days=days) if days > 0 else None
+    return cutoffs
+
+
+def _delete_batches(sql: str, params: tuple, batch_size: int, budget: int) -> Dict[str, int]:
+    """Run a LIMIT-ed delete until nothing is left or the batch budget is used up."""
+    deleted = batches = 0
+    while batches < budget:
+        with get_conn() as conn:
+            n = conn.execute(sql, (*params, batch_size)).rowcount
+        batches += 1
+        deleted += n
+        if n < batch_size:
+            return {"deleted": deleted, "batches": batches, "done": 1}
+        time.sleep(BATCH_PAUSE)
+    return {"deleted": deleted, "batches": batches, "done": 0}
+
+
+def _file_bytes() -> int:
+    path = Path(db.DB_PATH)
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def run_retention(now: Optional[datetime] = None,
+                  settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Apply the retention policy once. Returns and records (TelemetryRetentionRuns):
+    rows pruned (raw + per tier), bytes reclaimed, duration and whether
+    everything due was pruned ('complete').
+    """
+    started = time.perf_counter()
+    now = now or _utc_now()
+    settings = settings or get_retention_settings()
+    if not settings.get("enabled"):
+        return {"skipped": "disabled"}
+
+    ensure_rollup_tables()
+    batch_size = max(1, int(settings.get("batch_size") or 5000))
+    cutoffs = retention_cutoffs(now, settings)
+    budget = MAX_BATCHES_PER_RUN
+    details: Dict[str, Any] = {"cutoffs": {k: _fmt(v) if v else None for k, v in cutoffs.items()}}
+    complete = True
+    error = None
+
+    conn = get_conn()
+    try:
+        used_before = _used_bytes(conn)
+    finally:
+        conn.close()
+
+    raw_pruned = 0
+    rollups_pruned = 0
+    try:
+        # Raw readings - never past what every tier has already aggregated
+        raw_cutoff = cutoffs["raw"]
+        if raw_cutoff is not None:
+            marks = get_watermarks()
+            if any(m is None for m in marks.values()):
+                details["raw_held_back"] = "roll-ups have not run yet"
+                raw_cutoff = None
+            else:
+                raw_cutoff = min(raw_cutoff, *marks.values())
+                details["raw_cutoff"] = _fmt(raw_cutoff)
+        if raw_cutoff is not None:
+            res = _delete_batches(_RAW_DELETE_SQL, (_fmt(raw_cutoff),), batch_size, budget)
+            raw_pruned = res["deleted"]
+            budget -= res["batches"]
+            complete = complete and bool(res["done"])
+            details["raw"] = raw_pruned
+
+        for tier in TIERS:
+            cutoff = cutoffs[tier]
+            if cutoff is None:
+                continue
+            if budget <= 0:
+                complete = False
+                break
+            res = _delete_batches(_ROLLUP_DELETE_SQL, (tier, _fmt(cutoff)), batch_size, budget)
+            rollups_pruned += res["deleted"]
+            budget -= res["batches"]
+            complete = complete and bool(res["done"])
+            details[tier] = res["deleted"]
+
+        # Give pages back to the OS only if the database was set up for it
+        conn = get_conn()
+        try:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                conn.execute("PRAGMA incremental_vacuum")
+            used_after = _used_bytes(conn)
+        finally:
+            conn.close()
+    except Exception as e:
+        error = str(e)
+        complete = False
+        used_after = used_before
+
+    result = {
+        "raw_pruned": raw_pruned,
+        "rollups_pruned": rollups_pruned,
+        "bytes_reclaimed": max(0, used_before - used_after),
+        "file_bytes": _file_bytes(),
+        "duration_ms": round((time.perf_counter() - started) * 1000.0, 3),
+        "complete": complete,
+        "details": details,
+        "error": error,
+    }
+
+    with get_conn() as conn:
+        conn.execute(
+            """
+            INSERT INTO TelemetryRetentionRuns
+                (started, raw_pruned, rollups_pruned, bytes_reclaimed, duration_ms, complete, details, error)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                _fmt(now), raw_pruned, rollups_pruned, result["bytes_reclaimed"],
+                result["duration_ms"], 1 if complete else 0, json.dumps(details), error,
+            ),
+        )
+    if error:
+        raise RuntimeError(f"Retention run failed: {error}")
+    return result
+
+
+def retention_job() -> Optional[Dict[str, Any]]:
+    """
+    Scheduler entry point: runs when run_every_minutes have passed since the
+    last run, or straight away if the last run hit its batch limit.
+    """
+    settings = get_retention_settings()
+    if not settings.get("enabled"):
+        return None
+
+    with get_conn() as conn:
+        last = conn.execute(
+            "SELECT started, complete FROM TelemetryRetentionRuns ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+    now = _utc_now()
+    if last is not None and last["complete"]:
+        last_started = _parse_ts(last["started"])
+        every = timedelta(minutes=int(settings.get("run_every_minutes") or 60))
+        if last_started is not None and now - last_started < every:
+            return None
+    return run_retention(now, settings)
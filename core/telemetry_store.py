@@ -0,0 +1,556 @@
+"""
+Telemetry Store
+Roll-up tiers and monthly partitions for UnitReadings.
+
+Roll-ups: readings are aggregated into 1-minute, 15-minute, hourly and
+daily buckets (min / max / sum / count per metric) in ReadingRollups.
+Each tier keeps a watermark; run_rollups() only aggregates closed buckets
+after it, in bounded chunks, so it is cheap to call every minute (see
+core/telemetry_maintenance.py). Readings that arrive behind a watermark are
+recorded by the ingest writer (record_late_readings) and their buckets are
+rebuilt by the next run. Long-window reports call choose_tier() and
+read buckets instead of raw rows; the still-open tail after the watermark
+is aggregated from raw on the fly with the same SQL.
+
+Partitions: UnitReadings holds the live (hot) months. archive_month()
+copies a closed month into its own database file under data/archive and
+then deletes it from the live table in small batches, so the write lock is
+only ever held for one batch. Archived months stay queryable through
+attached_partition(); the roll-ups keep covering them.
+"""
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core import db
+from core.db import get_conn
+from core.readings_repo import _typed_readings_ddl
+
+ROLLUPS_SQL = Path(__file__).resolve().parents[1] / "schema" / "readings_rollups.sql"
+
+# Finest to coarsest: tier name -> bucket length in seconds
+TIERS: Dict[str, int] = {"1m": 60, "15m": 900, "1h": 3600, "1d": 86400}
+
+# Metrics aggregated per bucket (columns <metric>_min/_max/_sum/_n in ReadingRollups)
+ROLLUP_METRICS: Tuple[str, ...] = (
+    "supply_temp", "return_temp", "i_temp", "o_temp", "delta_t",
+    "sp_1", "sp_2",
+    "discharge_psi", "suction_psi", "superheat", "subcooling",
+    "compressor_amps", "v_1", "v_2", "v_3",
+    "rh",
+)
+
+MIN_POINTS = int(os.getenv("TELEMETRY_MIN_POINTS", "48"))        # buckets a report window must still have
+LATE_GRACE = int(os.getenv("TELEMETRY_LATE_GRACE", "120"))       # seconds to wait before closing a bucket
+ROLLUP_CHUNK = 6 * 3600                                          # seconds of raw readings per transaction
+ARCHIVE_BATCH = int(os.getenv("TELEMETRY_ARCHIVE_BATCH", "5000"))
+
+TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# A reading counts as an alert the same way the alert history report decides it
+ALERT_CONDITION = "(fault_code IS NOT NULL OR alarm_status = 'Active' OR mode = 'Fault')"
+
+_BUCKET_EXPR = {
+    "1m": "substr(ts, 1, 16) || ':00'",
+    "15m": "substr(ts, 1, 14) || printf('%02d', (CAST(substr(ts, 15, 2) AS INTEGER) / 15) * 15) || ':00'",
+    "1h": "substr(ts, 1, 13) || ':00:00'",
+    "1d": "substr(ts, 1, 10) || ' 00:00:00'",
+}
+
+
+# ---------------------------------------------------------
+# HELPERS
+# ---------------------------------------------------------
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _fmt(dt: datetime) -> str:
+    return dt.strftime(TS_FORMAT)
+
+
+def _parse_ts(value: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(str(value)[:19].replace("T", " "), TS_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+
+def floor_ts(dt: datetime, tier: str) -> datetime:
+    """Start of the tier bucket containing dt."""
+    seconds = TIERS[tier]
+    epoch = int((dt - datetime(1970, 1, 1)).total_seconds())
+    return datetime(1970, 1, 1) + timedelta(seconds=epoch - epoch % seconds)
+
+
+def _metric_columns() -> List[str]:
+    cols = []
+    for m in ROLLUP_METRICS:
+        cols += [f"{m}_min", f"{m}_max", f"{m}_sum", f"{m}_n"]
+    return cols
+
+
+ROLLUP_COLUMNS: Tuple[str, ...] = (
+    "unit_id", "bucket", "readings", "alert_count", "fault_codes", *_metric_columns()
+)
+
+
+def _aggregate_sql(tier: str, unit_filter: bool = False) -> str:
+    """
+    SELECT producing ROLLUP_COLUMNS for raw readings in [?, ?).
+    Non-numeric leftovers in metric columns are ignored.
+    """
+    exprs = [
+        "unit_id",
+        f"{_BUCKET_EXPR[tier]} AS bucket",
+        "COUNT(*)",
+        f"SUM(CASE WHEN {ALERT_CONDITION} THEN 1 ELSE 0 END)",
+        "GROUP_CONCAT(DISTINCT fault_code)",
+    ]
+    for m in ROLLUP_METRICS:
+        v = f"(CASE WHEN typeof({m}) IN ('real', 'integer') THEN {m} END)"
+        exprs += [f"MIN({v})", f"MAX({v})", f"SUM({v})", f"COUNT({v})"]
+    where = "ts >= ? AND ts < ?" + (" AND unit_id = ?" if unit_filter else "")
+    return (
+        f"SELECT {', '.join(exprs)} FROM UnitReadings "
+        f"WHERE {where} GROUP BY unit_id, bucket"
+    )
+
+
+def ensure_rollup_tables() -> None:
+    """Create roll-up / partition tables and the ts index (idempotent)."""
+    with get_conn() as conn:
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='UnitReadings'"
+        ).fetchone()
+        if row:
+            conn.executescript(ROLLUPS_SQL.read_text(encoding="utf-8"))
+
+
+# ---------------------------------------------------------
+# ROLL-UPS
+# ---------------------------------------------------------
+
+def get_watermarks(conn=None) -> Dict[str, Optional[datetime]]:
+    """rolled_until per tier (None if the tier has never run)."""
+    own = conn is None
+    conn = conn or get_conn()
+    try:
+        rows = conn.execute("SELECT tier, rolled_until FROM RollupWatermarks").fetchall()
+    except sqlite3.OperationalError:
+        rows = []   # roll-up tables not created yet
+    finally:
+        if own:
+            conn.close()
+    marks = {r["tier"]: _parse_ts(r["rolled_until"]) for r in rows}
+    return {tier: marks.get(tier) for tier in TIERS}
+
+
+def _rollup_range(conn, tier: str, start: datetime, end: datetime) -> int:
+    cur = conn.execute(
+        f"INSERT OR REPLACE INTO ReadingRollups (tier, {', '.join(ROLLUP_COLUMNS)}) "
+        f"SELECT ?, * FROM ({_aggregate_sql(tier)})",
+        (tier, _fmt(start), _fmt(end)),
+    )
+    return max(cur.rowcount, 0)
+
+
+def run_rollups(now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Aggregate every closed bucket after each tier's watermark.
+    Works in ROLLUP_CHUNK slices, one short transaction each.
+    Returns buckets written per tier.
+    """
+    now = now or _utc_now()
+    written = {tier: 0 for tier in TIERS}
+
+    conn = get_conn()
+    try:
+        first = conn.execute("SELECT MIN(ts) FROM UnitReadings").fetchone()[0]
+        marks = get_watermarks(conn)
+    finally:
+        conn.close()
+    first_dt = _parse_ts(first) if first else None
+    if first_dt is None:
+        return written
+
+    for tier, seconds in TIERS.items():
+        target = floor_ts(now - timedelta(seconds=LATE_GRACE), tier)
+        mark = marks.get(tier)
+        if mark is None:
+            # First run: the tier starts at the oldest reading
+            mark = floor_ts(first_dt, tier)
+            with get_conn() as conn:
+                _set_watermark(conn, tier, mark)
+        step = timedelta(seconds=max(seconds, ROLLUP_CHUNK - ROLLUP_CHUNK % seconds))
+        while mark < target:
+            chunk_end = min(mark + step, target)
+            with get_conn() as conn:
+                written[tier] += _rollup_range(conn, tier, mark, chunk_end)
+                _set_watermark(conn, tier, chunk_end)
+            mark = chunk_end
+
+    for tier, n in rebuild_dirty_rollups().items():
+        written[tier] += n
+    return written
+
+
+def _set_watermark(conn, tier: str, rolled_until: datetime) -> None:
+    conn.execute(
+        """
+        INSERT INTO RollupWatermarks (tier, rolled_until, updated)
+        VALUES (?, ?, datetime('now'))
+        ON CONFLICT(tier) DO UPDATE SET
+            rolled_until = excluded.rolled_until,
+            updated = excluded.updated
+        """,
+        (tier, _fmt(rolled_until)),
+    )
+
+
+def rebuild_rollups(start: datetime, end: datetime, tiers: Optional[List[str]] = None,
+                    not_before: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Re-aggregate [start, end) for late or corrected readings.
+    Only touches buckets already behind each tier's watermark, and none that
+    start before `not_before` (raw rows no longer all in UnitReadings).
+    """
+    marks = get_watermarks()
+    written = {}
+    for tier in tiers or list(TIERS):
+        mark = marks.get(tier)
+        if mark is None:
+            continue
+        lo = floor_ts(start, tier)
+        if not_before is not None and lo < not_before:
+            lo = floor_ts(not_before - timedelta(seconds=1), tier) + timedelta(seconds=TIERS[tier])
+        hi = min(floor_ts(end - timedelta(seconds=1), tier) + timedelta(seconds=TIERS[tier]), mark)
+        if lo >= hi:
+            written[tier] = 0
+            continue
+        with get_conn() as conn:
+            conn.execute(
+                "DELETE FROM ReadingRollups WHERE tier = ? AND bucket >= ? AND bucket < ?",
+                (tier, _fmt(lo), _fmt(hi)),
+            )
+            written[tier] = _rollup_range(conn, tier, lo, hi)
+    return written
+
+
+def record_late_readings(timestamps: Iterable[str]) -> Optional[Tuple[str, str]]:
+    """
+    Called by the ingest writer after each batch: remember the span of the
+    readings that are behind a roll-up watermark (already aggregated buckets)
+    so run_rollups() rebuilds them. Returns the recorded [start, end) or None.
+    """
+    marks = [m for m in get_watermarks().values() if m is not None]
+    if not marks:
+        return None
+    newest_mark = _fmt(max(marks))
+    late = [ts for ts in timestamps if ts < newest_mark]
+    if not late:
+        return None
+    span = (min(late), _fmt(_parse_ts(max(late)) + timedelta(seconds=1)))
+    with get_conn() as conn:
+        conn.execute("INSERT INTO RollupDirtyRanges (start_ts, end_ts) VALUES (?, ?)", span)
+    return span
+
+
+def _rebuild_floor() -> Optional[datetime]:
+    """Oldest time whose raw readings are all still live: after raw retention and archived months."""
+    from core.telemetry_retention import retention_cutoffs
+
+    floor = None
+    try:
+        floor = retention_cutoffs().get("raw")
+    except sqlite3.Error:
+        pass
+    for partition in list_partitions():
+        archived_until = _month_bounds(partition["month"])[1]
+        if floor is None or archived_until > floor:
+            floor = archived_until
+    return floor
+
+
+def rebuild_dirty_rollups() -> Dict[str, int]:
+    """Rebuild the buckets of every range recorded by record_late_readings(), then forget it."""
+    written = {tier: 0 for tier in TIERS}
+    conn = get_conn()
+    try:
+        ranges = conn.execute("SELECT id, start_ts, end_ts FROM RollupDirtyRanges ORDER BY id").fetchall()
+    except sqlite3.OperationalError:
+        ranges = []   # roll-up tables not created yet
+    finally:
+        conn.close()
+    if not ranges:
+        return written
+
+    not_before = _rebuild_floor()
+    for r in ranges:
+        start, end = _parse_ts(r["start_ts"]), _parse_ts(r["end_ts"])
+        if start is not None and end is not None:
+            for tier, n in rebuild_rollups(start, end, not_before=not_before).items():
+                written[tier] += n
+        with get_conn() as conn:
+            conn.execute("DELETE FROM RollupDirtyRanges WHERE id = ?", (r["id"],))
+    return written
+
+
+def choose_tier(start: datetime, end: datetime, min_points: int = MIN_POINTS) -> str:
+    """
+    Coarsest roll-up tier that still gives at least `min_points` buckets
+    over [start, end) and still holds data back to `start` (retention).
+    Falls back to 'raw' when the window is too short for any tier, and to
+    the finest tier that reaches back far enough when raw has been pruned.
+    """
+    from core.telemetry_retention import retention_cutoffs
+
+    span = (end - start).total_seconds()
+    marks = get_watermarks()
+    try:
+        cutoffs = retention_cutoffs(now=_utc_now())   # retention prunes relative to now, not to the window
+    except sqlite3.Error:
+        cutoffs = {}
+
+    def covers(tier: str) -> bool:
+        cutoff = cutoffs.get(tier)
+        return cutoff is None or start >= cutoff
+
+    available = [t for t in TIERS if marks.get(t) is not None and covers(t)]
+    for tier in reversed(available):
+        if span / TIERS[tier] >= min_points:
+            return tier
+    if covers("raw") or not available:
+        return "raw"
+    return available[0]
+
+
+def _bucket_dict(row) -> Dict[str, Any]:
+    d = dict(zip(ROLLUP_COLUMNS, row))
+    for m in ROLLUP_METRICS:
+        n = d.get(f"{m}_n") or 0
+        d[m] = round(d[f"{m}_sum"] / n, 2) if n else None
+    return d
+
+
+def get_rollup_buckets(
+    tier: str,
+    start: datetime,
+    end: datetime,
+    unit_id: Optional[int] = None,
+    alerts_only: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Buckets of `tier` covering [start, end), oldest first.
+    Stored buckets up to the watermark, plus the open tail aggregated live.
+    Each dict has ROLLUP_COLUMNS plus <metric> = average.
+    """
+    lo = floor_ts(start, tier)
+    mark = get_watermarks().get(tier) or lo
+    split = max(lo, min(mark, end))
+
+    stored_sql = (
+        f"SELECT {', '.join(ROLLUP_COLUMNS)} FROM ReadingRollups "
+        "WHERE tier = ? AND bucket >= ? AND bucket < ?"
+    )
+    params: List[Any] = [tier, _fmt(lo), _fmt(split)]
+    if unit_id is not None:
+        stored_sql += " AND unit_id = ?"
+        params.append(unit_id)
+
+    conn = get_conn()
+    try:
+        rows = conn.execute(stored_sql, params).fetchall()
+        if split < end:
+            tail_params: List[Any] = [_fmt(split), _fmt(end)]
+            if unit_id is not None:
+                tail_params.append(unit_id)
+            rows += conn.execute(_aggregate_sql(tier, unit_id is not None), tail_params).fetchall()
+    finally:
+        conn.close()
+
+    buckets = [_bucket_dict(r) for r in rows]
+    if alerts_only:
+        buckets = [b for b in buckets if b["alert_count"]]
+    buckets.sort(key=lambda b: (b["bucket"], b["unit_id"]))
+    return buckets
+
+
+# ---------------------------------------------------------
+# MONTHLY PARTITIONS (archive files)
+# ---------------------------------------------------------
+
+def archive_dir() -> Path:
+    return Path(os.getenv("TELEMETRY_ARCHIVE_DIR") or (db.DB_PATH.parent / "archive"))
+
+
+def partition_path(month: str) -> Path:
+    return archive_dir() / f"readings_{month.replace('-', '_')}.db"
+
+
+def _month_bounds(month: str) -> Tuple[datetime, datetime]:
+    try:
+        start = datetime.strptime(month, "%Y-%m")
+    except ValueError:
+        raise ValueError(f"Month must look like YYYY-MM, got {month!r}")
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+
+def archive_month(month: str, batch_size: int = ARCHIVE_BATCH) -> Dict[str, Any]:
+    """
+    Move one closed month of raw readings into data/archive/readings_YYYY_MM.db.
+
+    1. copy rows (by reading_id, in batches) into the archive file
+    2. delete them from UnitReadings in batches of `batch_size`
+    Roll-ups for the month must be complete first so reports keep working.
+    Re-running after an interruption resumes where it stopped.
+    """
+    start, end = _month_bounds(month)
+    if end > _utc_now() - timedelta(seconds=LATE_GRACE):
+        raise ValueError(f"{month} is not closed yet")
+    marks = get_watermarks()
+    behind = [t for t, m in marks.items() if m is None or m < end]
+    if behind:
+        raise ValueError(f"Roll-ups not caught up for {month} (tiers: {', '.join(behind)}); run run_rollups() first")
+
+    started = time.perf_counter()
+    path = partition_path(month)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    bounds = (_fmt(start), _fmt(end))
+
+    archive = sqlite3.connect(str(path))
+    try:
+        archive.execute(_typed_readings_ddl("UnitReadings", foreign_key=False).replace(
+            "CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1))
+        archive.execute("CREATE INDEX IF NOT EXISTS idx_readings_unit_ts ON UnitReadings(unit_id, ts)")
+        archive.commit()
+
+        # 1. copy
+        last_id = archive.execute("SELECT COALESCE(MAX(reading_id), 0) FROM UnitReadings").fetchone()[0]
+        copied = 0
+        while True:
+            conn = get_conn()
+            try:
+                cur = conn.execute(
+                    "SELECT * FROM UnitReadings WHERE reading_id > ? AND ts >= ? AND ts < ? "
+                    "ORDER BY reading_id LIMIT ?",
+                    (last_id, *bounds, batch_size),
+                )
+                cols = [d[0] for d in cur.description]
+                rows = [tuple(r) for r in cur.fetchall()]
+            finally:
+                conn.close()
+            if not rows:
+                break
+            archive.executemany(
+                f"INSERT OR IGNORE INTO UnitReadings ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)})",
+                rows,
+            )
+            archive.commit()
+            copied += len(rows)
+            last_id = rows[-1][cols.index("reading_id")]
+
+        total, first_ts, last_ts, max_id = archive.execute(
+            "SELECT COUNT(*), MIN(ts), MAX(ts), COALESCE(MAX(reading_id), 0) FROM UnitReadings"
+        ).fetchone()
+    finally:
+        archive.close()
+
+    # 2. delete from the live table - only what is safely in the archive file
+    deleted = 0
+    while True:
+        with get_conn() as conn:
+            n = conn.execute(
+                """
+                DELETE FROM UnitReadings WHERE reading_id IN (
+                    SELECT reading_id FROM UnitReadings
+                    WHERE ts >= ? AND ts < ? AND reading_id <= ?
+                    LIMIT ?
+                )
+                """,
+                (*bounds, max_id, batch_size),
+            ).rowcount
+        deleted += n
+        if n < batch_size:
+            break
+
+    with get_conn() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO ReadingPartitions (month, path, rows, first_ts, last_ts, archived)
+            VALUES (?, ?, ?, ?, ?, datetime('now'))
+            """,
+            (month, str(path), total, first_ts, last_ts),
+        )
+
+    return {
+        "month": month,
+        "path": str(path),
+        "copied": copied,
+        "deleted": deleted,
+        "rows": total,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def list_partitions() -> List[Dict[str, Any]]:
+    """Archived months, oldest first."""
+    conn = get_conn()
+    try:
+        rows = conn.execute(
+            "SELECT month, path, rows, first_ts, last_ts, archived FROM ReadingPartitions ORDER BY month"
+        ).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def _schema_name(month: str) -> str:
+    _month_bounds(month)  # validates the format
+    return "p_" + month.replace("-", "_")
+
+
+@contextmanager
+def attached_partition(month: str):
+    """
+    Pooled connection with an archived month attached:
+
+        with attached_partition("2025-01") as (conn, schema):
+            conn.execute(f"SELECT ... FROM {schema}.UnitReadings WHERE ...")
+
+    The archive is detached again before the connection goes back to the pool.
+    """
+    path = partition_path(month)
+    if not path.exists():
+        raise FileNotFoundError(f"No archive file for {month}: {path}")
+    name = _schema_name(month)
+    conn = get_conn()
+    try:
+        conn.execute(f"ATTACH DATABASE ? AS {name}", (str(path),))
+        try:
+            yield conn, name
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.execute(f"DETACH DATABASE {name}")
+    finally:
+        conn.close()
+
+
+def detach_partition(month: str) -> Optional[str]:
+    """
+    Forget an archived month (e.g. before moving its file to cold storage).
+    The file itself is left alone. Returns its path, or None if unknown.
+    """
+    with get_conn() as conn:
+        row = conn.execute("SELECT path FROM ReadingPartitions WHERE month = ?", (month,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("DELETE FROM ReadingPartitions WHERE month = ?", (month,))
+        return row["path"]
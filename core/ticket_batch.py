@@ -0,0 +1,444 @@
+"""
+Ticket Batch Export
+Month-end bundles: many service orders rendered in parallel and handed
+over as one merged PDF or as a ZIP of per-ticket PDFs.
+
+    batch_id = start_ticket_batch([12, 15, 19], owner="alice@example.com", output="zip")
+    ticket_batch_status(batch_id) -> {"status": "running", "total": 3, "done": 1, "failed": 0, ...}
+    iter_ticket_batch_zip(batch_id) -> ZIP bytes, yielded as each ticket finishes
+    ticket_batch_pdf(batch_id)      -> path of the merged PDF once the batch is done
+
+Tickets are fanned out to the shared PDF render service (core/pdf_render.py)
+as "ticket" jobs - the same core/ticket_document renderer and cache as a
+single print - with at most PARALLEL jobs in flight per batch, so a large
+export shares the workers with interactive prints instead of queueing
+ahead of them.
+
+Every finished ticket is written to <BATCH_DIR>/<batch_id>/<ticket_id>.pdf
+and the batch itself to manifest.json, so the part files are the progress:
+a batch interrupted by a shutdown is "paused", and resume_ticket_batch()
+(or the next app start) renders only the tickets that are still missing,
+plus any that failed. Finished batches are deleted after BATCH_TTL hours.
+
+Merging needs pypdf; ZIP exports work without it.
+"""
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+import zipfile
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from core.db import BASE_DIR
+from core.pdf_render import WORKERS, PdfQueueFull, PdfRenderService, get_pdf_service
+
+BATCH_DIR = Path(os.getenv("TICKET_BATCH_DIR", str(BASE_DIR / "data" / "ticket_batches")))
+PARALLEL = int(os.getenv("TICKET_BATCH_PARALLEL", str(max(1, WORKERS))))   # ticket jobs in flight per batch
+MAX_TICKETS = int(os.getenv("TICKET_BATCH_MAX", "1000"))                   # tickets per batch
+BATCH_TTL = float(os.getenv("TICKET_BATCH_TTL_HOURS", "24"))               # hours a finished batch is kept
+
+OUTPUTS = ("pdf", "zip")
+RETRY_DELAY = 1.0   # seconds to back off while the PDF queue is full
+
+_BATCH_ID = re.compile(r"[0-9a-f]{32}")
+
+
+class TicketBatchError(Exception):
+    """Raised when a batch export cannot be started."""
+
+
+def _zip_name(ticket_id: int) -> str:
+    return f"ServiceOrder_{ticket_id}.pdf"
+
+
+class _ZipSink:
+    """Write-only buffer for zipfile: unseekable, so entries are never patched after they are sent."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+class TicketBatchService:
+    """Runs batch exports: one driver thread per running batch, rendering through the PDF service."""
+
+    def __init__(self, directory: Path = BATCH_DIR, parallel: int = PARALLEL, max_tickets: int = MAX_TICKETS,
+                 ttl_hours: float = BATCH_TTL, pdf_service: Optional[PdfRenderService] = None):
+        self.directory = Path(directory)
+        self.parallel = max(1, int(parallel))
+        self.max_tickets = max(1, int(max_tickets))
+        self.ttl_hours = ttl_hours
+        self._pdf_service = pdf_service
+        self._cond = threading.Condition()
+        self._batches: Dict[str, Dict[str, Any]] = {}
+        self._done: Dict[str, Set[int]] = {}
+        self._threads: Dict[str, threading.Thread] = {}
+        self._stopping = threading.Event()
+        self._stats = {"started": 0, "resumed": 0, "rendered": 0, "failed": 0, "merged": 0}
+
+    def start(self, ticket_ids: Iterable[int], owner: Optional[str] = None, output: str = "pdf") -> str:
+        """Start exporting `ticket_ids` (in that order); returns the batch id. Raises TicketBatchError."""
+        if output not in OUTPUTS:
+            raise ValueError(f"Unknown batch output: {output}")
+        ids = list(dict.fromkeys(int(t) for t in ticket_ids))
+        if not ids:
+            raise TicketBatchError("No service orders to export")
+        if len(ids) > self.max_tickets:
+            raise TicketBatchError(f"At most {self.max_tickets} service orders per export - narrow the filters")
+        if output == "pdf" and find_spec("pypdf") is None:
+            raise TicketBatchError("Merged PDFs need pypdf (pip install pypdf) - export a ZIP instead")
+
+        with self._cond:
+            self._purge()
+            if owner is not None and any(b["owner"] == owner and b["id"] in self._threads
+                                         for b in self._batches.values()):
+                raise TicketBatchError("You already have an export running - wait for it to finish")
+            batch_id = uuid.uuid4().hex
+            batch = {
+                "id": batch_id,
+                "owner": owner,
+                "output": output,
+                "tickets": ids,
+                "status": "running",
+                "created": time.time(),
+                "finished": None,
+                "errors": {},
+                "error": None,
+            }
+            (self.directory / batch_id).mkdir(parents=True, exist_ok=True)
+            self._batches[batch_id] = batch
+            self._done[batch_id] = set()
+            self._save(batch)
+            self._stats["started"] += 1
+            self._spawn(batch_id)
+        return batch_id
+
+    def resume(self, batch_id: str) -> bool:
+        """Restart a paused batch, or retry the failed tickets of a finished one. False when there is nothing to do."""
+        with self._cond:
+            batch = self._load(batch_id)
+            if batch is None or batch_id in self._threads or self._stopping.is_set():
+                return False
+            if batch["status"] == "done" and not batch["errors"]:
+                return False
+            batch.update(status="running", finished=None, errors={}, error=None)
+            self._save(batch)
+            self._stats["resumed"] += 1
+            self._spawn(batch_id)
+        return True
+
+    def resume_all(self) -> int:
+        """Purge expired batches and resume every paused one on disk (app start). Returns how many resumed."""
+        if not self.directory.is_dir():
+            return 0
+        with self._cond:
+            self._purge()
+            paused = [b["id"] for b in map(self._load, [p.name for p in self.directory.iterdir()])
+                      if b is not None and b["status"] == "paused"]
+        return sum(self.resume(batch_id) for batch_id in paused)
+
+    def status(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Progress of a batch, or None for an unknown / expired one."""
+        with self._cond:
+            batch = self._load(batch_id)
+            if batch is None:
+                return None
+            total = len(batch["tickets"])
+            done = len(self._done[batch_id])
+            out = {k: v for k, v in batch.items() if k != "tickets"}
+            out["errors"] = dict(batch["errors"])
+            out.update(total=total, done=done, failed=len(batch["errors"]),
+                       progress=(done + len(batch["errors"])) / total if total else 1.0)
+            return out
+
+    def iter_zip(self, batch_id: str) -> Iterator[bytes]:
+        """
+        ZIP of the batch's service orders, yielded entry by entry as tickets
+        finish (a streaming HTTP response). Ends when the batch stops; tickets
+        that failed or were not reached are listed in MISSING.txt.
+        """
+        sink = _ZipSink()
+        sent: Set[int] = set()
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as archive:   # PDFs are already compressed
+            while True:
+                with self._cond:
+                    batch = self._load(batch_id)
+                    if batch is None:
+                        return
+                    ready = [t for t in batch["tickets"] if t in self._done[batch_id] and t not in sent]
+                    running = batch_id in self._threads
+                    if not ready and running:
+                        self._cond.wait(RETRY_DELAY)
+                        continue
+                for ticket_id in ready:
+                    try:
+                        pdf = self._part(batch_id, ticket_id).read_bytes()
+                    except OSError:
+                        continue   # purged underneath us; listed as missing
+                    archive.writestr(_zip_name(ticket_id), pdf)
+                    sent.add(ticket_id)
+                    yield sink.drain()
+                if not running and not ready:
+                    break
+
+            missing = [t for t in batch["tickets"] if t not in sent]
+            if missing:
+                lines = [f"#{t}: {batch['errors'].get(str(t), 'not rendered')}" for t in missing]
+                archive.writestr("MISSING.txt", "Service orders not included:\n" + "\n".join(lines) + "\n")
+        yield sink.drain()
+
+    def merged_path(self, batch_id: str) -> Optional[Path]:
+        """The merged PDF of a finished "pdf" batch, or None while it is not ready."""
+        with self._cond:
+            batch = self._load(batch_id)
+            if batch is None or batch["status"] != "done" or batch["output"] != "pdf":
+                return None
+        path = self.directory / batch_id / "merged.pdf"
+        return path if path.exists() else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            out = dict(self._stats)
+            out["running"] = len(self._threads)
+            out["kept"] = len(self._batches)
+        out["parallel"] = self.parallel
+        return out
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop the driver threads; unfinished batches are saved as "paused" (app shutdown)."""
+        self._stopping.set()
+        with self._cond:
+            threads = list(self._threads.values())
+            self._cond.notify_all()
+        for thread in threads:
+            thread.join(timeout)
+
+    # ---------------------------------------------------------
+    # Internals
+    # ---------------------------------------------------------
+
+    def _pdf(self) -> PdfRenderService:
+        return self._pdf_service or get_pdf_service()
+
+    def _part(self, batch_id: str, ticket_id: int) -> Path:
+        return self.directory / batch_id / f"{ticket_id}.pdf"
+
+    def _spawn(self, batch_id: str) -> None:
+        """Start the driver thread (caller holds the lock)."""
+        thread = threading.Thread(target=self._drive, args=(batch_id,), name=f"ticket-batch-{batch_id[:8]}", daemon=True)
+        self._threads[batch_id] = thread
+        thread.start()
+
+    def _drive(self, batch_id: str) -> None:
+        """Keep up to `parallel` ticket jobs in flight until every ticket is rendered or failed."""
+        service = self._pdf()
+        with self._cond:
+            batch = self._batches[batch_id]
+            pending = [t for t in batch["tickets"] if t not in self._done[batch_id]]
+        in_flight: Dict[str, int] = {}
+        try:
+            while (pending or in_flight) and not self._stopping.is_set():
+                while pending and len(in_flight) < self.parallel:
+                    try:
+                        in_flight[service.submit("ticket", pending[0])] = pending[0]
+                    except PdfQueueFull:
+                        break
+                    pending.pop(0)
+                if not in_flight:
+                    self._stopping.wait(RETRY_DELAY)
+                    continue
+
+                service.wait(next(iter(in_flight)), timeout=0.5)
+                for job_id, ticket_id in list(in_flight.items()):
+                    job = service.status(job_id)
+                    if job is not None and job["status"] in ("queued", "running"):
+                        continue
+                    del in_flight[job_id]
+                    self._collect(batch_id, ticket_id, service, job)
+
+            if self._stopping.is_set():
+                self._set_status(batch_id, "paused")
+                return
+            if batch["output"] == "pdf":
+                self._set_status(batch_id, "merging")
+                self._merge(batch_id)
+                with self._cond:
+                    self._stats["merged"] += 1
+            self._set_status(batch_id, "done")
+        except Exception as e:
+            self._set_status(batch_id, "failed", error=str(e) or e.__class__.__name__)
+            try:
+                from core.logger import log_error
+                log_error(f"Ticket batch {batch_id} failed: {e}", "ticket_batch")
+            except Exception:
+                pass
+        finally:
+            with self._cond:
+                self._threads.pop(batch_id, None)
+                self._cond.notify_all()
+
+    def _collect(self, batch_id: str, ticket_id: int, service: PdfRenderService, job: Optional[Dict[str, Any]]) -> None:
+        """Store one finished ticket job as a part file, or record why it failed."""
+        error = None
+        result = None
+        if job is None:
+            error = "Render job expired"
+        elif job["status"] == "failed":
+            error = job["error"] or "Render failed"
+        else:
+            try:
+                result = service.result(job["id"])
+            except KeyError:
+                error = "Render job expired"
+            if result is None and error is None:
+                error = "Nothing to render"
+
+        if error is None:
+            part = self._part(batch_id, ticket_id)
+            tmp = part.with_suffix(".tmp")
+            tmp.write_bytes(result[1])
+            os.replace(tmp, part)
+
+        with self._cond:
+            if error is None:
+                self._done[batch_id].add(ticket_id)
+                self._stats["rendered"] += 1
+            else:
+                batch = self._batches[batch_id]
+                batch["errors"][str(ticket_id)] = error
+                self._stats["failed"] += 1
+                self._save(batch)
+            self._cond.notify_all()
+
+    def _merge(self, batch_id: str) -> None:
+        """Concatenate the part files in ticket order into merged.pdf, one outline entry per ticket."""
+        from pypdf import PdfWriter
+
+        with self._cond:
+            batch = self._batches[batch_id]
+            parts = [(t, self._part(batch_id, t)) for t in batch["tickets"] if t in self._done[batch_id]]
+        target = self.directory / batch_id / "merged.pdf"
+        tmp = target.with_suffix(".tmp")
+        writer = PdfWriter()
+        for ticket_id, path in parts:
+            writer.append(str(path), outline_item=f"Service Order #{ticket_id}")
+        with open(tmp, "wb") as fh:
+            writer.write(fh)
+        os.replace(tmp, target)
+
+    def _set_status(self, batch_id: str, status: str, error: Optional[str] = None) -> None:
+        with self._cond:
+            batch = self._batches[batch_id]
+            batch["status"] = status
+            if error is not None:
+                batch["error"] = error
+            if status in ("done", "failed"):
+                batch["finished"] = time.time()
+            self._save(batch)
+            self._cond.notify_all()
+
+    def _load(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """The batch record, read back from its manifest when this process has not seen it (caller holds the lock)."""
+        batch = self._batches.get(batch_id)
+        if batch is not None:
+            return batch
+        if not _BATCH_ID.fullmatch(batch_id or ""):
+            return None
+        try:
+            batch = json.loads((self.directory / batch_id / "manifest.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if batch["status"] in ("running", "merging"):
+            batch["status"] = "paused"   # its driver died with the previous process
+        self._batches[batch_id] = batch
+        self._done[batch_id] = {t for t in batch["tickets"] if self._part(batch_id, t).exists()}
+        return batch
+
+    def _save(self, batch: Dict[str, Any]) -> None:
+        """Write manifest.json atomically (caller holds the lock)."""
+        folder = self.directory / batch["id"]
+        tmp = folder / "manifest.json.tmp"
+        tmp.write_text(json.dumps(batch), encoding="utf-8")
+        os.replace(tmp, folder / "manifest.json")
+
+    def _purge(self) -> None:
+        """Delete batches finished more than ttl_hours ago (caller holds the lock)."""
+        if not self.directory.is_dir():
+            return
+        cutoff = time.time() - self.ttl_hours * 3600
+        for path in self.directory.iterdir():
+            batch = self._load(path.name)
+            if batch is None or path.name in self._threads or not batch["finished"] or batch["finished"] >= cutoff:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            self._batches.pop(path.name, None)
+            self._done.pop(path.name, None)
+
+
+_service: Optional[TicketBatchService] = None
+_service_lock = threading.Lock()
+
+
+def get_ticket_batches() -> TicketBatchService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = TicketBatchService()
+    return _service
+
+
+def resume_ticket_batches() -> None:
+    """Pick up batches paused by the last shutdown (app startup)."""
+    try:
+        get_ticket_batches().resume_all()
+    except Exception as e:
+        print(f"Ticket batch resume failed: {e}")
+
+
+def stop_ticket_batches() -> None:
+    """Pause running batches and forget the shared service (app shutdown / tests)."""
+    global _service
+    with _service_lock:
+        service, _service = _service, None
+    if service is not None:
+        service.shutdown()
+
+
+def start_ticket_batch(ticket_ids: Iterable[int], owner: Optional[str] = None, output: str = "pdf") -> str:
+    return get_ticket_batches().start(ticket_ids, owner=owner, output=output)
+
+
+def resume_ticket_batch(batch_id: str) -> bool:
+    return get_ticket_batches().resume(batch_id)
+
+
+def ticket_batch_status(batch_id: str) -> Optional[Dict[str, Any]]:
+    return get_ticket_batches().status(batch_id)
+
+
+def iter_ticket_batch_zip(batch_id: str) -> Iterator[bytes]:
+    return get_ticket_batches().iter_zip(batch_id)
+
+
+def ticket_batch_pdf(batch_id: str) -> Optional[Path]:
+    return get_ticket_batches().merged_path(batch_id)
+
+
+def get_ticket_batch_stats() -> Dict[str, Any]:
+    return get_ticket_batches().stats()
@@ -6,8 +6,15 @@ Supports 1-4 units per ticket, new layout format
 
 from typing import List, Dict, Any, Tuple, Optional
 from datetime import datetime
+from io import BytesIO
 import os
 
+from core.pdf_cache import get_pdf_cache, pdf_key
+
+# Bump when the service order layout changes: cached PDFs of the old layout stop matching
+TEMPLATE_VERSION = 1
+KEEP_COPY = os.getenv("REPORT_PDF_KEEP_COPY") == "1"   # also write each service order into reports/service_orders
+
 
 # ============================================
 # HELPER FUNCTIONS
@@ -31,48 +38,8 @@ def format_phone(phone: Optional[str]) -> str:
 
 def get_company_profile() -> Dict[str, Any]:
     """Get company profile for header (from database or settings)"""
-    from core.db import get_conn
-    
-    default_profile = {
-        "company": "GCC TECHNOLOGY",
-        "address1": "123 Tech Street",
-        "address2": "",
-        "city": "Tech City",
-        "state": "TC",
-        "zip": "12345",
-        "phone": "(555) 123-4567",
-        "email": "support@gcc.com",
-        "service_email": "service@gcc.com",
-        "website": "www.gcc.com"
-    }
-    
-    try:
-        conn = get_conn()
-        # Try CompanyProfile first
-        row = conn.execute("SELECT * FROM CompanyProfile LIMIT 1").fetchone()
-        if not row:
-            # Fallback to CompanyInfo
-            row = conn.execute("SELECT * FROM CompanyInfo LIMIT 1").fetchone()
-        
-        if row:
-            row_dict = dict(row)
-            return {
-                "company": row_dict.get("company_name") or row_dict.get("name") or row_dict.get("company") or default_profile["company"],
-                "address1": row_dict.get("address1") or "",
-                "address2": row_dict.get("address2") or "",
-                "city": row_dict.get("city") or "",
-                "state": row_dict.get("state") or "",
-                "zip": row_dict.get("zip") or "",
-                "phone": row_dict.get("phone") or row_dict.get("fax") or default_profile["phone"],
-                "email": row_dict.get("email") or default_profile["email"],
-                "service_email": row_dict.get("service_email") or row_dict.get("email") or "",
-                "website": row_dict.get("website") or default_profile["website"],
-            }
-        conn.close()
-    except Exception:
-        pass
-    
-    return default_profile
+    from core.settings_repo import get_company_header
+    return dict(get_company_header())
 
 
 def get_ticket_units(ticket_id: int) -> List[Dict[str, Any]]:
@@ -184,7 +151,9 @@ def generate_ticket_pdf(ticket_id: int) -> Tuple[str, bytes]:
     Form title LEFT | Client info RIGHT
     Units table CENTER (bordered, 1-4 units with refrigerant + voltage)
     
-    Returns: (pdf_path, pdf_bytes)
+    Returns: (pdf_path, pdf_bytes). The PDF is rendered in memory; pdf_path
+    names the service order and exists on disk only with
+    REPORT_PDF_KEEP_COPY=1 - use pdf_bytes.
     """
     try:
         from reportlab.lib.pagesizes import letter
@@ -237,16 +206,28 @@ def generate_ticket_pdf(ticket_id: int) -> Tuple[str, bytes]:
     
     conn.close()
     
-    # Create PDF
-    os.makedirs("reports/service_orders", exist_ok=True)
-    
     # Use ticket ID only (not control fields)
     ticket_no = str(ticket_id)
     unit_label = f"RTU-{units[0].get('unit_id', '?')}" if units else "UNIT"
     filename = f"ServiceOrder_{datetime.now().strftime('%Y%m%d')}-{ticket_no.zfill(4)}_{unit_label}.pdf"
     pdf_path = os.path.join("reports", "service_orders", filename)
     
-    c = canvas.Canvas(pdf_path, pagesize=letter)
+    # Same rows, branding and layout as a PDF already rendered: reuse it
+    from core.pdf_layout import load_pdf_branding
+    cache = get_pdf_cache()
+    cache_key = pdf_key(
+        f"ticket-{ticket_id}", TEMPLATE_VERSION, ticket, units, company,
+        [customer_name, customer_phone, customer_email, location_address],
+        load_pdf_branding(force=True),
+    )
+    cached = cache.get(cache_key)
+    if cached is not None:
+        _keep_copy(pdf_path, cached)
+        return (pdf_path, cached)
+    
+    # Create PDF
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
     width, height = letter
     margin = 40
     left = margin
@@ -679,11 +660,23 @@ def generate_ticket_pdf(ticket_id: int) -> Tuple[str, bytes]:
             
             page_num += 1
     
-    # Save PDF
+    # Save PDF (rendered in memory)
     c.save()
-    
-    # Read bytes
-    with open(pdf_path, 'rb') as f:
-        pdf_bytes = f.read()
+    pdf_bytes = buffer.getvalue()
+    cache.put(cache_key, pdf_bytes)
+    _keep_copy(pdf_path, pdf_bytes)
     
     return (pdf_path, pdf_bytes)
+
+
+def _keep_copy(pdf_path: str, pdf_bytes: bytes) -> None:
+    """With REPORT_PDF_KEEP_COPY=1, write the service order to pdf_path (never read back)."""
+    if not KEEP_COPY:
+        return
+    try:
+        os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+        with open(pdf_path, 'wb') as f:
+            f.write(pdf_bytes)
+    except OSError as e:
+        from core.logger import log_error
+        log_error(f"Could not keep a copy of {os.path.basename(pdf_path)}: {e}", "ticket_document")
@@ -10,9 +10,19 @@ CRUD operations for service call management
 (uses existing ServiceCalls table)
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
+from pathlib import Path
 from core.db import get_conn
+from core.live_hub import publish
+from core.pdf_cache import forget_pdfs
+from core.search_index import ranked_hits
+from core.stat_counters import get_stat_counters
+
+TICKET_UNITS_SQL = Path(__file__).resolve().parents[1] / "schema" / "ticket_units_migration.sql"
+TICKET_GRID_SQL = Path(__file__).resolve().parents[1] / "schema" / "ticket_grid.sql"
+
+GRID_PAGE_SIZE = 100
 
 
 # -------------------------------------------------
@@ -20,9 +30,10 @@ from core.db import get_conn
 # -------------------------------------------------
 
 def _send_ticket_email(call_id: int, call_data: Dict[str, Any]) -> tuple[bool, str]:
-    """Send ticket creation/update email to admin email configured in settings"""
+    """Queue ticket creation/update email to admin email configured in settings"""
     try:
-        from core.email_settings import get_email_settings, send_email
+        from core.email_outbox import enqueue_email
+        from core.email_settings import get_email_settings
         from core.customers_repo import get_customer
         from core.locations_repo import get_location
         
@@ -61,8 +72,8 @@ Labor Description:
 Created: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 """
         
-        success, msg = send_email(to_email, subject, body)
-        return success, msg
+        outbox_id = enqueue_email(to_email, subject, body)
+        return True, f"Email queued (#{outbox_id})"
     except Exception as e:
         return False, f"Email notification error: {str(e)}"
 
@@ -98,6 +109,7 @@ def create_service_call(data: Dict[str, Any]) -> int:
         cur = conn.execute(query, params)
         conn.commit()
         call_id = cur.lastrowid
+    publish("tickets")
     
     # Note: Auto-email removed - user must manually send via Email button
     
@@ -171,42 +183,119 @@ def list_service_calls(
         rows = cursor.fetchall()
         return [dict(row) for row in rows]
 
-#----------------------------------------
 
+def list_service_call_ids(
+    customer_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    limit: int = 1000,
+) -> List[int]:
+    """IDs of every service call matching the filters, oldest first (batch PDF export)."""
+    query = "SELECT ID FROM ServiceCalls WHERE 1=1"
+    params: List[Any] = []
+    for column, value in (("customer_id", customer_id), ("location_id", location_id),
+                          ("status", status), ("priority", priority)):
+        if value:
+            query += f" AND {column} = ?"
+            params.append(value)
+    query += " ORDER BY created, ID LIMIT ?"
+    params.append(limit)
 
+    with get_conn() as conn:
+        return [row[0] for row in conn.execute(query, tuple(params)).fetchall()]
 
+# -------------------------------------------------
+# Ticket grid (dashboard / tickets page)
+# -------------------------------------------------
+
+def ensure_ticket_grid() -> None:
+    """Create TicketUnits (if missing), the grid indexes and the ServiceCallGrid view (idempotent)."""
+    with get_conn() as conn:
+        conn.executescript(TICKET_UNITS_SQL.read_text(encoding="utf-8"))
+        conn.executescript(TICKET_GRID_SQL.read_text(encoding="utf-8"))
+
+
+def list_service_calls_page(
+    customer_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    after: Optional[Tuple[Optional[str], int]] = None,
+    limit: int = GRID_PAGE_SIZE,
+) -> Dict[str, Any]:
+    """
+    One page of grid rows, newest first, with names and unit_count in the
+    same query (ServiceCallGrid view).
+
+    Keyset pagination: pass the returned "next" cursor as `after` for the
+    following page. Each page is an index range scan from the cursor, so
+    page 1000 costs the same as page 1 (OFFSET would re-read every row
+    before it). Returns {"rows": [...], "next": (created, ID) or None}.
+    """
+    where = ["1=1"]
+    params: List[Any] = []
+    if customer_id:
+        where.append("customer_id = ?")
+        params.append(customer_id)
+    if location_id:
+        where.append("location_id = ?")
+        params.append(location_id)
+    if status:
+        where.append("status = ?")
+        params.append(status)
+    if priority:
+        where.append("priority = ?")
+        params.append(priority)
+
+    def fetch(extra: str, extra_params: List[Any], order: str, n: int) -> List[Dict[str, Any]]:
+        query = f"SELECT * FROM ServiceCallGrid WHERE {' AND '.join(where)}{extra} ORDER BY {order} LIMIT ?"
+        return [dict(r) for r in conn.execute(query, (*params, *extra_params, n)).fetchall()]
+
+    with get_conn() as conn:
+        # Tickets without a created date sort last (NULLs are smallest); they get their own range
+        if after is None:
+            rows = fetch(" AND created IS NOT NULL", [], "created DESC, ID DESC", limit + 1)
+        elif after[0] is not None:
+            rows = fetch(" AND (created, ID) < (?, ?)", [after[0], after[1]], "created DESC, ID DESC", limit + 1)
+        else:
+            rows = []
+        if len(rows) <= limit:
+            tail = [] if after is None or after[0] is not None else [after[1]]
+            rows += fetch(
+                " AND created IS NULL" + (" AND ID < ?" if tail else ""), tail, "ID DESC", limit + 1 - len(rows)
+            )
+
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return {"rows": rows, "next": (rows[-1]["created"], rows[-1]["ID"]) if more else None}
+
+
+def queue_ticket_email(call_id: int, to_email: Optional[str] = None, queued_by: Optional[str] = None) -> int:
+    """Queue the ticket email (service order PDF attached by the sender) - core/email_outbox.py.
 
-def send_ticket_email(call_id: int, to_email: str = None) -> tuple[bool, str]:
-    """Manually send ticket email with PDF attachment
-    
     Args:
         call_id: Ticket ID
         to_email: Optional recipient email (defaults to admin email from settings)
+        queued_by: Email of the user who sent it
+
+    Returns the outbox id. Raises ValueError when the ticket or recipient is missing.
     """
-    from core.ticket_document import generate_ticket_pdf
-    from core.email_settings import send_email, get_email_settings
-    import os
-    
+    from core.email_outbox import enqueue_email
+    from core.email_settings import get_email_settings
+
     call = get_service_call(call_id)
     if not call:
-        return False, "Ticket not found"
-    
+        raise ValueError("Ticket not found")
+
     # Get recipient email
     if not to_email:
         settings = get_email_settings()
         to_email = settings.get("smtp_from")
-    
+
     if not to_email:
-        return False, "Recipient email not provided and admin email not configured"
-    
-    # Generate PDF
-    try:
-        pdf_path, pdf_bytes = generate_ticket_pdf(call_id)
-        pdf_filename = os.path.basename(pdf_path)
-    except Exception as e:
-        return False, f"PDF generation failed: {e}"
-    
-    # Send email with PDF attachment
+        raise ValueError("Recipient email not provided and admin email not configured")
+
     subject = f"Service Ticket #{call_id} - {call.get('title', 'No Title')}"
     body = f"""Service ticket details attached.
 
@@ -217,16 +306,21 @@ Priority: {call.get('priority', 'N/A')}
 
 Please see attached PDF for complete details.
 """
-    
-    success, msg = send_email(
-        to_email=to_email,
-        subject=subject,
-        body=body,
-        pdf_attachment=pdf_bytes,
-        pdf_filename=pdf_filename
-    )
-    
-    return success, msg
+    return enqueue_email(to_email, subject, body, ticket_id=call_id, queued_by=queued_by)
+
+
+def send_ticket_email(call_id: int, to_email: str = None) -> tuple[bool, str]:
+    """Queue the ticket email with PDF attachment; delivery happens in the background.
+
+    Args:
+        call_id: Ticket ID
+        to_email: Optional recipient email (defaults to admin email from settings)
+    """
+    try:
+        outbox_id = queue_ticket_email(call_id, to_email)
+    except ValueError as e:
+        return False, str(e)
+    return True, f"Email queued (#{outbox_id})"
 
 
 def update_service_call(call_id: int, data: Dict[str, Any]) -> bool:
@@ -246,14 +340,22 @@ def update_service_call(call_id: int, data: Dict[str, Any]) -> bool:
     with get_conn() as conn:
         cur = conn.execute(query, tuple(params))
         conn.commit()
-        return cur.rowcount > 0
+        updated = cur.rowcount > 0
+    if updated:
+        forget_pdfs(f"ticket-{call_id}")
+        publish("tickets")
+    return updated
 
 
 def delete_service_call(call_id: int) -> bool:
     with get_conn() as conn:
         cur = conn.execute("DELETE FROM ServiceCalls WHERE ID = ?", (call_id,))
         conn.commit()
-        return cur.rowcount > 0
+        deleted = cur.rowcount > 0
+    if deleted:
+        forget_pdfs(f"ticket-{call_id}")
+        publish("tickets")
+    return deleted
 
 
 # -------------------------------------------------
@@ -313,8 +415,19 @@ def create_ticket(data: Dict[str, Any]) -> int:
 def get_service_call_stats(customer_id: Optional[int] = None) -> Dict[str, Any]:
     """
     Return basic statistics for service calls.
-    Used by pages/tickets.py.
+    Used by pages/tickets.py and the dashboard ticket tiles. Reads the
+    trigger-maintained StatCounters (core/stat_counters.py) when they exist.
     """
+    counters = get_stat_counters(customer_id)
+    if counters is not None:
+        return {
+            "total": counters.get("tickets", 0),
+            "open": counters.get("tickets:Open", 0),
+            "in_progress": counters.get("tickets:In Progress", 0),
+            "closed": counters.get("tickets:Closed", 0),
+            "emergency": counters.get("emergency", 0),
+        }
+
     where = ""
     params = []
 
@@ -327,7 +440,8 @@ def get_service_call_stats(customer_id: Optional[int] = None) -> Dict[str, Any]:
         COUNT(*) AS total,
         SUM(CASE WHEN status = 'Open' THEN 1 ELSE 0 END) AS open,
         SUM(CASE WHEN status = 'In Progress' THEN 1 ELSE 0 END) AS in_progress,
-        SUM(CASE WHEN status = 'Closed' THEN 1 ELSE 0 END) AS closed
+        SUM(CASE WHEN status = 'Closed' THEN 1 ELSE 0 END) AS closed,
+        SUM(CASE WHEN priority = 'Emergency' AND status IS NOT 'Closed' THEN 1 ELSE 0 END) AS emergency
     FROM ServiceCalls
     {where}
     """
@@ -339,14 +453,25 @@ def get_service_call_stats(customer_id: Optional[int] = None) -> Dict[str, Any]:
             "open": 0,
             "in_progress": 0,
             "closed": 0,
+            "emergency": 0,
         }
 
 def search_service_calls(search: str, customer_id: Optional[int] = None):
     """
     Search service calls by ticket ID, title, or description.
     Used by pages/tickets.py.
+
+    Ranked FTS5 prefix search (core/search_index.py); an all-digit search
+    also matches the ticket ID exactly and ranks it first.
     """
-    query = """
+    hits = ranked_hits(
+        "service_calls", (search or "").strip(), limit=50,
+        where="t.customer_id = ?" if customer_id else None,
+        where_params=[customer_id] if customer_id else [],
+    )
+    source = f"({hits[0]}) h JOIN ServiceCalls sc ON sc.ID = h.hit_id" if hits else "ServiceCalls sc"
+
+    query = f"""
     SELECT
         sc.*,
         COALESCE(
@@ -356,23 +481,30 @@ def search_service_calls(search: str, customer_id: Optional[int] = None):
         ) AS customer_name,
         COALESCE(NULLIF(p.address1, ''), NULLIF(p.address2, '')) AS location_address,
         u.unit_tag AS unit_name
-    FROM ServiceCalls sc
+    FROM {source}
     LEFT JOIN Customers c ON sc.customer_id = c.ID
     LEFT JOIN PropertyLocations p ON sc.location_id = p.ID
     LEFT JOIN Units u ON sc.unit_id = u.unit_id
-    WHERE (
-        CAST(sc.ID AS TEXT) LIKE ?
-        OR sc.title LIKE ?
-        OR sc.description LIKE ?
-    )
+    WHERE 1=1
     """
-    params = [f"%{search}%", f"%{search}%", f"%{search}%"]
+    if hits:
+        params = list(hits[1])
+    else:
+        # No FTS5 index (or no words to match): substring scan
+        query += """
+        AND (
+            CAST(sc.ID AS TEXT) LIKE ?
+            OR sc.title LIKE ?
+            OR sc.description LIKE ?
+        )
+        """
+        params = [f"%{search}%", f"%{search}%", f"%{search}%"]
 
     if customer_id:
         query += " AND sc.customer_id = ?"
         params.append(customer_id)
 
-    query += " ORDER BY sc.created DESC LIMIT 50"
+    query += " ORDER BY h.hit_rank, sc.created DESC LIMIT 50" if hits else " ORDER BY sc.created DESC LIMIT 50"
 
     with get_conn() as conn:
         rows = conn.execute(query, tuple(params)).fetchall()
@@ -0,0 +1,424 @@
+"""
+Unit Alerts
+Streaming, stateful alert evaluation and the alert lifecycle table.
+
+New readings are evaluated in arrival order (reading_id after the
+watermark) against the 'alerts' ruleset of core.alert_rules. Per unit and
+rule the tracker keeps debounce counters: an alert opens after
+`open_after` consecutive matching readings and clears after `clear_after`
+consecutive readings past the rule's hysteresis band, so a value hovering
+at a threshold does not flap. Transitions go to UnitAlerts
+(open -> acked -> cleared) in the same transaction that moves the
+watermark, so every reading is evaluated exactly once. Each batch first
+goes through core.alert_batch in one vectorized pass; readings that match
+no rule are skipped unless their unit has alerts being tracked.
+
+The telemetry writer triggers the 'alerts' maintenance job after each
+batch; the job also runs every EVAL_INTERVAL seconds for readings written
+by other paths. The first run seeds open alerts from each unit's latest
+reading instead of replaying history.
+"""
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.alert_batch import evaluate_alerts_batch, readings_to_columns
+from core.alert_rules import READING_METRICS, derive_metrics, format_alert, get_rule_engine
+from core.db import get_conn
+from core.live_hub import publish
+from core.stat_counters import get_stat_counters
+
+ALERTS_SQL = Path(__file__).resolve().parents[1] / "schema" / "unit_alerts.sql"
+OPEN_AFTER = int(os.getenv("ALERT_OPEN_AFTER", "2"))            # matching readings in a row before an alert opens
+CLEAR_AFTER = int(os.getenv("ALERT_CLEAR_AFTER", "3"))          # normal readings in a row before it clears
+EVAL_BATCH = int(os.getenv("ALERT_EVAL_BATCH", "5000"))         # readings per transaction
+EVAL_INTERVAL = float(os.getenv("ALERT_EVAL_INTERVAL", "30"))   # seconds; the writer triggers runs sooner
+
+STATUSES = ("open", "acked", "cleared")
+_COLUMNS = ("reading_id", "unit_id", "ts", *READING_METRICS, "mode", "fault_code")
+
+# Tracker entry: [active, consecutive hits, consecutive misses, alert_id]
+_ACTIVE, _HITS, _MISSES, _ALERT_ID = range(4)
+
+
+def ensure_unit_alerts_table() -> None:
+    """Create UnitAlerts and its watermark (idempotent)."""
+    with get_conn() as conn:
+        conn.executescript(ALERTS_SQL.read_text(encoding="utf-8"))
+
+
+# =========================================================
+# TRACKER
+# =========================================================
+
+class AlertTracker:
+    """Per-unit alert state machine fed by new readings."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Optional[Dict[int, Dict[str, List[Any]]]] = None   # unit_id -> code -> entry
+        self._watermark: Optional[int] = None
+        self._compiled: Optional[Dict[str, Any]] = None   # rule set the state was built for
+        self._stats = {
+            "runs": 0,
+            "readings": 0,
+            "opened": 0,
+            "cleared": 0,
+            "errors": 0,
+            "total_ms": 0.0,
+            "last_run_ms": None,
+        }
+
+    # -------------------------
+    # State
+    # -------------------------
+
+    def _load(self) -> None:
+        """Active alerts and the watermark from the database (first run, or after a failed write)."""
+        state: Dict[int, Dict[str, List[Any]]] = {}
+        conn = get_conn()
+        try:
+            for r in conn.execute("SELECT alert_id, unit_id, code FROM UnitAlerts WHERE status != 'cleared'"):
+                state.setdefault(r["unit_id"], {})[r["code"]] = [True, 0, 0, r["alert_id"]]
+            row = conn.execute("SELECT last_reading_id FROM UnitAlertsWatermark WHERE id = 1").fetchone()
+        finally:
+            conn.close()
+        self._state = state
+        self._watermark = row[0] if row else None
+        self._compiled = None
+
+    def _fetch(self, after: int) -> List[sqlite3.Row]:
+        conn = get_conn()
+        try:
+            return conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM UnitReadings "
+                "WHERE reading_id > ? ORDER BY reading_id LIMIT ?",
+                (after, EVAL_BATCH),
+            ).fetchall()
+        finally:
+            conn.close()
+
+    def _seed_rows(self) -> Tuple[List[sqlite3.Row], int]:
+        """Latest reading of every unit + the newest reading_id (first run)."""
+        conn = get_conn()
+        try:
+            conn.execute("BEGIN")   # one snapshot for both queries
+            rows = conn.execute(
+                f"SELECT {', '.join('ur.' + c for c in _COLUMNS)} FROM UnitLatestReading lr "
+                "JOIN UnitReadings ur ON ur.reading_id = lr.reading_id ORDER BY ur.reading_id"
+            ).fetchall()
+            newest = conn.execute("SELECT COALESCE(MAX(reading_id), 0) FROM UnitReadings").fetchone()[0]
+            conn.rollback()
+        finally:
+            conn.close()
+        return rows, newest
+
+    # -------------------------
+    # Evaluation
+    # -------------------------
+
+    def _evaluate(self, rows: List[Any], compiled: Dict[str, Any], seed: bool = False):
+        """
+        Advance the state machines over `rows`. Returns (events, touches):
+        events are ordered ("open" | "clear", ...) transitions, touches the
+        still-active alerts seen again (entry id -> [entry, row, rule, metrics, n]).
+        """
+        state = self._state
+        rules = compiled["rules"]
+        states_of = compiled["states"]
+        codes = [r["code"] for r in rules]
+        limits = [(r["open_after"] or OPEN_AFTER, r["clear_after"] or CLEAR_AFTER) for r in rules]
+        events: List[Tuple[Any, ...]] = []
+        touches: Dict[int, List[Any]] = {}
+
+        if self._compiled is not compiled:
+            # Rules changed: alerts whose rule is gone (or disabled) are closed
+            self._compiled = compiled
+            current = set(codes)
+            for unit_id, unit in list(state.items()):
+                for code in [c for c in unit if c not in current]:
+                    entry = unit.pop(code)
+                    if entry[_ACTIVE]:
+                        events.append(("clear", entry, None, "rule removed"))
+                if not unit:
+                    del state[unit_id]
+
+        # One vectorized pass finds the readings that match any rule; a reading
+        # that matches none only matters for units with tracked alerts
+        matched = evaluate_alerts_batch(readings_to_columns(rows), with_codes=False, rules=rules,
+                                        record=False)["count"]
+
+        for row, hit in zip(rows, matched):
+            unit_id = row["unit_id"]
+            unit = state.get(unit_id)
+            if unit is None and not hit:
+                continue
+            m = derive_metrics(row)
+            results = states_of(m)
+
+            for i, s in enumerate(results):
+                code = codes[i]
+                entry = unit.get(code) if unit is not None else None
+                if s == 1:
+                    if entry is None:
+                        if unit is None:
+                            unit = state[unit_id] = {}
+                        entry = unit[code] = [False, 0, 0, None]
+                    entry[_MISSES] = 0
+                    entry[_HITS] += 1
+                    if entry[_ACTIVE]:
+                        touch = touches.get(id(entry))
+                        if touch is None:
+                            touches[id(entry)] = [entry, row, rules[i], m, 1]
+                        else:
+                            touch[1:] = [row, rules[i], m, touch[4] + 1]
+                    elif seed or entry[_HITS] >= limits[i][0]:
+                        entry[_ACTIVE] = True
+                        events.append(("open", entry, row, rules[i], m))
+                elif entry is None:
+                    continue
+                elif s == 0:
+                    entry[_HITS] = 0
+                    if entry[_ACTIVE]:
+                        entry[_MISSES] += 1
+                        if entry[_MISSES] >= limits[i][1]:
+                            del unit[code]
+                            events.append(("clear", entry, row, "normal"))
+                    else:
+                        del unit[code]
+                else:
+                    # Inside the hysteresis band or value missing: both streaks restart
+                    entry[_HITS] = entry[_MISSES] = 0
+                    if not entry[_ACTIVE]:
+                        del unit[code]
+
+            if unit is not None and not unit:
+                del state[unit_id]
+        return events, touches
+
+    def _write(self, conn, events, touches, watermark: int) -> Tuple[int, int]:
+        opened = cleared = 0
+        for event in events:
+            if event[0] == "open":
+                _, entry, row, rule, m = event
+                entry[_ALERT_ID] = _open_alert(conn, row, rule, m, entry[_HITS])
+                opened += 1
+            else:
+                _, entry, row, reason = event
+                if entry[_ALERT_ID] is None:
+                    continue
+                if row is None:
+                    conn.execute(
+                        "UPDATE UnitAlerts SET status = 'cleared', cleared_at = datetime('now'), clear_reason = ? "
+                        "WHERE alert_id = ? AND status != 'cleared'",
+                        (reason, entry[_ALERT_ID]),
+                    )
+                else:
+                    conn.execute(
+                        "UPDATE UnitAlerts SET status = 'cleared', cleared_at = ?, cleared_reading_id = ?, "
+                        "clear_reason = ? WHERE alert_id = ? AND status != 'cleared'",
+                        (row["ts"], row["reading_id"], reason, entry[_ALERT_ID]),
+                    )
+                cleared += 1
+
+        if touches:
+            conn.executemany(
+                """
+                UPDATE UnitAlerts
+                SET last_seen_at = ?, last_reading_id = ?, severity = ?, message = ?, readings = readings + ?
+                WHERE alert_id = ?
+                """,
+                [
+                    (row["ts"], row["reading_id"], rule["severity"], format_alert(rule, m)["message"], n,
+                     entry[_ALERT_ID])
+                    for entry, row, rule, m, n in touches.values()
+                    if entry[_ALERT_ID] is not None
+                ],
+            )
+
+        conn.execute(
+            """
+            INSERT INTO UnitAlertsWatermark (id, last_reading_id, updated) VALUES (1, ?, datetime('now'))
+            ON CONFLICT(id) DO UPDATE SET last_reading_id = excluded.last_reading_id, updated = excluded.updated
+            """,
+            (watermark,),
+        )
+        return opened, cleared
+
+    def process(self) -> Dict[str, int]:
+        """
+        Evaluate every reading after the watermark, EVAL_BATCH per
+        transaction. Returns counts for this run.
+        """
+        result = {"readings": 0, "opened": 0, "cleared": 0}
+        started = time.perf_counter()
+        with self._lock:
+            try:
+                if self._state is None:
+                    self._load()
+                engine = get_rule_engine()
+
+                if self._watermark is None:
+                    rows, newest = self._seed_rows()
+                    self._step(rows, engine.compiled("alerts"), newest, result, seed=True)
+
+                while True:
+                    rows = self._fetch(self._watermark)
+                    if not rows:
+                        break
+                    self._step(rows, engine.compiled("alerts"), rows[-1]["reading_id"], result)
+                    if len(rows) < EVAL_BATCH:
+                        break
+            except Exception:
+                self._stats["errors"] += 1
+                self._state = None   # rebuilt from UnitAlerts next run; the watermark did not move
+                raise
+            finally:
+                elapsed_ms = (time.perf_counter() - started) * 1000.0
+                self._stats["runs"] += 1
+                self._stats["total_ms"] += elapsed_ms
+                self._stats["last_run_ms"] = round(elapsed_ms, 3)
+                for key, n in result.items():
+                    self._stats[key] += n
+        if result["opened"] or result["cleared"]:
+            publish("alerts")
+        return result
+
+    def _step(self, rows, compiled, watermark: int, result: Dict[str, int], seed: bool = False) -> None:
+        # Caller holds self._lock
+        events, touches = self._evaluate(rows, compiled, seed=seed)
+        with get_conn() as conn:
+            opened, cleared = self._write(conn, events, touches, watermark)
+        self._watermark = watermark
+        result["readings"] += len(rows)
+        result["opened"] += opened
+        result["cleared"] += cleared
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["total_ms"] = round(out["total_ms"], 3)
+            out["avg_us_per_reading"] = (
+                round(self._stats["total_ms"] * 1000.0 / out["readings"], 3) if out["readings"] else None
+            )
+            out["watermark"] = self._watermark
+            out["tracked_units"] = len(self._state) if self._state is not None else None
+        return out
+
+
+def _open_alert(conn, row, rule: Dict[str, Any], metrics: Dict[str, Any], readings: int) -> int:
+    alert = format_alert(rule, metrics)
+    params = (
+        row["unit_id"], rule["code"], rule["category"], rule["severity"], alert["message"], alert["parameter"],
+        max(1, readings), row["ts"], row["reading_id"], row["ts"], row["reading_id"],
+    )
+    try:
+        cur = conn.execute(
+            """
+            INSERT INTO UnitAlerts (unit_id, code, category, severity, message, parameter, readings,
+                                    opened_at, opened_reading_id, last_seen_at, last_reading_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            params,
+        )
+        return cur.lastrowid
+    except sqlite3.IntegrityError:
+        # Already active (opened by another process): keep that one
+        found = conn.execute(
+            "SELECT alert_id FROM UnitAlerts WHERE unit_id = ? AND code = ? AND status != 'cleared'",
+            (row["unit_id"], rule["code"]),
+        ).fetchone()
+        if found is None:
+            raise   # unknown unit_id
+        return found[0]
+
+
+_tracker: Optional[AlertTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_alert_tracker() -> AlertTracker:
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                _tracker = AlertTracker()
+    return _tracker
+
+
+def reset_alert_tracker() -> None:
+    """Forget in-memory state (tests, after switching databases)."""
+    global _tracker
+    with _tracker_lock:
+        _tracker = None
+
+
+def process_new_readings() -> Dict[str, int]:
+    """Maintenance job: evaluate readings written since the last run."""
+    return get_alert_tracker().process()
+
+
+# =========================================================
+# QUERIES / ACTIONS
+# =========================================================
+
+def acknowledge_alert(alert_id: int, user: Optional[str] = None) -> bool:
+    """Mark an open alert as acknowledged. It stays active until the readings clear it."""
+    with get_conn() as conn:
+        cur = conn.execute(
+            "UPDATE UnitAlerts SET status = 'acked', acked_at = datetime('now'), acked_by = ? "
+            "WHERE alert_id = ? AND status = 'open'",
+            (user, int(alert_id)),
+        )
+        acked = cur.rowcount > 0
+    if acked:
+        publish("alerts")
+    return acked
+
+
+def count_active_alerts(customer_id: Optional[int] = None) -> int:
+    """Open + acknowledged alerts, optionally for one customer's units."""
+    counters = get_stat_counters(customer_id)
+    if counters is not None:
+        return counters.get("active_alerts", 0)
+
+    conn = get_conn()
+    try:
+        if customer_id:
+            row = conn.execute(
+                """
+                SELECT COUNT(*)
+                FROM UnitAlerts a
+                JOIN Units u ON a.unit_id = u.unit_id
+                JOIN PropertyLocations pl ON u.location_id = pl.ID
+                WHERE a.status != 'cleared' AND pl.customer_id = ?
+                """,
+                (int(customer_id),),
+            ).fetchone()
+        else:
+            row = conn.execute("SELECT COUNT(*) FROM UnitAlerts WHERE status != 'cleared'").fetchone()
+    except sqlite3.OperationalError:
+        return 0   # table not created yet
+    finally:
+        conn.close()
+    return int(row[0])
+
+
+def get_active_alerts(unit_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Open + acknowledged alerts, most severe and newest first."""
+    conn = get_conn()
+    try:
+        rows = conn.execute(
+            f"""
+            SELECT * FROM UnitAlerts
+            WHERE status != 'cleared' {'AND unit_id = ?' if unit_id else ''}
+            ORDER BY CASE severity WHEN 'critical' THEN 0 WHEN 'warning' THEN 1 ELSE 2 END, opened_at DESC
+            """,
+            (int(unit_id),) if unit_id else (),
+        ).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
@@ -1,108 +1,222 @@
 # core/unit_status.py
-# Junior module to get current status / sensor data for a HVAC unit
-# Fake data generator for development (skeleton phase)
-# Later: replace fake logic with real DB queries or hardware reads
+"""
+Unit Status
+Current monitoring status of HVAC units (equipment table), from each unit's
+newest reading in UnitLatestReading.
 
-import random
-from datetime import datetime, timedelta
+UnitStatusService answers any number of units with one query. The status
+colour / message ('status' rules in core/alert_rules, first match wins) is
+computed once per reading and cached: entries expire after STATUS_TTL
+seconds, and the ingest writer drops a unit's entry as soon as it stores a
+newer reading (invalidate()). An expired entry whose unit has no newer
+reading keeps its computed status; only the latest-reading lookup is redone.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-def get_unit_status(unit_id: int, location_id: int = None):
-    """
-    Get current monitoring status for one unit.
-    Returns: dict with sensor values, mode, alerts — easy to use in UI/tables
-    Fake but realistic ranges based on typical RTU/AHU HVAC data
-    """
-    # Step 1: Pick current operating mode (weighted - cooling more common)
-    modes = ["Off", "Idle", "Cooling", "Heating", "Economizer", "Fault"]
-    weights = [8, 25, 40, 15, 7, 5]  # Cooling highest probability for now
-    mode = random.choices(modes, weights=weights)[0]
-
-    # Step 2: Generate sensor readings based on mode
-    outdoor_temp = random.uniform(35.0, 95.0)  # NJ-like outdoor range
-
-    if mode == "Cooling":
-        supply_temp = random.uniform(52.0, 60.0)     # Typical target ~55°F
-        return_temp = random.uniform(70.0, 80.0)     # Indoor average
-        fan_speed = random.randint(75, 100)          # High fan for cooling
-    elif mode == "Heating":
-        supply_temp = random.uniform(95.0, 115.0)    # Furnace/heat rise
-        return_temp = random.uniform(68.0, 74.0)
-        fan_speed = random.randint(60, 90)
-    elif mode == "Economizer":
-        supply_temp = outdoor_temp + random.uniform(-8.0, 2.0)
-        return_temp = random.uniform(70.0, 78.0)
-        fan_speed = random.randint(70, 100)
-    else:
-        supply_temp = random.uniform(65.0, 78.0)
-        return_temp = supply_temp + random.uniform(-5.0, 5.0)
-        fan_speed = 0 if mode == "Off" else random.randint(30, 60)
-
-    delta_t = round(supply_temp - return_temp, 1)
-    abs_delta = abs(delta_t)  # Absolute value for diagnostic checks
-
-    # Step 3: Runtime hours (fake cumulative)
-    runtime_hours = random.randint(300, 18000)
-
-    # Step 4: Last update time (pretend recent)
-    minutes_ago = random.randint(1, 60)
-    last_update = datetime.now() - timedelta(minutes=minutes_ago)
-    last_update_str = last_update.strftime("%Y-%m-%d %H:%M:%S")
-
-    # Step 5: Alert / fault detection (simple if/else rules)
-    status_color = "green"
-    alert_message = ""
-    alert_level = "normal"
-
-    if mode == "Fault":
-        status_color = "red"
-        alert_message = "Unit in fault mode"
-        alert_level = "critical"
-
-    elif mode == "Cooling":
-        if abs_delta < 14.0:
-            status_color = "red"
-            alert_message = "Low Delta T (cooling fault?) - check refrigerant/airflow/coil"
-            alert_level = "critical"
-        elif abs_delta < 16.0:
-            status_color = "yellow"
-            alert_message = "Marginal Delta T - possible low charge or dirty filter"
-            alert_level = "warning"
-        elif supply_temp > 62.0:
-            status_color = "yellow"
-            alert_message = "High supply temp - cooling underperforming"
-            alert_level = "warning"
-
-    elif mode == "Heating":
-        if abs_delta < 30.0:
-            status_color = "red"
-            alert_message = "Low heat rise - check heat exchanger/fan"
-            alert_level = "critical"
-
-    elif fan_speed == 0 and mode not in ["Off", "Idle"]:
-        status_color = "red"
-        alert_message = "Fan stopped during operation"
-        alert_level = "critical"
-
-    # Final return dict - all info in one place
+from core.alert_rules import get_rule_engine
+from core.db import get_conn
+
+STATUS_TTL = float(os.getenv("UNIT_STATUS_TTL", "10"))   # seconds a cached status is served without a lookup
+
+# Rule severity -> status colour shown in the equipment table
+STATUS_COLORS = {"critical": "red", "warning": "yellow", "info": "green"}
+NO_DATA_COLOR = "grey"
+
+_CHUNK = 500   # unit ids per IN (...) lookup
+
+_LATEST_SQL = """
+SELECT ur.*
+FROM UnitLatestReading lr
+JOIN UnitReadings ur ON ur.reading_id = lr.reading_id
+WHERE lr.unit_id IN ({marks})
+"""
+
+
+def _round(value: Any, digits: int = 1) -> Optional[float]:
+    try:
+        return round(float(value), digits) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def status_from_reading(unit_id: int, reading: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Status dict for one unit from its newest reading (None: the unit never reported)."""
+    if reading is None:
+        return {
+            "unit_id": unit_id,
+            "mode": "No data",
+            "supply_temp_f": None,
+            "return_temp_f": None,
+            "delta_t_f": None,
+            "outdoor_temp_f": None,
+            "fan_speed_percent": None,
+            "runtime_hours": None,
+            "last_update": None,
+            "status_color": NO_DATA_COLOR,
+            "alert_message": "No readings received",
+            "alert_level": "normal",
+        }
+
+    supply, ret = _round(reading.get("supply_temp")), _round(reading.get("return_temp"))
+    delta_t = _round(reading.get("delta_t"))
+    if delta_t is None and supply is not None and ret is not None:
+        delta_t = round(supply - ret, 1)
+
+    status_color, alert_message, alert_level = "green", "", "normal"
+    hit = get_rule_engine().first_match(reading, "status")
+    if hit:
+        status_color = STATUS_COLORS.get(hit["severity"], "yellow")
+        alert_message = hit["message"]
+        alert_level = hit["severity"]
+
+    fan = _round(reading.get("fan_speed_percent"), 0)
     return {
         "unit_id": unit_id,
-        "mode": mode,
-        "supply_temp_f": round(supply_temp, 1),
-        "return_temp_f": round(return_temp, 1),
+        "mode": reading.get("mode") or "Unknown",
+        "supply_temp_f": supply,
+        "return_temp_f": ret,
         "delta_t_f": delta_t,
-        "outdoor_temp_f": round(outdoor_temp, 1),
-        "fan_speed_percent": fan_speed,
-        "runtime_hours": runtime_hours,
-        "last_update": last_update_str,
+        "outdoor_temp_f": _round(reading.get("o_temp")),
+        "fan_speed_percent": int(fan) if fan is not None else None,
+        "runtime_hours": _round(reading.get("runtime_hours")),
+        "last_update": reading.get("ts"),
         "status_color": status_color,
         "alert_message": alert_message,
         "alert_level": alert_level,
     }
 
 
-# Quick test block - run this file alone to see examples
-if __name__ == "__main__":
-    print("Example status for unit 101:")
-    print(get_unit_status(101))
-    print("\nExample status for unit 202:")
-    print(get_unit_status(202))
\ No newline at end of file
+class UnitStatusService:
+    """Bulk unit status with a per-unit TTL cache keyed on the latest reading."""
+
+    def __init__(self, ttl: float = STATUS_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # unit_id -> (expires at, reading_id, compiled 'status' rules, status)
+        self._cache: Dict[int, Tuple[float, Optional[int], Any, Dict[str, Any]]] = {}
+        self._stats = {"hits": 0, "lookups": 0, "queries": 0, "computed": 0, "invalidated": 0}
+        self._generation = 0   # bumped by invalidate(): lookups that raced it are not cached
+
+    def get_many(self, unit_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """{unit_id: status} for every requested unit (one query for all cache misses)."""
+        ids = list(dict.fromkeys(int(u) for u in unit_ids))
+        now = time.monotonic()
+        rules = get_rule_engine().compiled("status")   # a rule reload makes every cached status stale
+
+        out: Dict[int, Dict[str, Any]] = {}
+        missing: List[int] = []
+        with self._lock:
+            for unit_id in ids:
+                entry = self._cache.get(unit_id)
+                if entry and entry[0] > now and entry[2] is rules:
+                    out[unit_id] = entry[3]
+                else:
+                    missing.append(unit_id)
+            self._stats["hits"] += len(out)
+            generation = self._generation
+        if not missing:
+            return out
+
+        latest = self._latest(missing)
+        computed = 0
+        for unit_id in missing:
+            reading = latest.get(unit_id)
+            reading_id = reading["reading_id"] if reading else None
+            with self._lock:
+                entry = self._cache.get(unit_id)
+            if entry and entry[1] == reading_id and entry[2] is rules:
+                status = entry[3]   # same reading: already computed
+            else:
+                status = status_from_reading(unit_id, reading)
+                computed += 1
+            with self._lock:
+                if self._generation == generation:
+                    self._cache[unit_id] = (now + self.ttl, reading_id, rules, status)
+            out[unit_id] = status
+
+        with self._lock:
+            self._stats["lookups"] += len(missing)
+            self._stats["computed"] += computed
+        return out
+
+    def get(self, unit_id: int) -> Dict[str, Any]:
+        return self.get_many([unit_id])[int(unit_id)]
+
+    def invalidate(self, unit_ids: Optional[Iterable[int]] = None) -> None:
+        """Drop cached statuses (new readings arrived); all units when unit_ids is None."""
+        with self._lock:
+            self._generation += 1
+            if unit_ids is None:
+                dropped = len(self._cache)
+                self._cache.clear()
+            else:
+                dropped = sum(self._cache.pop(int(u), None) is not None for u in unit_ids)
+            self._stats["invalidated"] += dropped
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["cached"] = len(self._cache)
+        out["ttl"] = self.ttl
+        return out
+
+    def _latest(self, unit_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        latest: Dict[int, Dict[str, Any]] = {}
+        queries = 0
+        with get_conn() as conn:
+            for i in range(0, len(unit_ids), _CHUNK):
+                chunk = unit_ids[i:i + _CHUNK]
+                rows = conn.execute(_LATEST_SQL.format(marks=", ".join("?" * len(chunk))), chunk).fetchall()
+                queries += 1
+                for row in rows:
+                    latest[int(row["unit_id"])] = dict(row)
+        with self._lock:
+            self._stats["queries"] += queries
+        return latest
+
+
+_service: Optional[UnitStatusService] = None
+_service_lock = threading.Lock()
+
+
+def get_unit_status_service() -> UnitStatusService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = UnitStatusService()
+    return _service
+
+
+def reset_unit_status_service() -> None:
+    """Forget the shared service (tests / after a database swap)."""
+    global _service
+    with _service_lock:
+        _service = None
+
+
+def get_unit_statuses(unit_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Current status for many units at once: {unit_id: status dict}."""
+    return get_unit_status_service().get_many(unit_ids)
+
+
+def get_unit_status(unit_id: int, location_id: int = None) -> Dict[str, Any]:
+    """
+    Get current monitoring status for one unit.
+    Returns: dict with sensor values, mode, alerts — easy to use in UI/tables.
+    Tables should call get_unit_statuses() once for all their rows.
+    """
+    return get_unit_status_service().get(unit_id)
+
+
+def invalidate_unit_status(unit_ids: Optional[Iterable[int]] = None) -> None:
+    """Called by the ingest writer after it stores readings for these units."""
+    if _service is not None:
+        _service.invalidate(unit_ids)
+
+
+def get_unit_status_stats() -> Dict[str, Any]:
+    return get_unit_status_service().stats()
@@ -5,6 +5,10 @@
 
 from typing import List, Dict, Any, Optional
 from core.db import get_conn
+from core.live_hub import publish
+from core.pdf_cache import forget_pdfs
+from core.paged_query import PagedQuery, search_filter
+from core.search_index import ranked_hits
 
 
 print(">>> LOADED units_repo.py FROM:", __file__)
@@ -37,6 +41,8 @@ def set_ticket_units(ticket_id: int, unit_ids: List[int]) -> None:
                 (ticket_id, unit_id, idx)
             )
         conn.commit()
+    forget_pdfs(f"ticket-{ticket_id}")
+    publish("tickets")
 
 
 # ---------------------------------------------------------
@@ -44,18 +50,27 @@ def set_ticket_units(ticket_id: int, unit_ids: List[int]) -> None:
 # ---------------------------------------------------------
 
 def list_units(search: str = "", location_id: Optional[int] = None) -> List[Dict[str, Any]]:
-    query = """
-    SELECT *
-    FROM Units
+    # Ranked FTS5 prefix search (core/search_index.py), best match first
+    hits = ranked_hits(
+        "units", search.strip(),
+        where="t.location_id = ?" if location_id else None,
+        where_params=[location_id] if location_id else [],
+    ) if search else None
+    source = f"({hits[0]}) h JOIN Units ON Units.unit_id = h.hit_id" if hits else "Units"
+
+    query = f"""
+    SELECT Units.*
+    FROM {source}
     WHERE 1=1
     """
-    params = []
+    params = list(hits[1]) if hits else []
 
     if location_id:
         query += " AND location_id = ?"
         params.append(location_id)
 
-    if search:
+    if search and not hits:
+        # No FTS5 index (or no words to match): substring scan
         query += """
         AND (
             unit_tag LIKE ?
@@ -67,7 +82,7 @@ def list_units(search: str = "", location_id: Optional[int] = None) -> List[Dict
         s = f"%{search}%"
         params.extend([s, s, s, s])
 
-    query += " ORDER BY unit_id"
+    query += " ORDER BY h.hit_rank" if hits else " ORDER BY unit_id"
 
     with get_conn() as conn:
         cursor = conn.execute(query, tuple(params))
@@ -75,6 +90,18 @@ def list_units(search: str = "", location_id: Optional[int] = None) -> List[Dict
         return [dict(row) for row in rows]
 
 
+def units_query(location_id: int) -> PagedQuery:
+    """Server-side Equipment table for one location (core/paged_query.py); filter: search."""
+    return PagedQuery(
+        source="Units",
+        key="unit_id",
+        where=["location_id = ?"],
+        params=[location_id],
+        sort_columns={"unit_tag": "unit_tag", "make": "make", "model": "model", "serial": "serial"},
+        filters={"search": search_filter("units", "unit_id", ["unit_tag", "make", "model", "serial"])},
+    )
+
+
 # ---------------------------------------------------------
 # GET SINGLE UNIT BY ID (🔥 REQUIRED BY ISSUE DIALOG)
 # ---------------------------------------------------------
@@ -1,17 +1,34 @@
 """Version management for GCC Monitoring app"""
 import json
 from pathlib import Path
+from typing import List, TypedDict
 
-def get_version_info():
-    """Load version info from VERSION file (reads fresh every time)"""
+from core.settings_cache import cached_file
+
+# VERSION file is in the project root, parent of core/
+VERSION_FILE = Path(__file__).parent.parent / "VERSION"
+
+
+class VersionInfo(TypedDict, total=False):
+    software_name: str
+    version: str
+    build_date: str
+    release_date: str
+    description: str
+    features: List[str]
+
+
+def _read_version_file(path: Path) -> VersionInfo:
     try:
-        # VERSION file is in the project root, parent of core/
-        version_file = Path(__file__).parent.parent / "VERSION"
-        if version_file.exists():
-            with open(version_file, "r") as f:
-                return json.load(f)
+        with open(path, "r") as f:
+            return json.load(f)
     except Exception:
-        pass
+        return {}
+
+
+def get_version_info() -> VersionInfo:
+    """Load version info from VERSION file (cached; re-read when the file changes, {} if missing)"""
+    return cached_file("version_info", VERSION_FILE, _read_version_file)
 
 def get_software_name():
     """Get software name (e.g., 'GCC Monitoring')"""
@@ -21,6 +38,6 @@ def get_version():
     """Get version string (e.g., '1.0.0')"""
     return get_version_info().get("version", "1.0.0")
 
-def get_build_info():
+def get_build_info() -> VersionInfo:
     """Get full build info as dict"""
     return get_version_info()
@@ -1,7 +1,8 @@
 from nicegui import ui
 from core.auth import require_login, is_admin, logout
 from ui.layout import layout
-from core.customers_repo import list_customers, create_customer, update_customer, delete_customer
+from ui.table_page import ServerTable
+from core.customers_repo import customers_query, create_customer, update_customer, delete_customer
 from core.logger import log_user_action, log_error, handle_error
 
 def page():
@@ -41,13 +42,13 @@ def page():
         with ui.card().classes("gcc-card").style("height: calc(100vh - 350px); display: flex; flex-direction: column;"):
             table = ui.table(
                 columns=[
-                    {"name": "ID", "label": "ID", "field": "ID"},
-                    {"name": "company", "label": "Company", "field": "company"},
-                    {"name": "name", "label": "Name", "field": "name"},
-                    {"name": "email", "label": "Email", "field": "email"},
-                    {"name": "phone1", "label": "Phone", "field": "phone1"},
-                    {"name": "city", "label": "City", "field": "city"},
-                    {"name": "state", "label": "State", "field": "state"},
+                    {"name": "ID", "label": "ID", "field": "ID", "sortable": True},
+                    {"name": "company", "label": "Company", "field": "company", "sortable": True},
+                    {"name": "name", "label": "Name", "field": "name", "sortable": True},
+                    {"name": "email", "label": "Email", "field": "email", "sortable": True},
+                    {"name": "phone1", "label": "Phone", "field": "phone1", "sortable": True},
+                    {"name": "city", "label": "City", "field": "city", "sortable": True},
+                    {"name": "state", "label": "State", "field": "state", "sortable": True},
                 ],
                 rows=[],
                 row_key="ID",
@@ -56,12 +57,14 @@ def page():
             ).classes("w-full").style("flex: 1; min-height: 0;")
             table.props("dense bordered virtual-scroll")
 
+        # Sorted, filtered and paged in SQL: only the visible page is sent
+        grid = ServerTable(table, customers_query(), rows_per_page=15,
+                           filters=lambda: {"search": search.value}, descending=True)
+
         def refresh():
-            rows = list_customers(search.value or "")
-            for r in rows:
-                r["name"] = f"{r.get('first_name','')} {r.get('last_name','')}".strip()
-            table.rows = rows
-            table.update()
+            grid.refresh()
+
+        search.on("update:model-value", lambda e: grid.refresh(first_page=True), throttle=0.3)
 
         def open_customer_dialog(mode: str):
             selected = table.selected[0] if table.selected else None
@@ -7,12 +7,15 @@ from typing import Optional, Any, List, Dict, Tuple
 from core.auth import require_login, current_user
 from core.db import get_conn
 from core.equipment_analysis import calculate_equipment_health_score
-from core.alert_system import evaluate_all_alerts
+from core.unit_alerts import count_active_alerts
+from core.live_hub import feed_data, get_live_hub
 from core.stats import get_summary_counts
 from core.version import get_version, get_build_info
 from core.setpoints_repo import get_unit_setpoint, create_or_update_setpoint
 from ui.layout import layout
 from ui.unit_issue_dialog import open_unit_issue_dialog
+from ui.live import live_subscribe, live_unsubscribe
+from ui.ticket_grid import KeysetGrid, add_ticket_slots
 from core.logger import log_user_action, with_error_handling
 
 
@@ -85,18 +88,24 @@ def _build_location_text(data: dict) -> str:
     return ", ".join([p for p in parts if p]).strip() or "—"
 
 
+def _metric(data: dict, key: str):
+    """Reading value for display; keeps 0 / 0.0 (numeric columns), blanks become '—'."""
+    value = data.get(key)
+    return "—" if value is None or value == "" else value
+
+
 def _compose_autodesc(data: dict, alerts: dict) -> str:
-    supply = data.get("supply_temp") or "—"
-    ret = data.get("return_temp") or "—"
-    delta_t = data.get("delta_t") or "—"
-    discharge = data.get("discharge_psi") or "—"
-    suction = data.get("suction_psi") or "—"
-    superheat = data.get("superheat") or "—"
-    subcool = data.get("subcooling") or "—"
-    amps = data.get("compressor_amps") or "—"
-    v1 = data.get("v_1") or "—"
-    v2 = data.get("v_2") or "—"
-    v3 = data.get("v_3") or "—"
+    supply = _metric(data, "supply_temp")
+    ret = _metric(data, "return_temp")
+    delta_t = _metric(data, "delta_t")
+    discharge = _metric(data, "discharge_psi")
+    suction = _metric(data, "suction_psi")
+    superheat = _metric(data, "superheat")
+    subcool = _metric(data, "subcooling")
+    amps = _metric(data, "compressor_amps")
+    v1 = _metric(data, "v_1")
+    v2 = _metric(data, "v_2")
+    v3 = _metric(data, "v_3")
     primary_issue = data.get("fault_code") or "None"
 
     lines: List[str] = [
@@ -140,20 +149,14 @@ def get_unit_stats(customer_id: Optional[int] = None) -> dict:
     try:
         cursor = conn.cursor()
 
-        filters = [
-            """
-            ur.reading_id IN (
-                SELECT MAX(reading_id) FROM UnitReadings GROUP BY unit_id
-            )
-            """
-        ]
+        filters: list[str] = []
         params: list[Any] = []
 
         if customer_id:
             filters.append("c.ID = ?")
             params.append(int(customer_id))
 
-        where_sql = "WHERE " + " AND ".join(filters)
+        where_sql = ("WHERE " + " AND ".join(filters)) if filters else ""
 
         rows = cursor.execute(
             f"""
@@ -167,8 +170,9 @@ def get_unit_stats(customer_id: Optional[int] = None) -> dict:
                 pl.address1 AS location,
                 c.company AS customer,
                 c.ID as customer_id
-            FROM UnitReadings ur
-            JOIN Units u ON ur.unit_id = u.unit_id
+            FROM UnitLatestReading lr
+            JOIN UnitReadings ur ON ur.reading_id = lr.reading_id
+            JOIN Units u ON lr.unit_id = u.unit_id
             JOIN PropertyLocations pl ON u.location_id = pl.ID
             JOIN Customers c ON pl.customer_id = c.ID
             {where_sql}
@@ -177,22 +181,18 @@ def get_unit_stats(customer_id: Optional[int] = None) -> dict:
             tuple(params),
         ).fetchall()
 
-        units: list[dict] = []
+        units: list[dict] = [dict(r) for r in rows]
         health_data: dict[int, dict[str, Any]] = {}
-        alerts_count = 0
 
-        for r in rows:
-            row = dict(r)
+        for row in units:
             health = calculate_equipment_health_score(row)
-            alerts = evaluate_all_alerts(row)
-
-            uid = int(row["unit_id"])
-            health_data[uid] = {
+            health_data[int(row["unit_id"])] = {
                 "score": int(health.get("score", 0)),
                 "status": health.get("status", "Unknown"),
             }
-            alerts_count += int(alerts.get("count", 0))
-            units.append(row)
+
+        # Open / acknowledged alerts kept up to date by the alert tracker as readings arrive
+        alerts_count = count_active_alerts(customer_id)
 
         return {"units": units, "health_data": health_data, "alerts_count": alerts_count}
     finally:
@@ -296,29 +296,77 @@ def get_open_tickets(customer_id: Optional[int] = None) -> list[dict]:
         conn.close()
 
 
+# =========================================================
+# LIVE FEEDS
+# One query per feed + params, shared by every open dashboard; changes
+# are pushed to subscribed pages (core/live_hub.py, ui/live.py).
+# =========================================================
+
+def _units_feed(customer_id: Optional[int]) -> dict:
+    stats = get_unit_stats(customer_id)
+    if stats is None:
+        raise RuntimeError("unit stats unavailable")
+    rows = []
+    for u in stats["units"]:
+        health = stats["health_data"].get(int(u["unit_id"]), {})
+        rows.append({**u, "health_score": health.get("score", 0), "health_status": health.get("status", "Unknown")})
+    return feed_data(rows, "unit_id", {"alerts_count": stats["alerts_count"]})
+
+
+def _ticket_stats_feed(customer_id: Optional[int]) -> dict:
+    from core.tickets_repo import get_service_call_stats
+    return feed_data([], "ID", get_service_call_stats(customer_id))
+
+
+def _summary_feed() -> dict:
+    return feed_data([], "ID", get_summary_counts())
+
+
+def _service_calls_feed(customer_id: Optional[int], status: Optional[str], priority: Optional[str]) -> dict:
+    """First grid page (names + unit counts in one query); deeper pages are read on scroll."""
+    from core.tickets_repo import list_service_calls_page
+
+    page = list_service_calls_page(customer_id=customer_id, status=status, priority=priority)
+    return feed_data(page["rows"], "ID", {"next": page["next"]})
+
+
+_live = get_live_hub()
+_live.register("dashboard.units", _units_feed, ("readings", "alerts"))
+_live.register("dashboard.ticket_stats", _ticket_stats_feed, ("tickets",))
+_live.register("dashboard.summary", _summary_feed, ())
+_live.register("dashboard.service_calls", _service_calls_feed, ("tickets",))
+
+
 # =========================================================
 # TOP CARDS
 # =========================================================
 
-def render_top_cards(stats: dict) -> None:
-    summary = get_summary_counts()
+def render_top_cards(customer_id: Optional[int], alerts_count: int) -> None:
+    summary = _live.snapshot("dashboard.summary")["counters"]
 
     with ui.grid(columns=4).classes("gap-3 w-full"):
 
-        def card(title: str, value: Any) -> None:
+        def card(title: str, value: Any) -> ui.label:
             with ui.card().classes("gcc-card p-4 text-center"):
                 ui.label(title).classes("text-xs gcc-muted")
-                ui.label(str(value)).classes("text-2xl font-bold")
+                value_label = ui.label(str(value)).classes("text-2xl font-bold")
                 if title == "Equipment":
                     ui.button(
                         "Thermostat",
                         on_click=lambda: ui.navigate.to("/thermostat")
                     ).props("dense outline color=primary").classes("mt-2")
+            return value_label
 
         card("Clients", summary.get("clients", 0))
         card("Locations", summary.get("locations", 0))
         card("Equipment", summary.get("equipment", 0))
-        card("Alerts", stats.get("alerts_count", 0))
+        alerts_label = card("Alerts", alerts_count)
+
+    def on_units_change(diff: dict) -> None:
+        if "alerts_count" in diff["counters"]:
+            alerts_label.set_text(str(diff["counters"]["alerts_count"]))
+
+    live_subscribe("dashboard.units", customer_id, on_change=on_units_change)
 
 
 # =========================================================
@@ -542,35 +590,36 @@ def _save_schedule(unit_id: int, enabled: bool, day: str, start: str, end: str,
 # ADMIN: UNITS GRID (ROW CLICK + ICON CLICK)
 # =========================================================
 
-def render_admin_units_grid(stats: dict, tickets_by_unit: dict) -> None:
+def _unit_grid_row(u: dict) -> Optional[dict]:
+    """Grid row for a unit feed row, or None when the unit is healthy (score >= 80)."""
+    uid = _safe_int(u.get("unit_id"))
+    if uid is None or int(u.get("health_score") or 0) >= 80:
+        return None
+    return {
+        "client": str(u.get("customer_id") or u.get("customer") or ""),
+        "location": (u.get("location") or "")[:30],
+        "unit": f"RTU-{uid}",
+        "temp": f"{u.get('supply_temp')}°F" if u.get("supply_temp") is not None else "—",
+        "mode": u.get("mode") or "—",
+        "fault": u.get("fault_code") or "—",
+        "unit_id": uid,
+    }
+
+
+def render_admin_units_grid(units: dict, customer_id: Optional[int]) -> None:
     with ui.element("div").classes("gcc-dashboard-grid-item"):
         ui.label("Units With Warnings / Alarms").classes("text-lg font-bold mb-2")
         ui.label("Click row = Unit details • Click gear = Thermostat").classes("text-xs gcc-muted mb-2")
 
-        # build table rows (only warning/alarm units)
-        rows: list[dict] = []
-        for u in stats.get("units", []):
-            uid = _safe_int(u.get("unit_id"))
-            if uid is None:
-                continue
-
-            score = int(stats.get("health_data", {}).get(uid, {}).get("score", 0))
-            if score >= 80:
-                continue
+        # build table rows (only warning/alarm units), keyed by unit_id for live updates
+        grid_rows: dict[int, dict] = {}
+        for u in units["rows"].values():
+            row = _unit_grid_row(u)
+            if row is not None:
+                grid_rows[row["unit_id"]] = row
 
-            rows.append({
-                "client": str(u.get("customer_id") or u.get("customer") or ""),
-                "location": (u.get("location") or "")[:30],
-                "unit": f"RTU-{uid}",
-                "temp": f"{u.get('supply_temp')}°F" if u.get("supply_temp") is not None else "—",
-                "mode": u.get("mode") or "—",
-                "fault": u.get("fault_code") or "—",
-                "unit_id": uid,
-            })
-
-        if not rows:
-            ui.label("No warnings or alarms right now.").classes("gcc-muted")
-            return
+        empty_label = ui.label("No warnings or alarms right now.").classes("gcc-muted")
+        empty_label.set_visibility(not grid_rows)
 
         columns = [
             {"name": "client", "label": "Client", "field": "client", "align": "right"},
@@ -581,9 +630,30 @@ def render_admin_units_grid(stats: dict, tickets_by_unit: dict) -> None:
             {"name": "fault", "label": "Fault", "field": "fault", "align": "right"},
         ]
 
-        table = ui.table(columns=columns, rows=rows, row_key="unit_id") \
+        table = ui.table(columns=columns, rows=list(grid_rows.values()), row_key="unit_id") \
             .classes("gcc-dashboard-table") \
             .props('dense flat virtual-scroll header-align="right"')
+        table.set_visibility(bool(grid_rows))
+
+        def on_units_change(diff: dict) -> None:
+            # Only the units whose reading / health changed arrive here
+            if not diff["changed"] and not diff["removed"]:
+                return
+            for u in diff["changed"]:
+                row = _unit_grid_row(u)
+                uid = _safe_int(u.get("unit_id"))
+                if row is None:
+                    grid_rows.pop(uid, None)
+                else:
+                    grid_rows[uid] = row
+            for uid in diff["removed"]:
+                grid_rows.pop(uid, None)
+            table.rows = list(grid_rows.values())
+            table.update()
+            table.set_visibility(bool(grid_rows))
+            empty_label.set_visibility(not grid_rows)
+
+        live_subscribe("dashboard.units", customer_id, on_change=on_units_change)
 
                 # (Thermostat icon removed; use dedicated Thermostat page instead)
 
@@ -610,17 +680,28 @@ def render_admin_units_grid(stats: dict, tickets_by_unit: dict) -> None:
 # =========================================================
 
 def render_tickets_grid(customer_id: Optional[int]) -> None:
-    from core.tickets_repo import list_service_calls, search_service_calls, get_service_call_stats
+    from core.tickets_repo import GRID_PAGE_SIZE, list_service_calls_page, search_service_calls
     
     with ui.element("div").classes("gcc-dashboard-grid-item"):
         ui.label("Service Tickets").classes("text-lg font-bold mb-2")
         
         # Ticket counts stats - simple text display
-        stats = get_service_call_stats(customer_id)
+        stats = _live.snapshot("dashboard.ticket_stats", customer_id)["counters"]
         with ui.row().classes("gap-6 mb-3 items-center"):
-            ui.label(f"Open: {stats.get('open', 0)}").classes("text-blue-400 font-bold")
-            ui.label(f"In Progress: {stats.get('in_progress', 0)}").classes("text-yellow-400 font-bold")
-            ui.label(f"Closed: {stats.get('closed', 0)}").classes("text-green-400 font-bold")
+            open_label = ui.label(f"Open: {stats.get('open') or 0}").classes("text-blue-400 font-bold")
+            progress_label = ui.label(f"In Progress: {stats.get('in_progress') or 0}").classes("text-yellow-400 font-bold")
+            closed_label = ui.label(f"Closed: {stats.get('closed') or 0}").classes("text-green-400 font-bold")
+
+        def on_stats_change(diff: dict) -> None:
+            counters = diff["counters"]
+            if "open" in counters:
+                open_label.set_text(f"Open: {counters['open'] or 0}")
+            if "in_progress" in counters:
+                progress_label.set_text(f"In Progress: {counters['in_progress'] or 0}")
+            if "closed" in counters:
+                closed_label.set_text(f"Closed: {counters['closed'] or 0}")
+
+        live_subscribe("dashboard.ticket_stats", customer_id, on_change=on_stats_change)
         
         # Filters
         with ui.row().classes("gap-3 items-center flex-wrap mb-2"):
@@ -650,17 +731,11 @@ def render_tickets_grid(customer_id: Optional[int]) -> None:
             {"name": "created", "label": "Created", "field": "created", "align": "left"},
         ]
 
-        table = ui.table(columns=columns, rows=[], row_key="_id_raw", selection="single") \
+        table = ui.table(columns=columns, rows=[], row_key="ID", selection="single") \
             .classes("gcc-dashboard-table") \
             .props('dense flat virtual-scroll header-align="left"')
-        
-        # Add HTML slot for colored ID column
-        table.add_slot('body-cell-ID', '''
-            <q-td :props="props">
-                <div v-html="props.value"></div>
-            </q-td>
-        ''')
-        
+        add_ticket_slots(table)
+
         def update_button_states():
             has_selection = bool(table.selected)
             if has_selection:
@@ -681,81 +756,52 @@ def render_tickets_grid(customer_id: Optional[int]) -> None:
                 delete_btn.disable()
                 print_btn.disable()
 
+        grid = KeysetGrid(table, GRID_PAGE_SIZE, on_rows=update_button_states)
+
+        # Live subscription for the current filter (search results are not pushed)
+        subscription: dict[str, Any] = {"key": None, "token": None}
+
+        def follow(key: Optional[tuple]) -> None:
+            if key == subscription["key"]:
+                return
+            if subscription["token"] is not None:
+                live_unsubscribe(subscription["token"])
+            subscription["key"] = key
+            subscription["token"] = None
+            if key is not None:
+                subscription["token"] = live_subscribe(
+                    "dashboard.service_calls", *key, on_change=lambda diff: on_tickets_change(key)
+                )
+
+        def first_page(key: tuple) -> dict:
+            # Shared with every session showing the same filter
+            data = _live.snapshot("dashboard.service_calls", *key)
+            return {"rows": list(data["rows"].values()), "next": data["counters"]["next"]}
+
+        def on_tickets_change(key: tuple) -> None:
+            if len(table.rows) <= GRID_PAGE_SIZE:
+                grid.reset(grid.load, first_page(key))
+            else:
+                grid.reload()   # scrolled past page 1: re-read what is loaded
+
         def refresh_tickets():
             search_term = search_input.value
             status = None if status_filter.value == "All" else status_filter.value
             priority = None if priority_filter.value == "All" else priority_filter.value
 
             if search_term:
-                calls = search_service_calls(search_term, customer_id)
-            else:
-                calls = list_service_calls(customer_id=customer_id, status=status, priority=priority)
+                follow(None)
+                grid.show_all(search_service_calls(search_term, customer_id))
+                return
 
-            from core.db import get_conn
-            
-            rows = []
-            for call in calls:
-                customer_name = call.get("customer_name")
-                if not customer_name and call.get("customer_id"):
-                    customer_name = f"Customer #{call.get('customer_id')}"
-
-                # Get unit count for this ticket
-                unit_count = 0
-                try:
-                    conn = get_conn()
-                    row = conn.execute(
-                        "SELECT COUNT(*) as cnt FROM TicketUnits WHERE ticket_id = ?",
-                        (call.get("ID"),)
-                    ).fetchone()
-                    unit_count = row[0] if row else 0
-                    conn.close()
-                except Exception:
-                    unit_count = 0
-                
-                # Format units display with warning for >4
-                if unit_count > 4:
-                    units_display = f"⚠️ {unit_count}"
-                elif unit_count > 0:
-                    units_display = str(unit_count)
-                else:
-                    units_display = "—"
-                
-                # Color-code ID by status
-                status = call.get("status", "")
-                priority = call.get("priority", "")
-                
-                # Priority Emergency overrides status colors
-                if priority == "Emergency":
-                    id_color = "text-red-500 font-bold"
-                elif status == "Open":
-                    id_color = "text-blue-400 font-bold"
-                elif status == "In Progress":
-                    id_color = "text-yellow-400 font-bold"
-                elif status == "Closed":
-                    id_color = "text-green-400"
-                else:
-                    id_color = ""
-                
-                # Format ID with color class
-                ticket_id = call.get("ID")
-                id_display = f'<span class="{id_color}">{ticket_id}</span>'
-
-                rows.append({
-                    "ID": id_display,
-                    "_id_raw": ticket_id,  # Keep raw ID for selection
-                    "title": (call.get("title") or "Untitled")[:60],
-                    "customer": (customer_name or "—")[:40],
-                    "location": (call.get("location_address") or "—")[:60],
-                    "units": units_display,
-                    "status": status or "—",
-                    "priority": priority or "—",
-                    "created": (call.get("created") or "")[:16],
-                    "_full_data": call,
-                })
-
-            table.rows = rows
-            table.update()
-            update_button_states()
+            key = (customer_id, status, priority)
+            grid.reset(
+                lambda after, limit: list_service_calls_page(
+                    customer_id=customer_id, status=status, priority=priority, after=after, limit=limit
+                ),
+                first_page(key),
+            )
+            follow(key)
 
         def open_ticket_dialog(mode: str):
             from ui.ticket_actions import open_ticket_dialog as shared_open_ticket_dialog
@@ -805,15 +851,16 @@ def render_dashboard(customer_id: Optional[int]) -> None:
     </style>
     """)
 
-    stats = get_unit_stats(customer_id if not admin else None)
-    tickets_by_unit = get_tickets_status(customer_id if not admin else None)
+    # Cached / coalesced across sessions; changes are pushed afterwards (see LIVE FEEDS)
+    scope = customer_id if not admin else None
+    units = _live.snapshot("dashboard.units", scope)
 
-    render_top_cards(stats)
+    render_top_cards(scope, units["counters"].get("alerts_count", 0))
 
     if admin:
         with ui.element("div").classes("gcc-dashboard-grid"):
-            render_admin_units_grid(stats, tickets_by_unit)
-            render_tickets_grid(customer_id if not admin else None)
+            render_admin_units_grid(units, scope)
+            render_tickets_grid(scope)
     else:
         ui.label("Client dashboard unchanged").classes("gcc-muted")
 
@@ -3,10 +3,11 @@
 from nicegui import ui
 from core.auth import require_login, is_admin
 from ui.layout import layout
+from ui.table_page import ServerTable
 from core.customers_repo import list_customers
-from core.locations_repo import list_locations
-from core.units_repo import list_units, create_unit, update_unit, delete_unit
-from core.unit_status import get_unit_status
+from core.locations_repo import list_locations, get_location
+from core.units_repo import units_query, get_unit_by_id, create_unit, update_unit, delete_unit
+from core.unit_status import get_unit_statuses
 from core.logger import log_user_action, handle_error
 
 
@@ -83,10 +84,10 @@ def page():
                     .style("display: flex; flex-direction: column; overflow: hidden; max-height: 55vh"):
                 main_table = ui.table(
                     columns=[
-                        {"name": "unit_tag", "label": "Unit Tag", "field": "unit_tag"},
-                        {"name": "make", "label": "Make", "field": "make"},
-                        {"name": "model", "label": "Model", "field": "model"},
-                        {"name": "serial", "label": "Serial", "field": "serial"},
+                        {"name": "unit_tag", "label": "Unit Tag", "field": "unit_tag", "sortable": True},
+                        {"name": "make", "label": "Make", "field": "make", "sortable": True},
+                        {"name": "model", "label": "Model", "field": "model", "sortable": True},
+                        {"name": "serial", "label": "Serial", "field": "serial", "sortable": True},
                         {"name": "mode", "label": "Mode", "field": "mode"},
                         {"name": "status", "label": "Status", "field": "status_color"},
                     ],
@@ -98,6 +99,19 @@ def page():
                  .style("flex: 1; min-height: 0; overflow: hidden;")
                 main_table.props("dense bordered virtual-scroll")
 
+            def with_status(units):
+                # One status lookup for the visible page (cached per reading, core/unit_status.py)
+                statuses = get_unit_statuses(u["unit_id"] for u in units)
+                return [{**u, **statuses[int(u["unit_id"])]} for u in units]
+
+            # Sorted, filtered and paged in SQL
+            grid = ServerTable(
+                main_table, None, rows_per_page=15,
+                filters=lambda: {"search": search.value},
+                to_rows=with_status,
+            )
+            grid_location = {"id": None}
+
             # Invisible footer card to prevent overflow (keeps container boundaries)
             with ui.card().classes("gcc-card p-3 flex-shrink-0").style("opacity: 0; pointer-events: none; height: 1px; min-height: 1px; padding: 0;"):
                 ui.label("").classes("text-xs")
@@ -180,25 +194,23 @@ def page():
         # ---------------------------------------------------------
         # Refresh logic
         # ---------------------------------------------------------
-        def refresh():
+        def refresh(first_page: bool = False):
             if not location_sel.value:
                 main_table.rows = []
                 return
 
-            units = list_units(search.value or "", int(location_sel.value))
-            rows = []
-            for u in units:
-                status = get_unit_status(u["unit_id"])
-                rows.append({**u, **status})
-
-            main_table.rows = rows
-            unit_count_label.text = f"Units: {len(rows)}"
+            lid = int(location_sel.value)
+            if grid_location["id"] != lid:
+                grid.set_source(units_query(lid))
+                grid_location["id"] = lid
+            grid.refresh(first_page)
+            unit_count_label.text = f"Units: {grid.total}"
 
             if from_dashboard and focus_unit_id:
-                for r in rows:
-                    if int(r["unit_id"]) == focus_unit_id:
-                        main_table.selected = [r]
-                        break
+                # Open the page holding the unit
+                row = grid.show_key(focus_unit_id)
+                if row:
+                    main_table.selected = [row]
 
         # ---------------------------------------------------------
         # Load locations
@@ -215,24 +227,20 @@ def page():
                 location_sel.value = int(locs[0]["ID"])
 
         customer_sel.on_value_change(lambda: (refresh_locations(), refresh()))
-        location_sel.on_value_change(refresh)
-        search.on_value_change(refresh)
+        location_sel.on_value_change(lambda: refresh())
+        search.on_value_change(lambda: refresh(first_page=True))
 
         # ---------------------------------------------------------
         # Dashboard auto resolve (CRITICAL)
         # ---------------------------------------------------------
         if from_dashboard and focus_unit_id:
-            for cid in customer_opts:
-                locs = list_locations("", cid)
-                for loc in locs:
-                    units = list_units("", int(loc["ID"]))
-                    for u in units:
-                        if int(u["unit_id"]) == focus_unit_id:
-                            customer_sel.value = cid
-                            refresh_locations()
-                            location_sel.value = int(loc["ID"])
-                            refresh()
-                            break
+            unit = get_unit_by_id(focus_unit_id)
+            loc = get_location(int(unit["location_id"])) if unit else None
+            if loc:
+                customer_sel.value = int(loc["customer_id"])
+                refresh_locations()
+                location_sel.value = int(loc["ID"])
+                refresh()
 
         refresh_locations()
         refresh()
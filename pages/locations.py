@@ -1,8 +1,9 @@
 from nicegui import ui
 from core.auth import require_login, is_admin
 from ui.layout import layout
+from ui.table_page import ServerTable
 from core.customers_repo import list_customers
-from core.locations_repo import list_locations, create_location, update_location, delete_location
+from core.locations_repo import locations_query, create_location, update_location, delete_location
 from core.logger import log_user_action, handle_error
 
 def page():
@@ -46,13 +47,13 @@ def page():
         with ui.card().classes("gcc-card").style("height: calc(100vh - 380px); display: flex; flex-direction: column;"):
             table = ui.table(
                 columns=[
-                    {"name": "ID", "label": "ID", "field": "ID"},
-                    {"name": "address1", "label": "Address 1", "field": "address1"},
-                    {"name": "city", "label": "City", "field": "city"},
-                    {"name": "state", "label": "State", "field": "state"},
-                    {"name": "zip", "label": "Zip", "field": "zip"},
-                    {"name": "contact", "label": "Contact", "field": "contact"},
-                    {"name": "job_phone", "label": "Job Phone", "field": "job_phone"},
+                    {"name": "ID", "label": "ID", "field": "ID", "sortable": True},
+                    {"name": "address1", "label": "Address 1", "field": "address1", "sortable": True},
+                    {"name": "city", "label": "City", "field": "city", "sortable": True},
+                    {"name": "state", "label": "State", "field": "state", "sortable": True},
+                    {"name": "zip", "label": "Zip", "field": "zip", "sortable": True},
+                    {"name": "contact", "label": "Contact", "field": "contact", "sortable": True},
+                    {"name": "job_phone", "label": "Job Phone", "field": "job_phone", "sortable": True},
                     {"name": "business_name", "label": "Business Name", "field": "business_name"},
                     {"name": "res", "label": "Res", "field": "res"},
                     {"name": "com", "label": "Com", "field": "com"},
@@ -66,6 +67,22 @@ def page():
 
             empty_label = ui.label("Pick a client to load locations").classes("gcc-muted text-sm")
 
+        def location_rows(rows):
+            for r in rows:
+                r["res"] = "✔" if int(r.get("residential") or 0) == 1 else ""
+                r["com"] = "✔" if int(r.get("commercial") or 0) == 1 else ""
+                # Show business name for commercial properties
+                if int(r.get("commercial") or 0) == 1 and r.get("business_name"):
+                    r["business_name"] = r.get("business_name", "")
+                else:
+                    r["business_name"] = ""
+            return rows
+
+        # Sorted, filtered and paged in SQL: only the visible page is sent
+        grid = ServerTable(table, None, rows_per_page=15, filters=lambda: {"search": search.value},
+                           to_rows=location_rows, descending=True)
+        grid_customer = {"id": None}
+
         def update_button_states():
             has_client = bool(customer_id.value)
             if not can_edit:
@@ -82,7 +99,7 @@ def page():
                     edit_btn.disable()
                     delete_btn.disable()
 
-        def refresh():
+        def refresh(first_page: bool = False):
             if not customer_id.value:
                 table.rows = []
                 table.selected = []
@@ -93,18 +110,11 @@ def page():
                 return
 
             cid = int(customer_id.value)
-            rows = list_locations(search.value or "", cid)
-            for r in rows:
-                r["res"] = "✔" if int(r.get("residential") or 0) == 1 else ""
-                r["com"] = "✔" if int(r.get("commercial") or 0) == 1 else ""
-                # Show business name for commercial properties
-                if int(r.get("commercial") or 0) == 1 and r.get("business_name"):
-                    r["business_name"] = r.get("business_name", "")
-                else:
-                    r["business_name"] = ""
-            table.rows = rows
-            table.update()
-            empty_label.visible = len(rows) == 0
+            if grid_customer["id"] != cid:
+                grid.set_source(locations_query(cid))
+                grid_customer["id"] = cid
+            grid.refresh(first_page)
+            empty_label.visible = grid.total == 0
             empty_label.update()
             update_button_states()
 
@@ -215,7 +225,7 @@ def page():
 
         # Auto-refresh when customer or search changes
         customer_id.on("update:model-value", lambda e: refresh())
-        search.on("update:model-value", lambda e: refresh())
+        search.on("update:model-value", lambda e: refresh(first_page=True))
         
         # Start with no selection; wait for explicit client choice
         update_button_states()
\ No newline at end of file
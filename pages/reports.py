@@ -8,6 +8,7 @@ from nicegui import ui, app
 
 from core.auth import current_user, require_login, is_admin
 from ui.layout import layout
+from ui.pdf_jobs import download_pdf
 from core.reports_repo import (
     get_company_profile,
     get_hierarchical_company_report,
@@ -233,23 +234,9 @@ def show_hierarchical_report(customer_id: int):
 
 
 def export_hierarchical_pdf(customer_id: int):
-    """Export hierarchical report as PDF"""
-    from core.report_document import generate_hierarchical_company_pdf
-    
+    """Export hierarchical report as PDF (rendered in the background)"""
     cust_id = None if customer_id == 0 else customer_id
-    data = get_hierarchical_company_report(cust_id)
-    
-    if not data or not data.get("customers"):
-        ui.notify("No data to export", type="warning")
-        return
-    
-    try:
-        filepath, pdf_bytes = generate_hierarchical_company_pdf(data)
-        import os
-        ui.download(pdf_bytes, filename=os.path.basename(filepath))
-        ui.notify("PDF generated successfully", type="positive")
-    except Exception as e:
-        ui.notify(f"PDF generation failed: {e}", type="negative")
+    download_pdf("hierarchical_company", cust_id)
 
 
 # ============================================
@@ -792,19 +779,20 @@ def show_alert_history(days: int):
         ui.label(f"Alert History - Last {days} Days ({len(data)} alerts)").classes("text-2xl font-bold mb-4")
         
         columns = [
-            {"name": "timestamp", "label": "Time", "field": "timestamp", "sortable": True, "align": "center"},
+            {"name": "timestamp", "label": "Opened", "field": "timestamp", "sortable": True, "align": "center"},
             {"name": "customer_name", "label": "Customer", "field": "customer_name", "sortable": True, "align": "left"},
             {"name": "unit_tag", "label": "Unit", "field": "unit_tag", "sortable": True, "align": "left"},
-            {"name": "mode", "label": "Mode", "field": "mode", "sortable": True, "align": "center"},
-            {"name": "fault_code", "label": "Fault", "field": "fault_code", "sortable": True, "align": "center"},
-            {"name": "alarm_status", "label": "Alarm", "field": "alarm_status", "sortable": True, "align": "center"},
+            {"name": "severity", "label": "Severity", "field": "severity", "sortable": True, "align": "center"},
+            {"name": "code", "label": "Alert", "field": "code", "sortable": True, "align": "left"},
+            {"name": "status", "label": "Status", "field": "status", "sortable": True, "align": "center"},
+            {"name": "cleared_at", "label": "Cleared", "field": "cleared_at", "sortable": True, "align": "center"},
             {"name": "alert_message", "label": "Message", "field": "alert_message", "sortable": True, "align": "left"},
         ]
         
         ui.table(
             columns=columns,
             rows=data,
-            row_key="reading_id",
+            row_key="alert_id",
             pagination={"rowsPerPage": 25, "sortBy": "timestamp", "descending": True}
         ).classes("w-full")
         
@@ -898,102 +886,25 @@ def show_system_overview():
 # ============================================
 
 def export_equipment_inventory_pdf(customer_id: Optional[int], location_id: Optional[int]):
-    from core.report_document import generate_equipment_inventory_pdf
-    try:
-        data = get_equipment_inventory_report(customer_id, location_id)
-        if not data:
-            ui.notify("No data to export", type="warning")
-            return
-        
-        filepath, pdf_bytes = generate_equipment_inventory_pdf(data, customer_id)
-        ui.download(pdf_bytes, filename=filepath.split("/")[-1].split("\\")[-1])
-        ui.notify("PDF exported successfully", type="positive")
-    except Exception as e:
-        ui.notify(f"Export failed: {e}", type="negative")
+    download_pdf("equipment_inventory", customer_id, location_id)
 
 def export_equipment_age_pdf():
-    from core.report_document import generate_equipment_age_pdf
-    try:
-        data = get_equipment_by_age_report()
-        if not data:
-            ui.notify("No data to export", type="warning")
-            return
-        
-        filepath, pdf_bytes = generate_equipment_age_pdf(data)
-        ui.download(pdf_bytes, filename=filepath.split("/")[-1].split("\\")[-1])
-        ui.notify("PDF exported successfully", type="positive")
-    except Exception as e:
-        ui.notify(f"Export failed: {e}", type="negative")
+    download_pdf("equipment_age")
 
 def export_maintenance_pdf(unit_id: Optional[int]):
     ui.notify("PDF export coming soon", type="info")
 
 def export_tickets_pdf(status: Optional[str], start_date: Optional[str], end_date: Optional[str]):
-    from core.report_document import generate_tickets_report_pdf
-    try:
-        data = get_tickets_by_status_report(status=status, start_date=start_date, end_date=end_date)
-        if not data:
-            ui.notify("No data to export", type="warning")
-            return
-        
-        filepath, pdf_bytes = generate_tickets_report_pdf(data, status)
-        ui.download(pdf_bytes, filename=filepath.split("/")[-1].split("\\")[-1])
-        ui.notify("PDF exported successfully", type="positive")
-    except Exception as e:
-        ui.notify(f"Export failed: {e}", type="negative")
+    download_pdf("tickets_report", status, start_date, end_date)
 
 def export_open_tickets_pdf():
-    from core.report_document import generate_open_tickets_pdf
-    try:
-        data = get_open_tickets_summary()
-        if not data:
-            ui.notify("No open tickets to export", type="positive")
-            return
-        
-        filepath, pdf_bytes = generate_open_tickets_pdf(data)
-        ui.download(pdf_bytes, filename=filepath.split("/")[-1].split("\\")[-1])
-        ui.notify("PDF exported successfully", type="positive")
-    except Exception as e:
-        ui.notify(f"Export failed: {e}", type="negative")
+    download_pdf("open_tickets", empty_message="No open tickets to export", empty_type="positive")
 
 def export_customer_summary_pdf():
-    from core.report_document import generate_customer_summary_pdf
-    try:
-        data = get_customer_summary_report()
-        if not data:
-            ui.notify("No data to export", type="warning")
-            return
-        
-        filepath, pdf_bytes = generate_customer_summary_pdf(data)
-        ui.download(pdf_bytes, filename=filepath.split("/")[-1].split("\\")[-1])
-        ui.notify("PDF exported successfully", type="positive")
-    except Exception as e:
-        ui.notify(f"Export failed: {e}", type="negative")
+    download_pdf("customer_summary")
 
 def export_location_inventory_pdf():
-    from core.report_document import generate_location_inventory_pdf
-    try:
-        data = get_location_inventory_report()
-        if not data:
-            ui.notify("No data to export", type="warning")
-            return
-        
-        filepath, pdf_bytes = generate_location_inventory_pdf(data)
-        ui.download(pdf_bytes, filename=filepath.split("/")[-1].split("\\")[-1])
-        ui.notify("PDF exported successfully", type="positive")
-    except Exception as e:
-        ui.notify(f"Export failed: {e}", type="negative")
+    download_pdf("location_inventory")
 
 def export_current_alerts_pdf():
-    from core.report_document import generate_current_alerts_pdf
-    try:
-        data = get_current_alerts_report()
-        if not data:
-            ui.notify("No alerts to export - all systems normal!", type="positive")
-            return
-        
-        filepath, pdf_bytes = generate_current_alerts_pdf(data)
-        ui.download(pdf_bytes, filename=filepath.split("/")[-1].split("\\")[-1])
-        ui.notify("PDF exported successfully", type="positive")
-    except Exception as e:
-        ui.notify(f"Export failed: {e}", type="negative")
+    download_pdf("current_alerts", empty_message="No alerts to export - all systems normal!", empty_type="positive")
@@ -18,12 +18,16 @@ from core.settings_repo import (
     create_ticket_sequence,
     update_ticket_sequence,
     delete_ticket_sequence,
+    get_retention_settings,
+    update_retention_settings,
+    list_retention_runs,
 )
 from ui.layout import layout
 from core.db import get_conn
 from core.security import hash_password
 from core.customers_repo import list_customers
 from core.version import get_version_info
+from core.settings_cache import invalidate_settings
 import json
 from pathlib import Path
 
@@ -814,6 +818,56 @@ def save_service_call_settings(card):
     show_notification("Service call settings updated successfully", "success")
 
 
+# ==============================================
+# TELEMETRY RETENTION (Service tab)
+# ==============================================
+
+def create_retention_settings_card() -> ui.card:
+    """Telemetry retention policy card"""
+    with ui.card() as card:
+        with ui.column().classes("w-full gap-1"):
+            ui.label("Telemetry Retention").classes("text-lg font-bold")
+            ui.label("Days to keep each tier (0 = forever). Pruned in small batches in the background.").classes("text-sm gcc-muted")
+
+            settings = get_retention_settings()
+            fields = {}
+
+            fields["enabled"] = ui.checkbox(text="Enable retention", value=bool(settings.get("enabled", 1)))
+            with ui.row().classes("w-full gap-1"):
+                fields["raw_days"] = ui.number(label="Raw readings", value=settings["raw_days"], min=0).classes("flex-1")
+                fields["rollup_1m_days"] = ui.number(label="1-minute", value=settings["rollup_1m_days"], min=0).classes("flex-1")
+                fields["rollup_15m_days"] = ui.number(label="15-minute", value=settings["rollup_15m_days"], min=0).classes("flex-1")
+                fields["rollup_1h_days"] = ui.number(label="Hourly", value=settings["rollup_1h_days"], min=0).classes("flex-1")
+                fields["rollup_1d_days"] = ui.number(label="Daily", value=settings["rollup_1d_days"], min=0).classes("flex-1")
+            with ui.row().classes("w-full gap-1"):
+                fields["batch_size"] = ui.number(label="Rows per delete batch", value=settings["batch_size"], min=100).classes("flex-1")
+                fields["run_every_minutes"] = ui.number(label="Run every (minutes)", value=settings["run_every_minutes"], min=1).classes("flex-1")
+
+            runs = list_retention_runs(limit=1)
+            if runs:
+                last = runs[0]
+                ui.label(
+                    f"Last run {last['started']}: {last['raw_pruned']} raw + {last['rollups_pruned']} roll-up rows pruned, "
+                    f"{(last['bytes_reclaimed'] or 0) / (1024 * 1024):.1f} MB reclaimed in {(last['duration_ms'] or 0) / 1000:.1f}s"
+                    + ("" if last["complete"] else " (continuing)")
+                    + (f" - error: {last['error']}" if last.get("error") else "")
+                ).classes("text-xs gcc-muted mt-1")
+
+            ui.button("Save Retention", on_click=lambda: save_retention_settings(fields)).classes("mt-2 bg-blue-600 hover-bg-blue-700 w-40")
+
+    return card
+
+
+def save_retention_settings(fields: dict):
+    """Save telemetry retention policy"""
+    data = {key: field.value for key, field in fields.items()}
+    if update_retention_settings(data):
+        log_user_action("Updated telemetry retention settings", "settings")
+        show_notification("Retention settings updated successfully", "success")
+    else:
+        show_notification("Error updating retention settings", "error")
+
+
 # ==============================================
 # TICKET SEQUENCE TAB
 # ==============================================
@@ -1093,20 +1147,22 @@ def create_admin_tab() -> ui.card:
                     show_notification("Select a login first", "error")
                     return
 
+                def do_delete():
+                    # Same pooled connection for the DELETE and its commit
+                    with get_conn() as conn:
+                        conn.execute("DELETE FROM Logins WHERE ID = ?", (state["selected_login_id"],))
+                    d.close()
+                    show_notification("Login deleted", "success")
+                    clear_selection()
+                    refresh_logins()
+
                 with ui.dialog() as d:
                     with ui.card():
                         ui.label("Delete Login?").classes("text-lg font-bold")
                         ui.label(f"Delete: {state['selected_row']['login_id']}")
                         with ui.row().classes("gap-2 mt-4"):
                             ui.button("Cancel", on_click=d.close)
-                            ui.button("Delete", color="negative", on_click=lambda: (
-                                get_conn().__enter__().execute("DELETE FROM Logins WHERE ID = ?", (state["selected_login_id"],)),
-                                get_conn().__enter__().commit(),
-                                d.close(),
-                                show_notification("Login deleted", "success"),
-                                clear_selection(),
-                                refresh_logins()
-                            ))
+                            ui.button("Delete", color="negative", on_click=do_delete)
                 d.open()
 
             def open_add_dialog():
@@ -1267,6 +1323,7 @@ def create_version_tab() -> ui.card:
                     # Write back
                     with open(version_file, "w") as f:
                         json.dump(existing_data, f, indent=2)
+                    invalidate_settings("version_info")
                     
                     show_notification("Version updated - refresh page to see changes", "success")
                     log_user_action("version_update", f"Updated to version {existing_data['version']}")
@@ -1320,6 +1377,7 @@ def page():
 
             with ui.tab_panel("service"):
                 create_service_call_settings_tab()
+                create_retention_settings_card()
 
             with ui.tab_panel("tickets"):
                 create_ticket_sequence_tab()
@@ -445,14 +445,12 @@ def _fetch_units_by_location(customer_id: int, location_id: int) -> list[dict]:
                 c.company AS customer,
                 c.ID as customer_id,
                 pl.ID as location_id
-            FROM UnitReadings ur
-            JOIN Units u ON ur.unit_id = u.unit_id
+            FROM UnitLatestReading lr
+            JOIN UnitReadings ur ON ur.reading_id = lr.reading_id
+            JOIN Units u ON lr.unit_id = u.unit_id
             JOIN PropertyLocations pl ON u.location_id = pl.ID
             JOIN Customers c ON pl.customer_id = c.ID
-            WHERE ur.reading_id IN (
-                SELECT MAX(reading_id) FROM UnitReadings GROUP BY unit_id
-            )
-            AND c.ID = ?
+            WHERE c.ID = ?
             AND pl.ID = ?
             ORDER BY u.unit_id
             LIMIT 15
@@ -4,19 +4,32 @@ Full CRUD interface for service call management
 """
 
 from nicegui import ui, app
-import os
 import base64
 from typing import Optional, Dict, Any
 from core.auth import current_user, require_login
 from core.tickets_repo import (
     create_service_call, get_service_call, list_service_calls, update_service_call, delete_service_call,
-    get_service_call_stats, search_service_calls
+    get_service_call_stats, search_service_calls, list_service_calls_page, list_service_call_ids, GRID_PAGE_SIZE
 )
+from core.ticket_batch import MAX_TICKETS as BATCH_MAX_TICKETS
 from core.customers_repo import list_customers, get_customer
 from core.locations_repo import list_locations
 from core.units_repo import list_units, get_ticket_unit_ids, set_ticket_units
+from core.live_hub import publish
 from ui.layout import layout
 from ui.table_page import table_page
+from ui.ticket_grid import KeysetGrid, add_ticket_slots
+from ui.pdf_jobs import export_ticket_batch, render_pdf
+
+
+def _first_value(data: Dict[str, Any], *keys: str) -> Any:
+    """First present value for keys (0 / 0.0 count as present), else '—'."""
+    for key in keys:
+        value = data.get(key)
+        if value is not None and value != "":
+            return value
+    return "—"
+
 
 @ui.page("/tickets")
 def tickets_page():
@@ -116,6 +129,7 @@ def render_calls_table(customer_id: Optional[int] = None, hierarchy: int = 5):
             close_btn = ui.button(icon="check_circle", text="Close").props("flat dense color=green").tooltip("Close Call with Reason")
             delete_btn = ui.button(icon="delete", text="Delete").props("flat dense color=negative").tooltip("Delete Service Call")
             print_btn = ui.button(icon="print", text="Print").props("flat dense").tooltip("Print Work Order")
+            print_all_btn = ui.button(icon="picture_as_pdf", text="Print All").props("flat dense").tooltip("Print or Export Every Listed Call")
             email_btn = ui.button(icon="mail", text="Email").props("flat dense color=blue").tooltip("Send Email to Admin")
             refresh_btn = ui.button(icon="refresh", text="Refresh").props("flat dense").tooltip("Refresh List")
             
@@ -126,6 +140,10 @@ def render_calls_table(customer_id: Optional[int] = None, hierarchy: int = 5):
             close_btn.on_click(lambda: open_ticket_dialog("close"))
             delete_btn.on_click(lambda: open_ticket_dialog("delete"))
             print_btn.on_click(lambda: open_ticket_dialog("print"))
+            print_all_btn.on_click(lambda: show_print_all(
+                (search_input.value or "").strip(), status_filter.value, priority_filter.value,
+                int(customer_sel.value) if customer_sel and customer_sel.value else customer_id,
+            ))
             email_btn.on_click(lambda: open_ticket_dialog("email"))
             refresh_btn.on_click(lambda: refresh_calls())
 
@@ -141,16 +159,10 @@ def render_calls_table(customer_id: Optional[int] = None, hierarchy: int = 5):
         ]
 
         # Spacious table with more padding - constrained height
-        table = ui.table(columns=columns, rows=[], row_key="_id_raw", selection="single") \
+        table = ui.table(columns=columns, rows=[], row_key="ID", selection="single") \
             .classes("gcc-dashboard-table w-full") \
             .props('dense flat virtual-scroll')
-        
-        # Add HTML slot for colored ID column
-        table.add_slot('body-cell-ID', '''
-            <q-td :props="props">
-                <div v-html="props.value"></div>
-            </q-td>
-        ''')
+        add_ticket_slots(table)
         
         empty_label = ui.label("No service calls found. Click New Call to create one.").classes("gcc-muted text-center py-8")
         empty_label.visible = False
@@ -199,56 +211,26 @@ def render_calls_table(customer_id: Optional[int] = None, hierarchy: int = 5):
             if location_sel and location_sel.value:
                 effective_location_id = int(location_sel.value)
 
-            # Load from database
+            # Load from database: search hits, or keyset pages of the grid view (more load on scroll)
             if search_term:
-                calls = search_service_calls(search_term, effective_customer_id)
+                grid.show_all(search_service_calls(search_term, effective_customer_id))
             else:
-                calls = list_service_calls(
+                grid.reset(lambda after, limit: list_service_calls_page(
                     customer_id=effective_customer_id,
                     location_id=effective_location_id,
                     status=status,
                     priority=priority,
-                    limit=100,
-                )
+                    after=after,
+                    limit=limit,
+                ))
 
-            rows = []
-            for call in calls:
-                customer_name = call.get("customer_name") or call.get("customer") or "—"
-                
-                # Color-code ID based on status (Emergency priority overrides)
-                ticket_id = call.get("ID")
-                status = call.get("status", "—")
-                priority = call.get("priority", "—")
-                
-                if priority == "Emergency":
-                    id_display = f'<span class="text-red-500 font-bold">{ticket_id}</span>'
-                elif status == "Open":
-                    id_display = f'<span class="text-blue-400 font-bold">{ticket_id}</span>'
-                elif status == "In Progress":
-                    id_display = f'<span class="text-yellow-400 font-bold">{ticket_id}</span>'
-                elif status == "Closed":
-                    id_display = f'<span class="text-green-400">{ticket_id}</span>'
-                else:
-                    id_display = str(ticket_id)
-
-                rows.append({
-                    "ID": id_display,
-                    "_id_raw": ticket_id,  # Keep numeric ID for row selection
-                    "title": (call.get("title") or "Untitled")[:60],
-                    "customer": customer_name[:40],
-                    "location": (call.get("location_address") or call.get("location") or "—")[:60],
-                    "status": call.get("status", "—"),
-                    "priority": call.get("priority", "—"),
-                    "created": (call.get("created") or "")[:16],
-                    "_full_data": call,
-                })
-
-            table.rows = rows
-            table.update()
-            empty_label.visible = len(rows) == 0
+        def on_rows():
+            empty_label.visible = len(table.rows) == 0
             empty_label.update()
             update_button_states()
 
+        grid = KeysetGrid(table, GRID_PAGE_SIZE, on_rows=on_rows)
+
         def update_locations():
             """Cascade customer selection to location filter"""
             if not customer_sel or not location_sel:
@@ -350,6 +332,7 @@ def show_close_dialog(call_id: int):
                     ("Closed", new_desc, call_id)
                 )
                 conn.commit()
+                publish("tickets")
                 ui.notify(f"✓ Service Call #{call_id} closed successfully", type="positive")
                 dialog.close()
                 ui.navigate.reload()
@@ -367,7 +350,8 @@ def show_close_dialog(call_id: int):
 
 def send_ticket_email(call_id: int):
     """Send ticket email with recipient picker dialog"""
-    from core.tickets_repo import send_ticket_email as send_email_repo, get_service_call
+    from core.tickets_repo import queue_ticket_email, get_service_call
+    from ui.email_status import watch_email_delivery
     from core.email_settings import get_email_settings
     from core.customers_repo import get_customer
     from core.settings_repo import list_employees
@@ -446,27 +430,22 @@ def send_ticket_email(call_id: int):
                 ui.notify("Please select at least one recipient", type="warning")
                 return
             
-            # Send to all recipients
-            success_count = 0
-            fail_count = 0
+            # Queue for the background sender (core/email_outbox.py); delivery is tracked below
+            outbox_ids = []
             errors = []
-            
-            for recipient in recipients:
-                success, msg = send_email_repo(call_id, to_email=recipient)
-                if success:
-                    success_count += 1
-                else:
-                    fail_count += 1
-                    errors.append(f"{recipient}: {msg}")
+            queued_by = (current_user() or {}).get("email")
+            for recipient in dict.fromkeys(recipients):
+                try:
+                    outbox_ids.append(queue_ticket_email(call_id, to_email=recipient, queued_by=queued_by))
+                except ValueError as e:
+                    errors.append(f"{recipient}: {e}")
             
             dialog.close()
             
-            if fail_count == 0:
-                ui.notify(f"✓ Email sent to {success_count} recipient(s)", type="positive")
-            elif success_count > 0:
-                ui.notify(f"⚠ Sent to {success_count}, failed {fail_count}", type="warning")
-            else:
-                ui.notify(f"✗ All emails failed: {'; '.join(errors[:2])}", type="negative")
+            if errors:
+                ui.notify(f"✗ Not queued: {'; '.join(errors[:2])}", type="negative")
+            if outbox_ids:
+                watch_email_delivery(outbox_ids)
         
         with ui.row().classes("justify-end gap-2 mt-4"):
             ui.button("Cancel", on_click=dialog.close).props("flat")
@@ -518,112 +497,36 @@ def confirm_delete(call_id: int):
 
 
 def show_print_call(call: Dict[str, Any]):
-    """Use the same PDF generator as dashboard for consistency."""
-    try:
-        # Lazy import to avoid circulars
-        from pages.dashboard import generate_service_order_pdf, _generate_ticket_no
+    """Render the service order PDF in the background, then offer print / download."""
+    call_id = call.get("ID") or call.get("id")
+    if not call_id:
+        ui.notify("Missing ticket ID for PDF", type="negative")
+        return
+    render_pdf("ticket", call_id, on_done=lambda filename, pdf_bytes: _show_print_dialog(call, filename, pdf_bytes))
 
-        call_id = call.get("ID") or call.get("id")
-        if not call_id:
-            ui.notify("Missing ticket ID for PDF", type="negative")
-            return
 
-        # Build data payload expected by generator
-        data = {
-            "customer": call.get('customer') or call.get('customer_name') or (f"Customer #{call.get('customer_id')}") if call.get('customer_id') else '—',
-            "location": call.get('location') or call.get('location_address') or (f"Location #{call.get('location_id')}") if call.get('location_id') else '—',
-            "customer_phone": "—",
-            "customer_email": "—",
-            "unit_id": call.get('unit_id', 0),
-            "equipment_type": call.get('equipment_type', 'RTU'),
-            "make": call.get('make', '—'),
-            "model": call.get('model', '—'),
-            "serial": call.get('serial', '—'),
-            "refrigerant_type": call.get('refrigerant_type', '—'),
-            "voltage": call.get('voltage', '—'),
-            "amperage": call.get('amperage', '—'),
-            "btu_rating": call.get('btu_rating', '—'),
-            "tonnage": call.get('tonnage', '—'),
-            "breaker_size": call.get('breaker_size', '—'),
-            "inst_date": call.get('unit_inst_date') or call.get('inst_date') or '—',
-            "warranty_end_date": call.get('warranty_end_date', '—'),
-            "status": call.get('status', '—'),
-            "priority": call.get('priority', '—'),
-            "title": call.get('title', '—'),
-            "description": call.get('description', '—'),
-            "materials_services": call.get('materials_services', '—'),
-            "labor_description": call.get('labor_description', '—'),
-            "created": call.get('created', ''),
-        }
-
-        # Dummy health/alerts placeholders (match dashboard behavior)
-        health = {"score": 85, "status": "Good"}
-        alerts = {"alerts": []}
-
-        # Company profile lookup (shared with dashboard logic)
-        company = {
-            "company": "GCC TECHNOLOGY",
-            "address1": "123 Tech Street",
-            "address2": "",
-            "city": "Tech City",
-            "state": "TC",
-            "zip": "12345",
-            "phone": "(555) 123-4567",
-            "email": "support@gcc.com",
-            "website": "www.gcc.com"
-        }
-        conn = get_conn()
-        try:
-            row = conn.execute("SELECT * FROM CompanyProfile LIMIT 1").fetchone()
-            if row is None:
-                row = conn.execute("SELECT * FROM CompanyInfo LIMIT 1").fetchone()
-            if row:
-                row = dict(row)
-                company = {
-                    "company": row.get("company_name") or row.get("name") or row.get("company") or company["company"],
-                    "address1": row.get("address1") or "",
-                    "address2": row.get("address2") or "",
-                    "city": row.get("city") or "",
-                    "state": row.get("state") or "",
-                    "zip": row.get("zip") or "",
-                    "phone": row.get("phone") or row.get("fax") or company.get("phone"),
-                    "email": row.get("email") or company.get("email"),
-                    "service_email": row.get("service_email") or row.get("email") or "",
-                    "business_license": row.get("business_license") or "",
-                    "website": row.get("website") or company.get("website"),
-                }
-        except Exception:
-            pass
-        finally:
-            conn.close()
-
-        # Use centralized PDF generator
-        from core.ticket_document import generate_ticket_pdf
-        pdf_path, pdf_bytes = generate_ticket_pdf(call_id)
-
-        # Offer user choice: preview/print or download
-        pdf_b64 = base64.b64encode(pdf_bytes).decode("ascii")
-
-        with ui.dialog() as dlg, ui.card().classes("gcc-card p-4 max-w-xl"):
-            ui.label(f"Service Ticket #{call.get('ID', '—')} PDF Ready").classes("text-lg font-bold")
-            ui.label(os.path.basename(pdf_path)).classes("text-sm gcc-muted mb-2")
-
-            with ui.row().classes("gap-2 mt-2 justify-end"):
-                ui.button("Open & Print", icon="print", on_click=lambda: ui.run_javascript(
-                    "(function(){const b64='" + pdf_b64 + "';"+
-                    "const byteChars=atob(b64);const byteNums=new Array(byteChars.length);"+
-                    "for(let i=0;i<byteChars.length;i++){byteNums[i]=byteChars.charCodeAt(i);}"+
-                    "const byteArray=new Uint8Array(byteNums);const blob=new Blob([byteArray],{type:'application/pdf'});"+
-                    "const url=URL.createObjectURL(blob);const w=window.open(url,'_blank');"+
-                    "if(w){setTimeout(()=>{w.print();},500);}})();"
-                )).props("color=blue")
-                ui.button("Download PDF", icon="download", on_click=lambda: ui.download(pdf_bytes, filename=os.path.basename(pdf_path))).props("color=green")
-                ui.button("Close", on_click=lambda: dlg.close()).props("flat")
-
-        dlg.open()
-        ui.notify("PDF generated", type="positive")
-    except Exception as e:
-        ui.notify(f"PDF generation failed: {e}", type="negative")
+def _show_print_dialog(call: Dict[str, Any], filename: str, pdf_bytes: bytes):
+    """Offer user choice: preview/print or download"""
+    pdf_b64 = base64.b64encode(pdf_bytes).decode("ascii")
+
+    with ui.dialog() as dlg, ui.card().classes("gcc-card p-4 max-w-xl"):
+        ui.label(f"Service Ticket #{call.get('ID', '—')} PDF Ready").classes("text-lg font-bold")
+        ui.label(filename).classes("text-sm gcc-muted mb-2")
+
+        with ui.row().classes("gap-2 mt-2 justify-end"):
+            ui.button("Open & Print", icon="print", on_click=lambda: ui.run_javascript(
+                "(function(){const b64='" + pdf_b64 + "';"+
+                "const byteChars=atob(b64);const byteNums=new Array(byteChars.length);"+
+                "for(let i=0;i<byteChars.length;i++){byteNums[i]=byteChars.charCodeAt(i);}"+
+                "const byteArray=new Uint8Array(byteNums);const blob=new Blob([byteArray],{type:'application/pdf'});"+
+                "const url=URL.createObjectURL(blob);const w=window.open(url,'_blank');"+
+                "if(w){setTimeout(()=>{w.print();},500);}})();"
+            )).props("color=blue")
+            ui.button("Download PDF", icon="download", on_click=lambda: ui.download(pdf_bytes, filename=filename)).props("color=green")
+            ui.button("Close", on_click=lambda: dlg.close()).props("flat")
+
+    dlg.open()
+    ui.notify("PDF generated", type="positive")
 
 
 def show_print_form(title: str, description: str, materials: str, labor: str, priority: str, status: str,
@@ -675,10 +578,10 @@ def show_print_form(title: str, description: str, materials: str, labor: str, pr
 
         if telemetry:
             mode = telemetry.get("mode") or "—"
-            sup = telemetry.get("supply_temp") or telemetry.get("supply_temp_f") or "—"
-            ret = telemetry.get("return_temp") or telemetry.get("return_temp_f") or "—"
-            delta = telemetry.get("delta_t") or telemetry.get("delta_t_f") or "—"
-            fan = telemetry.get("fan_speed_percent") or "—"
+            sup = _first_value(telemetry, "supply_temp", "supply_temp_f")
+            ret = _first_value(telemetry, "return_temp", "return_temp_f")
+            delta = _first_value(telemetry, "delta_t", "delta_t_f")
+            fan = _first_value(telemetry, "fan_speed_percent")
             stat = telemetry.get("unit_status") or telemetry.get("status_color") or "—"
             ts = telemetry.get("ts") or telemetry.get("last_update") or ""
             alert = telemetry.get("alert_message") or ""
@@ -775,8 +678,21 @@ def show_print_all(search_term: str, status: str, priority: str, customer_id: Op
         
         ui.separator().classes("my-4")
         
+        def export(output: str):
+            # Every matching call, not just the 100 listed above (search hits are already complete)
+            if search_term:
+                ids = [c["ID"] for c in calls]
+            else:
+                ids = list_service_call_ids(customer_id=customer_id, status=status_filter, priority=priority_filter,
+                                            limit=BATCH_MAX_TICKETS + 1)
+            if export_ticket_batch(ids, output):
+                dialog.close()
+
         with ui.row().classes("justify-end gap-2"):
             ui.button("Close", on_click=dialog.close).props("flat")
+            if calls:
+                ui.button("ZIP", icon="folder_zip", on_click=lambda: export("zip")).props("flat").tooltip("One PDF per service order")
+                ui.button("Merged PDF", icon="picture_as_pdf", on_click=lambda: export("pdf")).props("flat").tooltip("All service orders in one PDF")
             ui.button("Print", icon="print", on_click=lambda: ui.run_javascript("window.print()")).props("color=blue")
     
     dialog.open()
@@ -965,12 +881,8 @@ def render_call_form(customer_id: Optional[int], user: Dict[str, Any], hierarchy
         def _get_latest_reading(u_id: int):
             """Fetch latest telemetry row for unit"""
             try:
-                with get_conn() as conn:
-                    row = conn.execute(
-                        "SELECT * FROM UnitReadings WHERE unit_id = ? ORDER BY reading_id DESC LIMIT 1",
-                        (u_id,),
-                    ).fetchone()
-                    return dict(row) if row else None
+                from core.readings_repo import get_latest_reading
+                return get_latest_reading(u_id)
             except Exception:
                 return None
 
@@ -1013,10 +925,10 @@ def render_call_form(customer_id: Optional[int], user: Dict[str, Any], hierarchy
                     latest = _get_latest_reading(unit_select.value)
                     if latest:
                         mode = latest.get("mode") or "—"
-                        sup = latest.get("supply_temp") or latest.get("supply_temp_f") or "—"
-                        ret = latest.get("return_temp") or latest.get("return_temp_f") or "—"
-                        delta = latest.get("delta_t") or latest.get("delta_t_f") or "—"
-                        fan = latest.get("fan_speed_percent") or "—"
+                        sup = _first_value(latest, "supply_temp", "supply_temp_f")
+                        ret = _first_value(latest, "return_temp", "return_temp_f")
+                        delta = _first_value(latest, "delta_t", "delta_t_f")
+                        fan = _first_value(latest, "fan_speed_percent")
                         stat = latest.get("unit_status") or latest.get("status_color") or "—"
                         alert = latest.get("alert_message") or ""
                         ts = latest.get("ts") or latest.get("last_update") or ""
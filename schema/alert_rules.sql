@@ -0,0 +1,50 @@
+-- Migration: Declarative alert / health / status rules
+-- Purpose: One rule table for core.alert_system, ui.alert_system,
+--          core.equipment_analysis and core.unit_status (see core/alert_rules.py).
+-- Seeded from core.alert_rules.DEFAULT_RULES; edits are picked up without a restart
+-- (AlertRulesVersion is bumped by the triggers below).
+
+CREATE TABLE IF NOT EXISTS AlertRules (
+  id          INTEGER PRIMARY KEY AUTOINCREMENT,
+  ruleset     TEXT NOT NULL,                 -- alerts | health | status
+  code        TEXT NOT NULL,
+  category    TEXT NOT NULL,                 -- fault | temperature | pressure | electrical | operation
+  severity    TEXT NOT NULL,                 -- critical | warning | info
+  metric      TEXT,                          -- reading column or derived metric (delta_t, pressure_ratio, ...)
+  op          TEXT NOT NULL,                 -- < <= > >= == != between outside set always
+  value       REAL,
+  value2      REAL,                          -- upper bound for between / outside
+  modes       TEXT,                          -- 'Cooling,Heating' = only in these modes, '!Off,Idle' = not in these
+  requires    TEXT,                          -- other metrics that must be present, comma separated
+  message     TEXT NOT NULL,                 -- str.format template: metric names + {threshold}
+  parameter   TEXT,
+  priority    INTEGER NOT NULL DEFAULT 100,  -- evaluation / output order; first match wins where one result is used
+  enabled     INTEGER NOT NULL DEFAULT 1,
+  hysteresis  REAL,                          -- alert lifecycle: clear only this far past the threshold
+  open_after  INTEGER,                       -- consecutive matching readings before an alert opens (NULL = default)
+  clear_after INTEGER,                       -- consecutive normal readings before it clears (NULL = default)
+  updated     TEXT DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE (ruleset, code)
+);
+
+CREATE TABLE IF NOT EXISTS AlertRulesVersion (
+  id       INTEGER PRIMARY KEY CHECK (id = 1),
+  version  INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO AlertRulesVersion (id, version) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_alert_rules_ins AFTER INSERT ON AlertRules
+BEGIN
+  UPDATE AlertRulesVersion SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_alert_rules_upd AFTER UPDATE ON AlertRules
+BEGIN
+  UPDATE AlertRulesVersion SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_alert_rules_del AFTER DELETE ON AlertRules
+BEGIN
+  UPDATE AlertRulesVersion SET version = version + 1 WHERE id = 1;
+END;
@@ -0,0 +1,31 @@
+-- Migration: Outbound email queue
+-- Purpose: Mail queued by pages (ticket emails) and delivered by the background
+--          sender in core/email_outbox.py over reused SMTP / SendGrid
+--          connections, with retries, instead of sending inside the UI handler.
+
+CREATE TABLE IF NOT EXISTS EmailOutbox (
+  id               INTEGER PRIMARY KEY AUTOINCREMENT,
+  to_email         TEXT NOT NULL,
+  subject          TEXT NOT NULL,
+  body             TEXT NOT NULL,
+  html_body        TEXT,
+  from_email       TEXT,                             -- NULL: EmailSettings.smtp_from
+  attachment       BLOB,                             -- dropped once sent
+  attachment_name  TEXT,
+  ticket_id        INTEGER,                          -- attach this service order, rendered by the sender
+  status           TEXT NOT NULL DEFAULT 'queued',   -- queued | sending | sent | failed
+  attempts         INTEGER NOT NULL DEFAULT 0,
+  next_attempt_at  REAL NOT NULL,                    -- unix time
+  last_error       TEXT,
+  queued_by        TEXT,
+  created_at       TEXT NOT NULL DEFAULT (datetime('now')),
+  sent_at          TEXT
+);
+
+-- The sender's "what is due" scan
+CREATE INDEX IF NOT EXISTS idx_email_outbox_due
+  ON EmailOutbox(next_attempt_at) WHERE status = 'queued';
+
+-- Delivery history per ticket
+CREATE INDEX IF NOT EXISTS idx_email_outbox_ticket
+  ON EmailOutbox(ticket_id) WHERE ticket_id IS NOT NULL;
@@ -0,0 +1,62 @@
+-- Migration: Typed numeric telemetry storage
+-- Purpose: UnitReadings metric columns are REAL/INTEGER (see NUMERIC_COLUMNS in
+--          core/readings_repo.py); rebuild existing databases with
+--          utility/migrate_readings_numeric.py.
+-- UnitReadingsText keeps the old all-TEXT shape for readers (exports, ad-hoc
+-- scripts) that still expect string values.
+
+CREATE VIEW IF NOT EXISTS UnitReadingsText AS
+SELECT
+  reading_id,
+  unit_id,
+  ts,
+  CAST(i_temp AS TEXT) AS i_temp,
+  CAST(o_temp AS TEXT) AS o_temp,
+  CAST(supply_temp AS TEXT) AS supply_temp,
+  CAST(return_temp AS TEXT) AS return_temp,
+  CAST(delta_t AS TEXT) AS delta_t,
+  CAST(v_1 AS TEXT) AS v_1,
+  CAST(v_2 AS TEXT) AS v_2,
+  CAST(v_3 AS TEXT) AS v_3,
+  CAST(a_1 AS TEXT) AS a_1,
+  CAST(a_2 AS TEXT) AS a_2,
+  CAST(a_3 AS TEXT) AS a_3,
+  CAST(id_l1 AS TEXT) AS id_l1,
+  CAST(id_l2 AS TEXT) AS id_l2,
+  CAST(h_1 AS TEXT) AS h_1,
+  CAST(h_2 AS TEXT) AS h_2,
+  CAST(rh AS TEXT) AS rh,
+  CAST(l_v AS TEXT) AS l_v,
+  CAST(discharge_psi AS TEXT) AS discharge_psi,
+  CAST(suction_psi AS TEXT) AS suction_psi,
+  CAST(c_1 AS TEXT) AS c_1,
+  CAST(c_2 AS TEXT) AS c_2,
+  CAST(c_3 AS TEXT) AS c_3,
+  CAST(time_1 AS TEXT) AS time_1,
+  CAST(time_2 AS TEXT) AS time_2,
+  CAST(date_1 AS TEXT) AS date_1,
+  CAST(runtime_hours AS TEXT) AS runtime_hours,
+  CAST(compressor_runtime_hours AS TEXT) AS compressor_runtime_hours,
+  CAST(sp_1 AS TEXT) AS sp_1,
+  CAST(sp_2 AS TEXT) AS sp_2,
+  CAST(sp_deadband AS TEXT) AS sp_deadband,
+  CAST(rpm_1 AS TEXT) AS rpm_1,
+  CAST(rpm_2 AS TEXT) AS rpm_2,
+  CAST(fan_speed_percent AS TEXT) AS fan_speed_percent,
+  CAST(ev_1 AS TEXT) AS ev_1,
+  CAST(ev_2 AS TEXT) AS ev_2,
+  CAST(superheat AS TEXT) AS superheat,
+  CAST(subcooling AS TEXT) AS subcooling,
+  CAST(cn_1 AS TEXT) AS cn_1,
+  CAST(cn_2 AS TEXT) AS cn_2,
+  CAST(compressor_amps AS TEXT) AS compressor_amps,
+  CAST(mode AS TEXT) AS mode,
+  CAST(unit_status AS TEXT) AS unit_status,
+  CAST(fault_code AS TEXT) AS fault_code,
+  CAST(accumulator_level AS TEXT) AS accumulator_level,
+  CAST(oil_pressure AS TEXT) AS oil_pressure,
+  CAST(demand_percent AS TEXT) AS demand_percent,
+  CAST(load_percent AS TEXT) AS load_percent,
+  CAST(alarm_status AS TEXT) AS alarm_status,
+  CAST(alert_message AS TEXT) AS alert_message
+FROM UnitReadings;
@@ -0,0 +1,131 @@
+-- Migration: Telemetry roll-up tiers + monthly partitions
+-- Purpose: Long-window reports read pre-aggregated buckets instead of raw UnitReadings,
+--          and closed months of raw readings can be moved out to per-month archive files.
+-- Maintained by core/telemetry_store.py (background job in core/telemetry_maintenance.py).
+
+-- Range scans by time (roll-ups, archiving) without going through unit_id
+CREATE INDEX IF NOT EXISTS idx_readings_ts ON UnitReadings(ts);
+
+-- One row per (tier, unit, bucket). tier: '1m' | '15m' | '1h' | '1d'
+-- Per metric: min / max / sum / n (non-null readings) so avg = sum / n
+CREATE TABLE IF NOT EXISTS ReadingRollups (
+  tier            TEXT NOT NULL,
+  unit_id         INTEGER NOT NULL,
+  bucket          TEXT NOT NULL,                     -- bucket start, 'YYYY-MM-DD HH:MM:SS' (UTC)
+  readings        INTEGER NOT NULL,                  -- raw readings in the bucket
+  alert_count     INTEGER NOT NULL DEFAULT 0,        -- readings with a fault / active alarm / Fault mode
+  fault_codes     TEXT,                              -- distinct fault codes, comma separated
+
+  -- Supply air temperature
+  supply_temp_min       REAL,
+  supply_temp_max       REAL,
+  supply_temp_sum       REAL,
+  supply_temp_n         INTEGER,
+  -- Return air temperature
+  return_temp_min       REAL,
+  return_temp_max       REAL,
+  return_temp_sum       REAL,
+  return_temp_n         INTEGER,
+  -- Indoor air temperature
+  i_temp_min            REAL,
+  i_temp_max            REAL,
+  i_temp_sum            REAL,
+  i_temp_n              INTEGER,
+  -- Outdoor air temperature
+  o_temp_min            REAL,
+  o_temp_max            REAL,
+  o_temp_sum            REAL,
+  o_temp_n              INTEGER,
+  -- Delta T
+  delta_t_min           REAL,
+  delta_t_max           REAL,
+  delta_t_sum           REAL,
+  delta_t_n             INTEGER,
+  -- Cooling setpoint
+  sp_1_min              REAL,
+  sp_1_max              REAL,
+  sp_1_sum              REAL,
+  sp_1_n                INTEGER,
+  -- Heating setpoint
+  sp_2_min              REAL,
+  sp_2_max              REAL,
+  sp_2_sum              REAL,
+  sp_2_n                INTEGER,
+  -- Discharge pressure
+  discharge_psi_min     REAL,
+  discharge_psi_max     REAL,
+  discharge_psi_sum     REAL,
+  discharge_psi_n       INTEGER,
+  -- Suction pressure
+  suction_psi_min       REAL,
+  suction_psi_max       REAL,
+  suction_psi_sum       REAL,
+  suction_psi_n         INTEGER,
+  -- Superheat
+  superheat_min         REAL,
+  superheat_max         REAL,
+  superheat_sum         REAL,
+  superheat_n           INTEGER,
+  -- Subcooling
+  subcooling_min        REAL,
+  subcooling_max        REAL,
+  subcooling_sum        REAL,
+  subcooling_n          INTEGER,
+  -- Compressor amperage
+  compressor_amps_min   REAL,
+  compressor_amps_max   REAL,
+  compressor_amps_sum   REAL,
+  compressor_amps_n     INTEGER,
+  -- Voltage phase 1
+  v_1_min               REAL,
+  v_1_max               REAL,
+  v_1_sum               REAL,
+  v_1_n                 INTEGER,
+  -- Voltage phase 2
+  v_2_min               REAL,
+  v_2_max               REAL,
+  v_2_sum               REAL,
+  v_2_n                 INTEGER,
+  -- Voltage phase 3
+  v_3_min               REAL,
+  v_3_max               REAL,
+  v_3_sum               REAL,
+  v_3_n                 INTEGER,
+  -- Relative humidity
+  rh_min                REAL,
+  rh_max                REAL,
+  rh_sum                REAL,
+  rh_n                  INTEGER,
+
+  PRIMARY KEY (tier, unit_id, bucket)
+) WITHOUT ROWID;
+
+-- All units for a time range (alert history, retention pruning)
+CREATE INDEX IF NOT EXISTS idx_rollups_tier_bucket ON ReadingRollups(tier, bucket);
+
+-- Everything before rolled_until has been aggregated for that tier
+CREATE TABLE IF NOT EXISTS RollupWatermarks (
+  tier            TEXT PRIMARY KEY,
+  rolled_until    TEXT NOT NULL,
+  updated         TEXT DEFAULT (datetime('now'))
+);
+
+-- Readings written behind the watermarks (a gateway flushing its buffer after an
+-- outage): the ingest writer records their span, the next roll-up run rebuilds
+-- the buckets it touches and deletes the row
+CREATE TABLE IF NOT EXISTS RollupDirtyRanges (
+  id              INTEGER PRIMARY KEY AUTOINCREMENT,
+  start_ts        TEXT NOT NULL,                     -- oldest late reading
+  end_ts          TEXT NOT NULL,                     -- exclusive: newest late reading + 1s
+  recorded        TEXT DEFAULT (datetime('now'))
+);
+
+-- Months of raw readings moved out of UnitReadings into their own database file
+CREATE TABLE IF NOT EXISTS ReadingPartitions (
+  month           TEXT PRIMARY KEY,                  -- 'YYYY-MM'
+  path            TEXT NOT NULL,                     -- archive database file
+  rows            INTEGER NOT NULL DEFAULT 0,
+  first_ts        TEXT,
+  last_ts         TEXT,
+  archived        TEXT DEFAULT (datetime('now'))
+);
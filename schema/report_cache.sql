@@ -0,0 +1,82 @@
+-- Migration: Report cache table versions
+-- Purpose: Every insert/update/delete on a table the reports read bumps that
+--          table's row here. core/report_cache keeps a report result together
+--          with the versions of the tables it read and drops it when any of
+--          them moved - whichever process or code path made the write.
+-- Applied by core/report_cache.ensure_report_cache_tables()
+
+CREATE TABLE IF NOT EXISTS ReportTableVersions (
+  table_name  TEXT PRIMARY KEY,
+  version     INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO ReportTableVersions (table_name) VALUES
+  ('Customers'), ('PropertyLocations'), ('Units'), ('ServiceCalls');
+
+-- Customers
+CREATE TRIGGER IF NOT EXISTS trg_report_version_customers_insert
+AFTER INSERT ON Customers
+BEGIN
+  UPDATE ReportTableVersions SET version = version + 1 WHERE table_name = 'Customers';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_report_version_customers_update
+AFTER UPDATE ON Customers
+BEGIN
+  UPDATE ReportTableVersions SET version = version + 1 WHERE table_name = 'Customers';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_report_version_customers_delete
+AFTER DELETE ON Customers
+BEGIN
+  UPDATE ReportTableVersions SET version = version + 1 WHERE table_name = 'Customers';
+END;
+
+-- PropertyLocations
+CREATE TRIGGER IF NOT EXISTS trg_report_version_propertylocations_insert
+AFTER INSERT ON PropertyLocations
+BEGIN
+  UPDATE ReportTableVersions SET version = version + 1 WHERE table_name = 'PropertyLocations';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_report_version_propertylocations_update
+AFTER UPDATE ON PropertyLocations
+BEGIN
+  UPDATE ReportTableVersions SET version = version + 1 WHERE table_name = 'PropertyLocations';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_report_version_propertylocations_delete
+AFTER DELETE ON PropertyLocations
+BEGIN
+  UPDATE ReportTableVersions SET version = version + 1 WHERE table_name = 'PropertyLocations';
+END;
+
+-- Units
+CREATE TRIGGER IF NOT EXISTS trg_report_version_units_insert
+AFTER INSERT ON Units
+BEGIN
+  UPDATE ReportTableVersions SET version = version + 1 WHERE table_name = 'Units';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_report_version_units_update
+AFTER UPDATE ON Units
+BEGIN
+  UPDATE ReportTableVersions SET version = version + 1 WHERE table_name = 'Units';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_report_version_units_delete
+AFTER DELETE ON Units
+BEGIN
+  UPDATE ReportTableVersions SET version = version + 1 WHERE table_name = 'Units';
+END;
+
+-- ServiceCalls
+CREATE TRIGGER IF NOT EXISTS trg_report_version_servicecalls_insert
+AFTER INSERT ON ServiceCalls
+BEGIN
+  UPDATE ReportTableVersions SET version = version + 1 WHERE table_name = 'ServiceCalls';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_report_version_servicecalls_update
+AFTER UPDATE ON ServiceCalls
+BEGIN
+  UPDATE ReportTableVersions SET version = version + 1 WHERE table_name = 'ServiceCalls';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_report_version_servicecalls_delete
+AFTER DELETE ON ServiceCalls
+BEGIN
+  UPDATE ReportTableVersions SET version = version + 1 WHERE table_name = 'ServiceCalls';
+END;
@@ -0,0 +1,16 @@
+-- Migration: Report range indexes
+-- Purpose: Indexes for the date-range and status predicates of the reports in
+--          core/reports_repo. The reports compare the stored ISO text
+--          ("YYYY-MM-DD HH:MM:SS") against range bounds (created >= ? AND
+--          created < ?) instead of wrapping the column in DATE(), so these
+--          are read as range searches. Applied on top of the ticket grid
+--          indexes (schema/ticket_grid.sql: created / status+created /
+--          customer_id+created) by core/reports_repo.ensure_report_indexes().
+
+-- Ticket resolution analysis: every column its three queries read, so the
+-- created range is answered from the index alone
+CREATE INDEX IF NOT EXISTS idx_servicecalls_created_resolution
+  ON ServiceCalls(created, priority, customer_id, closed);
+
+-- System overview: new customers in the last 30 days
+CREATE INDEX IF NOT EXISTS idx_customers_created ON Customers(created);
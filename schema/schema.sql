@@ -115,31 +115,31 @@ CREATE TABLE IF NOT EXISTS UnitReadings (
   ts              TEXT DEFAULT (datetime('now')),   -- server timestamp
 
   -- ===== TEMPERATURE PARAMETERS (°F or °C) =====
-  i_temp          TEXT,                              -- Indoor/Return air temperature
-  o_temp          TEXT,                              -- Outdoor air temperature
-  supply_temp     TEXT,                              -- Supply air temperature
-  return_temp     TEXT,                              -- Return air temperature (same as i_temp?)
-  delta_t         TEXT,                              -- Delta T (temperature differential)
+  i_temp          REAL,                              -- Indoor/Return air temperature
+  o_temp          REAL,                              -- Outdoor air temperature
+  supply_temp     REAL,                              -- Supply air temperature
+  return_temp     REAL,                              -- Return air temperature (same as i_temp?)
+  delta_t         REAL,                              -- Delta T (temperature differential)
   
   -- ===== ELECTRICAL PARAMETERS =====
-  v_1             TEXT,                              -- Voltage phase 1 (VAC)
-  v_2             TEXT,                              -- Voltage phase 2 (VAC) [added]
-  v_3             TEXT,                              -- Voltage phase 3 (VAC) [added]
-  a_1             TEXT,                              -- Amperage phase 1 (AMP)
-  a_2             TEXT,                              -- Amperage phase 2 (AMP) [added]
-  a_3             TEXT,                              -- Amperage phase 3 (AMP) [added]
+  v_1             REAL,                              -- Voltage phase 1 (VAC)
+  v_2             REAL,                              -- Voltage phase 2 (VAC) [added]
+  v_3             REAL,                              -- Voltage phase 3 (VAC) [added]
+  a_1             REAL,                              -- Amperage phase 1 (AMP)
+  a_2             REAL,                              -- Amperage phase 2 (AMP) [added]
+  a_3             REAL,                              -- Amperage phase 3 (AMP) [added]
   id_l1           TEXT,                              -- Input data line 1
   id_l2           TEXT,                              -- Input data line 2
   
   -- ===== HUMIDITY & ENVIRONMENTAL =====
-  h_1             TEXT,                              -- Humidity sensor 1 (%)
-  h_2             TEXT,                              -- Humidity sensor 2 (%)
-  rh              TEXT,                              -- Relative humidity (%)
+  h_1             REAL,                              -- Humidity sensor 1 (%)
+  h_2             REAL,                              -- Humidity sensor 2 (%)
+  rh              REAL,                              -- Relative humidity (%)
   
   -- ===== PRESSURE PARAMETERS =====
-  l_v             TEXT,                              -- Line voltage / Suction pressure
-  discharge_psi   TEXT,                              -- Discharge pressure (PSI) [added]
-  suction_psi     TEXT,                              -- Suction pressure (PSI) [added]
+  l_v             REAL,                              -- Line voltage / Suction pressure
+  discharge_psi   REAL,                              -- Discharge pressure (PSI) [added]
+  suction_psi     REAL,                              -- Suction pressure (PSI) [added]
   
   -- ===== CAPACITOR & ELECTRICAL COMPONENTS =====
   c_1             TEXT,                              -- Capacitor 1 (µF or status)
@@ -147,32 +147,32 @@ CREATE TABLE IF NOT EXISTS UnitReadings (
   c_3             TEXT,                              -- Capacitor 3 (µF or status)
   
   -- ===== TIME & OPERATIONAL METRICS =====
-  time_1          TEXT,                              -- Time parameter 1 (runtime hours)
-  time_2          TEXT,                              -- Time parameter 2
+  time_1          REAL,                              -- Time parameter 1 (runtime hours)
+  time_2          REAL,                              -- Time parameter 2
   date_1          TEXT,                              -- Date parameter 1
-  runtime_hours   TEXT,                              -- Total runtime hours (cumulative) [added]
-  compressor_runtime_hours TEXT,                     -- Compressor specific runtime [added]
+  runtime_hours   REAL,                              -- Total runtime hours (cumulative) [added]
+  compressor_runtime_hours REAL,                     -- Compressor specific runtime [added]
   
   -- ===== SETPOINTS & CONTROL =====
-  sp_1            TEXT,                              -- Setpoint 1 (cooling setpoint, °F)
-  sp_2            TEXT,                              -- Setpoint 2 (heating setpoint, °F)
-  sp_deadband     TEXT,                              -- Setpoint deadband [added]
+  sp_1            REAL,                              -- Setpoint 1 (cooling setpoint, °F)
+  sp_2            REAL,                              -- Setpoint 2 (heating setpoint, °F)
+  sp_deadband     REAL,                              -- Setpoint deadband [added]
   
   -- ===== FAN & MOTOR PARAMETERS =====
-  rpm_1           TEXT,                              -- Fan/motor 1 speed (RPM or %)
-  rpm_2           TEXT,                              -- Fan/motor 2 speed (RPM or %)
-  fan_speed_percent TEXT,                            -- Fan speed (0-100%) [added]
+  rpm_1           INTEGER,                           -- Fan/motor 1 speed (RPM or %)
+  rpm_2           INTEGER,                           -- Fan/motor 2 speed (RPM or %)
+  fan_speed_percent INTEGER,                         -- Fan speed (0-100%) [added]
   
   -- ===== EXPANSION VALVE & REFRIGERANT =====
-  ev_1            TEXT,                              -- Expansion valve 1 (%)
-  ev_2            TEXT,                              -- Expansion valve 2 (%)
-  superheat       TEXT,                              -- Superheat (°F) [added]
-  subcooling      TEXT,                              -- Subcooling (°F) [added]
+  ev_1            REAL,                              -- Expansion valve 1 (%)
+  ev_2            REAL,                              -- Expansion valve 2 (%)
+  superheat       REAL,                              -- Superheat (°F) [added]
+  subcooling      REAL,                              -- Subcooling (°F) [added]
   
   -- ===== COMPRESSOR & COMPONENT STATUS =====
   cn_1            TEXT,                              -- Compressor number 1 / status
   cn_2            TEXT,                              -- Compressor number 2 / status
-  compressor_amps TEXT,                              -- Compressor amperage [added]
+  compressor_amps REAL,                              -- Compressor amperage [added]
   
   -- ===== OPERATIONAL MODE & STATUS =====
   mode            TEXT,                              -- Operating mode (Off/Idle/Cooling/Heating/Economizer/Fault)
@@ -180,12 +180,12 @@ CREATE TABLE IF NOT EXISTS UnitReadings (
   fault_code      TEXT,                              -- Fault/error code if any [added]
   
   -- ===== ACCUMULATOR & SYSTEM HEALTH =====
-  accumulator_level TEXT,                            -- Accumulator charge level [added]
-  oil_pressure    TEXT,                              -- Oil pressure (PSI) [added]
+  accumulator_level REAL,                            -- Accumulator charge level [added]
+  oil_pressure    REAL,                              -- Oil pressure (PSI) [added]
   
   -- ===== DEMAND & LOAD =====
-  demand_percent  TEXT,                              -- System demand (%) [added]
-  load_percent    TEXT,                              -- Current load (%) [added]
+  demand_percent  INTEGER,                           -- System demand (%) [added]
+  load_percent    INTEGER,                           -- Current load (%) [added]
   
   -- ===== ALARMS & DIAGNOSTICS =====
   alarm_status    TEXT,                              -- Alarm status (None/Active/Cleared) [added]
@@ -198,6 +198,63 @@ CREATE INDEX IF NOT EXISTS idx_readings_unit_ts ON UnitReadings(unit_id, ts);
 CREATE INDEX IF NOT EXISTS idx_readings_unit_mode ON UnitReadings(unit_id, mode);
 CREATE INDEX IF NOT EXISTS idx_readings_fault ON UnitReadings(fault_code) WHERE fault_code IS NOT NULL;
 
+-- Old all-TEXT shape of UnitReadings for legacy readers (see readings_numeric.sql)
+CREATE VIEW IF NOT EXISTS UnitReadingsText AS
+SELECT
+  reading_id,
+  unit_id,
+  ts,
+  CAST(i_temp AS TEXT) AS i_temp,
+  CAST(o_temp AS TEXT) AS o_temp,
+  CAST(supply_temp AS TEXT) AS supply_temp,
+  CAST(return_temp AS TEXT) AS return_temp,
+  CAST(delta_t AS TEXT) AS delta_t,
+  CAST(v_1 AS TEXT) AS v_1,
+  CAST(v_2 AS TEXT) AS v_2,
+  CAST(v_3 AS TEXT) AS v_3,
+  CAST(a_1 AS TEXT) AS a_1,
+  CAST(a_2 AS TEXT) AS a_2,
+  CAST(a_3 AS TEXT) AS a_3,
+  CAST(id_l1 AS TEXT) AS id_l1,
+  CAST(id_l2 AS TEXT) AS id_l2,
+  CAST(h_1 AS TEXT) AS h_1,
+  CAST(h_2 AS TEXT) AS h_2,
+  CAST(rh AS TEXT) AS rh,
+  CAST(l_v AS TEXT) AS l_v,
+  CAST(discharge_psi AS TEXT) AS discharge_psi,
+  CAST(suction_psi AS TEXT) AS suction_psi,
+  CAST(c_1 AS TEXT) AS c_1,
+  CAST(c_2 AS TEXT) AS c_2,
+  CAST(c_3 AS TEXT) AS c_3,
+  CAST(time_1 AS TEXT) AS time_1,
+  CAST(time_2 AS TEXT) AS time_2,
+  CAST(date_1 AS TEXT) AS date_1,
+  CAST(runtime_hours AS TEXT) AS runtime_hours,
+  CAST(compressor_runtime_hours AS TEXT) AS compressor_runtime_hours,
+  CAST(sp_1 AS TEXT) AS sp_1,
+  CAST(sp_2 AS TEXT) AS sp_2,
+  CAST(sp_deadband AS TEXT) AS sp_deadband,
+  CAST(rpm_1 AS TEXT) AS rpm_1,
+  CAST(rpm_2 AS TEXT) AS rpm_2,
+  CAST(fan_speed_percent AS TEXT) AS fan_speed_percent,
+  CAST(ev_1 AS TEXT) AS ev_1,
+  CAST(ev_2 AS TEXT) AS ev_2,
+  CAST(superheat AS TEXT) AS superheat,
+  CAST(subcooling AS TEXT) AS subcooling,
+  CAST(cn_1 AS TEXT) AS cn_1,
+  CAST(cn_2 AS TEXT) AS cn_2,
+  CAST(compressor_amps AS TEXT) AS compressor_amps,
+  CAST(mode AS TEXT) AS mode,
+  CAST(unit_status AS TEXT) AS unit_status,
+  CAST(fault_code AS TEXT) AS fault_code,
+  CAST(accumulator_level AS TEXT) AS accumulator_level,
+  CAST(oil_pressure AS TEXT) AS oil_pressure,
+  CAST(demand_percent AS TEXT) AS demand_percent,
+  CAST(load_percent AS TEXT) AS load_percent,
+  CAST(alarm_status AS TEXT) AS alarm_status,
+  CAST(alert_message AS TEXT) AS alert_message
+FROM UnitReadings;
+
 -- =========================
 -- Service calls & reports (so the app can do real things)
 -- =========================
@@ -94,6 +94,11 @@ CREATE TABLE IF NOT EXISTS ServiceCallSettings (
   updated           TEXT DEFAULT (datetime('now'))
 );
 
+-- =========================
+-- Telemetry Retention Settings Table
+-- =========================
+-- TelemetryRetentionSettings / TelemetryRetentionRuns: see telemetry_retention.sql
+
 -- =========================
 -- Ticket Sequence Table
 -- =========================
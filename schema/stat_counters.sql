@@ -0,0 +1,231 @@
+-- Migration: Dashboard / ticket counters
+-- Purpose: Row counts for the dashboard tiles and the ticket stats bar, kept
+--          current by triggers so a tile reads a handful of rows instead of
+--          counting Customers, PropertyLocations, Units, UnitAlerts and
+--          ServiceCalls on every render.
+-- Applied by core/stat_counters.ensure_stat_counters(), which also fills the
+-- table on first run; core/stat_counters.check_stat_counters() recounts
+-- everything and repairs drift (maintenance job "counters").
+--
+-- customer_id 0 holds the totals over all customers. Counter names:
+--   customers                      (totals only)
+--   locations, units, active_alerts (UnitAlerts.status != 'cleared')
+--   tickets, tickets:<status>      (e.g. 'tickets:In Progress'; NULL status -> 'tickets:')
+--   emergency                      (priority 'Emergency', status not 'Closed')
+--
+-- Cascading deletes: while SQLite deletes children through ON DELETE CASCADE
+-- their parent row is already gone, so a child trigger cannot find the
+-- customer it belonged to. The BEFORE DELETE trigger of the row actually
+-- deleted (a location, a unit) therefore takes its children off its customer's
+-- counters, and the child triggers only adjust the customer they can still
+-- find. Totals are adjusted by every row. Deleting a customer drops its rows.
+
+CREATE TABLE IF NOT EXISTS StatCounters (
+  customer_id  INTEGER NOT NULL,      -- 0 = all customers
+  name         TEXT NOT NULL,
+  n            INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (customer_id, name)
+) WITHOUT ROWID;
+
+-- Customers
+CREATE TRIGGER IF NOT EXISTS trg_stat_counters_customers_insert
+AFTER INSERT ON Customers
+BEGIN
+  INSERT INTO StatCounters (customer_id, name, n) VALUES (0, 'customers', 1)
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stat_counters_customers_delete
+AFTER DELETE ON Customers
+BEGIN
+  INSERT INTO StatCounters (customer_id, name, n) VALUES (0, 'customers', -1)
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+  DELETE FROM StatCounters WHERE customer_id = OLD.ID;
+END;
+
+-- PropertyLocations
+CREATE TRIGGER IF NOT EXISTS trg_stat_counters_locations_insert
+AFTER INSERT ON PropertyLocations
+BEGIN
+  INSERT INTO StatCounters (customer_id, name, n) VALUES
+    (0, 'locations', 1), (NEW.customer_id, 'locations', 1)
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stat_counters_locations_before_delete
+BEFORE DELETE ON PropertyLocations
+BEGIN
+  INSERT INTO StatCounters (customer_id, name, n) VALUES
+    (OLD.customer_id, 'units', -(SELECT COUNT(*) FROM Units WHERE location_id = OLD.ID)),
+    (OLD.customer_id, 'active_alerts', -(SELECT COUNT(*) FROM UnitAlerts a JOIN Units u ON u.unit_id = a.unit_id
+                                         WHERE u.location_id = OLD.ID AND a.status != 'cleared'))
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stat_counters_locations_delete
+AFTER DELETE ON PropertyLocations
+BEGIN
+  INSERT INTO StatCounters (customer_id, name, n) VALUES
+    (0, 'locations', -1), (OLD.customer_id, 'locations', -1)
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+END;
+
+-- A location moved to another customer takes its units and alerts along
+CREATE TRIGGER IF NOT EXISTS trg_stat_counters_locations_move
+AFTER UPDATE OF customer_id ON PropertyLocations
+WHEN OLD.customer_id IS NOT NEW.customer_id
+BEGIN
+  INSERT INTO StatCounters (customer_id, name, n)
+  SELECT c.customer_id, k.name, c.sign * k.n
+  FROM (SELECT OLD.customer_id AS customer_id, -1 AS sign UNION ALL SELECT NEW.customer_id, 1) c,
+       (SELECT 'locations' AS name, 1 AS n
+        UNION ALL SELECT 'units', COUNT(*) FROM Units WHERE location_id = NEW.ID
+        UNION ALL SELECT 'active_alerts', COUNT(*) FROM UnitAlerts a JOIN Units u ON u.unit_id = a.unit_id
+                  WHERE u.location_id = NEW.ID AND a.status != 'cleared') k
+  WHERE true
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+END;
+
+-- Units (customer through PropertyLocations)
+CREATE TRIGGER IF NOT EXISTS trg_stat_counters_units_insert
+AFTER INSERT ON Units
+BEGIN
+  INSERT INTO StatCounters (customer_id, name, n) VALUES (0, 'units', 1)
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+  INSERT INTO StatCounters (customer_id, name, n)
+  SELECT customer_id, 'units', 1 FROM PropertyLocations WHERE ID = NEW.location_id
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stat_counters_units_before_delete
+BEFORE DELETE ON Units
+BEGIN
+  INSERT INTO StatCounters (customer_id, name, n)
+  SELECT customer_id, 'active_alerts',
+         -(SELECT COUNT(*) FROM UnitAlerts WHERE unit_id = OLD.unit_id AND status != 'cleared')
+  FROM PropertyLocations WHERE ID = OLD.location_id
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stat_counters_units_delete
+AFTER DELETE ON Units
+BEGIN
+  INSERT INTO StatCounters (customer_id, name, n) VALUES (0, 'units', -1)
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+  INSERT INTO StatCounters (customer_id, name, n)
+  SELECT customer_id, 'units', -1 FROM PropertyLocations WHERE ID = OLD.location_id
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stat_counters_units_move
+AFTER UPDATE OF location_id ON Units
+WHEN OLD.location_id IS NOT NEW.location_id
+BEGIN
+  INSERT INTO StatCounters (customer_id, name, n)
+  SELECT pl.customer_id, k.name, c.sign * k.n
+  FROM (SELECT OLD.location_id AS location_id, -1 AS sign UNION ALL SELECT NEW.location_id, 1) c
+  JOIN PropertyLocations pl ON pl.ID = c.location_id,
+       (SELECT 'units' AS name, 1 AS n
+        UNION ALL SELECT 'active_alerts', COUNT(*) FROM UnitAlerts
+                  WHERE unit_id = NEW.unit_id AND status != 'cleared') k
+  WHERE true
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+END;
+
+-- UnitAlerts (open + acked; customer through Units and PropertyLocations)
+CREATE TRIGGER IF NOT EXISTS trg_stat_counters_alerts_insert
+AFTER INSERT ON UnitAlerts
+WHEN NEW.status != 'cleared'
+BEGIN
+  INSERT INTO StatCounters (customer_id, name, n) VALUES (0, 'active_alerts', 1)
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+  INSERT INTO StatCounters (customer_id, name, n)
+  SELECT pl.customer_id, 'active_alerts', 1
+  FROM Units u JOIN PropertyLocations pl ON pl.ID = u.location_id WHERE u.unit_id = NEW.unit_id
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stat_counters_alerts_delete
+AFTER DELETE ON UnitAlerts
+WHEN OLD.status != 'cleared'
+BEGIN
+  INSERT INTO StatCounters (customer_id, name, n) VALUES (0, 'active_alerts', -1)
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+  INSERT INTO StatCounters (customer_id, name, n)
+  SELECT pl.customer_id, 'active_alerts', -1
+  FROM Units u JOIN PropertyLocations pl ON pl.ID = u.location_id WHERE u.unit_id = OLD.unit_id
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+END;
+
+-- Most alert updates (readings, last_seen_at, ack) leave the count alone
+CREATE TRIGGER IF NOT EXISTS trg_stat_counters_alerts_update
+AFTER UPDATE OF status, unit_id ON UnitAlerts
+WHEN (OLD.status != 'cleared') != (NEW.status != 'cleared') OR OLD.unit_id IS NOT NEW.unit_id
+BEGIN
+  INSERT INTO StatCounters (customer_id, name, n)
+  SELECT 0, 'active_alerts', (NEW.status != 'cleared') - (OLD.status != 'cleared')
+  WHERE true
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+  INSERT INTO StatCounters (customer_id, name, n)
+  SELECT pl.customer_id, 'active_alerts', c.n
+  FROM (SELECT OLD.unit_id AS unit_id, -(OLD.status != 'cleared') AS n
+        UNION ALL SELECT NEW.unit_id, NEW.status != 'cleared') c
+  JOIN Units u ON u.unit_id = c.unit_id
+  JOIN PropertyLocations pl ON pl.ID = u.location_id
+  WHERE c.n != 0
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+END;
+
+-- ServiceCalls
+CREATE TRIGGER IF NOT EXISTS trg_stat_counters_tickets_insert
+AFTER INSERT ON ServiceCalls
+BEGIN
+  INSERT INTO StatCounters (customer_id, name, n)
+  SELECT c.customer_id, k.name, k.n
+  FROM (SELECT 0 AS customer_id UNION ALL SELECT NEW.customer_id) c,
+       (SELECT 'tickets' AS name, 1 AS n
+        UNION ALL SELECT 'tickets:' || COALESCE(NEW.status, ''), 1
+        UNION ALL SELECT 'emergency', 1
+                  WHERE NEW.priority = 'Emergency' AND NEW.status IS NOT 'Closed') k
+  WHERE true
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stat_counters_tickets_delete
+AFTER DELETE ON ServiceCalls
+BEGIN
+  INSERT INTO StatCounters (customer_id, name, n)
+  SELECT c.customer_id, k.name, k.n
+  FROM (SELECT 0 AS customer_id UNION ALL SELECT OLD.customer_id) c,
+       (SELECT 'tickets' AS name, -1 AS n
+        UNION ALL SELECT 'tickets:' || COALESCE(OLD.status, ''), -1
+        UNION ALL SELECT 'emergency', -1
+                  WHERE OLD.priority = 'Emergency' AND OLD.status IS NOT 'Closed') k
+  WHERE true
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stat_counters_tickets_update
+AFTER UPDATE OF customer_id, status, priority ON ServiceCalls
+WHEN OLD.customer_id IS NOT NEW.customer_id OR OLD.status IS NOT NEW.status
+  OR OLD.priority IS NOT NEW.priority
+BEGIN
+  INSERT INTO StatCounters (customer_id, name, n)
+  SELECT c.customer_id, k.name, k.n
+  FROM (SELECT 0 AS customer_id UNION ALL SELECT OLD.customer_id) c,
+       (SELECT 'tickets' AS name, -1 AS n
+        UNION ALL SELECT 'tickets:' || COALESCE(OLD.status, ''), -1
+        UNION ALL SELECT 'emergency', -1
+                  WHERE OLD.priority = 'Emergency' AND OLD.status IS NOT 'Closed') k
+  WHERE true
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+  INSERT INTO StatCounters (customer_id, name, n)
+  SELECT c.customer_id, k.name, k.n
+  FROM (SELECT 0 AS customer_id UNION ALL SELECT NEW.customer_id) c,
+       (SELECT 'tickets' AS name, 1 AS n
+        UNION ALL SELECT 'tickets:' || COALESCE(NEW.status, ''), 1
+        UNION ALL SELECT 'emergency', 1
+                  WHERE NEW.priority = 'Emergency' AND NEW.status IS NOT 'Closed') k
+  WHERE true
+  ON CONFLICT(customer_id, name) DO UPDATE SET n = n + excluded.n;
+END;
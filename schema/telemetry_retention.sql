@@ -0,0 +1,35 @@
+-- Migration: Telemetry retention policy + run log
+-- Purpose: Days to keep raw readings and each roll-up tier, and one row per
+--          pruning run. Applied once at startup by
+--          core/settings_repo.ensure_retention_tables(); read by
+--          core/telemetry_retention.py.
+
+-- Days to keep each telemetry tier; 0 = keep forever
+CREATE TABLE IF NOT EXISTS TelemetryRetentionSettings (
+  id                INTEGER PRIMARY KEY CHECK (id = 1),
+  enabled           INTEGER DEFAULT 1,
+  raw_days          INTEGER DEFAULT 30,       -- UnitReadings (each unit's latest reading is always kept)
+  rollup_1m_days    INTEGER DEFAULT 30,       -- ReadingRollups tier '1m'
+  rollup_15m_days   INTEGER DEFAULT 365,      -- ReadingRollups tier '15m'
+  rollup_1h_days    INTEGER DEFAULT 730,      -- ReadingRollups tier '1h'
+  rollup_1d_days    INTEGER DEFAULT 0,        -- ReadingRollups tier '1d'
+  batch_size        INTEGER DEFAULT 5000,     -- rows per delete transaction
+  run_every_minutes INTEGER DEFAULT 60,
+  updated           TEXT DEFAULT (datetime('now'))
+);
+
+-- One row per retention run (what was pruned, how long it took)
+CREATE TABLE IF NOT EXISTS TelemetryRetentionRuns (
+  id                INTEGER PRIMARY KEY AUTOINCREMENT,
+  started           TEXT DEFAULT (datetime('now')),
+  raw_pruned        INTEGER DEFAULT 0,
+  rollups_pruned    INTEGER DEFAULT 0,
+  bytes_reclaimed   INTEGER DEFAULT 0,
+  duration_ms       REAL,
+  complete          INTEGER DEFAULT 1,        -- 0 = hit the per-run batch limit, rest next run
+  details           TEXT,                     -- JSON: rows pruned per tier, cutoffs
+  error             TEXT
+);
+
+-- The single policy row (the column defaults are the default policy)
+INSERT OR IGNORE INTO TelemetryRetentionSettings (id) VALUES (1);
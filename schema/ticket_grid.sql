@@ -0,0 +1,37 @@
+-- Migration: Ticket grid read model
+-- Purpose: One query returns the ticket grids' rows - customer / location /
+--          unit names and the TicketUnits count - instead of one COUNT(*)
+--          query per ticket. Pages are read with keyset pagination on
+--          (created, ID), so the indexes below serve every filter the grids use.
+-- Needs TicketUnits (schema/ticket_units_migration.sql); applied by
+-- core/tickets_repo.ensure_ticket_grid()
+
+CREATE INDEX IF NOT EXISTS idx_servicecalls_created ON ServiceCalls(created, ID);
+CREATE INDEX IF NOT EXISTS idx_servicecalls_status_created ON ServiceCalls(status, created, ID);
+CREATE INDEX IF NOT EXISTS idx_servicecalls_customer_created ON ServiceCalls(customer_id, created, ID);
+
+-- Recreated on every startup so column changes here take effect
+DROP VIEW IF EXISTS ServiceCallGrid;
+
+CREATE VIEW ServiceCallGrid AS
+SELECT
+  sc.ID, sc.customer_id, sc.location_id, sc.unit_id,
+  sc.title, sc.description, sc.priority, sc.status,
+  sc.requested_by_login_id, sc.materials_services, sc.labor_description,
+  sc.created, sc.closed,
+  COALESCE(
+    NULLIF(c.company, ''),
+    NULLIF(TRIM(COALESCE(c.first_name, '') || ' ' || COALESCE(c.last_name, '')), ''),
+    NULLIF(c.email, '')
+  ) AS customer_name,
+  COALESCE(NULLIF(p.address1, ''), NULLIF(p.address2, '')) AS location_address,
+  u.unit_tag AS unit_name,
+  -- Same rule as units_repo.get_ticket_unit_ids: TicketUnits, else the legacy single unit
+  COALESCE(
+    NULLIF((SELECT COUNT(*) FROM TicketUnits tu WHERE tu.ticket_id = sc.ID), 0),
+    CASE WHEN sc.unit_id IS NOT NULL THEN 1 ELSE 0 END
+  ) AS unit_count
+FROM ServiceCalls sc
+LEFT JOIN Customers c ON sc.customer_id = c.ID
+LEFT JOIN PropertyLocations p ON sc.location_id = p.ID
+LEFT JOIN Units u ON sc.unit_id = u.unit_id;
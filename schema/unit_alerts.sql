@@ -0,0 +1,42 @@
+-- Migration: Alert lifecycle
+-- Purpose: Alerts opened / acknowledged / cleared by the streaming evaluator
+--          (core/unit_alerts.py) as readings arrive, instead of recomputing
+--          them from UnitReadings on every dashboard render or report.
+
+CREATE TABLE IF NOT EXISTS UnitAlerts (
+  alert_id            INTEGER PRIMARY KEY AUTOINCREMENT,
+  unit_id             INTEGER NOT NULL,
+  code                TEXT NOT NULL,                 -- AlertRules.code ('alerts' ruleset)
+  category            TEXT,
+  severity            TEXT NOT NULL,                 -- critical | warning | info
+  status              TEXT NOT NULL DEFAULT 'open',  -- open | acked | cleared
+  message             TEXT,                          -- latest rendered message
+  parameter           TEXT,
+  readings            INTEGER NOT NULL DEFAULT 1,    -- matching readings while active
+  opened_at           TEXT NOT NULL,                 -- reading ts that opened it
+  opened_reading_id   INTEGER,
+  last_seen_at        TEXT,                          -- last matching reading
+  last_reading_id     INTEGER,
+  acked_at            TEXT,
+  acked_by            TEXT,
+  cleared_at          TEXT,
+  cleared_reading_id  INTEGER,
+  clear_reason        TEXT,                          -- normal | rule removed
+  FOREIGN KEY (unit_id) REFERENCES Units(unit_id) ON DELETE CASCADE
+);
+
+-- At most one active alert per unit and code; also serves "open alerts" counts
+CREATE UNIQUE INDEX IF NOT EXISTS ux_unit_alerts_active
+  ON UnitAlerts(unit_id, code) WHERE status != 'cleared';
+
+-- Alert history windows
+CREATE INDEX IF NOT EXISTS idx_unit_alerts_opened ON UnitAlerts(opened_at);
+CREATE INDEX IF NOT EXISTS idx_unit_alerts_cleared ON UnitAlerts(cleared_at) WHERE cleared_at IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_unit_alerts_unit ON UnitAlerts(unit_id, opened_at);
+
+-- Every reading up to last_reading_id has been evaluated
+CREATE TABLE IF NOT EXISTS UnitAlertsWatermark (
+  id               INTEGER PRIMARY KEY CHECK (id = 1),
+  last_reading_id  INTEGER NOT NULL,
+  updated          TEXT DEFAULT (datetime('now'))
+);
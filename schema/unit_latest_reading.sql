@@ -0,0 +1,37 @@
+-- Migration: Materialized "latest reading per unit"
+-- Purpose: Dashboard / thermostat / current-alerts queries read one row per unit
+--          instead of scanning UnitReadings with MAX(reading_id) GROUP BY unit_id.
+-- Maintained by triggers on UnitReadings; rebuild with utility/rebuild_latest_readings.py
+
+CREATE TABLE IF NOT EXISTS UnitLatestReading (
+  unit_id         INTEGER PRIMARY KEY,
+  reading_id      INTEGER NOT NULL,                  -- newest UnitReadings.reading_id for this unit
+  ts              TEXT,                              -- copy of UnitReadings.ts for that reading
+  FOREIGN KEY(unit_id) REFERENCES Units(unit_id) ON DELETE CASCADE
+);
+
+-- Newer reading wins (same rule as MAX(reading_id))
+CREATE TRIGGER IF NOT EXISTS trg_readings_latest_ins
+AFTER INSERT ON UnitReadings
+BEGIN
+  INSERT INTO UnitLatestReading (unit_id, reading_id, ts)
+  VALUES (NEW.unit_id, NEW.reading_id, NEW.ts)
+  ON CONFLICT(unit_id) DO UPDATE SET
+    reading_id = excluded.reading_id,
+    ts = excluded.ts
+  WHERE excluded.reading_id > UnitLatestReading.reading_id;
+END;
+
+-- If the latest reading is deleted, fall back to the next newest one
+CREATE TRIGGER IF NOT EXISTS trg_readings_latest_del
+AFTER DELETE ON UnitReadings
+WHEN OLD.reading_id = (SELECT reading_id FROM UnitLatestReading WHERE unit_id = OLD.unit_id)
+BEGIN
+  DELETE FROM UnitLatestReading WHERE unit_id = OLD.unit_id;
+  INSERT INTO UnitLatestReading (unit_id, reading_id, ts)
+  SELECT unit_id, reading_id, ts
+  FROM UnitReadings
+  WHERE unit_id = OLD.unit_id
+  ORDER BY reading_id DESC
+  LIMIT 1;
+END;
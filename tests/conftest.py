@@ -0,0 +1,42 @@
+"""
+Shared fixtures: every test gets its own throwaway SQLite file
+so nothing touches data/app.db.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core import db
+from core.report_cache import reset_report_cache
+from core.settings_cache import reset_settings_cache
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """Point core.db at an empty temp database."""
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "app.db")
+    db.close_pools()
+    yield db
+    reset_settings_cache()
+    reset_report_cache()
+    db.close_pools()
+
+
+@pytest.fixture
+def schema_db(temp_db):
+    """Temp database with schema/schema.sql applied and one customer/location/unit."""
+    with temp_db.get_conn() as conn:
+        conn.executescript((PROJECT_ROOT / "schema" / "schema.sql").read_text(encoding="utf-8"))
+        conn.execute("INSERT INTO Customers (ID, company) VALUES (1, 'Acme')")
+        conn.execute("INSERT INTO PropertyLocations (ID, customer_id, address1) VALUES (1, 1, '1 Main St')")
+        conn.execute("INSERT INTO Units (unit_id, location_id, unit_tag) VALUES (1, 1, 'RTU-1')")
+
+    # Startup migrations (see app.py)
+    from core.readings_repo import ensure_latest_reading_table
+    ensure_latest_reading_table()
+    return temp_db
@@ -0,0 +1,118 @@
+"""
+Tests for vectorized batch alert evaluation.
+
+Validates:
+- evaluate_alerts_batch() gives the same codes and counts as
+  evaluate_all_alerts() for every reading, including missing, non-numeric,
+  zero, NaN/inf and boundary values
+- Typed float arrays and legacy string columns give the same result
+- readings_to_columns() accepts dicts and sqlite3.Row
+"""
+
+import random
+import sqlite3
+
+import numpy as np
+import pytest
+
+from core.alert_batch import ALERT_COLUMNS, evaluate_alerts_batch, readings_to_columns
+from core.alert_rules import reset_rule_engine
+from core.alert_system import evaluate_all_alerts
+
+_SPECIAL = [None, '', 'abc', 'nan', 'inf', '-inf', 0, 0.0, '0', ' 45 ', True]
+
+
+@pytest.fixture(autouse=True)
+def default_rules(temp_db):
+    """Built-in rules (no AlertRules table in the temp database)."""
+    reset_rule_engine()
+    yield
+    reset_rule_engine()
+
+
+def _random_readings(n, seed=7):
+    rnd = random.Random(seed)
+    # Values around every threshold, plus the awkward ones above
+    pools = {
+        'supply_temp': [31.9, 32, 32.1, 55, 139.9, 140, 140.1, 20, 85.5],
+        'return_temp': [42, 45, 55, 65, 80, 30],
+        'discharge_psi': [99.9, 100, 250, 400, 400.1, 60],
+        'suction_psi': [-5, 19.9, 20, 40, 150, 150.1, 80],
+        'v_1': [-10, 20, 50, 50.1, 60, 22],
+        'v_2': [20, 22, 50, 55, 25],
+        'v_3': [20, 23, 18, 51, 0],
+        'compressor_amps': [0, 20, 24, 26, 30, 100, -5],
+    }
+    modes = ['Cooling', 'Heating', 'Idle', 'Off', None, 'cooling']
+    faults = [None, '', 'E1', 0, 'LOW_DELTA_T']
+    readings = []
+    for i in range(n):
+        r = {'unit_id': i + 1}
+        for name, pool in pools.items():
+            r[name] = rnd.choice(_SPECIAL) if rnd.random() < 0.1 else rnd.choice(pool)
+        r['mode'] = rnd.choice(modes)
+        r['fault_code'] = rnd.choice(faults)
+        readings.append(r)
+    return readings
+
+
+def _assert_matches(readings, result):
+    for i, reading in enumerate(readings):
+        expected = evaluate_all_alerts(reading)
+        assert result['codes'][i] == [a['code'] for a in expected['all']], reading
+        assert result['count'][i] == expected['count']
+        for severity in ('critical', 'warning', 'info'):
+            assert result[severity][i] == len(expected[severity])
+
+
+class TestBatchMatchesScalar:
+
+    def test_random_mixed_values(self):
+        readings = _random_readings(5000)
+        result = evaluate_alerts_batch(readings_to_columns(readings))
+        _assert_matches(readings, result)
+        assert result['count'].sum() > 0
+        assert list(result['unit_id'][:3]) == [1, 2, 3]
+
+    def test_special_values_everywhere(self):
+        readings = []
+        for value in _SPECIAL:
+            for other in (40, 120, value):
+                readings.append({
+                    'supply_temp': value, 'return_temp': other, 'mode': 'Cooling',
+                    'discharge_psi': value, 'suction_psi': other,
+                    'v_1': value, 'v_2': other, 'v_3': 30, 'compressor_amps': value,
+                    'fault_code': value,
+                })
+        _assert_matches(readings, evaluate_alerts_batch(readings_to_columns(readings)))
+
+    def test_float_arrays_match_strings(self):
+        readings = _random_readings(2000, seed=11)
+        numeric = [k for k in ALERT_COLUMNS if k not in ('mode', 'fault_code')]
+        for r in readings:
+            for k in numeric:
+                if isinstance(r.get(k), (str, bool)):
+                    r[k] = None   # typed columns only hold numbers or NULL
+        as_text = [{k: (str(v) if k in numeric and v is not None else v) for k, v in r.items()} for r in readings]
+
+        block = readings_to_columns(readings)
+        for k in numeric:
+            block[k] = np.array([np.nan if v is None else float(v) for v in block[k]])
+
+        typed = evaluate_alerts_batch(block)
+        text = evaluate_alerts_batch(readings_to_columns(as_text))
+        assert typed['codes'] == text['codes']
+        _assert_matches(readings, typed)
+
+    def test_rows_and_empty(self):
+        conn = sqlite3.connect(':memory:')
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            "SELECT 1 AS unit_id, 20.0 AS supply_temp, 'Cooling' AS mode, 'E5' AS fault_code"
+        ).fetchall()
+        result = evaluate_alerts_batch(readings_to_columns(rows))
+        assert result['codes'] == [['UNIT_FAULT', 'TEMP_FREEZE_RISK']]
+        assert result['critical'][0] == 2
+
+        empty = evaluate_alerts_batch(readings_to_columns([]))
+        assert empty['count'].shape == (0,) and empty['codes'] == []
@@ -0,0 +1,133 @@
+"""
+Tests for the declarative alert rule engine.
+
+Validates:
+- The default rules reproduce the old hard-coded alert / health / status checks
+- core.alert_system, ui.alert_system and the batch evaluator agree
+- Rules are read from the AlertRules table and hot-reloaded when it changes
+- A YAML rule file overrides the table; invalid rules are skipped, not fatal
+- Per-rule hit counters and evaluation timings
+"""
+
+import pytest
+
+from core import alert_rules
+from core.alert_batch import evaluate_alerts_batch, readings_to_columns
+from core.alert_rules import ensure_alert_rules_table, get_rule_engine, get_rule_stats, reset_rule_engine
+from core.alert_system import evaluate_all_alerts
+from core.equipment_analysis import calculate_equipment_health_score, get_pressure_analysis
+from ui.alert_system import evaluate_all_alerts as ui_evaluate_all_alerts
+
+COLD = {'supply_temp': 20, 'return_temp': 75, 'mode': 'Cooling', 'discharge_psi': 300, 'suction_psi': 70}
+
+
+@pytest.fixture(autouse=True)
+def fresh_engine(temp_db, monkeypatch):
+    monkeypatch.delenv("ALERT_RULES_FILE", raising=False)
+    reset_rule_engine()
+    yield
+    reset_rule_engine()
+
+
+def _codes(reading):
+    return [a['code'] for a in evaluate_all_alerts(reading)['all']]
+
+
+class TestDefaults:
+
+    def test_alerts(self):
+        result = evaluate_all_alerts({**COLD, 'fault_code': 'E7'})
+        assert [a['code'] for a in result['all']] == ['UNIT_FAULT', 'TEMP_FREEZE_RISK', 'LOW_DELTA_T']
+        assert result['all'][1]['message'] == 'Supply temp 20.0°F - Freezing risk'
+        assert result['all'][2]['message'] == 'Low Delta-T (-55.0°F) - Poor efficiency'
+        assert result['count'] == 3 and len(result['critical']) == 2
+
+        imbalance = evaluate_all_alerts({'v_1': 20, 'v_2': 20, 'v_3': 30})['all'][0]
+        assert imbalance['message'] == 'Phase imbalance: 42.9% (max 10%)'
+        assert get_rule_engine().first_match({}, 'alerts') is None
+
+    def test_ui_module_uses_same_rules(self):
+        ui = ui_evaluate_all_alerts({**COLD, 'discharge_psi': 380})
+        assert [a['code'] for a in ui['all']] == _codes({**COLD, 'discharge_psi': 380})
+        assert 'HIGH_DISCHARGE_PSI' not in [a['code'] for a in ui['all']]   # 400, not the old 350
+
+    def test_health_and_status(self):
+        pressure = get_pressure_analysis(300, 100, 'Cooling')
+        assert pressure['status'] == 'warning' and pressure['warning'] == 'Low pressure ratio: 3.0 (expected 4-6)'
+        assert get_pressure_analysis(300, 100, 'Heating')['status'] == 'normal'
+
+        health = calculate_equipment_health_score({**COLD, 'v_1': 20, 'v_2': 20, 'v_3': 30, 'compressor_amps': 40})
+        assert health['electrical']['warning'].startswith('Compressor overload: 40.0A')
+
+        engine = get_rule_engine()
+        status = lambda **r: engine.first_match(r, 'status')  # noqa: E731
+        assert status(mode='Cooling', supply_temp=60, return_temp=72)['code'] == 'LOW_DELTA_T'
+        assert status(mode='Cooling', supply_temp=57, return_temp=72)['code'] == 'MARGINAL_DELTA_T'
+        assert status(mode='Heating', supply_temp=100, return_temp=70) is None
+        assert status(mode='Economizer', fan_speed_percent=0)['code'] == 'FAN_STOPPED'
+        assert status(mode='Idle', fan_speed_percent=0) is None
+
+
+class TestSources:
+
+    def test_table_hot_reload(self, temp_db, monkeypatch):
+        ensure_alert_rules_table()
+        monkeypatch.setattr(alert_rules, "RELOAD_INTERVAL", 0)
+        engine = get_rule_engine()
+        assert engine.reload()['source'] == 'db'
+        reading = {'supply_temp': 35}
+        assert _codes(reading) == []
+
+        with temp_db.get_conn() as conn:
+            conn.execute("UPDATE AlertRules SET value = 40 WHERE ruleset = 'alerts' AND code = 'TEMP_FREEZE_RISK'")
+        assert _codes(reading) == ['TEMP_FREEZE_RISK']
+        assert evaluate_alerts_batch(readings_to_columns([reading]))['codes'] == [['TEMP_FREEZE_RISK']]
+
+        with temp_db.get_conn() as conn:
+            conn.execute("UPDATE AlertRules SET enabled = 0 WHERE code = 'TEMP_FREEZE_RISK'")
+        assert _codes(reading) == []
+        assert engine.stats()['reloads'] == 3
+
+        # Seeding again keeps edited rules
+        ensure_alert_rules_table()
+        assert _codes(reading) == []
+
+    def test_yaml_file_and_invalid_rules(self, tmp_path, monkeypatch):
+        path = tmp_path / "rules.yaml"
+        path.write_text(
+            "alerts:\n"
+            "  - {code: HOT, category: temperature, severity: critical, metric: supply_temp, op: '>', value: 90,\n"
+            "     message: 'Hot {supply_temp:.0f} > {threshold:g}'}\n"
+            "  - {code: BROKEN, category: temperature, severity: critical, metric: nope, op: '>', value: 1,\n"
+            "     message: x}\n",
+            encoding="utf-8",
+        )
+        monkeypatch.setenv("ALERT_RULES_FILE", str(path))
+        info = get_rule_engine().reload()
+        assert info['source'] == 'yaml' and info['rules']['alerts'] == 1
+        assert 'BROKEN' in info['errors'][0]
+
+        assert evaluate_all_alerts({'supply_temp': 95})['all'][0]['message'] == 'Hot 95 > 90'
+        assert evaluate_all_alerts({'supply_temp': 20})['count'] == 0      # file replaces the alert rules
+        assert get_rule_engine().rules('status')[0]['code'] == 'FAULT_MODE'  # other rulesets: defaults
+
+        path.unlink()
+        info = get_rule_engine().reload()
+        assert info['errors'] and info['rules']['alerts'] == 1               # last good rules kept
+
+
+class TestMetrics:
+
+    def test_hit_counters(self):
+        evaluate_all_alerts(COLD)
+        evaluate_all_alerts(COLD)
+        evaluate_alerts_batch(readings_to_columns([COLD, {'supply_temp': 50}]), with_codes=False)
+
+        stats = get_rule_stats()
+        assert stats['hits']['alerts.TEMP_FREEZE_RISK'] == 3
+        assert stats['hits']['alerts.LOW_DELTA_T'] == 3
+        assert stats['rulesets']['alerts']['evaluations'] == 4
+        assert stats['rulesets']['alerts']['avg_us'] > 0
+
+        get_rule_engine().reload()   # counts survive a recompile
+        assert get_rule_stats()['hits']['alerts.TEMP_FREEZE_RISK'] == 3
@@ -0,0 +1,80 @@
+"""
+Tests for the pooled SQLite connection manager in core/db.py.
+
+Validates:
+- `with get_conn() as conn:` and `conn.close()` both return connections to the pool
+- Connections are reused instead of re-opened
+- WAL / synchronous / foreign key PRAGMAs are applied once per connection
+- Uncommitted work is rolled back when a connection goes back to the pool
+"""
+
+import threading
+
+import pytest
+
+
+class TestConnectionPool:
+
+    def test_with_block_reuses_connection(self, temp_db):
+        with temp_db.get_conn() as conn:
+            conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+        for i in range(5):
+            with temp_db.get_conn() as conn:
+                conn.execute("INSERT INTO t (v) VALUES (?)", (str(i),))
+
+        stats = temp_db.get_pool_stats()
+        assert stats["opens"] == 1
+        assert stats["reuses"] == 5
+        assert stats["in_use"] == 0
+
+        conn = temp_db.get_conn()
+        try:
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 5
+        finally:
+            conn.close()
+
+    def test_pragmas_applied(self, temp_db):
+        conn = temp_db.get_conn()
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        finally:
+            conn.close()
+
+    def test_uncommitted_work_rolled_back_on_close(self, temp_db):
+        with temp_db.get_conn() as conn:
+            conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+
+        conn = temp_db.get_conn()
+        conn.execute("INSERT INTO t (id) VALUES (1)")
+        conn.close()  # no commit
+
+        with temp_db.get_conn() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+    def test_closed_proxy_rejects_use(self, temp_db):
+        conn = temp_db.get_conn()
+        conn.close()
+        with pytest.raises(Exception):
+            conn.execute("SELECT 1")
+
+    def test_threads_share_bounded_pool(self, temp_db):
+        with temp_db.get_conn() as conn:
+            conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY AUTOINCREMENT, n INTEGER)")
+
+        def worker(n):
+            for _ in range(20):
+                with temp_db.get_conn() as c:
+                    c.execute("INSERT INTO t (n) VALUES (?)", (n,))
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stats = temp_db.get_pool_stats()
+        assert stats["open"] <= temp_db.POOL_SIZE
+        with temp_db.get_conn() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 320
@@ -0,0 +1,149 @@
+"""
+Tests for the outbound email queue, against a local aiosmtpd server.
+
+Validates:
+- A batch of queued messages goes out over one logged-in SMTP session,
+  and a session the server dropped is reconnected transparently
+- Ticket emails carry the service order PDF, rendered once per batch
+- 4xx replies are retried with backoff; 5xx replies fail at once
+- The sender thread delivers new mail as soon as it is queued, and resends
+  mail left "sending" by a process that stopped
+"""
+
+import smtplib
+import socket
+import time
+
+import pytest
+
+pytest.importorskip("aiosmtpd")
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+from core import email_outbox, pdf_render
+from core.email_outbox import EmailSender, enqueue_email, ensure_outbox_table, get_email_status, get_outbox_counts
+from core.email_settings import ensure_email_settings_table, update_email_settings
+from core.pdf_render import PdfRenderService
+from core.tickets_repo import ensure_ticket_grid, queue_ticket_email
+
+
+class Mailbox:
+    """aiosmtpd handler: keeps what it receives; refuses chosen recipients."""
+
+    def __init__(self):
+        self.messages = []
+        self.refuse = {}   # address -> SMTP reply
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.refuse:
+            return self.refuse[address]
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append({"peer": session.peer, "to": envelope.rcpt_tos, "content": envelope.content})
+        return "250 Message accepted"
+
+
+def _plain_connect(settings, timeout):
+    """open_smtp() without TLS: the local test server speaks plain SMTP."""
+    smtp = smtplib.SMTP(settings["smtp_host"], int(settings["smtp_port"]), timeout=timeout)
+    smtp.login(settings["smtp_user"], settings["smtp_pass"])
+    return smtp
+
+
+@pytest.fixture
+def mailbox(schema_db, tmp_path, monkeypatch):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    box = Mailbox()
+    controller = Controller(box, hostname="127.0.0.1", port=port, auth_require_tls=False,
+                            authenticator=lambda *args: AuthResult(success=True))
+    controller.start()
+
+    ensure_email_settings_table()
+    update_email_settings({"smtp_host": "127.0.0.1", "smtp_port": port, "use_tls": False,
+                           "smtp_user": "app", "smtp_pass": "secret", "smtp_from": "service@example.com"})
+    ensure_outbox_table()
+    ensure_ticket_grid()
+    with schema_db.get_conn() as conn:
+        conn.execute("INSERT INTO ServiceCalls (ID, customer_id, location_id, unit_id, title, status, priority) "
+                     "VALUES (7, 1, 1, 1, 'No cooling', 'Open', 'High')")
+
+    monkeypatch.chdir(tmp_path)   # the service_orders copy lands here
+    service = PdfRenderService(workers=0)
+    monkeypatch.setattr(pdf_render, "_service", service)
+    yield box
+    service.shutdown()
+    controller.stop()
+
+
+@pytest.fixture
+def sender():
+    instance = EmailSender(retry_base=60, connect=_plain_connect)
+    yield instance
+    instance.stop()
+    instance.close()
+
+
+class TestEmailOutbox:
+
+    def test_batch_shares_one_session(self, mailbox, sender):
+        ids = [enqueue_email(f"tech{i}@example.com", f"Note {i}", "Body") for i in range(3)]
+        ids += [queue_ticket_email(7, to, queued_by="admin@example.com") for to in ("a@example.com", "b@example.com")]
+
+        assert sender.run_once() == 5
+        statuses = get_email_status(ids)
+        assert [statuses[i]["status"] for i in ids] == ["sent"] * 5
+        assert len({m["peer"] for m in mailbox.messages}) == 1 and sender.stats()["smtp_connections"] == 1
+
+        ticket_mail = mailbox.messages[-1]["content"]
+        assert b"Service Ticket #7" in ticket_mail and b"application/pdf" in ticket_mail
+        assert pdf_render._service.stats()["submitted"] == 1               # rendered once for both recipients
+        with email_outbox.get_conn() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM EmailOutbox WHERE attachment IS NOT NULL").fetchone()[0] == 0
+
+        sender._smtp._smtp.sock.shutdown(socket.SHUT_RDWR)                   # server hung up while idle
+        sent_later = enqueue_email("late@example.com", "Later", "Body")
+        assert sender.run_once() == 1
+        assert get_email_status([sent_later])[sent_later]["status"] == "sent"
+        assert sender.stats()["smtp_connections"] == 2
+
+    def test_retry_and_permanent_failure(self, mailbox, sender):
+        mailbox.refuse = {"busy@example.com": "451 4.3.0 Mailbox busy", "nobody@example.com": "550 5.1.1 No such user"}
+        busy = enqueue_email("busy@example.com", "Hi", "Body")
+        nobody = enqueue_email("nobody@example.com", "Hi", "Body")
+        bad = enqueue_email("not-an-address", "Hi", "Body")
+        ok = enqueue_email("ok@example.com", "Hi", "Body")
+
+        before = time.time()
+        assert sender.run_once() == 4
+        statuses = get_email_status([busy, nobody, bad, ok])
+        assert statuses[ok]["status"] == "sent"                             # refusals did not poison the session
+        assert statuses[nobody]["status"] == "failed" and "550" in statuses[nobody]["last_error"]
+        assert statuses[bad]["status"] == "failed"
+        assert statuses[busy]["status"] == "queued" and statuses[busy]["attempts"] == 1
+        assert before + 60 * 0.8 <= statuses[busy]["next_attempt_at"] <= time.time() + 60 * 1.2
+
+        assert sender.run_once() == 0                                       # not due yet
+        mailbox.refuse = {}
+        with email_outbox.get_conn() as conn:
+            conn.execute("UPDATE EmailOutbox SET next_attempt_at = 0 WHERE id = ?", (busy,))
+        assert sender.run_once() == 1
+        assert get_email_status([busy])[busy]["status"] == "sent"
+        assert get_outbox_counts() == {"queued": 0, "sending": 0, "sent": 2, "failed": 2}
+
+    def test_thread_delivers_and_recovers(self, mailbox, sender, monkeypatch):
+        stranded = enqueue_email("stranded@example.com", "Hi", "Body")
+        with email_outbox.get_conn() as conn:
+            conn.execute("UPDATE EmailOutbox SET status = 'sending' WHERE id = ?", (stranded,))
+
+        monkeypatch.setattr(email_outbox, "_sender", sender)
+        sender.start()
+        fresh = enqueue_email("fresh@example.com", "Hi", "Body")            # wakes the sender
+        for _ in range(100):
+            if {s["status"] for s in get_email_status([stranded, fresh]).values()} == {"sent"}:
+                break
+            time.sleep(0.05)
+        assert sorted(m["to"][0] for m in mailbox.messages) == ["fresh@example.com", "stranded@example.com"]
@@ -0,0 +1,65 @@
+"""
+Tests for the trigger-maintained UnitLatestReading table.
+
+Validates:
+- Inserts keep exactly one row per unit pointing at MAX(reading_id)
+- Deleting the latest reading falls back to the previous one
+- rebuild_latest_readings() matches the old MAX(reading_id) GROUP BY query
+"""
+
+from core.readings_repo import get_latest_reading, rebuild_latest_readings
+
+
+OLD_LATEST_SQL = "SELECT unit_id, MAX(reading_id) FROM UnitReadings GROUP BY unit_id ORDER BY unit_id"
+NEW_LATEST_SQL = "SELECT unit_id, reading_id FROM UnitLatestReading ORDER BY unit_id"
+
+
+def _pairs(conn, sql):
+    return [tuple(r) for r in conn.execute(sql).fetchall()]
+
+
+def _add_unit(conn, unit_id):
+    conn.execute("INSERT INTO Units (unit_id, location_id, unit_tag) VALUES (?, 1, ?)", (unit_id, f"RTU-{unit_id}"))
+
+
+class TestUnitLatestReading:
+
+    def test_insert_tracks_latest(self, schema_db):
+        with schema_db.get_conn() as conn:
+            _add_unit(conn, 2)
+            for i in range(10):
+                conn.execute(
+                    "INSERT INTO UnitReadings (unit_id, supply_temp) VALUES (?, ?)",
+                    (1 + i % 2, str(50 + i)),
+                )
+            assert _pairs(conn, NEW_LATEST_SQL) == _pairs(conn, OLD_LATEST_SQL)
+
+        assert get_latest_reading(1)["supply_temp"] == 58.0
+        assert get_latest_reading(2)["supply_temp"] == 59.0
+
+    def test_delete_latest_falls_back(self, schema_db):
+        with schema_db.get_conn() as conn:
+            conn.execute("INSERT INTO UnitReadings (unit_id, supply_temp) VALUES (1, '50')")
+            conn.execute("INSERT INTO UnitReadings (unit_id, supply_temp) VALUES (1, '60')")
+            latest = conn.execute("SELECT MAX(reading_id) FROM UnitReadings").fetchone()[0]
+            conn.execute("DELETE FROM UnitReadings WHERE reading_id = ?", (latest,))
+
+        assert get_latest_reading(1)["supply_temp"] == 50.0
+
+        with schema_db.get_conn() as conn:
+            conn.execute("DELETE FROM UnitReadings")
+        assert get_latest_reading(1) is None
+
+    def test_rebuild_matches_group_by(self, schema_db):
+        with schema_db.get_conn() as conn:
+            _add_unit(conn, 2)
+            _add_unit(conn, 3)
+            conn.execute("DROP TRIGGER trg_readings_latest_ins")  # simulate a raw backfill
+            conn.executemany(
+                "INSERT INTO UnitReadings (unit_id, supply_temp) VALUES (?, ?)",
+                [(1 + i % 3, str(i)) for i in range(30)],
+            )
+
+        assert rebuild_latest_readings() == 3
+        with schema_db.get_conn() as conn:
+            assert _pairs(conn, NEW_LATEST_SQL) == _pairs(conn, OLD_LATEST_SQL)
@@ -0,0 +1,140 @@
+"""
+Tests for the live update hub.
+
+Validates:
+- Concurrent snapshots of the same feed run the loader once (single-flight)
+- publish() only invalidates feeds listening to that topic
+- refresh() reloads a subscribed feed once and pushes only changed rows /
+  counters to every subscriber; unchanged data pushes nothing
+- Changes a page render already reloaded are still pushed
+- A failing subscriber is dropped; the refresh loop wakes on publish from
+  another thread
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.live_hub import LiveHub, feed_data
+
+
+class _Source:
+    """Mutable rows + a loader that counts calls."""
+
+    def __init__(self, delay=0.0):
+        self.rows = {1: {"id": 1, "temp": 50}, 2: {"id": 2, "temp": 60}}
+        self.calls = 0
+        self.delay = delay
+
+    def load(self, scope=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        rows = [dict(r) for r in self.rows.values()]
+        return feed_data(rows, "id", {"hot": sum(r["temp"] > 55 for r in rows)})
+
+
+@pytest.fixture
+def hub():
+    return LiveHub(min_interval=0.01, max_age=60)
+
+
+class TestSnapshots:
+
+    def test_concurrent_snapshots_coalesce(self, hub):
+        source = _Source(delay=0.05)
+        hub.register("units", source.load, ("readings",))
+
+        threads = [threading.Thread(target=hub.snapshot, args=("units", None)) for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert source.calls == 1
+        assert hub.snapshot("units", None)["counters"] == {"hot": 1}
+        assert source.calls == 1
+
+        hub.snapshot("units", 7)                  # other params: own query
+        assert source.calls == 2
+        stats = hub.stats()
+        assert stats["queries"] == 2 and stats["cache_hits"] + stats["coalesced"] == 20
+
+    def test_publish_only_invalidates_matching_topics(self, hub):
+        units, tickets = _Source(), _Source()
+        hub.register("units", units.load, ("readings",))
+        hub.register("tickets", tickets.load, ("tickets",))
+        hub.snapshot("units")
+        hub.snapshot("tickets")
+
+        hub.publish("readings")
+        hub.snapshot("units")
+        hub.snapshot("tickets")
+        assert (units.calls, tickets.calls) == (2, 1)
+
+
+class TestPush:
+
+    def test_refresh_pushes_changed_rows_once(self, hub):
+        source = _Source()
+        hub.register("units", source.load, ("readings",))
+        hub.snapshot("units")
+        received = ([], [])
+        for box in received:
+            hub.subscribe("units", (), box.append)
+
+        async def scenario():
+            source.rows[2]["temp"] = 40
+            hub.publish("readings")
+            assert await hub.refresh() == 1
+            hub.publish("readings")                # reloaded, but nothing changed
+            assert await hub.refresh() == 0
+
+        asyncio.run(scenario())
+        assert source.calls == 3                   # render + two refreshes, not one per subscriber
+        for box in received:
+            assert box == [{"changed": [{"id": 2, "temp": 40}], "removed": [], "counters": {"hot": 0}}]
+
+    def test_render_reload_still_pushed(self, hub):
+        source = _Source()
+        hub.register("units", source.load, ("readings",))
+        hub.snapshot("units")
+        received = []
+        hub.subscribe("units", (), received.append)
+
+        del source.rows[1]
+        hub.publish("readings")
+        hub.snapshot("units")                      # another page opens before the refresh loop runs
+        asyncio.run(hub.refresh())
+        assert received == [{"changed": [], "removed": [1], "counters": {}}]
+
+    def test_failing_subscriber_dropped(self, hub):
+        source = _Source()
+        hub.register("units", source.load, ("readings",))
+        ok = []
+
+        def broken(diff):
+            raise RuntimeError("client deleted")
+
+        hub.subscribe("units", (), broken)
+        hub.subscribe("units", (), ok.append)
+        asyncio.run(hub.refresh())
+        assert len(ok) == 1 and hub.stats()["subscribers"] == 1
+
+    def test_loop_wakes_on_publish_from_thread(self, hub):
+        source = _Source()
+        hub.register("units", source.load, ("readings",))
+        hub.snapshot("units")
+
+        async def scenario():
+            got = asyncio.Event()
+            hub.subscribe("units", (), lambda diff: got.set())
+            hub.start()
+            await asyncio.sleep(0.01)
+            source.rows[1]["temp"] = 90
+            threading.Thread(target=hub.publish, args=("readings",)).start()
+            await asyncio.wait_for(got.wait(), timeout=2)
+            await hub.stop()
+
+        asyncio.run(scenario())
+        assert hub.stats()["running"] is False
@@ -26,10 +26,10 @@ sys.path.insert(0, PROJECT_ROOT)
 from core.ticket_document import generate_ticket_pdf
 
 try:
-    from PyPDF2 import PdfReader
-    PYPDF2_AVAILABLE = True
+    from pypdf import PdfReader
+    PYPDF_AVAILABLE = True
 except ImportError:
-    PYPDF2_AVAILABLE = False
+    PYPDF_AVAILABLE = False
 
 
 class TestMultiPagePDF:
@@ -43,11 +43,11 @@ class TestMultiPagePDF:
             pdf_path, pdf_bytes = generate_ticket_pdf(40)
             
             # Verify PDF was created
-            assert os.path.exists(pdf_path), f"PDF not found: {pdf_path}"
+            assert pdf_path.endswith(".pdf"), f"Unexpected PDF name: {pdf_path}"
             assert len(pdf_bytes) > 0, "PDF bytes are empty"
             
-            # If PyPDF2 available, verify page count
-            if PYPDF2_AVAILABLE:
+            # If pypdf available, verify page count
+            if PYPDF_AVAILABLE:
                 reader = PdfReader(BytesIO(pdf_bytes))
                 assert len(reader.pages) == 1, "Expected single page for ticket without overflow"
                 
@@ -68,10 +68,10 @@ class TestMultiPagePDF:
         try:
             pdf_path, pdf_bytes = generate_ticket_pdf(61)
             
-            assert os.path.exists(pdf_path), f"PDF not found: {pdf_path}"
+            assert pdf_path.endswith(".pdf"), f"Unexpected PDF name: {pdf_path}"
             assert len(pdf_bytes) > 0, "PDF bytes are empty"
             
-            if PYPDF2_AVAILABLE:
+            if PYPDF_AVAILABLE:
                 reader = PdfReader(BytesIO(pdf_bytes))
                 num_pages = len(reader.pages)
                 
@@ -97,7 +97,7 @@ class TestMultiPagePDF:
                     "Page 2 missing continuation header"
                 assert "UNITS INFORMATION" in page2_text, "Page 2 missing units table"
             
-            print(f"✓ Multi-unit overflow test passed: {pdf_path} ({num_pages if PYPDF2_AVAILABLE else '?'} pages)")
+            print(f"✓ Multi-unit overflow test passed: {pdf_path} ({num_pages if PYPDF_AVAILABLE else '?'} pages)")
             
         except Exception as e:
             print(f"Note: Test ticket may not exist: {e}")
@@ -109,10 +109,10 @@ class TestMultiPagePDF:
         try:
             pdf_path, pdf_bytes = generate_ticket_pdf(60)
             
-            assert os.path.exists(pdf_path), f"PDF not found: {pdf_path}"
+            assert pdf_path.endswith(".pdf"), f"Unexpected PDF name: {pdf_path}"
             assert len(pdf_bytes) > 0, "PDF bytes are empty"
             
-            if PYPDF2_AVAILABLE:
+            if PYPDF_AVAILABLE:
                 reader = PdfReader(BytesIO(pdf_bytes))
                 num_pages = len(reader.pages)
                 
@@ -128,7 +128,7 @@ class TestMultiPagePDF:
                        "LABOR DESCRIPTION (Continued)" in page2_text, \
                     "Page 2 missing materials/labor continuation sections"
             
-            print(f"✓ Text overflow test passed: {pdf_path} ({num_pages if PYPDF2_AVAILABLE else '?'} pages)")
+            print(f"✓ Text overflow test passed: {pdf_path} ({num_pages if PYPDF_AVAILABLE else '?'} pages)")
             
         except Exception as e:
             print(f"Note: Test ticket may not exist: {e}")
@@ -140,10 +140,10 @@ class TestMultiPagePDF:
         try:
             pdf_path, pdf_bytes = generate_ticket_pdf(62)
             
-            assert os.path.exists(pdf_path), f"PDF not found: {pdf_path}"
+            assert pdf_path.endswith(".pdf"), f"Unexpected PDF name: {pdf_path}"
             assert len(pdf_bytes) > 0, "PDF bytes are empty"
             
-            if PYPDF2_AVAILABLE:
+            if PYPDF_AVAILABLE:
                 reader = PdfReader(BytesIO(pdf_bytes))
                 num_pages = len(reader.pages)
                 
@@ -161,7 +161,7 @@ class TestMultiPagePDF:
                        "LABOR DESCRIPTION (Continued)" in page2_text, \
                     "Page 2 missing materials/labor sections"
             
-            print(f"✓ Combined overflow test passed: {pdf_path} ({num_pages if PYPDF2_AVAILABLE else '?'} pages)")
+            print(f"✓ Combined overflow test passed: {pdf_path} ({num_pages if PYPDF_AVAILABLE else '?'} pages)")
             
         except Exception as e:
             print(f"Note: Test ticket may not exist: {e}")
@@ -173,8 +173,8 @@ class TestMultiPagePDF:
         try:
             pdf_path, pdf_bytes = generate_ticket_pdf(61)
             
-            if not PYPDF2_AVAILABLE:
-                pytest.skip("PyPDF2 not available for structure validation")
+            if not PYPDF_AVAILABLE:
+                pytest.skip("pypdf not available for structure validation")
             
             reader = PdfReader(BytesIO(pdf_bytes))
             
@@ -0,0 +1,114 @@
+"""
+Tests for server-side table paging.
+
+Validates:
+- Pages walk every row exactly once for each sort column and direction,
+  NULLs and case included, whether read in order (keyset cursors) or
+  by jumping to a page
+- Filters and the search index narrow the listing; large filtered counts
+  are estimates that become exact at the last page
+- locate() finds the page holding a row
+- Sorted pages read the sort indexes instead of sorting the table
+"""
+
+import pytest
+
+from core.customers_repo import customers_query, ensure_customer_sort_indexes
+from core.paged_query import PagedQuery
+from core.search_index import ensure_search_index
+from core.units_repo import units_query
+
+
+@pytest.fixture
+def paged_db(schema_db):
+    companies = ["acme", "Beta", None, "alpha", "", "Gamma", "beta"]
+    with schema_db.get_conn() as conn:
+        conn.executemany(
+            "INSERT INTO Customers (ID, company, first_name, last_name, city) VALUES (?, ?, ?, ?, ?)",
+            [(i, companies[i % 7], f"F{i % 5}", f"L{i % 3}", "Boston" if i % 4 == 0 else "Denver")
+             for i in range(2, 103)],
+        )
+    return schema_db
+
+
+def _request(page, size=10, sort_by=None, descending=False, **filters):
+    return {"page": page, "rows_per_page": size, "sort_by": sort_by, "descending": descending, "filters": filters}
+
+
+def _sorted_ids(rows, sort_by, descending):
+    if sort_by is None:
+        return sorted((r["ID"] for r in rows), reverse=descending)
+    keyed = sorted(rows, key=lambda r: ((r[sort_by] or "").lower(), r["ID"]), reverse=descending)
+    return [r["ID"] for r in keyed]
+
+
+class TestPaging:
+
+    @pytest.mark.parametrize("sort_by", [None, "company", "name", "city"])
+    @pytest.mark.parametrize("descending", [False, True])
+    def test_pages_walk_every_row_once(self, paged_db, sort_by, descending):
+        query = customers_query()
+        first = query.fetch(_request(1, sort_by=sort_by, descending=descending))
+        assert first["total"] == 102 and first["exact"]
+
+        seen = list(first["rows"])
+        for page in range(2, 12):
+            seen += query.fetch(_request(page, sort_by=sort_by, descending=descending))["rows"]
+        assert sorted(query._cursors) == list(range(1, 11))       # each page seeked from the one before
+
+        everything = customers_query().fetch(_request(1, size=500))["rows"]
+        assert [r["ID"] for r in seen] == _sorted_ids(everything, sort_by, descending)
+
+        jumped = customers_query().fetch(_request(7, sort_by=sort_by, descending=descending))["rows"]
+        assert [r["ID"] for r in jumped] == [r["ID"] for r in seen[60:70]]
+        assert "_cursor0" not in jumped[0]
+
+    def test_page_past_the_end_is_clamped(self, paged_db):
+        result = customers_query().fetch(_request(99))
+        assert result["page"] == 11 and [r["ID"] for r in result["rows"]] == [101, 102]
+
+
+class TestFilters:
+
+    def test_search_and_base_filter(self, paged_db):
+        assert customers_query().fetch(_request(1, search="gamm"))["total"] == 14     # LIKE fallback
+        ensure_search_index()
+        result = customers_query().fetch(_request(1, size=50, search="gamm"))
+        assert result["total"] == 14 and {r["company"] for r in result["rows"]} == {"Gamma"}
+
+        units = units_query(1).fetch(_request(1))
+        assert [u["unit_id"] for u in units["rows"]] == [1] and units["total"] == 1
+
+    def test_capped_count_is_an_estimate(self, paged_db):
+        boston = PagedQuery(source="Customers", key="ID", count_cap=10,
+                            filters={"city": lambda v: ("city = ?", [v])})
+        first = boston.fetch(_request(1, size=4, city="Boston"))
+        assert (first["total"], first["exact"]) == (10, False)
+        assert boston.fetch(_request(3, size=4, city="Boston"))["total"] == 16       # room for one more page
+        last = boston.fetch(_request(7, size=4, city="Boston"))
+        assert (last["total"], last["exact"], len(last["rows"])) == (25, True, 1)
+
+    def test_locate(self, paged_db):
+        query = customers_query()
+        assert query.locate(1, _request(1)) == 1
+        assert query.locate(95, _request(1)) == 10
+        assert query.locate(95, _request(1, descending=True)) == 1
+        page = query.locate(50, _request(1, sort_by="company"))
+        assert 50 in [r["ID"] for r in query.fetch(_request(page, sort_by="company"))["rows"]]
+        assert query.locate(50, _request(1, search="zzz")) is None
+
+
+class TestSortIndexes:
+
+    def test_sorted_pages_use_the_sort_index(self, paged_db):
+        ensure_customer_sort_indexes()
+        query = customers_query()
+        query.fetch(_request(1, sort_by="company"))
+        columns = query._columns("company")
+        with paged_db.get_conn() as conn:
+            plan = " | ".join(r[3] for r in conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM Customers WHERE 1=1 AND {query._seek(columns, False)} "
+                f"ORDER BY {columns[0]}, {columns[1]} LIMIT 10",
+                query._cursors[1],
+            ))
+        assert "idx_customers_sort_company" in plan and "TEMP B-TREE" not in plan
@@ -0,0 +1,109 @@
+"""
+Tests for the content-addressed PDF cache.
+
+Validates:
+- Memory and disk tiers evict least recently used entries past their byte limits;
+  a disk hit is promoted back into memory
+- A reprinted, unchanged ticket is served from the cache
+- Service orders are written to disk only with REPORT_PDF_KEEP_COPY
+- Changing the ticket, its TicketUnits or the company profile changes the key
+  (a fresh PDF) and drops the superseded entries
+"""
+
+from pathlib import Path
+
+import pytest
+
+from core import pdf_cache, settings_cache, ticket_document
+from core.pdf_cache import PdfCache, pdf_key
+from core.settings_cache import SettingsCache
+from core.ticket_document import generate_ticket_pdf
+from core.tickets_repo import ensure_ticket_grid, update_service_call
+from core.units_repo import set_ticket_units
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    instance = PdfCache(tmp_path / "pdf_cache", memory_bytes=10 ** 7, disk_bytes=10 ** 8)
+    monkeypatch.setattr(pdf_cache, "_cache", instance)
+    return instance
+
+
+@pytest.fixture
+def ticket_db(schema_db, cache, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)   # the service_orders copy lands here
+    monkeypatch.setattr(settings_cache, "_cache", SettingsCache(check_interval=0))   # see outside edits at once
+    ensure_ticket_grid()          # TicketUnits
+    with schema_db.get_conn() as conn:
+        conn.executescript((Path(__file__).resolve().parents[1] / "schema" / "settings_schema.sql").read_text(encoding="utf-8"))
+        conn.execute("INSERT INTO Units (unit_id, location_id, unit_tag) VALUES (2, 1, 'RTU-2')")
+        conn.execute(
+            "INSERT INTO ServiceCalls (ID, customer_id, location_id, unit_id, title, status, priority) "
+            "VALUES (7, 1, 1, 1, 'No cooling', 'Open', 'High')"
+        )
+    return schema_db
+
+
+def _files(cache):
+    return sorted(p.name.split("-")[0] + "-" + p.name.split("-")[1] for p in cache.directory.glob("*.pdf"))
+
+
+class TestPdfCache:
+
+    def test_lru_tiers(self, tmp_path):
+        cache = PdfCache(tmp_path / "lru", memory_bytes=250, disk_bytes=350)
+        for name in ("a", "b", "c"):
+            cache.put(f"t-{name}", name.encode() * 100)
+        assert cache.get("t-a") == b"a" * 100                # evicted from memory, still on disk
+        stats = cache.stats()
+        assert stats["disk_hits"] == 1 and stats["memory_bytes"] <= 250
+
+        cache.put("t-d", b"d" * 100)                          # disk over 350 bytes: oldest file goes
+        assert len(list(cache.directory.glob("*.pdf"))) == 3
+        assert cache.get("t-missing") is None
+        assert cache.forget("t") >= 3 and cache.get("t-d") is None
+
+    def test_keys_cover_every_input(self):
+        base = pdf_key("ticket-1", 1, {"title": "x"}, [{"unit_id": 1}])
+        assert base == pdf_key("ticket-1", 1, {"title": "x"}, [{"unit_id": 1}])
+        assert base != pdf_key("ticket-1", 2, {"title": "x"}, [{"unit_id": 1}])
+        assert base != pdf_key("ticket-1", 1, {"title": "y"}, [{"unit_id": 1}])
+        assert base.startswith("ticket-1-")
+
+
+class TestTicketPdfCache:
+
+    def test_reprint_is_a_cache_hit(self, ticket_db, cache):
+        _, first = generate_ticket_pdf(7)
+        _, again = generate_ticket_pdf(7)
+        assert again is first and cache.stats()["memory_hits"] == 1
+        assert _files(cache) == ["ticket-7"]
+
+    def test_copy_only_when_kept(self, ticket_db, cache, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        path, _ = generate_ticket_pdf(7)
+        assert not (tmp_path / "reports").exists()
+
+        monkeypatch.setattr(ticket_document, "KEEP_COPY", True)
+        path, pdf = generate_ticket_pdf(7)                                # cache hit: the copy is still written
+        assert (tmp_path / path).read_bytes() == pdf
+
+    def test_changes_invalidate(self, ticket_db, cache):
+        def rendered():
+            before = cache.stats()["stored"]
+            generate_ticket_pdf(7)
+            return cache.stats()["stored"] - before
+
+        assert rendered() == 1 and rendered() == 0
+
+        update_service_call(7, {"title": "Compressor noise"})
+        assert not list(cache.directory.glob("ticket-7-*.pdf"))          # dropped on write
+        assert rendered() == 1
+
+        set_ticket_units(7, [1, 2])
+        assert rendered() == 1 and rendered() == 0
+
+        with ticket_db.get_conn() as conn:                                # changed outside the app
+            conn.execute("INSERT INTO CompanyProfile (id, company_name) VALUES (1, 'Cool Air LLC')")
+        assert rendered() == 1
+        assert _files(cache) == ["ticket-7"] * 2                           # the pre-branding PDF ages out by LRU
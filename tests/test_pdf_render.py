@@ -0,0 +1,86 @@
+"""
+Tests for the background PDF render service.
+
+Validates:
+- Service orders render in a spawned worker process against the app's
+  database and come back as bytes; nothing is read back from disk
+- Renderers with no data finish as "done" with no PDF; errors as "failed"
+- Queue limits: PdfQueueFull past MAX_QUEUED unfinished jobs overall
+  and MAX_PER_OWNER per user; finished jobs free their slots
+"""
+
+import threading
+
+import pytest
+
+from core import pdf_render
+from core.pdf_render import PdfQueueFull, PdfRenderService
+
+
+@pytest.fixture
+def ticket_db(schema_db, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)   # the service_orders copy lands here
+    with schema_db.get_conn() as conn:
+        conn.execute(
+            "INSERT INTO ServiceCalls (ID, customer_id, location_id, unit_id, title, status, priority, description) "
+            "VALUES (7, 1, 1, 1, 'No cooling', 'Open', 'High', 'Unit blowing warm air')"
+        )
+    return schema_db
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    """A 'slow' renderer that blocks until the test opens the gate."""
+    event = threading.Event()
+
+    def slow(value):
+        event.wait(5)
+        return f"/tmp/slow_{value}.pdf", b"%PDF-slow"
+
+    monkeypatch.setitem(pdf_render.RENDERERS, "slow", slow)
+    monkeypatch.setitem(pdf_render.RENDERERS, "empty", lambda: None)
+    monkeypatch.setitem(pdf_render.RENDERERS, "broken", lambda: 1 / 0)
+    yield event
+    event.set()
+
+
+class TestPdfRender:
+
+    def test_ticket_renders_in_worker_process(self, ticket_db):
+        service = PdfRenderService(workers=1)
+        try:
+            filename, pdf_bytes = service.render("ticket", 7, timeout=60)
+        finally:
+            service.shutdown()
+        assert filename.startswith("ServiceOrder_") and filename.endswith(".pdf")
+        assert pdf_bytes.startswith(b"%PDF") and len(pdf_bytes) > 1000
+        assert service.stats()["done"] == 1
+
+    def test_empty_and_failed_jobs(self, gate):
+        service = PdfRenderService(workers=0)
+        assert service.render("empty") is None
+        with pytest.raises(RuntimeError, match="division by zero"):
+            service.render("broken")
+        stats = service.stats()
+        assert (stats["done"], stats["failed"]) == (1, 1)
+        with pytest.raises(KeyError):
+            service.submit("nope")
+        service.shutdown()
+
+    def test_queue_limits(self, gate):
+        service = PdfRenderService(workers=0, max_queued=3, max_per_owner=2)
+        first = service.submit("slow", 1, owner="a")
+        service.submit("slow", 2, owner="a")
+        with pytest.raises(PdfQueueFull):
+            service.submit("slow", 3, owner="a")                 # per-user limit
+        service.submit("slow", 4, owner="b")
+        with pytest.raises(PdfQueueFull):
+            service.submit("slow", 5, owner="c")                 # overall limit
+        assert service.status(first)["status"] in ("queued", "running")
+
+        gate.set()
+        assert service.wait(first, 5)["status"] == "done"
+        assert service.result(first) == ("slow_1.pdf", b"%PDF-slow")
+        assert service.render("slow", 6, timeout=5) == ("slow_6.pdf", b"%PDF-slow")   # slots freed
+        assert service.stats()["rejected"] == 2
+        service.shutdown()
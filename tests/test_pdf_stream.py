@@ -0,0 +1,140 @@
+"""
+Tests for the streaming PDF table writer.
+
+Validates:
+- StreamingTable pulls rows lazily, one page at a time, repeats the header on
+  every page and compresses each finished page
+- One-line cells take the drawString fast path; long ones wrap (markup-safe)
+- ParagraphStyles are shared, not rebuilt per table
+- The equipment inventory export streams straight from the SQLite cursor;
+  a copy goes to the reports directory only with REPORT_PDF_KEEP_COPY
+- The hierarchical company report is built from three ordered queries and
+  its PDF is drawn one customer at a time
+"""
+
+import re
+from io import BytesIO
+
+import pytest
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas
+
+from core import report_document, reports_repo
+from core.pdf_layout import StreamingTable, paragraph_style
+from core.reports_repo import (
+    count_equipment_inventory, get_hierarchical_company_report, iter_equipment_inventory,
+    iter_hierarchical_company_report,
+)
+
+
+def _page_count(pdf: bytes) -> int:
+    return len(re.findall(rb"/Type /Page\b(?!s)", pdf))
+
+
+class TestStreamingTable:
+
+    def test_rows_are_pulled_page_by_page(self):
+        c = canvas.Canvas(BytesIO(), pagesize=letter)
+        table = StreamingTable(["#", "Name", "Notes"], [0.6 * inch, 2 * inch, 3 * inch])
+        pulled = []
+        pulled_at_page_break = []
+
+        def rows():
+            for i in range(500):
+                pulled.append(i)
+                yield [i, f"Unit {i}", "x" * 30 if i % 50 else "<W&W> " * 10]
+
+        def new_page():
+            pulled_at_page_break.append(len(pulled))
+            c.showPage()
+            return letter[1] - inch
+
+        y, drawn = table.draw(c, rows(), x=inch, y=letter[1] - inch, bottom_margin=inch, new_page=new_page)
+        assert drawn == 500 and y >= inch
+        assert len(pulled_at_page_break) >= 10
+        assert pulled_at_page_break == sorted(set(pulled_at_page_break))   # one page of rows at a time
+        assert pulled_at_page_break[0] < 100
+
+        assert table.stats["wrapped_cells"] == 10                           # the ten wide notes
+        assert table.stats["fast_cells"] == 3 * 500 - 10 + 3 * (len(pulled_at_page_break) + 1)
+        assert all(page.Contents is not None for page in c._doc.Pages.pages)   # finished pages compressed
+        c.save()
+
+    def test_styles_are_cached(self):
+        assert paragraph_style(8) is paragraph_style(8)
+        assert paragraph_style(8) is not paragraph_style(9)
+
+
+class TestInventoryExport:
+
+    def test_streams_from_cursor(self, schema_db, tmp_path, monkeypatch):
+        reports = tmp_path / "reports"
+        monkeypatch.setattr(report_document, "get_pdf_dir", lambda: reports)
+        with schema_db.get_conn() as conn:
+            conn.executemany("INSERT INTO Units (unit_id, location_id, unit_tag, make) VALUES (?, 1, ?, 'Carrier')",
+                             [(i, f"RTU-{i}") for i in range(2, 121)])
+        total = count_equipment_inventory()
+        assert total == 120
+
+        rows = iter_equipment_inventory(batch_size=25)
+        path, pdf = report_document.generate_equipment_inventory_pdf(rows, total=total)
+        assert pdf.startswith(b"%PDF") and _page_count(pdf) == 5   # 27 rows a page
+        with pytest.raises(StopIteration):
+            next(rows)                                                      # consumed and closed
+        assert not reports.exists()                                         # no copy unless asked for
+
+        monkeypatch.setattr(report_document, "KEEP_COPY", True)
+        listed_path, listed = report_document.generate_equipment_inventory_pdf([{"unit_id": 1, "customer_name": "Acme"}])
+        assert listed_path.endswith(".pdf")                                 # plain lists still work
+        assert (reports / listed_path.split("/")[-1]).read_bytes() == listed
+
+
+class TestHierarchicalReport:
+
+    @pytest.fixture
+    def tree_db(self, schema_db):
+        with schema_db.get_conn() as conn:
+            conn.execute("INSERT INTO Customers (ID, company) VALUES (2, 'Zenith'), (3, 'Bolt'), (4, NULL)")
+            conn.execute("INSERT INTO PropertyLocations (ID, customer_id, address1) "
+                         "VALUES (2, 2, '9 Elm St'), (3, 2, '2 Oak Ave'), (4, 3, '5 Pine Rd')")
+            conn.executemany("INSERT INTO Units (unit_id, location_id, unit_tag) VALUES (?, ?, ?)",
+                             [(2, 2, "AHU-2"), (3, 3, "RTU-B"), (4, 3, "RTU-A"), (5, 1, "CU-1")])
+        return schema_db
+
+    def test_three_queries_build_the_tree(self, tree_db, monkeypatch):
+        statements = []
+        real_get_conn = reports_repo.get_conn
+
+        def traced_conn():
+            conn = real_get_conn()
+            conn.set_trace_callback(lambda sql: statements.append(sql) if sql.lstrip().startswith("SELECT") else None)
+            return conn
+
+        monkeypatch.setattr(reports_repo, "get_conn", traced_conn)
+        data = get_hierarchical_company_report()
+        assert len(statements) == 3
+
+        tree = [(c["company"], [(loc["address1"], [u["unit_tag"] for u in loc["equipment"]])
+                                for loc in c["locations"]]) for c in data["customers"]]
+        assert tree == [
+            (None, []),
+            ("Acme", [("1 Main St", ["CU-1", "RTU-1"])]),
+            ("Bolt", [("5 Pine Rd", [])]),
+            ("Zenith", [("2 Oak Ave", ["RTU-A", "RTU-B"]), ("9 Elm St", ["AHU-2"])]),
+        ]
+        zenith = data["customers"][-1]
+        assert (zenith["location_count"], zenith["equipment_count"]) == (2, 3)
+        assert zenith["locations"][0]["equipment_count"] == 2
+        assert (data["total_customers"], data["total_locations"], data["total_equipment"]) == (4, 4, 5)
+
+        only = get_hierarchical_company_report(2)["customers"]
+        assert [c["customer_id"] for c in only] == [2] and only[0]["equipment_count"] == 3
+
+    def test_pdf_streams_customers(self, tree_db, tmp_path, monkeypatch):
+        monkeypatch.setattr(report_document, "get_pdf_dir", lambda: tmp_path)
+        customers = iter_hierarchical_company_report(batch_size=1)
+        path, pdf = report_document.generate_hierarchical_company_pdf({"customers": customers})
+        assert pdf.startswith(b"%PDF") and _page_count(pdf) == 1
+        with pytest.raises(StopIteration):
+            next(customers)
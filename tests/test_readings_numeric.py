@@ -0,0 +1,109 @@
+"""
+Tests for typed (REAL/INTEGER) telemetry storage.
+
+Validates:
+- schema.sql creates numeric metric columns
+- migrate_readings_to_numeric() converts a legacy all-TEXT table in place,
+  keeping reading_ids, indexes and the UnitLatestReading triggers
+- Range filters compare numerically (TEXT columns compared as strings)
+- UnitReadingsText still returns strings for legacy readers
+"""
+
+import pytest
+
+from core.readings_repo import (
+    NUMERIC_COLUMNS,
+    ensure_latest_reading_table,
+    get_latest_reading,
+    get_reading_column_types,
+    migrate_readings_to_numeric,
+    query_readings,
+    readings_are_numeric,
+)
+
+
+def _make_legacy_table(conn):
+    """Rewrite UnitReadings with the pre-migration all-TEXT metric columns."""
+    cols = get_reading_column_types(conn)
+    conn.execute("DROP TABLE UnitReadings")
+    defs = []
+    for name in cols:
+        if name == "reading_id":
+            defs.append("reading_id INTEGER PRIMARY KEY AUTOINCREMENT")
+        elif name == "unit_id":
+            defs.append("unit_id INTEGER NOT NULL")
+        else:
+            defs.append(f"{name} TEXT")
+    conn.execute(f"CREATE TABLE UnitReadings ({', '.join(defs)})")
+    conn.execute("CREATE INDEX idx_readings_unit_ts ON UnitReadings(unit_id, ts)")
+
+
+class TestNumericReadings:
+
+    def test_fresh_schema_is_numeric(self, schema_db):
+        assert readings_are_numeric()
+        types = get_reading_column_types()
+        assert types["supply_temp"] == "REAL"
+        assert types["fan_speed_percent"] == "INTEGER"
+        assert types["mode"] == "TEXT"
+
+    def test_migrate_legacy_table(self, schema_db):
+        with schema_db.get_conn() as conn:
+            conn.execute("DROP TABLE UnitLatestReading")
+            _make_legacy_table(conn)
+            rows = [
+                ("2026-01-01 00:00:00", "100.5", "87", "Cooling"),
+                ("2026-01-01 00:01:00", "31.0", "", "Cooling"),
+                ("2026-01-01 00:02:00", "N/A", "0", "Fault"),
+            ]
+            conn.executemany(
+                "INSERT INTO UnitReadings (unit_id, ts, supply_temp, fan_speed_percent, mode) VALUES (1, ?, ?, ?, ?)",
+                rows,
+            )
+            # TEXT affinity turns 32 into '32': '100.5' < '32' as strings
+            legacy = conn.execute("SELECT supply_temp FROM UnitReadings WHERE supply_temp < 32 ORDER BY reading_id")
+            assert [r[0] for r in legacy] == ["100.5", "31.0"]
+        ensure_latest_reading_table()
+
+        result = migrate_readings_to_numeric()
+        cold = query_readings([("supply_temp", "<", 32)], columns=["supply_temp"])
+        assert [r["supply_temp"] for r in cold] == [31.0]
+        assert result["migrated"] and result["rows"] == 3
+        assert result["non_numeric"] == {"supply_temp": 1}
+        assert readings_are_numeric()
+        assert migrate_readings_to_numeric()["migrated"] is False
+
+        with schema_db.get_conn() as conn:
+            data = [tuple(r) for r in conn.execute(
+                "SELECT reading_id, supply_temp, fan_speed_percent, mode FROM UnitReadings ORDER BY reading_id"
+            )]
+            assert data == [(1, 100.5, 87, "Cooling"), (2, 31.0, None, "Cooling"), (3, "N/A", 0, "Fault")]
+            names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE tbl_name = 'UnitReadings'")}
+            assert {"idx_readings_unit_ts", "trg_readings_latest_ins", "trg_readings_latest_del"} <= names
+
+            # Triggers still maintain the latest reading after the rebuild
+            conn.execute("INSERT INTO UnitReadings (unit_id, supply_temp) VALUES (1, '72.5')")
+        assert get_latest_reading(1)["supply_temp"] == 72.5
+
+        with schema_db.get_conn() as conn:
+            legacy = conn.execute("SELECT supply_temp FROM UnitReadingsText WHERE reading_id = 1").fetchone()
+            assert legacy[0] == "100.5"
+
+    def test_query_readings_pushdown(self, schema_db):
+        with schema_db.get_conn() as conn:
+            conn.executemany(
+                "INSERT INTO UnitReadings (unit_id, supply_temp, discharge_psi) VALUES (1, ?, ?)",
+                [(25.0, 300), (31.9, 410), (32.0, 420), (55.0, 200)],
+            )
+        cold = query_readings([("supply_temp", "<", 32)], columns=["supply_temp"])
+        assert sorted(r["supply_temp"] for r in cold) == [25.0, 31.9]
+
+        both = query_readings([("supply_temp", "<", 32), ("discharge_psi", ">", 400)])
+        assert [r["supply_temp"] for r in both] == [31.9]
+
+    def test_query_readings_rejects_unsafe_input(self, schema_db):
+        with pytest.raises(ValueError):
+            query_readings([("mode", "=", "Cooling")])
+        with pytest.raises(ValueError):
+            query_readings([("supply_temp", "; DROP TABLE Units; --", 1)])
+        assert "mode" not in NUMERIC_COLUMNS
@@ -0,0 +1,137 @@
+"""
+Tests for the customer / location report aggregations.
+
+Validates:
+- get_customer_summary_report, get_location_inventory_report and the
+  locations of get_customer_activity_report return exactly what the old
+  join-then-COUNT(DISTINCT) queries returned, including customers without
+  locations, locations without units, tickets in every status and filters
+- The summary counts each child table separately: its work grows with
+  locations + units + tickets, not their product
+"""
+
+import random
+
+import pytest
+
+from core import reports_repo
+from core.reports_repo import (
+    get_customer_activity_report, get_customer_summary_report, get_location_inventory_report,
+)
+
+# The queries as they were before the subquery rewrite (reference results)
+OLD_CUSTOMER_SUMMARY = """
+    SELECT
+        c.ID as customer_id, c.company as customer_name, c.email as customer_email,
+        c.phone1 as customer_phone, c.address1, c.city, c.state, c.zip,
+        COUNT(DISTINCT pl.ID) as location_count,
+        COUNT(DISTINCT u.unit_id) as equipment_count,
+        COUNT(DISTINCT CASE WHEN sc.status IN ('Open', 'Pending', 'In Progress') THEN sc.ID END) as open_tickets,
+        COUNT(DISTINCT sc.ID) as total_tickets,
+        MAX(sc.created) as last_service_date
+    FROM Customers c
+    LEFT JOIN PropertyLocations pl ON c.ID = pl.customer_id
+    LEFT JOIN Units u ON pl.ID = u.location_id
+    LEFT JOIN ServiceCalls sc ON c.ID = sc.customer_id
+    {where}
+    GROUP BY c.ID
+    ORDER BY c.company
+"""
+
+OLD_LOCATION_INVENTORY = """
+    SELECT
+        pl.ID as location_id, pl.address1, pl.address2, pl.city, pl.state, pl.zip,
+        pl.contact, pl.job_phone, c.company as customer_name, c.phone1 as customer_phone,
+        COUNT(DISTINCT u.unit_id) as equipment_count
+    FROM PropertyLocations pl
+    JOIN Customers c ON pl.customer_id = c.ID
+    LEFT JOIN Units u ON pl.ID = u.location_id
+    {where}
+    GROUP BY pl.ID
+    ORDER BY c.company, pl.address1
+"""
+
+OLD_ACTIVITY_LOCATIONS = """
+    SELECT pl.*, COUNT(DISTINCT u.unit_id) as equipment_count
+    FROM PropertyLocations pl
+    LEFT JOIN Units u ON pl.ID = u.location_id
+    WHERE pl.customer_id = ?
+    GROUP BY pl.ID
+"""
+
+
+@pytest.fixture
+def report_db(schema_db):
+    rng = random.Random(7)
+    statuses = ["Open", "Pending", "In Progress", "Closed", "Cancelled", None]
+    with schema_db.get_conn() as conn:
+        conn.executemany("INSERT INTO Customers (ID, company, email) VALUES (?, ?, ?)",
+                         [(i, f"Customer {i:02d}", f"c{i}@example.com") for i in range(2, 31)])
+        location_id, unit_id, ticket_id = 2, 2, 1
+        for customer in range(1, 31):
+            for _ in range(rng.randrange(0, 4)):                      # some customers have no locations
+                conn.execute("INSERT INTO PropertyLocations (ID, customer_id, address1) VALUES (?, ?, ?)",
+                             (location_id, customer, f"{rng.randrange(1, 99)} Main St"))
+                for _ in range(rng.randrange(0, 5)):                  # some locations have no units
+                    conn.execute("INSERT INTO Units (unit_id, location_id, unit_tag) VALUES (?, ?, ?)",
+                                 (unit_id, location_id, f"RTU-{unit_id}"))
+                    unit_id += 1
+                location_id += 1
+            for _ in range(rng.randrange(0, 6)):
+                conn.execute("INSERT INTO ServiceCalls (ID, customer_id, title, status, created) VALUES (?, ?, ?, ?, ?)",
+                             (ticket_id, customer, "Check", rng.choice(statuses),
+                              f"2026-0{rng.randrange(1, 10)}-1{rng.randrange(0, 10)} 08:00:00"))
+                ticket_id += 1
+    return schema_db
+
+
+def _old(db, sql, where="", params=()):
+    with db.get_conn() as conn:
+        return [dict(r) for r in conn.execute(sql.format(where=where), params).fetchall()]
+
+
+class TestReportAggregates:
+
+    def test_same_results_as_join_queries(self, report_db):
+        assert get_customer_summary_report() == _old(report_db, OLD_CUSTOMER_SUMMARY)
+        assert get_customer_summary_report(5) == _old(report_db, OLD_CUSTOMER_SUMMARY, "WHERE c.ID = ?", (5,))
+        assert get_location_inventory_report() == _old(report_db, OLD_LOCATION_INVENTORY)
+        assert get_location_inventory_report(3) == _old(report_db, OLD_LOCATION_INVENTORY, "WHERE pl.ID = ?", (3,))
+        for customer in range(1, 31):
+            locations = get_customer_activity_report(customer)["locations"]
+            assert locations == _old(report_db, OLD_ACTIVITY_LOCATIONS, params=(customer,))
+
+    def test_work_grows_additively(self, report_db, monkeypatch):
+        # One customer with 10 locations, 100 units and 50 tickets: the old join visits 100 * 50 rows
+        with report_db.get_conn() as conn:
+            conn.execute("INSERT INTO Customers (ID, company) VALUES (99, 'Wide')")
+            conn.executemany("INSERT INTO PropertyLocations (ID, customer_id, address1) VALUES (?, 99, 'x')",
+                             [(1000 + i,) for i in range(10)])
+            conn.executemany("INSERT INTO Units (unit_id, location_id, unit_tag) VALUES (?, ?, 'u')",
+                             [(1000 + i, 1000 + i % 10) for i in range(100)])
+            conn.executemany("INSERT INTO ServiceCalls (ID, customer_id, title) VALUES (?, 99, 't')",
+                             [(1000 + i,) for i in range(50)])
+
+        steps = []
+        real_get_conn = reports_repo.get_conn
+
+        def counted_conn():
+            conn = real_get_conn()
+            steps.append(0)
+            conn.set_progress_handler(lambda: steps.__setitem__(-1, steps[-1] + 1), 100)
+            return conn
+
+        monkeypatch.setattr(reports_repo, "get_conn", counted_conn)
+        summary = get_customer_summary_report(99)[0]
+        assert (summary["location_count"], summary["equipment_count"], summary["total_tickets"]) == (10, 100, 50)
+        assert summary["open_tickets"] == 50                                # status defaults to 'Open'
+        new_steps = steps[-1]
+
+        conn = counted_conn()
+        try:
+            old = conn.execute(OLD_CUSTOMER_SUMMARY.format(where="WHERE c.ID = ?"), (99,)).fetchone()
+        finally:
+            conn.set_progress_handler(None, 0)
+            conn.close()
+        assert dict(old) == summary
+        assert new_steps * 10 < steps[-1]                                   # VM instructions, in hundreds
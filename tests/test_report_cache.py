@@ -0,0 +1,74 @@
+"""
+Tests for the report result cache.
+
+Validates:
+- A report is computed once per arguments (positional or keyword) and then
+  served from memory, with hit/miss statistics per report
+- Writes to a table the report reads - by any connection - invalidate it;
+  writes to other tables do not
+- Entries expire after the report's TTL
+- A second process (the PDF worker) reuses the result through the disk tier
+- Without ReportTableVersions the cache is bypassed
+"""
+
+import sqlite3
+import time
+
+import pytest
+
+from core import report_cache
+from core.report_cache import ReportCache, ensure_report_cache_tables
+from core.reports_repo import get_customer_summary_report, get_location_inventory_report
+
+
+@pytest.fixture
+def cache(schema_db, tmp_path, monkeypatch):
+    ensure_report_cache_tables()
+    instance = ReportCache(tmp_path / "report_cache")
+    monkeypatch.setattr(report_cache, "_cache", instance)
+    return instance
+
+
+class TestReportCache:
+
+    def test_hits_and_table_invalidation(self, cache, schema_db):
+        first = get_customer_summary_report()
+        assert first[0]["customer_name"] == "Acme" and first[0]["total_tickets"] == 0
+        first[0]["customer_name"] = "mutated"
+        assert get_customer_summary_report()[0]["customer_name"] == "Acme"       # copies
+        assert get_customer_summary_report(customer_id=None)[0]["customer_name"] == "Acme"
+        assert get_customer_summary_report(1)[0]["customer_id"] == 1
+        stats = cache.stats()
+        assert stats["reports"]["customer_summary"] == {"hits": 2, "misses": 2}
+
+        get_location_inventory_report()
+        other = sqlite3.connect(schema_db.DB_PATH)                           # another process
+        other.execute("INSERT INTO ServiceCalls (ID, customer_id, location_id, unit_id, title, status) "
+                      "VALUES (1, 1, 1, 1, 'No heat', 'Open')")
+        other.commit()
+        other.close()
+        assert get_customer_summary_report()[0]["open_tickets"] == 1
+        assert cache.stats()["invalidated"] == 1
+        get_location_inventory_report()                                       # reads no ServiceCalls
+        assert cache.stats()["reports"]["location_inventory"] == {"hits": 1, "misses": 1}
+
+    def test_ttl_and_disk_tier(self, cache, tmp_path):
+        worker = ReportCache(tmp_path / "report_cache")                      # same directory, own memory
+        runs = []
+        args = (("customer_id", None),)
+        value = cache.get_or_run("demo", ("Units",), args, lambda: runs.append(1) or ["row"])
+        assert worker.get_or_run("demo", ("Units",), args, lambda: runs.append(1) or ["other"]) == value
+        assert runs == [1] and worker.stats()["disk_hits"] == 1
+
+        short = ReportCache(tmp_path / "short", default_ttl=0.05)
+        assert short.get_or_run("demo", ("Units",), args, lambda: runs.append(2) or 1) == 1
+        time.sleep(0.1)
+        assert short.get_or_run("demo", ("Units",), args, lambda: runs.append(2) or 2) == 2
+        assert runs == [1, 2, 2] and short.stats()["expired"] == 1
+
+    def test_bypassed_without_version_table(self, schema_db, tmp_path, monkeypatch):
+        instance = ReportCache(tmp_path / "report_cache")
+        monkeypatch.setattr(report_cache, "_cache", instance)
+        get_customer_summary_report()
+        get_customer_summary_report()
+        assert instance.stats()["bypassed"] == 2 and instance.stats()["hits"] == 0
@@ -0,0 +1,110 @@
+"""
+Tests for the report query plans.
+
+Validates:
+- The date, status, customer and unit predicates of the reports are
+  answered with index searches: EXPLAIN QUERY PLAN of every query a report
+  runs shows no SCAN of a table or of a whole index, except scans of
+  partial indexes and the ones a case allows (constant rows, materialized
+  subqueries, the whole-table totals of the system overview)
+- The range predicates return the same tickets as the DATE() comparisons
+  they replace, including the first and last second of the boundary days
+"""
+
+import re
+
+import pytest
+
+from core import reports_repo
+from core.reports_repo import ensure_report_indexes, get_tickets_by_status_report
+from core.tickets_repo import ensure_ticket_grid
+from core.unit_alerts import ensure_unit_alerts_table
+
+CASES = [
+    ("tickets_by_status dates", lambda: get_tickets_by_status_report.uncached(
+        start_date="2026-01-01", end_date="2026-01-31"), ()),
+    ("tickets_by_status status", lambda: get_tickets_by_status_report.uncached(
+        status="Open", start_date="2026-01-01"), ()),
+    ("tickets_by_status customer", lambda: get_tickets_by_status_report.uncached(
+        customer_id=1, end_date="2026-01-31"), ()),
+    ("ticket_resolution", lambda: reports_repo.get_ticket_resolution_analysis.uncached(30), ()),
+    ("open_tickets_summary", lambda: reports_repo.get_open_tickets_summary.uncached(), ()),
+    ("customer_activity", lambda: reports_repo.get_customer_activity_report.uncached(1), ()),
+    ("alert_history", lambda: reports_repo.get_alert_history_report(30), ("hit",)),
+    ("alert_history unit", lambda: reports_repo.get_alert_history_report(30, unit_id=1), ("hit",)),
+    ("temperature_trend", lambda: reports_repo.get_temperature_trend_report(1, hours=1), ()),
+    # Totals count every row (from the smallest covering index); the date counts must still be searches
+    ("system_overview", lambda: reports_repo.get_system_overview_report.uncached(),
+     ("CONSTANT ROW", "Customers", "PropertyLocations", "Units", "ServiceCalls", "sc")),
+]
+
+
+@pytest.fixture
+def plan_db(schema_db):
+    ensure_ticket_grid()
+    ensure_unit_alerts_table()
+    ensure_report_indexes()
+    return schema_db
+
+
+@pytest.fixture
+def plans(plan_db, monkeypatch):
+    """EXPLAIN QUERY PLAN detail lines of every statement a report runs."""
+    captured = []
+    real_get_conn = reports_repo.get_conn
+
+    class Explained:
+        def __init__(self, conn):
+            self._conn = conn
+
+        def execute(self, sql, params=()):
+            rows = self._conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+            captured.append((sql, [r[3] for r in rows]))
+            return self._conn.execute(sql, params)
+
+        def __getattr__(self, name):
+            return getattr(self._conn, name)
+
+    monkeypatch.setattr(reports_repo, "get_conn", lambda: Explained(real_get_conn()))
+    return captured
+
+
+def _partial_indexes(db):
+    with db.get_conn() as conn:
+        return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql LIKE '% WHERE %'")}
+
+
+class TestReportPlans:
+
+    @pytest.mark.parametrize("name,run,allowed", CASES, ids=[c[0] for c in CASES])
+    def test_no_full_scans(self, plan_db, plans, name, run, allowed):
+        partial = _partial_indexes(plan_db)
+        run()
+        assert plans
+        for sql, plan in plans:
+            for line in plan:
+                scan = re.match(r"SCAN (\w+(?: ROW)?)(?: USING (?:COVERING )?INDEX (\w+))?", line)
+                if scan is None or scan.group(2) in partial or scan.group(1) in allowed:
+                    continue
+                pytest.fail(f"{name}: {line}\n{sql}")
+
+    def test_overview_date_counts_are_range_searches(self, plan_db, plans):
+        reports_repo.get_system_overview_report.uncached()
+        lines = [line for _, plan in plans for line in plan]
+        assert sum("(created>?)" in line for line in lines) == 3
+
+    def test_ranges_match_date_comparisons(self, plan_db):
+        created = ["2025-12-31 23:59:59", "2026-01-01 00:00:00", "2026-01-15 12:00:00",
+                   "2026-01-31 23:59:59", "2026-02-01 00:00:00"]
+        with plan_db.get_conn() as conn:
+            conn.executemany("INSERT INTO ServiceCalls (ID, customer_id, title, created) VALUES (?, 1, 't', ?)",
+                             list(enumerate(created, start=1)))
+            old = [r[0] for r in conn.execute(
+                "SELECT ID FROM ServiceCalls WHERE DATE(created) >= DATE(?) AND DATE(created) <= DATE(?) "
+                "ORDER BY created DESC", ("2026-01-01", "2026-01-31 08:30:00"))]
+        assert old == [4, 3, 2]
+        ids = [r["ticket_id"] for r in get_tickets_by_status_report.uncached(
+            start_date="2026-01-01", end_date="2026-01-31 08:30:00")]
+        assert ids == old
+        assert [r["ticket_id"] for r in get_tickets_by_status_report.uncached(end_date="2025-12-31")] == [1]
+        assert [r["ticket_id"] for r in get_tickets_by_status_report.uncached(start_date="2026-02-01")] == [5]
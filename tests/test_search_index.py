@@ -0,0 +1,93 @@
+"""
+Tests for the FTS5 search index.
+
+Validates:
+- Triggers keep the index in sync with inserts, updates and deletes
+- Ranked prefix search: every word must match, heavier columns rank first
+- User input with FTS5 syntax is taken literally; all-digit searches hit IDs
+- search_all() spans all four entities and honours a customer scope
+- A column added to a source table rebuilds its index; without the index
+  the repos fall back to the LIKE scan
+"""
+
+import pytest
+
+from core.customers_repo import list_customers
+from core.locations_repo import list_locations
+from core.search_index import ensure_search_index, match_query, search_all
+from core.tickets_repo import search_service_calls
+from core.units_repo import list_units
+
+
+@pytest.fixture
+def search_db(schema_db):
+    with schema_db.get_conn() as conn:
+        conn.execute("INSERT INTO Customers (ID, company, city, notes) VALUES (2, 'Northwind Traders', 'Boston', NULL)")
+        conn.execute("INSERT INTO Customers (ID, company, notes) VALUES (3, 'Globex', 'referred by northwind')")
+        conn.execute("INSERT INTO PropertyLocations (ID, customer_id, address1, city) VALUES (2, 2, '77 Harbor Rd', 'Boston')")
+        conn.execute("INSERT INTO Units (unit_id, location_id, unit_tag, make) VALUES (2, 2, 'AHU-North', 'Carrier')")
+        conn.execute("INSERT INTO ServiceCalls (ID, customer_id, unit_id, title, description) "
+                     "VALUES (41, 2, 2, 'Compressor noise', 'Loud rattle at startup')")
+        conn.execute("INSERT INTO ServiceCalls (ID, customer_id, title, description) "
+                     "VALUES (42, 1, 'Filter change', 'Quarterly 41 point check')")
+    assert ensure_search_index()["customers"] == "created"      # indexes the rows above
+    return schema_db
+
+
+class TestIndex:
+
+    def test_ranked_prefix_search_and_sync(self, search_db):
+        assert [c["ID"] for c in list_customers("north")] == [2, 3]   # company beats notes
+        assert [c["ID"] for c in list_customers("northw bost")] == [2]
+        assert list_customers("orthwind") == []                        # prefix, not substring
+
+        with search_db.get_conn() as conn:
+            conn.execute("INSERT INTO Customers (ID, company) VALUES (4, 'Northern Air')")
+            conn.execute("UPDATE Customers SET company = 'Southwind Traders' WHERE ID = 2")
+            conn.execute("DELETE FROM Customers WHERE ID = 3")
+        assert [c["ID"] for c in list_customers("north")] == [4]
+        assert [c["company"] for c in list_customers("southw")] == ["Southwind Traders"]
+        assert ensure_search_index()["customers"] == "ok"
+
+        with search_db.get_conn() as conn:   # raises if the index drifted from Customers
+            conn.execute("INSERT INTO CustomersSearch (CustomersSearch, rank) VALUES ('integrity-check', 1)")
+
+    def test_literal_input_and_ids(self, search_db):
+        assert match_query('acme" OR -x*') == '"acme"* "OR"* "x"*'
+        assert match_query(" -- ") is None
+        assert list_customers('north"') and list_customers("NEAR(north)") == []
+
+        assert [t["ID"] for t in search_service_calls("41")] == [41, 42]     # ID first, then text
+        assert [t["ID"] for t in search_service_calls("rattl")] == [41]
+        assert search_service_calls("compressor", customer_id=1) == []
+        assert [u["unit_id"] for u in list_units("carr", location_id=2)] == [2]
+        assert list_units("carr", location_id=1) == []
+
+    def test_search_all(self, search_db):
+        hits = search_all("north")
+        assert {(h["entity"], h["id"]) for h in hits} == {("customers", 2), ("customers", 3), ("units", 2)}
+        assert [h["rank"] for h in hits] == sorted(h["rank"] for h in hits)
+        assert hits[-1]["title"] == "Globex"                           # notes-only match ranks last
+        assert len(search_all("north", limit=1)) == 1
+
+        scoped = search_all("boston", customer_id=2)
+        assert {(h["entity"], h["id"]) for h in scoped} == {("customers", 2), ("locations", 2)}
+        assert all(h["customer_id"] == 2 for h in scoped)
+        assert search_all("boston", customer_id=1) == []
+
+
+class TestSchemaChanges:
+
+    def test_new_column_rebuilds_index(self, search_db):
+        with search_db.get_conn() as conn:
+            conn.execute("ALTER TABLE PropertyLocations ADD COLUMN business_name TEXT DEFAULT ''")
+            conn.execute("ALTER TABLE PropertyLocations ADD COLUMN extendednotes TEXT")
+            conn.execute("UPDATE PropertyLocations SET business_name = 'Harbor Holdings LLC' WHERE ID = 2")
+        assert ensure_search_index()["locations"] == "rebuilt"
+        assert [loc["ID"] for loc in list_locations("holdings")] == [2]
+        assert [loc["ID"] for loc in list_locations("harb", customer_id=2)] == [2]
+        assert list_locations("harb", customer_id=1) == []
+
+    def test_like_fallback_without_index(self, schema_db):
+        assert [c["ID"] for c in list_customers("cme")] == [1]      # substring scan
+        assert search_all("acme") == []
@@ -0,0 +1,116 @@
+"""
+Tests for the process-wide settings cache.
+
+Validates:
+- Settings are read from SQLite once, then served from the cache as copies
+- The update_* functions drop the entries they change
+- An edit made through another connection is noticed via PRAGMA data_version
+  and SettingsVersion, while unrelated writes (telemetry) keep the cache
+- The VERSION file is re-read only when its mtime changes
+"""
+
+import json
+import os
+import sqlite3
+
+import pytest
+
+from core import settings_cache
+from core.email_settings import ensure_email_settings_table, get_email_settings, update_email_settings
+from core.settings_cache import SettingsCache, ensure_settings_version
+from core.settings_repo import (
+    ensure_retention_tables, get_company_header, get_company_profile, get_retention_settings,
+    update_company_profile, update_retention_settings,
+)
+
+COMPANY_INFO = """
+    CREATE TABLE CompanyInfo (
+        id INTEGER PRIMARY KEY CHECK (id = 1), name TEXT, address1 TEXT, address2 TEXT, city TEXT,
+        state TEXT, zip TEXT, phone TEXT, fax TEXT, email TEXT, website TEXT, service_email TEXT,
+        owner_email TEXT, logo_path TEXT
+    )
+"""
+
+
+@pytest.fixture
+def cache(schema_db, monkeypatch):
+    with schema_db.get_conn() as conn:
+        conn.execute(COMPANY_INFO)
+        conn.execute("INSERT INTO CompanyInfo (id, name, phone) VALUES (1, 'Acme HVAC', '5551234567')")
+    ensure_email_settings_table()
+    ensure_retention_tables()
+    ensure_settings_version()
+    instance = SettingsCache(check_interval=0)
+    monkeypatch.setattr(settings_cache, "_cache", instance)
+    yield instance
+    instance.close()
+
+
+class TestSettingsCache:
+
+    def test_hits_copies_and_update_invalidation(self, cache):
+        profile = get_company_profile()
+        assert profile["name"] == "Acme HVAC"
+        profile["name"] = "mutated"
+        assert get_company_profile()["name"] == "Acme HVAC"              # callers get copies
+        assert get_company_header()["company"] == "Acme HVAC"
+        assert cache.stats()["loads"] == 2 and cache.stats()["hits"] == 1
+
+        update_company_profile({"name": "Acme Mechanical", "phone": "5550000000"})
+        assert get_company_profile()["name"] == "Acme Mechanical"
+        assert get_company_header()["company"] == "Acme Mechanical"
+
+        update_email_settings({"smtp_host": "mail.example.com", "smtp_port": 2525})
+        assert get_email_settings()["smtp_host"] == "mail.example.com"
+        update_email_settings({"smtp_host": "smtp.example.com", "smtp_port": 2525})
+        assert get_email_settings()["smtp_host"] == "smtp.example.com"
+
+        assert get_retention_settings()["raw_days"] == 30
+        loads = cache.stats()["loads"]
+        assert get_retention_settings()["raw_days"] == 30                # trend renders: no query
+        assert cache.stats()["loads"] == loads
+        update_retention_settings({"raw_days": 14})
+        assert get_retention_settings()["raw_days"] == 14
+
+    def test_out_of_process_edit(self, cache, schema_db):
+        assert get_company_profile()["name"] == "Acme HVAC"
+        get_email_settings()
+        loads = cache.stats()["loads"]
+
+        other = sqlite3.connect(schema_db.DB_PATH)                        # e.g. a utility script
+        other.execute("INSERT INTO Customers (ID, company) VALUES (2, 'Globex')")
+        other.commit()
+        assert get_company_profile()["name"] == "Acme HVAC"
+        assert cache.stats()["loads"] == loads                            # unrelated write: still cached
+
+        other.execute("UPDATE CompanyInfo SET name = 'Edited Elsewhere' WHERE id = 1")
+        other.commit()
+        other.close()
+        assert get_company_profile()["name"] == "Edited Elsewhere"
+        assert cache.stats()["external_changes"] == 1
+
+        assert get_retention_settings()["raw_days"] == 30
+        other = sqlite3.connect(schema_db.DB_PATH)
+        other.execute("UPDATE TelemetryRetentionSettings SET raw_days = 7 WHERE id = 1")
+        other.commit()
+        other.close()
+        assert get_retention_settings()["raw_days"] == 7
+
+    def test_version_file_reloads_on_change(self, cache, tmp_path):
+        path = tmp_path / "VERSION"
+        path.write_text(json.dumps({"version": "1.0.0"}))
+        reads = []
+
+        def load(p):
+            reads.append(p)
+            return json.loads(p.read_text())
+
+        assert cache.get_file("version_info", path, load)["version"] == "1.0.0"
+        assert cache.get_file("version_info", path, load)["version"] == "1.0.0"
+        assert len(reads) == 1
+
+        path.write_text(json.dumps({"version": "1.1.0"}))
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert cache.get_file("version_info", path, load)["version"] == "1.1.0"
+        assert len(reads) == 2
@@ -0,0 +1,122 @@
+"""
+Tests for the trigger-maintained stat counters.
+
+Validates:
+- ensure_stat_counters() counts the rows already in the database
+- Ticket inserts, status / priority changes and moves between customers,
+  alert open / ack / clear, and units or locations moved to another customer
+  keep the totals and per-customer counters exact
+- Deleting a unit, a location or a customer (with ON DELETE CASCADE
+  children) leaves no drift and drops the customer's counters
+- The dashboard / ticket stats readers return the counter values, and count
+  again when StatCounters does not exist
+- check_stat_counters() reports and repairs drift from writes that bypassed
+  the triggers
+"""
+
+import pytest
+
+from core.stat_counters import check_stat_counters, ensure_stat_counters, get_stat_counters
+from core.stats import get_summary_counts
+from core.tickets_repo import get_service_call_stats
+from core.unit_alerts import count_active_alerts
+
+
+@pytest.fixture
+def counters_db(schema_db):
+    with schema_db.get_conn() as conn:
+        conn.execute("INSERT INTO Customers (ID, company) VALUES (2, 'Globex')")
+        conn.execute("INSERT INTO PropertyLocations (ID, customer_id, address1) VALUES (2, 2, '2 Oak Ave')")
+        conn.executemany("INSERT INTO Units (unit_id, location_id, unit_tag) VALUES (?, ?, ?)",
+                         [(2, 1, "RTU-2"), (3, 2, "RTU-3")])
+        conn.executemany("INSERT INTO ServiceCalls (ID, customer_id, title, status, priority) VALUES (?, ?, 't', ?, ?)",
+                         [(1, 1, "Open", "Normal"), (2, 1, "Closed", "Emergency"), (3, 2, "In Progress", "Emergency")])
+    ensure_stat_counters()
+    return schema_db
+
+
+def _alert(conn, alert_id, unit_id, status="open"):
+    conn.execute("INSERT INTO UnitAlerts (alert_id, unit_id, code, severity, status, opened_at) "
+                 "VALUES (?, ?, 'HIGH_TEMP', 'warning', ?, '2026-01-01 00:00:00')", (alert_id, unit_id, status))
+
+
+class TestStatCounters:
+
+    def test_initial_fill_and_readers(self, counters_db):
+        assert get_summary_counts() == {"clients": 2, "locations": 2, "equipment": 3}
+        assert get_service_call_stats() == {"total": 3, "open": 1, "in_progress": 1, "closed": 1, "emergency": 1}
+        assert get_service_call_stats(1) == {"total": 2, "open": 1, "in_progress": 0, "closed": 1, "emergency": 0}
+        assert get_stat_counters(2)["units"] == 1
+        assert check_stat_counters(repair=False) == []
+
+    def test_updates_keep_counters_exact(self, counters_db):
+        with counters_db.get_conn() as conn:
+            conn.execute("UPDATE ServiceCalls SET status = 'In Progress' WHERE ID = 1")
+            conn.execute("UPDATE ServiceCalls SET status = 'Open' WHERE ID = 2")       # reopened emergency
+            conn.execute("UPDATE ServiceCalls SET customer_id = 2 WHERE ID = 1")
+            conn.execute("UPDATE ServiceCalls SET title = 'renamed' WHERE ID = 3")    # no counter change
+            conn.execute("INSERT INTO ServiceCalls (customer_id, title, status) VALUES (2, 't', NULL)")
+            _alert(conn, 1, 1)
+            _alert(conn, 2, 3)
+            _alert(conn, 3, 3, "cleared")
+        assert get_service_call_stats(2) == {"total": 3, "open": 0, "in_progress": 2, "closed": 0, "emergency": 1}
+        assert get_service_call_stats()["emergency"] == 2
+        assert (count_active_alerts(), count_active_alerts(1), count_active_alerts(2)) == (2, 1, 1)
+
+        with counters_db.get_conn() as conn:
+            conn.execute("UPDATE UnitAlerts SET status = 'acked' WHERE alert_id = 1")   # still active
+            conn.execute("UPDATE UnitAlerts SET status = 'cleared' WHERE alert_id = 2")
+            conn.execute("UPDATE UnitAlerts SET status = 'open' WHERE alert_id = 3")
+            conn.execute("UPDATE Units SET location_id = 2 WHERE unit_id = 1")          # unit + alert to Globex
+        assert (count_active_alerts(1), count_active_alerts(2)) == (0, 2)
+        assert (get_stat_counters(1)["units"], get_stat_counters(2)["units"]) == (1, 2)
+
+        with counters_db.get_conn() as conn:
+            conn.execute("UPDATE PropertyLocations SET customer_id = 1 WHERE ID = 2")   # location moves to Acme
+        assert get_stat_counters(1)["locations"] == 2 and get_stat_counters(2)["locations"] == 0
+        assert (get_stat_counters(1)["units"], count_active_alerts(1), count_active_alerts(2)) == (3, 2, 0)
+        assert check_stat_counters(repair=False) == []
+
+    def test_cascading_deletes(self, counters_db):
+        with counters_db.get_conn() as conn:
+            _alert(conn, 1, 1)
+            _alert(conn, 2, 2, "acked")
+            _alert(conn, 3, 3)
+            conn.execute("DELETE FROM Units WHERE unit_id = 2")
+        assert (count_active_alerts(), count_active_alerts(1), get_stat_counters(1)["units"]) == (2, 1, 1)
+        assert check_stat_counters(repair=False) == []
+
+        with counters_db.get_conn() as conn:
+            conn.execute("DELETE FROM PropertyLocations WHERE ID = 1")
+        assert get_summary_counts() == {"clients": 2, "locations": 1, "equipment": 1}
+        assert (count_active_alerts(), count_active_alerts(1)) == (1, 0)
+        assert check_stat_counters(repair=False) == []
+
+        with counters_db.get_conn() as conn:
+            conn.execute("DELETE FROM Customers WHERE ID = 2")
+        assert get_summary_counts() == {"clients": 1, "locations": 0, "equipment": 0}
+        assert get_service_call_stats() == {"total": 2, "open": 1, "in_progress": 0, "closed": 1, "emergency": 0}
+        assert count_active_alerts() == 0 and get_stat_counters(2) == {}
+        assert check_stat_counters(repair=False) == []
+
+    def test_checker_repairs_drift_and_fallback(self, counters_db):
+        with counters_db.get_conn() as conn:
+            conn.execute("DROP TRIGGER trg_stat_counters_tickets_insert")             # e.g. an old import script
+            conn.execute("INSERT INTO ServiceCalls (customer_id, title, priority) VALUES (2, 't', 'Emergency')")
+            conn.execute("UPDATE StatCounters SET n = 99 WHERE customer_id = 0 AND name = 'units'")
+        assert get_service_call_stats(2)["open"] == 0
+
+        drift = check_stat_counters()
+        assert {(d["customer_id"], d["name"], d["stored"], d["actual"]) for d in drift} == {
+            (0, "units", 99, 3), (0, "tickets", 3, 4), (2, "tickets", 1, 2), (0, "tickets:Open", 1, 2),
+            (2, "tickets:Open", 0, 1), (0, "emergency", 1, 2), (2, "emergency", 1, 2),
+        }
+        assert get_service_call_stats(2) == {"total": 2, "open": 1, "in_progress": 1, "closed": 0, "emergency": 2}
+        assert check_stat_counters() == []
+
+        with counters_db.get_conn() as conn:
+            conn.execute("DROP TABLE StatCounters")
+        assert get_stat_counters() is None
+        assert get_service_call_stats(2) == {"total": 2, "open": 1, "in_progress": 1, "closed": 0, "emergency": 2}
+        assert get_summary_counts() == {"clients": 2, "locations": 2, "equipment": 3}
+        assert count_active_alerts() == 0
@@ -0,0 +1,91 @@
+"""
+Tests for the telemetry ingestion path (core/telemetry_ingest.py, core/readings_repo.py).
+
+Validates:
+- JSON object / array / envelope / NDJSON payloads parse to reading dicts
+- Queued readings are flushed in batches by the writer thread
+- Bad unit_ids are rejected without dropping the rest of the batch
+- Gateway timestamps (ISO 8601 with T / Z / offsets, epoch seconds) are
+  stored as UTC "YYYY-MM-DD HH:MM:SS"; unparseable ones are rejected
+- Back-pressure raises IngestQueueFull instead of growing without bound
+"""
+
+import pytest
+
+from core.readings_repo import normalize_reading, normalize_ts
+from core.telemetry_ingest import IngestQueueFull, TelemetryWriter, parse_payload
+
+
+class TestParsePayload:
+
+    def test_single_object(self):
+        assert parse_payload(b'{"unit_id": 1, "supply_temp": 55}') == [{"unit_id": 1, "supply_temp": 55}]
+
+    def test_array_and_envelope(self):
+        assert len(parse_payload(b'[{"unit_id": 1}, {"unit_id": 2}]')) == 2
+        assert len(parse_payload(b'{"readings": [{"unit_id": 1}, {"unit_id": 2}]}')) == 2
+
+    def test_ndjson(self):
+        body = b'{"unit_id": 1}\n{"unit_id": 2}\n\n{"unit_id": 3}\n'
+        assert len(parse_payload(body, "application/x-ndjson")) == 3
+        assert len(parse_payload(body)) == 3  # sniffed without content type
+
+    def test_malformed(self):
+        with pytest.raises(ValueError):
+            parse_payload(b"{not json")
+
+
+class TestNormalizeTimestamps:
+
+    def test_forms(self):
+        assert normalize_ts("2026-10-17 03:00:00") == "2026-10-17 03:00:00"
+        assert normalize_ts("2026-10-17T03:00:00Z") == "2026-10-17 03:00:00"
+        assert normalize_ts("2026-10-17T03:00:00.750Z") == "2026-10-17 03:00:00"
+        assert normalize_ts("2026-10-16T23:00:00-04:00") == "2026-10-17 03:00:00"
+        assert normalize_ts("2026-10-17T05:00:00+02:00") == "2026-10-17 03:00:00"
+        assert normalize_ts(1760670000) == "2025-10-17 03:00:00"
+        assert normalize_ts(1760670000.5) == "2025-10-17 03:00:00"
+        assert normalize_ts("1760670000") == "2025-10-17 03:00:00"
+
+    def test_unparseable_rejected(self):
+        for bad in ("garbage", "2026-13-01 00:00:00", True, [2026], 10 ** 20):
+            assert normalize_ts(bad) is None
+            assert normalize_reading({"unit_id": 1, "ts": bad}) is None
+        assert normalize_reading({"unit_id": 1, "ts": "2026-10-17T03:00:00Z"})[1] == "2026-10-17 03:00:00"
+        assert normalize_reading({"unit_id": 1})[1]                        # missing ts: now
+
+
+class TestTelemetryWriter:
+
+    def test_batches_are_written(self, schema_db):
+        writer = TelemetryWriter(batch_size=100, flush_interval=0.05)
+        accepted, rejected = writer.submit(
+            [{"unit_id": 1, "supply_temp": 50 + i % 10, "mode": "Cooling"} for i in range(250)]
+            + [{"supply_temp": 1}]  # no unit_id
+            + [{"unit_id": 1, "ts": "garbage"}]
+        )
+        writer.stop()
+
+        assert (accepted, rejected) == (250, 2)
+        stats = writer.stats()
+        assert stats["written"] == 250
+        assert stats["batches"] >= 3
+        with schema_db.get_conn() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM UnitReadings").fetchone()[0] == 250
+
+    def test_unknown_unit_isolated(self, schema_db):
+        writer = TelemetryWriter(batch_size=10, flush_interval=0.05)
+        writer.submit([{"unit_id": 1}, {"unit_id": 999}, {"unit_id": 1}])
+        writer.stop()
+
+        stats = writer.stats()
+        assert stats["written"] == 2
+        assert stats["write_rejected"] == 1
+
+    def test_back_pressure(self, schema_db):
+        writer = TelemetryWriter(batch_size=10, flush_interval=60, max_pending=10)
+        writer._running = True  # hold the queue: no consumer thread
+        writer.submit([{"unit_id": 1}] * 10)
+        with pytest.raises(IngestQueueFull):
+            writer.submit([{"unit_id": 1}])
+        assert writer.stats()["throttled"] == 1
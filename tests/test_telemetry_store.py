@@ -0,0 +1,262 @@
+"""
+Tests for telemetry roll-up tiers and monthly partitions.
+
+Validates:
+- run_rollups() buckets match aggregates computed directly from raw rows
+- Watermarks make re-runs incremental; the open tail is aggregated live
+- Readings ingested behind the watermarks are recorded and rolled up by the
+  next run
+- choose_tier() picks the coarsest tier with enough buckets that retention
+  (measured from the current time) has not pruned back past the window start
+- The trend report switches to roll-ups for long windows
+- archive_month() moves a closed month to its own file, in batches
+- run_retention() prunes per policy in bounded batches, never past the
+  roll-up watermarks and never a unit's latest reading
+- Reading the retention policy is a plain SELECT (defaults before the
+  startup migration has created the tables)
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from core import telemetry_store as store
+from core import telemetry_retention as retention
+from core.reports_repo import get_temperature_trend_report
+from core.telemetry_ingest import TelemetryWriter
+from core.settings_repo import (
+    ensure_retention_tables, get_retention_settings, list_retention_runs, update_retention_settings,
+)
+
+NOW = datetime(2026, 3, 10, 12, 0, 0)
+
+
+@pytest.fixture
+def rollup_db(schema_db):
+    store.ensure_rollup_tables()
+    ensure_retention_tables()
+    return schema_db
+
+
+def _insert(conn, ts, supply, fault=None, unit_id=1):
+    conn.execute(
+        "INSERT INTO UnitReadings (unit_id, ts, supply_temp, return_temp, fault_code) VALUES (?, ?, ?, 75, ?)",
+        (unit_id, ts.strftime(store.TS_FORMAT), supply, fault),
+    )
+
+
+def _fill(conn, start, minutes, every_s=20):
+    """Readings every `every_s` seconds; supply_temp cycles 50..59, a fault every 7th."""
+    i = 0
+    t = start
+    while t < start + timedelta(minutes=minutes):
+        _insert(conn, t, 50 + i % 10, "LOW_DELTA_T" if i % 7 == 0 else None)
+        i += 1
+        t += timedelta(seconds=every_s)
+
+
+class TestRollups:
+
+    def test_buckets_match_raw(self, rollup_db):
+        with rollup_db.get_conn() as conn:
+            _fill(conn, NOW - timedelta(hours=3), 180)
+
+        written = store.run_rollups(now=NOW)
+        assert written["1m"] > 0 and written["15m"] > 0 and written["1h"] > 0
+
+        with rollup_db.get_conn() as conn:
+            for tier in ("1m", "15m", "1h"):
+                expected = [
+                    tuple(r) for r in conn.execute(
+                        f"SELECT {store._BUCKET_EXPR[tier]} AS b, COUNT(*), MIN(supply_temp), MAX(supply_temp), "
+                        "SUM(supply_temp), SUM(fault_code IS NOT NULL) FROM UnitReadings "
+                        "WHERE ts < ? GROUP BY b ORDER BY b",
+                        (store._fmt(store.floor_ts(NOW - timedelta(seconds=store.LATE_GRACE), tier)),),
+                    )
+                ]
+                actual = [
+                    tuple(r) for r in conn.execute(
+                        "SELECT bucket, readings, supply_temp_min, supply_temp_max, supply_temp_sum, alert_count "
+                        "FROM ReadingRollups WHERE tier = ? ORDER BY bucket",
+                        (tier,),
+                    )
+                ]
+                assert actual == expected, tier
+
+        # Nothing new -> nothing re-aggregated
+        assert store.run_rollups(now=NOW) == {t: 0 for t in store.TIERS}
+
+    def test_open_tail_is_included(self, rollup_db):
+        with rollup_db.get_conn() as conn:
+            _fill(conn, NOW - timedelta(hours=2), 120)
+        store.run_rollups(now=NOW - timedelta(minutes=30))
+
+        buckets = store.get_rollup_buckets("1m", NOW - timedelta(hours=2), NOW, unit_id=1)
+        assert len(buckets) == 120
+        assert sum(b["readings"] for b in buckets) == 360
+
+    def test_late_readings_are_rolled_up(self, rollup_db):
+        now = store._utc_now().replace(microsecond=0)
+        start = store.floor_ts(now - timedelta(hours=3), "1h")
+        with rollup_db.get_conn() as conn:
+            _fill(conn, start, 60)
+        store.run_rollups(now=now)
+
+        def bucket(tier, at):
+            with rollup_db.get_conn() as conn:
+                return tuple(conn.execute(
+                    "SELECT readings, supply_temp_max FROM ReadingRollups WHERE tier = ? AND bucket = ?",
+                    (tier, store._fmt(at)),
+                ).fetchone())
+
+        late = start + timedelta(minutes=30)
+        assert bucket("1m", late) == (3, 52) and bucket("1h", start) == (180, 59)
+
+        writer = TelemetryWriter(batch_size=10, flush_interval=0.05)     # gateway flushing its buffer
+        writer.submit([{"unit_id": 1, "ts": (late + timedelta(seconds=5)).isoformat() + "Z", "supply_temp": 99}])
+        writer.stop()
+        with rollup_db.get_conn() as conn:
+            assert [tuple(r) for r in conn.execute("SELECT start_ts, end_ts FROM RollupDirtyRanges")] == [
+                (store._fmt(late + timedelta(seconds=5)), store._fmt(late + timedelta(seconds=6)))]
+
+        written = store.run_rollups(now=now)
+        assert written["1m"] == 1 and written["1h"] == 1
+        assert bucket("1m", late) == (4, 99) and bucket("1h", start) == (181, 99)
+        with rollup_db.get_conn() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM RollupDirtyRanges").fetchone()[0] == 0
+
+    def test_choose_tier(self, rollup_db, monkeypatch):
+        monkeypatch.setattr(store, "_utc_now", lambda: NOW)
+        assert store.choose_tier(NOW - timedelta(days=30), NOW) == "raw"   # never rolled up
+
+        with rollup_db.get_conn() as conn:
+            _fill(conn, NOW - timedelta(minutes=10), 5)
+        store.run_rollups(now=NOW)
+
+        assert store.choose_tier(NOW - timedelta(minutes=30), NOW) == "raw"
+        assert store.choose_tier(NOW - timedelta(hours=2), NOW) == "1m"
+        assert store.choose_tier(NOW - timedelta(hours=24), NOW) == "15m"
+        assert store.choose_tier(NOW - timedelta(days=7), NOW) == "1h"
+        assert store.choose_tier(NOW - timedelta(days=365), NOW) == "1d"
+
+        # Viewed 60 days later: raw and '1m' (30 days each) no longer reach back to the window
+        monkeypatch.setattr(store, "_utc_now", lambda: NOW + timedelta(days=60))
+        assert store.choose_tier(NOW - timedelta(hours=2), NOW) == "15m"
+
+    def test_reports_use_rollups(self, rollup_db):
+        now = datetime.now().replace(microsecond=0)
+        with rollup_db.get_conn() as conn:
+            _fill(conn, now - timedelta(hours=6), 360, every_s=60)
+        store.run_rollups()
+
+        trend = get_temperature_trend_report(1, hours=24)
+        assert trend and {r["tier"] for r in trend} == {"15m"}
+        assert all(50 <= r["supply_temp"] <= 59 for r in trend)
+
+        # One hour still has enough 1-minute buckets
+        short = get_temperature_trend_report(1, hours=1)
+        assert {r["tier"] for r in short} == {"1m"}
+
+
+class TestPartitions:
+
+    def test_archive_month(self, rollup_db, tmp_path, monkeypatch):
+        monkeypatch.setenv("TELEMETRY_ARCHIVE_DIR", str(tmp_path / "archive"))
+        with rollup_db.get_conn() as conn:
+            _fill(conn, datetime(2026, 1, 31, 23, 0), 120, every_s=60)   # Jan 31 23:00 -> Feb 1 01:00
+
+        with pytest.raises(ValueError):
+            store.archive_month("2026-01")   # roll-ups not run yet
+
+        store.run_rollups(now=NOW)
+        result = store.archive_month("2026-01", batch_size=7)
+        assert result["copied"] == 60 and result["deleted"] == 60
+
+        with rollup_db.get_conn() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM UnitReadings").fetchone()[0] == 60
+            assert conn.execute("SELECT MIN(ts) FROM UnitReadings").fetchone()[0] == "2026-02-01 00:00:00"
+            # Roll-ups still cover the archived hour
+            assert conn.execute(
+                "SELECT readings FROM ReadingRollups WHERE tier = '1h' AND bucket = '2026-01-31 23:00:00'"
+            ).fetchone()[0] == 60
+
+        assert [p["month"] for p in store.list_partitions()] == ["2026-01"]
+        with store.attached_partition("2026-01") as (conn, schema):
+            assert conn.execute(f"SELECT COUNT(*) FROM {schema}.UnitReadings").fetchone()[0] == 60
+
+        # Re-running is a no-op; detaching forgets the month but keeps the file
+        assert store.archive_month("2026-01")["deleted"] == 0
+        assert store.detach_partition("2026-01") == result["path"]
+        assert store.list_partitions() == []
+
+    def test_open_month_is_rejected(self, rollup_db):
+        with pytest.raises(ValueError):
+            store.archive_month(datetime.utcnow().strftime("%Y-%m"))
+
+
+class TestRetention:
+
+    def test_policy_read_does_not_migrate(self, schema_db):
+        assert get_retention_settings()["raw_days"] == 30
+        assert list_retention_runs() == []
+        with schema_db.get_conn() as conn:
+            assert conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE name LIKE 'TelemetryRetention%'"
+            ).fetchone()[0] == 0
+        ensure_retention_tables()
+        assert update_retention_settings({"raw_days": 10})
+        assert get_retention_settings()["raw_days"] == 10
+
+    def test_prunes_raw_and_rollups(self, rollup_db, monkeypatch):
+        monkeypatch.setattr(retention, "BATCH_PAUSE", 0)
+        with rollup_db.get_conn() as conn:
+            _fill(conn, NOW - timedelta(days=40), 60, every_s=60)   # old
+            _fill(conn, NOW - timedelta(days=1), 60, every_s=60)    # recent
+        store.run_rollups(now=NOW)
+        update_retention_settings({"raw_days": 30, "rollup_1m_days": 7, "rollup_15m_days": 0,
+                                   "rollup_1h_days": 0, "batch_size": 100})
+
+        result = retention.run_retention(now=NOW)
+        assert result["raw_pruned"] == 60
+        assert result["details"]["1m"] == 60        # 40-day-old 1-minute buckets
+        assert result["complete"] and result["duration_ms"] >= 0
+
+        with rollup_db.get_conn() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM UnitReadings").fetchone()[0] == 60
+            # Coarser tiers still cover the pruned hour
+            assert conn.execute(
+                "SELECT COUNT(*) FROM ReadingRollups WHERE tier = '1h' AND bucket < ?",
+                (store._fmt(NOW - timedelta(days=30)),),
+            ).fetchone()[0] == 1
+
+        runs = list_retention_runs()
+        assert runs[0]["raw_pruned"] == 60 and runs[0]["complete"] == 1
+
+        # Old windows now come from a tier that still has the data
+        monkeypatch.setattr(store, "_utc_now", lambda: NOW)
+        assert store.choose_tier(NOW - timedelta(days=40), NOW) == "1h"
+
+    def test_bounded_batches_and_safety(self, rollup_db, monkeypatch):
+        monkeypatch.setattr(retention, "BATCH_PAUSE", 0)
+        monkeypatch.setattr(retention, "MAX_BATCHES_PER_RUN", 2)
+        with rollup_db.get_conn() as conn:
+            _fill(conn, NOW - timedelta(days=40), 60, every_s=60)
+        update_retention_settings({"raw_days": 30, "batch_size": 100})
+
+        # Nothing rolled up yet -> raw readings are held back
+        first = retention.run_retention(now=NOW)
+        assert first["raw_pruned"] == 0 and "raw_held_back" in first["details"]
+
+        store.run_rollups(now=NOW)
+        monkeypatch.setattr(retention, "MAX_BATCHES_PER_RUN", 1)
+        partial = retention.run_retention(now=NOW, settings={**get_retention_settings(), "batch_size": 10})
+        assert partial["raw_pruned"] == 10 and not partial["complete"]
+
+        # Incomplete run -> the scheduler job continues right away
+        monkeypatch.setattr(retention, "_utc_now", lambda: NOW)
+        monkeypatch.setattr(retention, "MAX_BATCHES_PER_RUN", 100)
+        assert retention.retention_job()["raw_pruned"] == 49   # latest reading is kept
+        assert retention.retention_job() is None                # not due again yet
+
+        with rollup_db.get_conn() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM UnitReadings").fetchone()[0] == 1
@@ -0,0 +1,122 @@
+"""
+Tests for batch ticket PDF exports.
+
+Validates:
+- A ZIP export streams each service order as soon as it has rendered and
+  lists tickets that failed in MISSING.txt
+- An interrupted batch is saved as "paused"; resuming it (from a fresh
+  service, as after a restart) renders only the missing tickets
+- A merged export is one PDF with every ticket's pages, in ticket order
+- Only one running export per user
+"""
+
+import io
+import threading
+import zipfile
+
+import pytest
+from pypdf import PdfReader
+
+from core import pdf_cache, pdf_render
+from core.pdf_cache import PdfCache
+from core.pdf_render import PdfRenderService
+from core.ticket_batch import TicketBatchError, TicketBatchService
+from core.tickets_repo import ensure_ticket_grid, list_service_call_ids
+
+
+@pytest.fixture
+def ticket_db(schema_db, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)   # the service_orders copies land here
+    monkeypatch.setattr(pdf_cache, "_cache", PdfCache(tmp_path / "pdf_cache"))
+    ensure_ticket_grid()
+    with schema_db.get_conn() as conn:
+        conn.executemany(
+            "INSERT INTO ServiceCalls (ID, customer_id, location_id, unit_id, title, status, priority, created) "
+            "VALUES (?, 1, 1, 1, ?, 'Closed', 'Normal', ?)",
+            [(t, f"Call {t}", f"2026-09-{t:02d} 08:00:00") for t in (7, 8, 9)],
+        )
+    return schema_db
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """Ticket ids as the worker renders them; ticket 9 waits for the returned gate."""
+    calls = []
+    gate = threading.Event()
+    real = pdf_render.RENDERERS["ticket"]
+
+    def gated(ticket_id):
+        calls.append(ticket_id)
+        if ticket_id == 9:
+            gate.wait(5)
+        return real(ticket_id)
+
+    monkeypatch.setitem(pdf_render.RENDERERS, "ticket", gated)
+    yield calls, gate
+    gate.set()
+
+
+@pytest.fixture
+def pdf_service():
+    service = PdfRenderService(workers=0)
+    yield service
+    service.shutdown()
+
+
+def _wait_for(service, batch_id, *statuses):
+    for _ in range(200):
+        batch = service.status(batch_id)
+        if batch["status"] in statuses:
+            return batch
+        threading.Event().wait(0.05)
+    raise AssertionError(f"batch still {batch['status']}")
+
+
+class TestTicketBatch:
+
+    def test_zip_streams_as_tickets_finish(self, ticket_db, rendered, pdf_service, tmp_path):
+        calls, gate = rendered
+        batches = TicketBatchService(tmp_path / "batches", parallel=2, pdf_service=pdf_service)
+        ids = list_service_call_ids(status="Closed") + [404]
+        assert ids == [7, 8, 9, 404]
+        batch_id = batches.start(ids, owner="tech@example.com", output="zip")
+
+        stream = batches.iter_zip(batch_id)
+        first = next(stream)                                       # ticket 7, while 9 is still rendering
+        assert b"ServiceOrder_7.pdf" in first
+        assert batches.status(batch_id)["status"] == "running"
+        gate.set()
+        archive = zipfile.ZipFile(io.BytesIO(first + b"".join(stream)))
+
+        assert archive.namelist() == ["ServiceOrder_7.pdf", "ServiceOrder_8.pdf", "ServiceOrder_9.pdf", "MISSING.txt"]
+        assert archive.read("ServiceOrder_8.pdf").startswith(b"%PDF")
+        assert "#404: Ticket 404 not found" in archive.read("MISSING.txt").decode()
+        batch = batches.status(batch_id)
+        assert (batch["status"], batch["done"], batch["failed"], batch["progress"]) == ("done", 3, 1, 1.0)
+        batches.shutdown()
+
+    def test_interrupted_batch_resumes_missing_tickets(self, ticket_db, rendered, pdf_service, tmp_path):
+        calls, gate = rendered
+        batches = TicketBatchService(tmp_path / "batches", parallel=1, pdf_service=pdf_service)
+        batch_id = batches.start([7, 8, 9], owner="tech@example.com", output="pdf")
+        with pytest.raises(TicketBatchError):
+            batches.start([7], owner="tech@example.com")           # one running export per user
+
+        while len(calls) < 3:
+            threading.Event().wait(0.05)
+        batches.shutdown()                                         # server stops while 9 renders
+        gate.set()
+        assert batches.status(batch_id)["status"] == "paused"
+
+        restarted = TicketBatchService(tmp_path / "batches", pdf_service=pdf_service)
+        assert restarted.status(batch_id)["done"] == 2
+        calls.clear()
+        assert restarted.resume_all() == 1
+        batch = _wait_for(restarted, batch_id, "done", "failed")
+        assert batch["status"] == "done" and calls == [9]
+
+        merged = PdfReader(str(restarted.merged_path(batch_id)))
+        assert len(merged.pages) == 3
+        assert [item.title for item in merged.outline] == ["Service Order #7", "Service Order #8", "Service Order #9"]
+        assert restarted.status("../../etc") is None
+        restarted.shutdown()
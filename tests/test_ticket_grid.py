@@ -0,0 +1,77 @@
+"""
+Tests for the ticket grid read model.
+
+Validates:
+- ServiceCallGrid returns names and unit counts (TicketUnits, else the
+  legacy ServiceCalls.unit_id) in the same row
+- Keyset pages walk every ticket exactly once, newest first, including
+  equal timestamps and tickets without a created date
+- Filtered pages are index range scans, not table scans
+"""
+
+import pytest
+
+from core.tickets_repo import ensure_ticket_grid, list_service_calls_page
+
+
+@pytest.fixture
+def grid_db(schema_db):
+    ensure_ticket_grid()
+    with schema_db.get_conn() as conn:
+        conn.execute("INSERT INTO Units (unit_id, location_id, unit_tag) VALUES (2, 1, 'RTU-2')")
+        rows = []
+        for i in range(1, 251):
+            created = None if i % 50 == 0 else f"2025-01-{i % 28 + 1:02d} 08:00:00"   # many equal timestamps
+            rows.append((i, 1, 1, 1 if i % 7 == 0 else None, f"Call {i}", "Open" if i % 3 else "Closed", created))
+        conn.executemany(
+            "INSERT INTO ServiceCalls (ID, customer_id, location_id, unit_id, title, status, created) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.executemany("INSERT INTO TicketUnits (ticket_id, unit_id, sequence_order) VALUES (?, ?, ?)",
+                         [(5, 1, 0), (5, 2, 1), (7, 2, 0)])
+    return schema_db
+
+
+def _walk(limit, **filters):
+    seen, after, pages = [], None, 0
+    while True:
+        page = list_service_calls_page(after=after, limit=limit, **filters)
+        seen += page["rows"]
+        pages += 1
+        after = page["next"]
+        if after is None:
+            return seen, pages
+
+
+class TestTicketGrid:
+
+    def test_rows_carry_names_and_unit_counts(self, grid_db):
+        rows = {r["ID"]: r for r in list_service_calls_page(limit=300)["rows"]}
+        assert len(rows) == 250
+        assert rows[5]["unit_count"] == 2                       # TicketUnits
+        assert rows[7]["unit_count"] == 1                       # TicketUnits wins over unit_id
+        assert rows[14]["unit_count"] == 1                      # legacy unit_id only
+        assert rows[1]["unit_count"] == 0
+        assert rows[1]["customer_name"] == "Acme" and rows[1]["location_address"] == "1 Main St"
+
+    def test_keyset_walks_every_ticket_once(self, grid_db):
+        seen, pages = _walk(37)
+        assert pages == 7
+        keys = [(r["created"] is not None, r["created"] or "", r["ID"]) for r in seen]
+        assert keys == sorted(keys, reverse=True)               # newest first, NULL created last
+        assert sorted(r["ID"] for r in seen) == list(range(1, 251))
+
+        closed, _ = _walk(10, status="Closed")
+        assert sorted(r["ID"] for r in closed) == [i for i in range(1, 251) if i % 3 == 0]
+        assert list_service_calls_page(customer_id=2) == {"rows": [], "next": None}
+
+    def test_filtered_pages_use_an_index(self, grid_db):
+        with grid_db.get_conn() as conn:
+            plan = " | ".join(r[3] for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM ServiceCallGrid WHERE 1=1 AND status = ? "
+                "AND (created, ID) < (?, ?) ORDER BY created DESC, ID DESC LIMIT 101",
+                ("Open", "2025-01-10 08:00:00", 10),
+            ))
+        assert "idx_servicecalls_status_created" in plan
+        assert "SCAN sc" not in plan and "TEMP B-TREE" not in plan
@@ -0,0 +1,173 @@
+"""
+Tests for the streaming alert tracker and the UnitAlerts lifecycle table.
+
+Validates:
+- The first run seeds open alerts from each unit's latest reading only
+- Alerts open after N matching readings in a row and clear only after M
+  readings past the hysteresis band (values inside the band never clear)
+- State carries across runs and transaction chunks, and survives a restart
+- Acknowledging; counts and the alert history report read UnitAlerts
+- Disabling a rule clears its open alerts
+- Readings that match no rule are skipped by the batch masks unless the
+  unit has tracked alerts; the prefilter leaves the rule statistics alone
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from core import alert_rules, unit_alerts
+from core.alert_rules import ensure_alert_rules_table, normalize_rule, reset_rule_engine
+from core.reports_repo import get_alert_history_report
+from core.unit_alerts import (
+    acknowledge_alert,
+    count_active_alerts,
+    get_active_alerts,
+    get_alert_tracker,
+    process_new_readings,
+    reset_alert_tracker,
+)
+
+START = datetime.now().replace(microsecond=0) - timedelta(hours=1)
+
+
+@pytest.fixture
+def alerts_db(schema_db, monkeypatch):
+    monkeypatch.delenv("ALERT_RULES_FILE", raising=False)
+    monkeypatch.setattr(unit_alerts, "OPEN_AFTER", 2)
+    monkeypatch.setattr(unit_alerts, "CLEAR_AFTER", 3)
+    unit_alerts.ensure_unit_alerts_table()
+    reset_rule_engine()
+    reset_alert_tracker()
+    yield schema_db
+    reset_alert_tracker()
+    reset_rule_engine()
+
+
+class _Feed:
+    """Inserts readings one second apart (mode None: only the supply temp rules apply)."""
+
+    def __init__(self, db):
+        self.db = db
+        self.t = START
+
+    def __call__(self, *supply_temps, unit_id=1):
+        with self.db.get_conn() as conn:
+            for supply in supply_temps:
+                self.t += timedelta(seconds=1)
+                conn.execute(
+                    "INSERT INTO UnitReadings (unit_id, ts, supply_temp) VALUES (?, ?, ?)",
+                    (unit_id, self.t.strftime("%Y-%m-%d %H:%M:%S"), supply),
+                )
+        return self.t.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _alerts(db):
+    with db.get_conn() as conn:
+        return [dict(r) for r in conn.execute("SELECT * FROM UnitAlerts ORDER BY alert_id")]
+
+
+class TestLifecycle:
+
+    def test_first_run_seeds_latest_reading(self, alerts_db):
+        feed = _Feed(alerts_db)
+        feed(20, 20, 50)
+        assert process_new_readings()["opened"] == 0          # latest reading is normal
+        assert _alerts(alerts_db) == []
+
+        reset_alert_tracker()
+        with alerts_db.get_conn() as conn:
+            conn.execute("DELETE FROM UnitAlertsWatermark")
+        last = feed(20)
+        assert process_new_readings() == {"readings": 1, "opened": 1, "cleared": 0}
+        alert = _alerts(alerts_db)[0]
+        assert alert["code"] == "TEMP_FREEZE_RISK" and alert["opened_at"] == last
+        assert get_alert_tracker().stats()["watermark"] == 4
+
+    def test_debounce_and_hysteresis(self, alerts_db, monkeypatch):
+        monkeypatch.setattr(unit_alerts, "EVAL_BATCH", 3)       # state must carry across chunks
+        feed = _Feed(alerts_db)
+        process_new_readings()
+
+        feed(20, 50)                                             # one hit, then the streak breaks
+        assert process_new_readings()["opened"] == 0
+        feed(20)
+        opened_at = feed(21)
+        assert process_new_readings()["opened"] == 1
+
+        feed(33, 33, 33, 33)                                     # inside the 2°F band: still open
+        feed(40, 40, 20, 40, 40)                                 # 2 normal, a hit resets the count
+        assert process_new_readings()["cleared"] == 0
+        assert count_active_alerts() == 1
+
+        cleared_at = feed(40)
+        assert process_new_readings()["cleared"] == 1
+
+        alert = _alerts(alerts_db)[0]
+        assert alert["status"] == "cleared" and alert["clear_reason"] == "normal"
+        assert alert["opened_at"] == opened_at and alert["cleared_at"] == cleared_at
+        assert alert["readings"] == 3                            # 20, 21 and the later 20
+        assert alert["message"] == "Supply temp 20.0°F - Freezing risk"
+        assert count_active_alerts() == 0
+
+    def test_batch_masks_skip_normal_readings(self, alerts_db, monkeypatch):
+        with alerts_db.get_conn() as conn:
+            conn.execute("INSERT INTO Units (unit_id, location_id, unit_tag) VALUES (2, 1, 'RTU-2')")
+        feed = _Feed(alerts_db)
+        process_new_readings()
+        derived = []
+        real_derive = unit_alerts.derive_metrics
+        monkeypatch.setattr(unit_alerts, "derive_metrics", lambda row: derived.append(row["reading_id"]) or real_derive(row))
+
+        feed(50, 50, 20, 20, 50)                                 # unit 1: normal, then an alert opens
+        feed(50, 50, unit_id=2)                                  # unit 2: nothing to track
+        assert process_new_readings() == {"readings": 7, "opened": 1, "cleared": 0}
+        assert derived == [3, 4, 5]                              # the two hits + unit 1's normal reading after them
+        stats = alert_rules.get_rule_stats()
+        assert stats["rulesets"] == {} and stats["hits"] == {}      # the prefilter is not counted as evaluations
+
+    def test_restart_ack_and_reports(self, alerts_db):
+        feed = _Feed(alerts_db)
+        process_new_readings()
+        feed(20, 20)
+        process_new_readings()
+        alert_id = _alerts(alerts_db)[0]["alert_id"]
+
+        assert acknowledge_alert(alert_id, "tech1")
+        assert not acknowledge_alert(alert_id, "tech1")         # only open alerts can be acked
+
+        reset_alert_tracker()                                    # restart: state comes from UnitAlerts
+        feed(20, 20, 20)
+        assert process_new_readings()["opened"] == 0
+        alert = get_active_alerts(unit_id=1)[0]
+        assert alert["status"] == "acked" and alert["acked_by"] == "tech1" and alert["readings"] == 5
+        assert count_active_alerts(customer_id=1) == 1 and count_active_alerts(customer_id=2) == 0
+
+        feed(50, 50, 50)
+        process_new_readings()
+        history = get_alert_history_report(days=1)
+        assert [(r["code"], r["status"], r["unit_tag"]) for r in history] == [("TEMP_FREEZE_RISK", "cleared", "RTU-1")]
+        assert get_alert_history_report(days=1, unit_id=2) == []
+
+    def test_disabled_rule_clears_alerts(self, alerts_db, monkeypatch):
+        ensure_alert_rules_table()
+        monkeypatch.setattr(alert_rules, "RELOAD_INTERVAL", 0)
+        feed = _Feed(alerts_db)
+        process_new_readings()
+        feed(20, 20)
+        process_new_readings()
+
+        with alerts_db.get_conn() as conn:
+            conn.execute("UPDATE AlertRules SET enabled = 0 WHERE ruleset = 'alerts' AND code = 'TEMP_FREEZE_RISK'")
+        feed(20)
+        assert process_new_readings()["cleared"] == 1
+        assert _alerts(alerts_db)[0]["clear_reason"] == "rule removed"
+
+    def test_lifecycle_fields_validated(self):
+        rule = {"ruleset": "alerts", "code": "X", "severity": "warning", "metric": "supply_temp", "op": "<",
+                "value": 1, "message": "x"}
+        assert normalize_rule({**rule, "hysteresis": "1.5", "open_after": "4"})["open_after"] == 4
+        with pytest.raises(ValueError):
+            normalize_rule({**rule, "hysteresis": -1})
+        with pytest.raises(ValueError):
+            normalize_rule({**rule, "clear_after": 0})
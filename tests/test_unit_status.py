@@ -0,0 +1,88 @@
+"""
+Tests for the unit status service.
+
+Validates:
+- Status comes from each unit's latest reading and the 'status' rules;
+  many units are answered with one query, units without readings get "No data"
+- Statuses are cached for the TTL and computed once per reading: an expired
+  entry with no newer reading is re-checked but not re-computed
+- Readings stored by the ingest writer invalidate that unit's status
+"""
+
+import pytest
+
+from core.alert_rules import reset_rule_engine
+from core.telemetry_ingest import TelemetryWriter
+from core.unit_status import UnitStatusService, get_unit_statuses, reset_unit_status_service
+
+
+@pytest.fixture
+def status_db(schema_db, monkeypatch):
+    monkeypatch.delenv("ALERT_RULES_FILE", raising=False)
+    reset_rule_engine()
+    reset_unit_status_service()
+    with schema_db.get_conn() as conn:
+        conn.execute("INSERT INTO Units (unit_id, location_id, unit_tag) VALUES (2, 1, 'RTU-2')")
+        conn.execute("INSERT INTO Units (unit_id, location_id, unit_tag) VALUES (3, 1, 'RTU-3')")
+        conn.executemany(
+            "INSERT INTO UnitReadings (unit_id, ts, mode, supply_temp, return_temp, fan_speed_percent) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (1, "2025-06-01 10:00:00", "Fault", 70, 72, 0),
+                (1, "2025-06-01 10:05:00", "Cooling", 55, 75, 80),
+                (2, "2025-06-01 10:05:00", "Cooling", 60, 70, 80),
+            ],
+        )
+    yield schema_db
+    reset_unit_status_service()
+    reset_rule_engine()
+
+
+def _add_reading(db, unit_id, mode, supply, ret):
+    with db.get_conn() as conn:
+        conn.execute(
+            "INSERT INTO UnitReadings (unit_id, ts, mode, supply_temp, return_temp, fan_speed_percent) "
+            "VALUES (?, '2025-06-01 11:00:00', ?, ?, ?, 80)",
+            (unit_id, mode, supply, ret),
+        )
+
+
+class TestUnitStatus:
+
+    def test_bulk_status_from_latest_readings(self, status_db):
+        service = UnitStatusService(ttl=60)
+        statuses = service.get_many([1, 2, 3, 2])
+        assert set(statuses) == {1, 2, 3}
+        assert service.stats()["queries"] == 1
+
+        assert statuses[1]["mode"] == "Cooling" and statuses[1]["status_color"] == "green"
+        assert statuses[1]["delta_t_f"] == -20.0 and statuses[1]["last_update"] == "2025-06-01 10:05:00"
+        assert statuses[2]["status_color"] == "red" and "Delta T" in statuses[2]["alert_message"]
+        assert statuses[3]["mode"] == "No data" and statuses[3]["status_color"] == "grey"
+
+    def test_cached_per_reading(self, status_db):
+        service = UnitStatusService(ttl=60)
+        service.get_many([1, 2])
+        _add_reading(status_db, 1, "Fault", 70, 70)
+        assert service.get(1)["mode"] == "Cooling"                  # served from cache within the TTL
+        assert service.stats()["hits"] == 1
+
+        service.invalidate([1])
+        assert service.get(1)["mode"] == "Fault"
+        assert service.stats()["computed"] == 3
+
+        uncached = UnitStatusService(ttl=0)                          # every call re-checks the latest reading
+        for _ in range(3):
+            uncached.get_many([1, 2])
+        stats = uncached.stats()
+        assert stats["queries"] == 3 and stats["computed"] == 2      # same readings: computed once
+
+    def test_writer_invalidates_status(self, status_db):
+        assert get_unit_statuses([1])[1]["status_color"] == "green"
+
+        writer = TelemetryWriter(batch_size=10, flush_interval=0.05)
+        writer.submit([{"unit_id": 1, "mode": "Fault", "supply_temp": 70, "return_temp": 71}])
+        writer.stop()
+
+        status = get_unit_statuses([1])[1]
+        assert (status["mode"], status["status_color"]) == ("Fault", "red")
@@ -0,0 +1,53 @@
+"""Follow queued emails (core/email_outbox.py) from a NiceGUI page until they are delivered."""
+
+from __future__ import annotations
+
+import time
+from typing import Iterable
+
+from nicegui import ui
+
+from core.email_outbox import get_email_status
+
+__all__ = ["watch_email_delivery"]
+
+POLL_INTERVAL = 1.0   # seconds between status checks
+WATCH_FOR = 60.0      # stop watching after this long; the sender keeps retrying
+
+
+def watch_email_delivery(outbox_ids: Iterable[int]) -> None:
+    """
+    Show a spinner while the outbox delivers `outbox_ids`, then one summary
+    notification. The handler that queued the mail returns immediately;
+    messages still being retried when WATCH_FOR runs out are reported as
+    queued and go out in the background.
+    """
+    ids = list(outbox_ids)
+    started = time.monotonic()
+    client = ui.context.client
+    with client.layout:
+        note = ui.notification(f"Sending email to {len(ids)} recipient(s)...", spinner=True, timeout=None)
+
+        def poll() -> None:
+            statuses = get_email_status(ids)
+            pending = [s for s in statuses.values() if s["status"] in ("queued", "sending")]
+            if pending and time.monotonic() - started < WATCH_FOR:
+                return
+            timer.cancel()
+            note.dismiss()
+            sent = sum(s["status"] == "sent" for s in statuses.values())
+            failed = [s for s in statuses.values() if s["status"] == "failed"]
+            if not failed and not pending:
+                ui.notify(f"✓ Email sent to {sent} recipient(s)", type="positive")
+            elif failed and not sent and not pending:
+                errors = "; ".join(f"{s['to_email']}: {s['last_error']}" for s in failed[:2])
+                ui.notify(f"✗ All emails failed: {errors}", type="negative")
+            else:
+                parts = [f"sent {sent}"]
+                if pending:
+                    parts.append(f"{len(pending)} still queued (retrying: {pending[0]['last_error'] or 'waiting'})")
+                if failed:
+                    parts.append(f"failed {len(failed)}")
+                ui.notify(f"⚠ Email: {', '.join(parts)}", type="warning")
+
+        timer = ui.timer(POLL_INTERVAL, poll)
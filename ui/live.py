@@ -0,0 +1,37 @@
+"""Server-push helpers for NiceGUI pages (feeds live in core/live_hub.py)."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict
+
+from nicegui import Client, ui
+
+from core.live_hub import get_live_hub
+
+__all__ = ["live_subscribe", "live_unsubscribe"]
+
+
+def live_subscribe(feed: str, *params: Any, on_change: Callable[[Dict[str, Any]], Any]) -> int:
+    """
+    Push changes of `feed(*params)` to the current page.
+
+    `on_change(diff)` runs inside the page's client context, so it can
+    update elements directly. The subscription ends when the client is
+    deleted (tab closed and not reconnected).
+    """
+    hub = get_live_hub()
+    client = ui.context.client
+
+    def deliver(diff: Dict[str, Any]) -> Any:
+        if client.id not in Client.instances:
+            raise RuntimeError("client deleted")   # hub drops the subscription
+        with client:
+            return on_change(diff)
+
+    token = hub.subscribe(feed, params, deliver)
+    client.on_delete(lambda: hub.unsubscribe(token))
+    return token
+
+
+def live_unsubscribe(token: int) -> None:
+    get_live_hub().unsubscribe(token)
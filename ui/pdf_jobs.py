@@ -0,0 +1,138 @@
+"""
+Render PDFs in the background from NiceGUI pages (service in core/pdf_render.py)
+and run batch exports of service orders (core/ticket_batch.py).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable, Optional
+
+from nicegui import ui
+
+from core.auth import current_user
+from core.pdf_render import PdfQueueFull, get_pdf_service
+from core.ticket_batch import TicketBatchError, resume_ticket_batch, start_ticket_batch, ticket_batch_status
+
+__all__ = ["render_pdf", "download_pdf", "export_ticket_batch"]
+
+POLL_INTERVAL = 0.5   # seconds between job status checks
+
+
+def render_pdf(kind: str, *args: Any,
+               on_done: Callable[[str, bytes], Any],
+               empty_message: str = "No data to export",
+               empty_type: str = "warning") -> Optional[str]:
+    """
+    Submit a PDF job and call `on_done(filename, pdf_bytes)` in this page
+    once it has rendered. The handler returns immediately; a spinner
+    notification stays up while the job is queued or running.
+    Returns the job id, or None when the job was not accepted.
+    """
+    service = get_pdf_service()
+    user = current_user() or {}
+    try:
+        job_id = service.submit(kind, *args, owner=user.get("email"))
+    except PdfQueueFull as e:
+        ui.notify(str(e), type="warning")
+        return None
+
+    client = ui.context.client
+    with client.layout:
+        note = ui.notification("Generating PDF...", spinner=True, timeout=None)
+
+        def poll() -> None:
+            job = service.status(job_id)
+            if job is not None and job["status"] in ("queued", "running"):
+                return
+            timer.cancel()
+            note.dismiss()
+            if job is None:
+                ui.notify("PDF generation expired - please try again", type="warning")
+            elif job["status"] == "failed":
+                ui.notify(f"PDF generation failed: {job['error']}", type="negative")
+            else:
+                result = service.result(job_id)
+                if result is None:
+                    ui.notify(empty_message, type=empty_type)
+                else:
+                    on_done(*result)
+
+        timer = ui.timer(POLL_INTERVAL, poll)
+    return job_id
+
+
+def download_pdf(kind: str, *args: Any, **kwargs: Any) -> Optional[str]:
+    """render_pdf() that sends the finished PDF to the browser as a download."""
+    def done(filename: str, pdf_bytes: bytes) -> None:
+        ui.download(pdf_bytes, filename=filename)
+        ui.notify("PDF exported successfully", type="positive")
+    return render_pdf(kind, *args, on_done=done, **kwargs)
+
+
+def export_ticket_batch(ticket_ids: Iterable[int], output: str = "pdf") -> Optional[str]:
+    """
+    Export many service orders as one merged PDF ("pdf") or a ZIP ("zip")
+    and show the progress in a dialog. A ZIP download starts at once and
+    fills in as tickets finish; a merged PDF downloads when it is complete.
+    A paused batch (server restart) or failed tickets can be resumed from
+    the dialog. Returns the batch id, or None when the export was refused.
+    """
+    user = current_user() or {}
+    try:
+        batch_id = start_ticket_batch(ticket_ids, owner=user.get("email"), output=output)
+    except TicketBatchError as e:
+        ui.notify(str(e), type="warning")
+        return None
+
+    url = f"/api/tickets/batch/{batch_id}.{output}"
+    delivered = output == "zip"
+    if delivered:
+        ui.download.from_url(url)   # streamed: entries arrive as tickets finish
+
+    with ui.context.client.layout:   # outlives the dialog it was started from
+        with ui.dialog() as dialog, ui.card().classes("gcc-card p-6 w-96"):
+            ui.label("Exporting service orders").classes("text-lg font-bold")
+            bar = ui.linear_progress(value=0, show_value=False).classes("my-2")
+            label = ui.label("Starting...").classes("text-sm gcc-muted")
+
+            def poll() -> None:
+                nonlocal delivered
+                batch = ticket_batch_status(batch_id)
+                if batch is None:
+                    timer.deactivate()
+                    label.text = "Export expired - please start it again"
+                    return
+                bar.value = batch["progress"]
+                text = f"{batch['done']} of {batch['total']} rendered"
+                if batch["failed"]:
+                    text += f", {batch['failed']} failed"
+                if batch["status"] == "merging":
+                    text = "Merging into one PDF..."
+                elif batch["status"] == "paused":
+                    text += " - paused"
+                elif batch["status"] == "failed":
+                    text = f"Export failed: {batch['error']}"
+                label.text = text
+                resume_btn.visible = batch["status"] in ("paused", "failed") or (batch["status"] == "done" and batch["failed"] > 0)
+                if batch["status"] in ("running", "merging"):
+                    return
+
+                timer.deactivate()
+                if batch["status"] == "done" and not delivered:
+                    delivered = True
+                    ui.download.from_url(url)
+                    ui.notify("Service orders exported", type="positive")
+
+            def resume() -> None:
+                nonlocal delivered
+                if resume_ticket_batch(batch_id):
+                    delivered = False   # fetch the completed export again
+                    timer.activate()
+
+            with ui.row().classes("justify-end gap-2 w-full mt-2"):
+                resume_btn = ui.button("Resume", icon="replay", on_click=resume).props("flat")
+                resume_btn.visible = False
+                ui.button("Close", on_click=dialog.close).props("flat")
+            timer = ui.timer(POLL_INTERVAL, poll)
+        dialog.open()
+    return batch_id
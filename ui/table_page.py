@@ -1,12 +1,114 @@
 """
 Standard table page component - ONE pattern for all CRUD pages.
 Uses the EXACT same structure as working dashboard tables.
+
+Large tables use a server-side data source instead of loading every row:
+any object with
+
+    fetch(request) -> {"rows": [...], "page": int, "total": int, "exact": bool}
+    invalidate()                      # optional: forget cached counts / cursors
+
+where request = {"page", "rows_per_page", "sort_by", "descending", "filters"}
+(core/paged_query.PagedQuery implements it in SQL). ServerTable binds one to
+a ui.table through Quasar's server-side pagination: sorting, filtering and
+paging happen on the server and only the visible page goes to the browser.
 """
 
 from contextlib import contextmanager
 from typing import Generator, Optional, Callable, List, Dict, Any
 from nicegui import ui
 
+ROWS_PER_PAGE_OPTIONS = [15, 25, 50, 100]
+
+# "1-50 of 1,234"; estimated totals get a "~"
+_PAGINATION_LABEL = "(first, last, total) => `${first}-${last} of %s${total.toLocaleString()}`"
+
+
+class ServerTable:
+    """
+    Server-side pagination for a ui.table backed by a data source (see module docstring).
+
+    `filters()` returns the current filter values ({name: value}) and is read
+    on every load; `to_rows(rows)` decorates a fetched page before it is shown
+    (e.g. live status for the visible units only).
+    """
+
+    def __init__(self, table: ui.table, source: Any, rows_per_page: int = 50,
+                 filters: Optional[Callable[[], Dict[str, Any]]] = None,
+                 to_rows: Optional[Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]] = None,
+                 on_rows: Optional[Callable[[], None]] = None,
+                 sort_by: Optional[str] = None, descending: bool = False):
+        self.table = table
+        self.source = source
+        self.filters = filters or dict
+        self.to_rows = to_rows
+        self.on_rows = on_rows
+        self.total = 0
+        self.request: Dict[str, Any] = {
+            "page": 1, "rows_per_page": rows_per_page, "sort_by": sort_by, "descending": descending,
+        }
+        options = sorted(set(ROWS_PER_PAGE_OPTIONS + [rows_per_page]))
+        table.props(remove="hide-pagination")
+        table.props(f":rows-per-page-options=\"{options}\"")
+        # Quasar calls @request for every page / sort / rows-per-page change once rowsNumber is set
+        table.on("request", self._on_request, js_handler="(e) => emit(e.pagination)")
+
+    def refresh(self, first_page: bool = False) -> None:
+        """Reload the current page (or page 1, e.g. for a new search), re-counting."""
+        if first_page:
+            self.request["page"] = 1
+        if hasattr(self.source, "invalidate"):
+            self.source.invalidate()
+        self.load()
+
+    def set_source(self, source: Any) -> None:
+        """Switch to another listing (e.g. a different customer's locations) from page 1."""
+        self.source = source
+        self.request["page"] = 1
+
+    def show_key(self, key_value: Any) -> Optional[Dict[str, Any]]:
+        """Load the page holding the row with this key (source.locate) and return that row."""
+        page = self.source.locate(key_value, {**self.request, "filters": self.filters()})
+        if page is None:
+            return None
+        self.request["page"] = page
+        self.load()
+        row_key = self.table.row_key
+        return next((r for r in self.table.rows if r.get(row_key) == key_value), None)
+
+    def load(self) -> None:
+        if self.source is None:
+            return
+        result = self.source.fetch({**self.request, "filters": self.filters()})
+        rows = result["rows"]
+        if self.to_rows:
+            rows = self.to_rows(rows)
+        self.request["page"] = result["page"]
+        self.total = result["total"]
+
+        self.table.rows = rows
+        self.table.pagination = {
+            "page": result["page"],
+            "rowsPerPage": self.request["rows_per_page"],
+            "sortBy": self.request["sort_by"],
+            "descending": self.request["descending"],
+            "rowsNumber": result["total"],
+        }
+        self.table.props(f":pagination-label=\"{_PAGINATION_LABEL % ('' if result['exact'] else '~')}\"")
+        self.table.update()
+        if self.on_rows:
+            self.on_rows()
+
+    def _on_request(self, e) -> None:
+        pagination = e.args or {}
+        self.request.update(
+            page=pagination.get("page") or 1,
+            rows_per_page=pagination.get("rowsPerPage") or self.request["rows_per_page"],
+            sort_by=pagination.get("sortBy"),
+            descending=bool(pagination.get("descending")),
+        )
+        self.load()
+
 
 @contextmanager
 def table_page(
@@ -15,7 +117,9 @@ def table_page(
     columns: List[Dict[str, Any]],
     row_key: str = "ID",
     toolbar_builder: Optional[Callable] = None,
-    on_refresh: Callable,
+    on_refresh: Optional[Callable] = None,
+    data_source: Optional[Any] = None,
+    rows_per_page: int = 50,
     can_edit: bool = True,
 ) -> Generator[Any, None, None]:
     """
@@ -26,7 +130,10 @@ def table_page(
         columns: Table column definitions (same as ui.table)
         row_key: Row key field name
         toolbar_builder: Function that builds filter/search controls
-        on_refresh: Function that returns table rows
+        on_refresh: Function that returns table rows (small tables)
+        data_source: Server-side data source (see module docstring); used
+            instead of on_refresh, with the registered filters' values
+        rows_per_page: Page size for data_source
         can_edit: Whether CRUD buttons are enabled
         
     Usage:
@@ -37,6 +144,10 @@ def table_page(
             on_refresh=lambda filters: fetch_data(filters)
         ) as page:
             # Access page.table, page.refresh(), etc.
+
+        or, for large tables, data_source=customers_query() instead of
+        on_refresh: filters added with page.add_filter(name, widget) are
+        passed to the source as {name: widget.value}.
     """
     
     # Container matching dashboard grid item
@@ -76,9 +187,16 @@ def table_page(
             self.on_refresh = on_refresh
             self.can_edit = can_edit
             self._filter_state = {}
+            self.server = ServerTable(
+                table, data_source, rows_per_page,
+                filters=lambda: {name: getattr(w, "value", w) for name, w in self._filter_state.items()},
+            ) if data_source is not None else None
         
         def refresh(self):
             """Reload table data"""
+            if self.server:
+                self.server.refresh(first_page=True)
+                return
             rows = self.on_refresh(self._filter_state)
             self.table.rows = rows
             self.table.update()
@@ -0,0 +1,120 @@
+"""Shared pieces of the service-ticket grids (dashboard + tickets page)."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional
+
+from nicegui import ui
+
+__all__ = ["ticket_grid_row", "add_ticket_slots", "KeysetGrid"]
+
+# ID colour by status (Emergency priority wins); the browser renders it from
+# the row fields, so rows carry plain values instead of pre-built HTML.
+_ID_SLOT = r'''
+    <q-td :props="props">
+        <span :class="props.row.priority === 'Emergency' ? 'text-red-500 font-bold'
+                    : props.row.status === 'Open' ? 'text-blue-400 font-bold'
+                    : props.row.status === 'In Progress' ? 'text-yellow-400 font-bold'
+                    : props.row.status === 'Closed' ? 'text-green-400' : ''">{{ props.value }}</span>
+    </q-td>
+'''
+
+# Unit count with a warning above 4 units
+_UNITS_SLOT = r'''
+    <q-td :props="props">
+        {{ props.value > 4 ? '⚠️ ' + props.value : (props.value || '—') }}
+    </q-td>
+'''
+
+# Rows past which scrolling loads the next page
+_SCROLL_MARGIN = 20
+
+
+def ticket_grid_row(call: Dict[str, Any]) -> Dict[str, Any]:
+    """Grid row for a ServiceCallGrid / service-call dict."""
+    customer_name = call.get("customer_name")
+    if not customer_name and call.get("customer_id"):
+        customer_name = f"Customer #{call.get('customer_id')}"
+    return {
+        "ID": call.get("ID"),
+        "title": (call.get("title") or "Untitled")[:60],
+        "customer": (customer_name or "—")[:40],
+        "location": (call.get("location_address") or "—")[:60],
+        "units": call.get("unit_count") or 0,
+        "status": call.get("status") or "—",
+        "priority": call.get("priority") or "—",
+        "created": (call.get("created") or "")[:16],
+        "_full_data": call,
+    }
+
+
+def add_ticket_slots(table: ui.table) -> None:
+    table.add_slot("body-cell-ID", _ID_SLOT)
+    table.add_slot("body-cell-units", _UNITS_SLOT)
+
+
+class KeysetGrid:
+    """
+    Infinite scroll for a virtual-scroll ui.table backed by a keyset loader.
+
+    `load(after, limit)` returns {"rows": [...], "next": cursor or None}
+    (e.g. tickets_repo.list_service_calls_page). reset() shows the first
+    page; scrolling near the end of the loaded rows fetches the next page
+    and appends it, so table.rows only holds the pages the user actually
+    scrolled through.
+    """
+
+    def __init__(self, table: ui.table, page_size: int,
+                 to_row: Callable[[Dict[str, Any]], Dict[str, Any]] = ticket_grid_row,
+                 on_rows: Optional[Callable[[], None]] = None):
+        self.table = table
+        self.page_size = page_size
+        self.to_row = to_row
+        self.on_rows = on_rows
+        self.load: Optional[Callable[[Any, int], Dict[str, Any]]] = None
+        self.next: Any = None
+        table.on(
+            "virtual-scroll",
+            self._on_scroll,
+            js_handler="(e) => emit({to: e.to, direction: e.direction})",
+            throttle=0.2,
+        )
+
+    def reset(self, load: Callable[[Any, int], Dict[str, Any]], first_page: Optional[Dict[str, Any]] = None) -> None:
+        """Show page 1 of a new query (optionally already loaded, e.g. a shared live snapshot)."""
+        self.load = load
+        self._page(first_page if first_page is not None else load(None, self.page_size))
+
+    def reload(self) -> None:
+        """Re-read everything loaded so far in one query (keeps the scroll depth)."""
+        if self.load is not None:
+            self._page(self.load(None, max(self.page_size, len(self.table.rows))))
+
+    def show_all(self, rows: List[Dict[str, Any]]) -> None:
+        """Unpaged result (e.g. search hits)."""
+        self.load = None
+        self.next = None
+        self._show([self.to_row(r) for r in rows])
+
+    def load_more(self) -> bool:
+        if self.load is None or self.next is None:
+            return False
+        page = self.load(self.next, self.page_size)
+        self.next = page["next"]
+        self._show(self.table.rows + [self.to_row(r) for r in page["rows"]])
+        return True
+
+    def _page(self, page: Dict[str, Any]) -> None:
+        self.next = page["next"]
+        self._show([self.to_row(r) for r in page["rows"]])
+
+    def _show(self, rows: List[Dict[str, Any]]) -> None:
+        self.table.rows = rows
+        self.table.update()
+        if self.on_rows:
+            self.on_rows()
+
+    def _on_scroll(self, e) -> None:
+        args = e.args or {}
+        if args.get("direction") == "increase" and (args.get("to") or 0) >= len(self.table.rows) - _SCROLL_MARGIN:
+            self.load_more()
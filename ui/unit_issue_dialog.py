@@ -12,22 +12,8 @@ from typing import Optional, Dict, Any
 
 
 def _get_latest_reading(unit_id: int):
-    conn = get_conn()
-    try:
-        cur = conn.cursor()
-        row = cur.execute(
-            """
-            SELECT *
-            FROM UnitReadings
-            WHERE unit_id = ?
-            ORDER BY reading_id DESC
-            LIMIT 1
-            """,
-            (unit_id,),
-        ).fetchone()
-        return dict(row) if row else None
-    finally:
-        conn.close()
+    from core.readings_repo import get_latest_reading
+    return get_latest_reading(unit_id)
 
 
 def _get_unit_info(unit_id: int) -> Optional[Dict[str, Any]]:
@@ -0,0 +1,125 @@
+"""
+Manage the declarative alert rules (core/alert_rules.py).
+
+  python utility/alert_rules.py                  list the active rules and where they come from
+  python utility/alert_rules.py --seed           create AlertRules and add missing default rules
+  python utility/alert_rules.py --export rules.yaml
+                                                 write the current rules as YAML (for ALERT_RULES_FILE)
+  python utility/alert_rules.py --check rules.yaml
+                                                 validate a YAML rule file without using it
+  python utility/alert_rules.py --bench 100000   time the compiled evaluator on synthetic readings
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.alert_rules import (
+    RULESETS,
+    _RULE_FIELDS,
+    _load_yaml,
+    ensure_alert_rules_table,
+    get_rule_engine,
+    normalize_rule,
+)
+
+
+def _list():
+    engine = get_rule_engine()
+    info = engine.reload()
+    print(f"Source: {info['source']}  ({info['fingerprint']})")
+    for message in info["errors"]:
+        print(f"  ✗ {message}")
+    for ruleset in RULESETS:
+        print(f"\n[{ruleset}]")
+        for r in engine.rules(ruleset):
+            cond = r["op"] if r["op"] in ("set", "always") else f"{r['op']} {r['value']:g}"
+            if r["value2"] is not None:
+                cond += f"..{r['value2']:g}"
+            guard = f"  modes={r['modes']}" if r["modes"] else ""
+            if r["hysteresis"]:
+                guard += f"  ±{r['hysteresis']:g}"
+            print(f"  {r['priority']:>4}  {r['code']:<24} {r['severity']:<9} {r['metric'] or '':<20} {cond}{guard}")
+
+
+def _export(path: Path):
+    import yaml
+
+    engine = get_rule_engine()
+    engine.reload()
+    data = {}
+    for ruleset in RULESETS:
+        data[ruleset] = [
+            {k: v for k, v in r.items() if k in _RULE_FIELDS and k != "ruleset" and v is not None}
+            for r in engine.rules(ruleset)
+        ]
+    path.write_text(yaml.safe_dump(data, sort_keys=False, allow_unicode=True), encoding="utf-8")
+    print(f"✓ Wrote {sum(len(v) for v in data.values())} rules to {path}")
+
+
+def _check(path: Path):
+    errors = 0
+    rules = _load_yaml(path)
+    for item in rules:
+        try:
+            normalize_rule(item)
+        except (ValueError, TypeError) as e:
+            errors += 1
+            print(f"  ✗ {e}")
+    if errors:
+        sys.exit(f"✗ {errors} of {len(rules)} rules invalid")
+    print(f"✓ {len(rules)} rules valid")
+
+
+def _bench(n: int):
+    rnd = random.Random(1)
+    readings = [
+        {
+            "supply_temp": rnd.uniform(25, 150), "return_temp": rnd.uniform(55, 85),
+            "mode": rnd.choice(["Cooling", "Heating", "Idle"]),
+            "discharge_psi": rnd.uniform(80, 420), "suction_psi": rnd.uniform(15, 160),
+            "v_1": rnd.uniform(15, 55), "v_2": rnd.uniform(15, 55), "v_3": rnd.uniform(15, 55),
+            "compressor_amps": rnd.uniform(10, 60), "fault_code": None,
+        }
+        for _ in range(n)
+    ]
+    engine = get_rule_engine()
+    engine.reload()
+    engine.reset_stats()
+    started = time.perf_counter()
+    for r in readings:
+        engine.evaluate(r, "alerts")
+    elapsed = time.perf_counter() - started
+    stats = engine.stats()
+    print(f"✓ {n:,} readings in {elapsed * 1000:.0f} ms ({elapsed * 1e6 / n:.1f} µs each)")
+    for key, hits in sorted(stats["hits"].items(), key=lambda kv: -kv[1]):
+        print(f"  {key:<34}{hits:>10,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true")
+    parser.add_argument("--export", type=Path)
+    parser.add_argument("--check", type=Path)
+    parser.add_argument("--bench", type=int)
+    args = parser.parse_args()
+
+    if args.seed:
+        ensure_alert_rules_table()
+        print("✓ AlertRules ready (missing default rules added)")
+    if args.export:
+        _export(args.export)
+    elif args.check:
+        _check(args.check)
+    elif args.bench:
+        _bench(args.bench)
+    else:
+        _list()
+
+
+if __name__ == "__main__":
+    main()
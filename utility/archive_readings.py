@@ -0,0 +1,79 @@
+"""
+Archive closed months of raw telemetry out of UnitReadings.
+
+Each month goes to its own database file (data/archive/readings_YYYY_MM.db,
+or TELEMETRY_ARCHIVE_DIR). Rows are deleted from the live table in small
+batches, so the app keeps running. Roll-ups are brought up to date first.
+
+Usage:
+  python utility/archive_readings.py 2025-11            # archive one month
+  python utility/archive_readings.py --before 2026-01   # every month before January 2026
+  python utility/archive_readings.py --list
+  python utility/archive_readings.py --detach 2025-11   # forget it (file is kept)
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.db import get_conn
+from core.telemetry_store import (
+    archive_month,
+    detach_partition,
+    ensure_rollup_tables,
+    list_partitions,
+    run_rollups,
+)
+
+
+def _months_before(month: str):
+    conn = get_conn()
+    try:
+        rows = conn.execute(
+            "SELECT DISTINCT substr(ts, 1, 7) AS m FROM UnitReadings WHERE ts < ? ORDER BY m",
+            (f"{month}-01 00:00:00",),
+        ).fetchall()
+        return [r["m"] for r in rows]
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive monthly telemetry partitions")
+    parser.add_argument("month", nargs="?", help="YYYY-MM")
+    parser.add_argument("--before", help="archive every month before YYYY-MM")
+    parser.add_argument("--list", action="store_true", help="list archived months")
+    parser.add_argument("--detach", metavar="YYYY-MM", help="unregister an archived month")
+    args = parser.parse_args()
+
+    ensure_rollup_tables()
+
+    if args.list:
+        for p in list_partitions():
+            print(f"{p['month']}  {p['rows']:>10} rows  {p['first_ts']} .. {p['last_ts']}  {p['path']}")
+        return
+    if args.detach:
+        path = detach_partition(args.detach)
+        print(f"✓ {args.detach} detached, file kept at {path}" if path else f"✗ {args.detach} is not archived")
+        return
+
+    months = _months_before(args.before) if args.before else [args.month] if args.month else []
+    if not months:
+        parser.print_help()
+        return
+
+    run_rollups()
+    for month in months:
+        try:
+            result = archive_month(month)
+        except ValueError as e:
+            print(f"✗ {month}: {e}")
+            continue
+        print(f"✓ {month}: {result['copied']} copied, {result['deleted']} removed from UnitReadings "
+              f"in {result['seconds']:.1f}s -> {result['path']}")
+
+
+if __name__ == "__main__":
+    main()
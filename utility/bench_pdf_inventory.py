@@ -0,0 +1,90 @@
+"""
+Benchmark: equipment inventory PDF export, materialized list vs streamed cursor.
+
+Builds a throwaway database with N units (long model names so some cells
+wrap), then renders generate_equipment_inventory_pdf in a fresh process per
+run and reports wall time and peak RSS:
+  - list:    get_equipment_inventory_report() -> every row in memory first
+  - stream:  iter_equipment_inventory() straight from the SQLite cursor
+             (what the PDF worker does)
+Peak RSS still includes the PDF itself (reportlab keeps the page streams of
+one document until save), so compare the growth per row, not absolute MB.
+
+Usage: python utility/bench_pdf_inventory.py [--rows 20000 50000 200000] [--modes list stream]
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def _build_db(path: Path, n_units: int) -> None:
+    import sqlite3
+    conn = sqlite3.connect(path)
+    conn.executescript((ROOT / "schema" / "schema.sql").read_text(encoding="utf-8"))
+    n_customers = max(1, n_units // 200)
+    conn.executemany("INSERT INTO Customers (ID, company) VALUES (?, ?)",
+                     [(i, f"Customer {i:05d} Holdings") for i in range(1, n_customers + 1)])
+    conn.executemany(
+        "INSERT INTO PropertyLocations (ID, customer_id, address1, city, state) VALUES (?, ?, ?, ?, ?)",
+        [(i, (i - 1) // 10 + 1, f"{i} Industrial Parkway", "Springfield", "IL") for i in range(1, n_customers * 10 + 1)],
+    )
+    conn.executemany(
+        "INSERT INTO Units (unit_id, location_id, unit_tag, make, model, serial, inst_date) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(i, (i - 1) // 20 + 1, f"RTU-{i}", "Carrier", "48TC" + "-HIGH-EFFICIENCY" * (i % 4), f"SN{i:010d}", "2019-05-01")
+         for i in range(1, n_units + 1)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def _child(db_path: str, mode: str) -> None:
+    """Render once in this process and print {"seconds", "rss_mb", "pdf_mb"} as JSON."""
+    from core import db
+    db.DB_PATH = Path(db_path)
+    from core.report_document import generate_equipment_inventory_pdf
+    from core.reports_repo import count_equipment_inventory, get_equipment_inventory_report, iter_equipment_inventory
+
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    if mode == "list":
+        _, pdf = generate_equipment_inventory_pdf(get_equipment_inventory_report())
+    else:
+        _, pdf = generate_equipment_inventory_pdf(iter_equipment_inventory(), total=count_equipment_inventory())
+    seconds = time.perf_counter() - started
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": seconds, "rss_mb": (peak_rss - base_rss) / 1024, "pdf_mb": len(pdf) / 2 ** 20}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[20_000, 50_000, 200_000])
+    parser.add_argument("--modes", nargs="+", default=["list", "stream"], choices=["list", "stream"])
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(*args.child)
+        return
+
+    print(f"{'rows':>10}{'mode':>8}{'time':>10}{'rows/s':>10}{'+RSS':>10}{'PDF':>9}{'RSS/row':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.rows:
+            db_path = Path(tmp) / f"inventory_{n}.db"
+            _build_db(db_path, n)
+            for mode in args.modes:
+                out = subprocess.run([sys.executable, __file__, "--child", str(db_path), mode],
+                                     check=True, capture_output=True, text=True, cwd=tmp).stdout
+                r = json.loads(out.strip().splitlines()[-1])
+                print(f"{n:>10,}{mode:>8}{r['seconds']:>9.1f}s{n / r['seconds']:>10,.0f}"
+                      f"{r['rss_mb']:>8.0f}MB{r['pdf_mb']:>7.1f}MB{r['rss_mb'] * 2 ** 20 / n:>9.0f}B")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Benchmark: TEXT vs REAL/INTEGER telemetry columns.
+
+Builds two throw-away databases with the same synthetic UnitReadings rows,
+one with the legacy all-TEXT schema and one with the typed schema from
+core.readings_repo, then times:
+  - a numeric range filter (supply_temp < 32), with and without an index
+  - a per-unit aggregate (AVG supply_temp / MAX discharge_psi)
+  - fetching rows and running core.alert_system.evaluate_all_alerts on them
+
+The legacy queries need CAST(... AS REAL) to be correct at all: on a TEXT
+column `supply_temp < 32` is a string comparison ('100.5' < '32').
+
+Usage: python utility/bench_readings_numeric.py [--rows 10000000] [--units 2000] [--dir /tmp]
+"""
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.alert_system import evaluate_all_alerts
+from core.readings_repo import NUMERIC_COLUMNS, READING_COLUMNS, _typed_readings_ddl
+
+TEMPLATE_ROWS = 5000
+CHUNK = 50000
+EVAL_ROWS = 100000
+
+
+def _template_rows():
+    """A pool of realistic readings (as strings, like gateways used to send)."""
+    rnd = random.Random(42)
+    modes = ["Cooling", "Heating", "Idle", "Off", "Fault"]
+    rows = []
+    for _ in range(TEMPLATE_ROWS):
+        r = {}
+        for col in READING_COLUMNS[2:]:
+            typ = NUMERIC_COLUMNS.get(col)
+            if typ == "REAL":
+                r[col] = f"{rnd.uniform(0, 400):.1f}"
+            elif typ == "INTEGER":
+                r[col] = str(rnd.randint(0, 100))
+            else:
+                r[col] = None
+        r["supply_temp"] = f"{rnd.uniform(20, 95):.1f}"
+        r["return_temp"] = f"{rnd.uniform(60, 85):.1f}"
+        r["v_1"], r["v_2"], r["v_3"] = (f"{rnd.uniform(225, 245):.1f}" for _ in range(3))
+        r["mode"] = rnd.choice(modes)
+        r["c_1"] = r["c_2"] = r["c_3"] = "OK"
+        rows.append(tuple(r[col] for col in READING_COLUMNS[2:]))
+    return rows
+
+
+def _build(path: Path, typed: bool, n_rows: int, n_units: int, templates) -> float:
+    conn = sqlite3.connect(str(path))
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("CREATE TABLE Units (unit_id INTEGER PRIMARY KEY)")
+    conn.executemany("INSERT INTO Units VALUES (?)", [(i,) for i in range(1, n_units + 1)])
+
+    ddl = _typed_readings_ddl("UnitReadings")
+    if not typed:
+        for typ in ("REAL", "INTEGER"):
+            ddl = ddl.replace(f" {typ},", " TEXT,")
+    conn.execute(ddl)
+
+    cols = ", ".join(READING_COLUMNS)
+    sql = f"INSERT INTO UnitReadings ({cols}) VALUES ({', '.join('?' for _ in READING_COLUMNS)})"
+    started = time.perf_counter()
+    done = 0
+    while done < n_rows:
+        batch = []
+        for i in range(done, min(done + CHUNK, n_rows)):
+            ts = f"2026-01-{1 + (i // 400000) % 28:02d} {(i // 20000) % 24:02d}:{(i // 400) % 60:02d}:{i % 60:02d}"
+            batch.append((1 + i % n_units, ts, *templates[i % len(templates)]))
+        conn.executemany(sql, batch)
+        conn.commit()
+        done += len(batch)
+    conn.execute("CREATE INDEX idx_readings_unit_ts ON UnitReadings(unit_id, ts)")
+    conn.commit()
+    conn.close()
+    return time.perf_counter() - started
+
+
+def _time(conn, sql, params=()):
+    started = time.perf_counter()
+    result = conn.execute(sql, params).fetchall()
+    return (time.perf_counter() - started) * 1000.0, result
+
+
+def _bench(path: Path, typed: bool):
+    conn = sqlite3.connect(str(path))
+    conn.row_factory = sqlite3.Row
+    temp = "supply_temp" if typed else "CAST(supply_temp AS REAL)"
+    disch = "discharge_psi" if typed else "CAST(discharge_psi AS REAL)"
+    out = {"size_mb": path.stat().st_size / (1024 * 1024)}
+
+    out["range_scan_ms"], rows = _time(conn, f"SELECT COUNT(*) FROM UnitReadings WHERE {temp} < 32")
+    out["range_count"] = rows[0][0]
+
+    if typed:
+        conn.execute("CREATE INDEX idx_bench_supply ON UnitReadings(supply_temp)")
+    else:
+        conn.execute("CREATE INDEX idx_bench_supply ON UnitReadings(CAST(supply_temp AS REAL))")
+    out["range_indexed_ms"], _ = _time(conn, f"SELECT COUNT(*) FROM UnitReadings WHERE {temp} < 32")
+    plan = conn.execute(f"EXPLAIN QUERY PLAN SELECT COUNT(*) FROM UnitReadings WHERE {temp} < 32").fetchall()
+    out["range_plan"] = "; ".join(r[3] for r in plan)
+
+    out["aggregate_ms"], _ = _time(
+        conn, f"SELECT unit_id, AVG({temp}), MAX({disch}) FROM UnitReadings GROUP BY unit_id"
+    )
+
+    started = time.perf_counter()
+    rows = conn.execute("SELECT * FROM UnitReadings LIMIT ?", (EVAL_ROWS,)).fetchall()
+    for row in rows:
+        evaluate_all_alerts(row)
+    out["evaluate_ms"] = (time.perf_counter() - started) * 1000.0
+    conn.close()
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--units", type=int, default=2000)
+    parser.add_argument("--dir", default=None, help="where to put the temporary databases")
+    args = parser.parse_args()
+
+    templates = _template_rows()
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        results = {}
+        for label, typed in (("TEXT", False), ("typed", True)):
+            path = Path(tmp) / f"bench_{label}.db"
+            print(f"Building {label} table with {args.rows:,} rows...")
+            load_s = _build(path, typed, args.rows, args.units, templates)
+            results[label] = _bench(path, typed)
+            results[label]["load_s"] = load_s
+            path.unlink()
+
+    print()
+    print(f"{'metric':<28}{'TEXT':>14}{'typed':>14}")
+    for key, fmt in (("load_s", "{:.1f}s"), ("size_mb", "{:.0f} MB"), ("range_scan_ms", "{:.0f} ms"),
+                     ("range_indexed_ms", "{:.0f} ms"), ("aggregate_ms", "{:.0f} ms"),
+                     ("evaluate_ms", "{:.0f} ms")):
+        print(f"{key:<28}{fmt.format(results['TEXT'][key]):>14}{fmt.format(results['typed'][key]):>14}")
+    print(f"{'rows with supply_temp < 32':<28}{results['TEXT']['range_count']:>14,}{results['typed']['range_count']:>14,}")
+    print(f"\nevaluate_ms = fetch + evaluate_all_alerts on {EVAL_ROWS:,} rows")
+    print(f"TEXT plan:  {results['TEXT']['range_plan']}")
+    print(f"typed plan: {results['typed']['range_plan']}")
+
+
+if __name__ == "__main__":
+    main()
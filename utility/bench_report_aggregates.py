@@ -0,0 +1,105 @@
+"""
+Benchmark: customer summary report, fan-out join vs pre-aggregated subqueries.
+
+Builds a throwaway database of N customers, each with LOCATIONS locations
+of UNITS units and TICKETS service calls, and times both forms of the
+customer summary query:
+  - join:      Customers ⟕ PropertyLocations ⟕ Units ⟕ ServiceCalls, then
+               COUNT(DISTINCT) - visits locations × units × tickets rows per customer
+  - subquery:  reports_repo.get_customer_summary_report() - locations (with
+               unit counts) and tickets grouped separately, one row per customer
+Both results are compared row by row before timing. Doubling --tickets
+should roughly double the join time and barely move the subquery time.
+
+Usage: python utility/bench_report_aggregates.py [--customers 2000] [--locations 3] [--units 5] [--tickets 10 20 40]
+"""
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+JOIN_SQL = """
+    SELECT
+        c.ID as customer_id, c.company as customer_name, c.email as customer_email,
+        c.phone1 as customer_phone, c.address1, c.city, c.state, c.zip,
+        COUNT(DISTINCT pl.ID) as location_count,
+        COUNT(DISTINCT u.unit_id) as equipment_count,
+        COUNT(DISTINCT CASE WHEN sc.status IN ('Open', 'Pending', 'In Progress') THEN sc.ID END) as open_tickets,
+        COUNT(DISTINCT sc.ID) as total_tickets,
+        MAX(sc.created) as last_service_date
+    FROM Customers c
+    LEFT JOIN PropertyLocations pl ON c.ID = pl.customer_id
+    LEFT JOIN Units u ON pl.ID = u.location_id
+    LEFT JOIN ServiceCalls sc ON c.ID = sc.customer_id
+    GROUP BY c.ID
+    ORDER BY c.company, c.ID
+"""
+
+
+def _build_db(path: Path, customers: int, locations: int, units: int, tickets: int) -> None:
+    conn = sqlite3.connect(path)
+    conn.executescript((ROOT / "schema" / "schema.sql").read_text(encoding="utf-8"))
+    conn.executescript((ROOT / "schema" / "ticket_grid.sql").read_text(encoding="utf-8").split("DROP VIEW")[0])
+    conn.executemany("INSERT INTO Customers (ID, company) VALUES (?, ?)",
+                     [(i, f"Customer {i:05d}") for i in range(1, customers + 1)])
+    n_locations = customers * locations
+    conn.executemany("INSERT INTO PropertyLocations (ID, customer_id, address1) VALUES (?, ?, ?)",
+                     [(i, (i - 1) // locations + 1, f"{i} Main St") for i in range(1, n_locations + 1)])
+    conn.executemany("INSERT INTO Units (unit_id, location_id, unit_tag) VALUES (?, ?, ?)",
+                     [(i, (i - 1) // units + 1, f"RTU-{i}") for i in range(1, n_locations * units + 1)])
+    statuses = ("Open", "Closed", "In Progress", "Closed")
+    conn.executemany("INSERT INTO ServiceCalls (ID, customer_id, title, status, created) VALUES (?, ?, 't', ?, ?)",
+                     [(i, (i - 1) // tickets + 1, statuses[i % 4], f"2026-01-{i % 28 + 1:02d} 08:00:00")
+                      for i in range(1, customers * tickets + 1)])
+    conn.commit()
+    conn.close()
+
+
+def _time(run, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customers", type=int, default=2000)
+    parser.add_argument("--locations", type=int, default=3)
+    parser.add_argument("--units", type=int, default=5, help="units per location")
+    parser.add_argument("--tickets", type=int, nargs="+", default=[10, 20, 40], help="tickets per customer")
+    args = parser.parse_args()
+
+    from core import db
+    from core.reports_repo import get_customer_summary_report
+
+    print(f"{'tickets':>8}{'joined rows':>14}{'join':>10}{'subquery':>10}{'speedup':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for tickets in args.tickets:
+            path = Path(tmp) / f"summary_{tickets}.db"
+            _build_db(path, args.customers, args.locations, args.units, tickets)
+            db.close_pools()
+            db.DB_PATH = path
+
+            conn = sqlite3.connect(path)
+            conn.row_factory = sqlite3.Row
+            joined = [dict(r) for r in conn.execute(JOIN_SQL)]
+            if joined != get_customer_summary_report():
+                raise SystemExit(f"results differ at {tickets} tickets per customer")
+            join_s = _time(lambda: conn.execute(JOIN_SQL).fetchall())
+            conn.close()
+            sub_s = _time(get_customer_summary_report.uncached)
+            rows = args.customers * args.locations * args.units * tickets
+            print(f"{tickets:>8}{rows:>14,}{join_s:>9.3f}s{sub_s:>9.3f}s{join_s / sub_s:>8.1f}x")
+    db.close_pools()
+
+
+if __name__ == "__main__":
+    main()
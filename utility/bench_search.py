@@ -0,0 +1,160 @@
+"""
+Benchmark: LIKE '%x%' scans vs the FTS5 search index (core/search_index.py).
+
+Builds a throwaway database with synthetic customers, locations, units and
+service calls, then times the repo search functions twice:
+  - like:  no index yet, so the repos OR LIKE '%x%' over every column
+  - fts:   after ensure_search_index(), ranked prefix lookups
+plus the one-off index build and search_all() across all four entities.
+
+Usage: python utility/bench_search.py [--customers 100000] [--tickets 1000000] [--repeat 3]
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import db
+
+FIRST = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+         "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Carlos", "Nguyen"]
+LAST = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+        "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin"]
+WORDS = ["Acme", "Summit", "Harbor", "Pioneer", "Liberty", "Cedar", "Granite", "Valley", "Lakeside", "Metro",
+         "Northwind", "Evergreen", "Frontier", "Keystone", "Riverside", "Sterling", "Beacon", "Crescent"]
+SUFFIX = ["LLC", "Inc", "Properties", "Holdings", "Management", "Group", "Realty", "Partners"]
+STREETS = ["Main St", "Oak Ave", "Maple Dr", "Park Blvd", "Elm St", "Lake Rd", "Hill St", "Pine Ln"]
+CITIES = [("Boston", "MA"), ("Denver", "CO"), ("Austin", "TX"), ("Tampa", "FL"), ("Dayton", "OH"), ("Fresno", "CA")]
+MAKES = ["Carrier", "Trane", "Lennox", "Rheem", "Goodman", "York", "Daikin"]
+ISSUES = ["Compressor noise", "No cooling", "Filter change", "Thermostat fault", "Refrigerant leak",
+          "Short cycling", "Frozen coil", "Blower motor", "Quarterly PM", "Breaker tripping"]
+DETAILS = ["loud rattle at startup", "unit iced over overnight", "tenant reports warm air", "replaced capacitor",
+           "checked superheat and subcool", "cleaned condenser coil", "belt worn", "error code flashing",
+           "low suction pressure", "high head pressure", "drain pan overflowing", "contactor pitted"]
+
+
+def _build(path: Path, n_customers: int, n_tickets: int) -> None:
+    rnd = random.Random(7)
+    with db.get_conn() as conn:
+        conn.executescript((Path(__file__).parent.parent / "schema" / "schema.sql").read_text(encoding="utf-8"))
+        conn.execute("ALTER TABLE PropertyLocations ADD COLUMN business_name TEXT DEFAULT ''")
+        conn.execute("ALTER TABLE PropertyLocations ADD COLUMN extendednotes TEXT")
+
+        conn.executemany(
+            "INSERT INTO Customers (ID, company, first_name, last_name, email, phone1, address1, city, state, zip, notes) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (i, f"{rnd.choice(WORDS)} {rnd.choice(WORDS)} {rnd.choice(SUFFIX)}", first, last,
+                 f"{first.lower()}.{last.lower()}{i}@example.com", f"555-{rnd.randint(100, 999)}-{rnd.randint(1000, 9999)}",
+                 f"{rnd.randint(1, 9999)} {rnd.choice(STREETS)}", *rnd.choice(CITIES), f"{rnd.randint(10000, 99999)}",
+                 rnd.choice(DETAILS) if rnd.random() < 0.3 else None)
+                for i in range(1, n_customers + 1)
+                for first, last in [(rnd.choice(FIRST), rnd.choice(LAST))]
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO PropertyLocations (ID, customer_id, address1, city, state, zip, contact, business_name) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (i, i, f"{rnd.randint(1, 9999)} {rnd.choice(STREETS)}", *rnd.choice(CITIES),
+                 f"{rnd.randint(10000, 99999)}", f"{rnd.choice(FIRST)} {rnd.choice(LAST)}",
+                 f"{rnd.choice(WORDS)} {rnd.choice(SUFFIX)}")
+                for i in range(1, n_customers + 1)
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO Units (unit_id, location_id, unit_tag, make, model, serial) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (u, (u + 1) // 2, f"RTU-{u % 20 + 1}", rnd.choice(MAKES), f"M{rnd.randint(100, 999)}",
+                 f"SN{rnd.randint(10**8, 10**9)}")
+                for u in range(1, 2 * n_customers + 1)
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO ServiceCalls (ID, customer_id, location_id, unit_id, title, description, created) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                (t, c, c, 2 * c, rnd.choice(ISSUES), f"{rnd.choice(DETAILS)}, {rnd.choice(DETAILS)}",
+                 f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d} 10:00:00")
+                for t in range(1, n_tickets + 1)
+                for c in [rnd.randint(1, n_customers)]
+            ),
+        )
+
+
+def _best(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = (time.perf_counter() - started) * 1000.0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from core.customers_repo import list_customers
+    from core.locations_repo import list_locations
+    from core.search_index import ensure_search_index, search_all
+    from core.tickets_repo import search_service_calls
+    from core.units_repo import list_units
+
+    cases = [
+        ("customers", "garcia", lambda: list_customers("garcia")),
+        ("customers", "summit harbor", lambda: list_customers("summit harbor")),
+        ("customers", "555-4", lambda: list_customers("555-4")),
+        ("customers", "garcia451", lambda: list_customers("garcia451")),
+        ("locations", "oak", lambda: list_locations("oak")),
+        ("locations", "keystone", lambda: list_locations("keystone", customer_id=42)),
+        ("units", "trane", lambda: list_units("trane")),
+        ("units", "sn12345", lambda: list_units("sn12345")),
+        ("tickets", "refrigerant", lambda: search_service_calls("refrigerant")),
+        ("tickets", "superheat coil", lambda: search_service_calls("superheat coil")),
+        ("tickets", "123456", lambda: search_service_calls("123456")),
+        ("tickets", "overflowing (cust)", lambda: search_service_calls("overflowing", customer_id=42)),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = Path(tmp) / "bench.db"
+        db.close_pools()
+        started = time.perf_counter()
+        _build(db.DB_PATH, args.customers, args.tickets)
+        print(f"Built {args.customers:,} customers / locations, {2 * args.customers:,} units, "
+              f"{args.tickets:,} tickets in {time.perf_counter() - started:.1f}s\n")
+
+        like = {}
+        for entity, term, func in cases:
+            like[(entity, term)] = _best(func, args.repeat)
+
+        started = time.perf_counter()
+        status = ensure_search_index()
+        print(f"ensure_search_index: {(time.perf_counter() - started):.1f}s {status}\n")
+
+        print(f"{'entity':<11}{'search':<22}{'like':>10}{'fts':>10}{'speedup':>10}{'hits':>12}")
+        for entity, term, func in cases:
+            like_ms, like_rows = like[(entity, term)]
+            fts_ms, fts_rows = _best(func, args.repeat)
+            print(f"{entity:<11}{term:<22}{like_ms:>8.1f}ms{fts_ms:>8.1f}ms{like_ms / fts_ms:>9.0f}x"
+                  f"{len(like_rows):>6}/{len(fts_rows):<5}")
+
+        global_ms, hits = _best(lambda: search_all("harbor"), args.repeat)
+        print(f"\nsearch_all('harbor'): {global_ms:.1f}ms, {len(hits)} hits "
+              f"({', '.join(sorted({h['entity'] for h in hits}))})")
+        print("hits = like/fts rows returned (like is substring, fts is ranked word-prefix, capped at SEARCH_MAX_RESULTS)")
+        db.close_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Convert UnitReadings metric columns from TEXT to REAL/INTEGER.
+Rebuilds the table in one transaction (reading_ids, indexes and the
+UnitLatestReading triggers are kept) and creates the UnitReadingsText view
+for readers that still expect strings. Safe to re-run.
+
+Stop the app (or at least telemetry ingestion) while this runs: the rebuild
+holds the write lock for the whole copy.
+
+Usage: python utility/migrate_readings_numeric.py
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.readings_repo import migrate_readings_to_numeric
+
+
+def main():
+    result = migrate_readings_to_numeric()
+    if not result["migrated"]:
+        print(f"✓ Nothing to do: {result['reason']}")
+        return
+
+    mb = 1024 * 1024
+    print(f"✓ UnitReadings rebuilt with numeric columns: {result['rows']} row(s) in {result['seconds']:.2f}s")
+    print(f"  Used: {result['bytes_before'] / mb:.1f} MB -> {result['bytes_after'] / mb:.1f} MB "
+          "(run VACUUM to return freed pages to the OS)")
+    if result["non_numeric"]:
+        print("⚠ Values kept as text because they are not numbers:")
+        for col, n in sorted(result["non_numeric"].items()):
+            print(f"  {col}: {n}")
+
+
+if __name__ == "__main__":
+    main()
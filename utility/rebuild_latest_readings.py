@@ -0,0 +1,29 @@
+"""
+Rebuild UnitLatestReading from UnitReadings.
+Run after bulk imports / backfills that wrote readings with triggers disabled
+or before the UnitLatestReading migration existed.
+
+Usage: python utility/rebuild_latest_readings.py
+"""
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.readings_repo import ensure_latest_reading_table, rebuild_latest_readings
+
+
+def main():
+    started = time.perf_counter()
+    created = ensure_latest_reading_table()
+    if created:
+        print("✓ UnitLatestReading table + triggers created (backfilled)")
+    count = rebuild_latest_readings()
+    elapsed = time.perf_counter() - started
+    print(f"✓ UnitLatestReading rebuilt: {count} unit(s) in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Apply the telemetry retention policy now (same as the background job).
+Policy is edited in Settings > Service or TelemetryRetentionSettings.
+
+Usage: python utility/run_retention.py
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.settings_repo import get_retention_settings
+from core.telemetry_retention import run_retention
+from core.telemetry_store import ensure_rollup_tables, run_rollups
+
+
+def main():
+    settings = get_retention_settings()
+    print("Policy (days, 0 = forever): " + ", ".join(
+        f"{k.replace('_days', '')}={settings[k]}" for k in settings if k.endswith("_days")
+    ))
+    ensure_rollup_tables()
+    run_rollups()
+    result = run_retention()
+    if result.get("skipped"):
+        print(f"✓ Retention is {result['skipped']}")
+        return
+    print(f"✓ Pruned {result['raw_pruned']} raw reading(s) and {result['rollups_pruned']} roll-up row(s)")
+    print(f"  Reclaimed {result['bytes_reclaimed'] / (1024 * 1024):.1f} MB in {result['duration_ms'] / 1000:.2f}s")
+    if not result["complete"]:
+        print("  Batch limit reached - run again (or let the background job) to continue")
+
+
+if __name__ == "__main__":
+    main()